@@ -16,8 +16,8 @@ from PySide6.QtGui import (QBrush, QColor, QConicalGradient, QCursor,
     QImage, QKeySequence, QLinearGradient, QPainter,
     QPalette, QPixmap, QRadialGradient, QTransform)
 from PySide6.QtWidgets import (QApplication, QFrame, QHBoxLayout, QHeaderView,
-    QSizePolicy, QSpacerItem, QStackedWidget, QTableWidget,
-    QTableWidgetItem, QVBoxLayout, QWidget)
+    QSizePolicy, QSpacerItem, QStackedWidget, QTableView,
+    QVBoxLayout, QWidget)
 
 from qfluentwidgets import (BodyLabel, CardWidget, ComboBox, HorizontalSeparator,
     LineEdit, Pivot, ProgressBar, PushButton,
@@ -89,6 +89,12 @@ class teach_page_frame(object):
 
         self.horizontalLayout.addWidget(self.ActionLoopTimes)
 
+        self.ActionLoopDwellEdit = LineEdit(Frame)
+        self.ActionLoopDwellEdit.setObjectName(u"ActionLoopDwellEdit")
+        self.ActionLoopDwellEdit.setAlignment(Qt.AlignCenter)
+
+        self.horizontalLayout.addWidget(self.ActionLoopDwellEdit)
+
 
         self.verticalLayout_7.addLayout(self.horizontalLayout)
 
@@ -97,31 +103,7 @@ class teach_page_frame(object):
 
         self.verticalLayout_7.addWidget(self.HorizontalSeparator)
 
-        self.ActionTableWidget = QTableWidget(Frame)
-        if (self.ActionTableWidget.columnCount() < 11):
-            self.ActionTableWidget.setColumnCount(11)
-        __qtablewidgetitem = QTableWidgetItem()
-        self.ActionTableWidget.setHorizontalHeaderItem(0, __qtablewidgetitem)
-        __qtablewidgetitem1 = QTableWidgetItem()
-        self.ActionTableWidget.setHorizontalHeaderItem(1, __qtablewidgetitem1)
-        __qtablewidgetitem2 = QTableWidgetItem()
-        self.ActionTableWidget.setHorizontalHeaderItem(2, __qtablewidgetitem2)
-        __qtablewidgetitem3 = QTableWidgetItem()
-        self.ActionTableWidget.setHorizontalHeaderItem(3, __qtablewidgetitem3)
-        __qtablewidgetitem4 = QTableWidgetItem()
-        self.ActionTableWidget.setHorizontalHeaderItem(4, __qtablewidgetitem4)
-        __qtablewidgetitem5 = QTableWidgetItem()
-        self.ActionTableWidget.setHorizontalHeaderItem(5, __qtablewidgetitem5)
-        __qtablewidgetitem6 = QTableWidgetItem()
-        self.ActionTableWidget.setHorizontalHeaderItem(6, __qtablewidgetitem6)
-        __qtablewidgetitem7 = QTableWidgetItem()
-        self.ActionTableWidget.setHorizontalHeaderItem(7, __qtablewidgetitem7)
-        __qtablewidgetitem8 = QTableWidgetItem()
-        self.ActionTableWidget.setHorizontalHeaderItem(8, __qtablewidgetitem8)
-        __qtablewidgetitem9 = QTableWidgetItem()
-        self.ActionTableWidget.setHorizontalHeaderItem(9, __qtablewidgetitem9)
-        __qtablewidgetitem10 = QTableWidgetItem()
-        self.ActionTableWidget.setHorizontalHeaderItem(10, __qtablewidgetitem10)
+        self.ActionTableWidget = QTableView(Frame)
         self.ActionTableWidget.setObjectName(u"ActionTableWidget")
 
         self.verticalLayout_7.addWidget(self.ActionTableWidget)
@@ -1089,28 +1071,8 @@ class teach_page_frame(object):
 "}", None))
         self.ActionLoopTimes.setText("")
         self.ActionLoopTimes.setPlaceholderText(QCoreApplication.translate("Frame", u"1~100", None))
-        ___qtablewidgetitem = self.ActionTableWidget.horizontalHeaderItem(0)
-        ___qtablewidgetitem.setText(QCoreApplication.translate("Frame", u"J1", None));
-        ___qtablewidgetitem1 = self.ActionTableWidget.horizontalHeaderItem(1)
-        ___qtablewidgetitem1.setText(QCoreApplication.translate("Frame", u"J2", None));
-        ___qtablewidgetitem2 = self.ActionTableWidget.horizontalHeaderItem(2)
-        ___qtablewidgetitem2.setText(QCoreApplication.translate("Frame", u"J3", None));
-        ___qtablewidgetitem3 = self.ActionTableWidget.horizontalHeaderItem(3)
-        ___qtablewidgetitem3.setText(QCoreApplication.translate("Frame", u"J4", None));
-        ___qtablewidgetitem4 = self.ActionTableWidget.horizontalHeaderItem(4)
-        ___qtablewidgetitem4.setText(QCoreApplication.translate("Frame", u"J5", None));
-        ___qtablewidgetitem5 = self.ActionTableWidget.horizontalHeaderItem(5)
-        ___qtablewidgetitem5.setText(QCoreApplication.translate("Frame", u"J6", None));
-        ___qtablewidgetitem6 = self.ActionTableWidget.horizontalHeaderItem(6)
-        ___qtablewidgetitem6.setText(QCoreApplication.translate("Frame", u"\u901f\u5ea6", None));
-        ___qtablewidgetitem7 = self.ActionTableWidget.horizontalHeaderItem(7)
-        ___qtablewidgetitem7.setText(QCoreApplication.translate("Frame", u"\u5de5\u5177", None));
-        ___qtablewidgetitem8 = self.ActionTableWidget.horizontalHeaderItem(8)
-        ___qtablewidgetitem8.setText(QCoreApplication.translate("Frame", u"\u5f00\u5173", None));
-        ___qtablewidgetitem9 = self.ActionTableWidget.horizontalHeaderItem(9)
-        ___qtablewidgetitem9.setText(QCoreApplication.translate("Frame", u"\u5ef6\u65f6", None));
-        ___qtablewidgetitem10 = self.ActionTableWidget.horizontalHeaderItem(10)
-        ___qtablewidgetitem10.setText(QCoreApplication.translate("Frame", u"\u5907\u6ce8", None));
+        self.ActionLoopDwellEdit.setText("")
+        self.ActionLoopDwellEdit.setPlaceholderText(QCoreApplication.translate("Frame", u"\u95f4\u9694 0 s", None))
         self.ActionDeleteButton.setText(QCoreApplication.translate("Frame", u"\u5220\u9664\u52a8\u4f5c", None))
         self.ActionDeleteButton.setProperty("lightCustomQss", QCoreApplication.translate("Frame", u"PushButton {\n"
 "    background: rgb(225, 41, 41);\n"
@@ -0,0 +1,151 @@
+"""示教动作文件的流式读写
+
+动作文件是一个 JSON 数组, 每个元素为一个动作记录, 字段为 J1/X ~ J6/X、速度、工具、开关、延时、备注。
+读取时按块读入并逐条解析记录, 写入时逐条写出记录, 内存占用只与单条记录和读写块的大小有关, 与文件大小无关。
+写出的格式与 json.dump(records, indent=4, ensure_ascii=False) 完全一致。
+"""
+import codecs
+import json
+import os
+import re
+import textwrap
+from typing import Iterator
+
+_WHITESPACE = re.compile(r'\s*')
+_encode_value = json.JSONEncoder(ensure_ascii=False).encode
+_encode_string = json.encoder.encode_basestring
+
+
+def format_record(record: dict) -> str:
+    """格式化一条记录, 结果与数组元素在 json.dumps(indent=4) 中的文本相同
+
+    动作记录只有一层字段, 逐个字段用 C 实现的编码器编码, 比带缩进的 json.dumps 快得多。
+    """
+    if not record or any(isinstance(value, (dict, list, tuple)) for value in record.values()):
+        return textwrap.indent(json.dumps(record, indent=4, ensure_ascii=False), "    ")
+    fields = ",\n".join(
+        f"        {_encode_string(str(key))}: {_encode_string(value) if type(value) is str else _encode_value(value)}"
+        for key, value in record.items())
+    return "    {\n" + fields + "\n    }"
+
+
+class ActionFileReader(object):
+    """逐条读取动作文件中的记录
+
+    bytes_read / file_size 为读取进度。
+
+    Raises:
+        ValueError: 文件不是动作记录组成的 JSON 数组
+    """
+
+    def __init__(self, file_name, read_size=1 << 16):
+        self.file_name = file_name
+        self.read_size = read_size
+        self.file_size = os.path.getsize(file_name)
+        self.bytes_read = 0
+
+    def __iter__(self) -> Iterator[dict]:
+        decoder = json.JSONDecoder()
+        text_decoder = codecs.getincrementaldecoder('utf-8-sig')()
+        buffer, position, eof = "", 0, False
+        expect = "["  # 下一个期望的 token: "[" 数组开始, "record" 记录, "," 分隔符或 "]"
+        record_count = 0
+        with open(self.file_name, 'rb') as file:
+            while True:
+                position = _WHITESPACE.match(buffer, position).end()
+                if position == len(buffer):
+                    if eof:
+                        raise ValueError("动作文件不完整")
+                    buffer, position, eof = self._read_more(file, text_decoder, buffer, position)
+                    continue
+
+                char = buffer[position]
+                if expect == "[":
+                    if char != "[":
+                        raise ValueError("动作文件不是 JSON 数组")
+                    position, expect = position + 1, "record"
+                elif char == "]" and (expect == "," or record_count == 0):
+                    return
+                elif expect == ",":
+                    if char != ",":
+                        raise ValueError(f"动作文件格式错误: {buffer[position:position + 20]!r}")
+                    position, expect = position + 1, "record"
+                else:
+                    try:
+                        record, end = decoder.raw_decode(buffer, position)
+                    except json.JSONDecodeError:
+                        if eof:
+                            raise ValueError(f"动作文件格式错误: {buffer[position:position + 20]!r}") from None
+                        # 记录跨越了读取块, 继续读入
+                        buffer, position, eof = self._read_more(file, text_decoder, buffer, position)
+                        continue
+                    if not isinstance(record, dict):
+                        raise ValueError(f"动作记录不是 JSON 对象: {record!r}")
+                    position, expect = end, ","
+                    record_count += 1
+                    yield record
+
+    def iter_chunks(self, chunk_rows) -> Iterator[list]:
+        """按块读取记录, 每块最多 chunk_rows 条"""
+        records = []
+        for record in self:
+            records.append(record)
+            if len(records) >= chunk_rows:
+                yield records
+                records = []
+        if records:
+            yield records
+
+    @property
+    def progress(self) -> float:
+        return self.bytes_read / self.file_size if self.file_size else 1.0
+
+    def close(self):
+        """与 ProgramFileReader 接口一致, 文件在每次读取结束时已关闭"""
+
+    def _read_more(self, file, text_decoder, buffer, position):
+        """丢弃已解析的内容, 读入下一块"""
+        chunk = file.read(self.read_size)
+        self.bytes_read += len(chunk)
+        eof = not chunk
+        return buffer[position:] + text_decoder.decode(chunk, final=eof), 0, eof
+
+
+class ActionFileWriter(object):
+    """逐条写出动作记录
+
+    先写入临时文件, 正常结束时替换目标文件; 出现异常或调用 abort() 时删除临时文件, 不会留下不完整的动作文件。
+    """
+
+    def __init__(self, file_name):
+        self.file_name = str(file_name)
+        self.temp_file_name = self.file_name + ".part"
+        self.records_written = 0
+        self._file = None
+
+    def __enter__(self):
+        self._file = open(self.temp_file_name, "w", encoding="utf-8")
+        self._file.write("[")
+        return self
+
+    def write(self, record: dict):
+        separator = ",\n" if self.records_written else "\n"
+        self._file.write(separator + format_record(record))
+        self.records_written += 1
+
+    def abort(self):
+        """放弃写入, 删除临时文件"""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+            os.remove(self.temp_file_name)
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is not None:
+            self.abort()
+        elif self._file is not None:
+            self._file.write("\n]" if self.records_written else "]")
+            self._file.close()
+            self._file = None
+            os.replace(self.temp_file_name, self.file_name)
+        return False
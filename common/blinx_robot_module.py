@@ -1,3 +1,6 @@
+import sys
+import threading
+from collections import OrderedDict
 from math import radians, degrees, pi
 import yaml
 import numpy as np
@@ -5,6 +8,8 @@ from roboticstoolbox import DHRobot, RevoluteMDH, RevoluteDH
 from spatialmath import SE3
 from spatialmath.base import rpy2tr
 
+from common.time_parameterization import TimeOptimalParameterization
+
 class RobotArmConfig(object):
     """解析机械臂模型的配置文件类"""
     def __init__(self, yaml_file):
@@ -82,12 +87,94 @@ class RobotArmConfig(object):
     def get_joint_qlim(self, joint_config: dict):
         """获取关节的 qlim 参数"""
         return [radians(joint_config.get('qlim')[0]), radians(joint_config.get('qlim')[1])]
+
+    def get_joint_max_speeds(self, default=45.0) -> list:
+        """按关节顺序获取各关节的最大速度(°/s), 配置文件中未填写时使用 default"""
+        config = self.open_yaml_config()
+        joints = sorted(config, key=lambda each_joint: each_joint.get('joint'))
+        return [float(each_joint.get('max_speed', default)) for each_joint in joints]
+
+    def get_joint_max_accelerations(self, default=180.0) -> list:
+        """按关节顺序获取各关节的最大加速度(°/s²), 配置文件中未填写时使用 default
+
+        规格书没有给出加速度, default 与配置文件中的数值都是调试估计值(0.25 s 加速到 45 °/s), 不是实测值。
+        """
+        config = self.open_yaml_config()
+        joints = sorted(config, key=lambda each_joint: each_joint.get('joint'))
+        return [float(each_joint.get('max_acceleration', default)) for each_joint in joints]
     
 
+class KinematicsCache(object):
+    """有内存上限的 LRU 缓存，用于缓存正逆解结果
+
+    正解以毫度整数元组为键，逆解以量化后的位姿与初值所在的解分支为键。
+    关节角度已经按 0.001° 四舍五入，因此可以直接使用精确键。
+    """
+
+    ENTRY_OVERHEAD = sys.getsizeof((None, 0)) + 100  # 条目元组与 OrderedDict 的哈希槽、链表节点
+
+    def __init__(self, max_bytes=8 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """读取缓存，未命中时返回 None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, value):
+        """写入缓存，超过内存上限时淘汰最久未使用的条目"""
+        entry_bytes = self.ENTRY_OVERHEAD + self.sizeof(key) + self.sizeof(value)
+        with self._lock:
+            if key in self._entries:
+                self.current_bytes -= self._entries.pop(key)[1]
+            self._entries[key] = (value, entry_bytes)
+            self.current_bytes += entry_bytes
+            while self.current_bytes > self.max_bytes and self._entries:
+                self.current_bytes -= self._entries.popitem(last=False)[1][1]
+
+    @classmethod
+    def sizeof(cls, obj) -> int:
+        """对象实际占用的内存(字节)，元组逐个计入元素，数组视图计入数据"""
+        size = sys.getsizeof(obj)
+        if isinstance(obj, tuple):
+            size += sum(cls.sizeof(item) for item in obj)
+        elif isinstance(obj, np.ndarray) and obj.base is not None:
+            size += obj.nbytes  # 视图的 getsizeof 只有数组头
+        return size
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def stats(self) -> dict:
+        """缓存命中统计"""
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "entries": len(self._entries),
+            "bytes": self.current_bytes,
+            "max_bytes": self.max_bytes,
+        }
+
+
 class Mirobot(DHRobot):
     """比邻星机械臂模型"""
 
-    def __init__(self, robot_module_config_file, param_type='MDH'):
+    def __init__(self, robot_module_config_file, param_type='MDH', fkine_cache_max_bytes=4 * 1024 * 1024):
         self.config_parser = RobotArmConfig(robot_module_config_file)
         self.param_type = param_type
         L1 = self.config_parser.get_joint_mdh_parameters(1, self.param_type)
@@ -109,10 +196,529 @@ class Mirobot(DHRobot):
         self.addconfiguration("qr", self.qr)
         self.addconfiguration("qz", self.qz)
 
+        # 连杆参数常量表 [alpha, a, d, offset]，解析正逆解直接使用; DH 参数的模型按标准 DH 的连杆变换连乘
+        self._mdh_params = np.array([[link.alpha, link.a, link.d, link.offset] for link in self.links])
+        self._link_matrix = self._mdh_link_matrix if param_type == 'MDH' else self._dh_link_matrix
+        self._qlim_array = np.array([link.qlim for link in self.links])
+        self._cos_alpha = np.cos(self._mdh_params[:, 0])
+        self._sin_alpha = np.sin(self._mdh_params[:, 0])
+        self.fkine_cache = KinematicsCache(fkine_cache_max_bytes)
+        self.joint_max_speeds = np.array(self.config_parser.get_joint_max_speeds())  # 各关节最大速度(°/s)
+        self.joint_max_accelerations = np.array(self.config_parser.get_joint_max_accelerations())  # 各关节最大加速度(°/s²)
+        self.time_parameterization = TimeOptimalParameterization(self.joint_max_speeds, self.joint_max_accelerations)
+
     @property
     def MYCONFIG(self):
         return self._MYCONFIG
 
+    @staticmethod
+    def _mdh_link_matrix(alpha, a, theta, d):
+        """单个关节的 MDH 齐次变换矩阵: Rx(alpha) * Tx(a) * Rz(theta) * Tz(d)"""
+        ca, sa = np.cos(alpha), np.sin(alpha)
+        ct, st = np.cos(theta), np.sin(theta)
+        return np.array([
+            [ct, -st, 0.0, a],
+            [st * ca, ct * ca, -sa, -sa * d],
+            [st * sa, ct * sa, ca, ca * d],
+            [0.0, 0.0, 0.0, 1.0],
+        ])
+
+    @staticmethod
+    def _dh_link_matrix(alpha, a, theta, d):
+        """单个关节的标准 DH 齐次变换矩阵: Rz(theta) * Tz(d) * Tx(a) * Rx(alpha)"""
+        ca, sa = np.cos(alpha), np.sin(alpha)
+        ct, st = np.cos(theta), np.sin(theta)
+        return np.array([
+            [ct, -st * ca, st * sa, a * ct],
+            [st, ct * ca, -ct * sa, a * st],
+            [0.0, sa, ca, d],
+            [0.0, 0.0, 0.0, 1.0],
+        ])
+
+    def _fkine_matrix(self, q, end_joint=6):
+        """纯 numpy 计算前 end_joint 个关节的正解矩阵(弧度制)"""
+        T = np.eye(4)
+        for (alpha, a, d, offset), q_i in zip(self._mdh_params[:end_joint], q[:end_joint]):
+            T = T @ self._link_matrix(alpha, a, q_i + offset, d)
+        return T
+
+    def _fkine_batch_axes(self, q, end_joint=6):
+        """批量正解，返回末端(或前 end_joint 个关节)坐标系的三个坐标轴与原点
+
+        按列展开 T = T * Rx(alpha) * Tx(a) * Rz(theta) * Tz(d)(DH 参数的模型为 T * Rz(theta) * Tz(d) * Tx(a) * Rx(alpha))，
+        避免逐样本构造 4x4 矩阵再相乘。
+        坐标轴与位置按 (3, N) 存放，逐关节广播时内存连续。
+
+        Args:
+            q (ndarray): 关节角度(弧度), 形状为 (N, 6) 或 (N, end_joint)
+            end_joint (int): 计算到第几个关节
+
+        Returns:
+            x_axis, y_axis, z_axis, position (ndarray): 形状均为 (3, N)
+        """
+        sample_count = q.shape[0]
+        x_axis = np.zeros((3, sample_count))
+        y_axis = np.zeros((3, sample_count))
+        z_axis = np.zeros((3, sample_count))
+        position = np.zeros((3, sample_count))
+        x_axis[0] = y_axis[1] = z_axis[2] = 1.0
+
+        theta = np.ascontiguousarray((q[:, :end_joint] + self._mdh_params[:end_joint, 3]).T)
+        cos_theta, sin_theta = np.cos(theta), np.sin(theta)
+        for i, (_, a, d, _) in enumerate(self._mdh_params[:end_joint]):
+            ca, sa = self._cos_alpha[i], self._sin_alpha[i]
+            ct, st = cos_theta[i], sin_theta[i]
+            if self.param_type == 'MDH':
+                # 先绕 x 轴旋转 alpha，得到中间坐标系的 y、z 轴
+                y_alpha = ca * y_axis + sa * z_axis
+                z_alpha = ca * z_axis - sa * y_axis
+                position += a * x_axis + d * z_alpha
+                x_axis, y_axis = ct * x_axis + st * y_alpha, ct * y_alpha - st * x_axis
+                z_axis = z_alpha
+            else:
+                # 先绕 z 轴旋转 theta，沿 z、x 轴平移后再绕新的 x 轴旋转 alpha
+                x_axis, y_theta = ct * x_axis + st * y_axis, ct * y_axis - st * x_axis
+                position += d * z_axis + a * x_axis
+                y_axis, z_axis = ca * y_theta + sa * z_axis, ca * z_axis - sa * y_theta
+        return x_axis, y_axis, z_axis, position
+
+    def _fkine_batch_matrix(self, q):
+        """批量计算正解矩阵, 返回形状为 (N, 4, 4)"""
+        x_axis, y_axis, z_axis, position = self._fkine_batch_axes(q)
+        T = np.zeros((q.shape[0], 4, 4))
+        T[:, :3, 0], T[:, :3, 1], T[:, :3, 2], T[:, :3, 3] = x_axis.T, y_axis.T, z_axis.T, position.T
+        T[:, 3, 3] = 1.0
+        return T
+
+    def fkine_batch(self, q, unit='rad'):
+        """批量正解，一次计算 N 组关节角度的末端坐标与姿态
+
+        与 fkine(q).t、fkine(q).rpy(order='zyx') 的结果一致，但不创建 SE3 对象，
+        适用于遥测数据、示教程序校验与工作空间采样。
+
+        Args:
+            q (ndarray): 关节角度(弧度), 形状为 (N, 6) 或 (6,)
+            unit (str): 姿态角的单位 'rad' 或 'deg'
+
+        Returns:
+            ndarray: 形状为 (N, 6), 每行为 [x, y, z, roll, pitch, yaw]
+        """
+        q = np.atleast_2d(np.asarray(q, dtype=float))
+        x_axis, y_axis, z_axis, position = self._fkine_batch_axes(q)
+
+        # zyx 顺序的 rpy 角，奇异位置(pitch = ±90°)与 spatialmath.tr2rpy 处理方式一致
+        r20 = x_axis[2]
+        singular = np.abs(np.abs(r20) - 1) < 20 * np.finfo(float).eps
+        roll = np.where(singular, 0.0, np.arctan2(y_axis[2], z_axis[2]))
+        pitch = np.arctan2(-r20, np.hypot(x_axis[0], x_axis[1]))
+        yaw = np.where(
+            singular,
+            np.where(r20 < 0, -np.arctan2(y_axis[0], z_axis[0]), np.arctan2(-y_axis[0], -z_axis[0])),
+            np.arctan2(x_axis[1], x_axis[0])
+        )
+        rpy = np.stack([roll, pitch, yaw])
+        if unit == 'deg':
+            rpy = np.degrees(rpy)
+        return np.concatenate([position, rpy]).T
+
+    def fkine_cached(self, joint_degrees):
+        """带缓存的正解
+
+        Args:
+            joint_degrees (list): 关节角度(角度制)，精度为 0.001°
+
+        Returns:
+            ndarray: [x, y, z, roll, pitch, yaw]，姿态角为角度制
+        """
+        key = tuple(int(round(float(d) * 1000)) for d in joint_degrees)  # 毫度整数
+        arm_pose = self.fkine_cache.get(key)
+        if arm_pose is None:
+            arm_pose = self.fkine_batch(np.radians(np.array(key) / 1000), unit='deg')[0]
+            arm_pose.setflags(write=False)  # 缓存中的结果只读，避免被调用方修改
+            self.fkine_cache.put(key, arm_pose)
+        return arm_pose
+
+    def joint_move_time(self, start_degrees, target_degrees, speed_percentage=100) -> float:
+        """估算关节同步运动(set_joint_angle_all_time)的耗时
+
+        各关节同时到位, 耗时由行程与限速之比最大的关节决定, 限速为最大速度乘以速度百分比。
+
+        Args:
+            start_degrees (list): 起点关节角度(角度制)
+            target_degrees (list): 终点关节角度(角度制)
+            speed_percentage (float): 速度百分比 1 ~ 100
+
+        Returns:
+            float: 预计耗时(秒)
+        """
+        travel = np.abs(np.asarray(target_degrees, dtype=float) - np.asarray(start_degrees, dtype=float))
+        speed = self.joint_max_speeds * (max(float(speed_percentage), 1.0) / 100.0)
+        return float(np.max(travel / speed))
+
+    def _check_analytic_model(self):
+        """解析逆解的公式按 MDH 建系推导, 其他参数类型的模型只能使用数值逆解(ikine_LM)"""
+        if self.param_type != 'MDH':
+            raise ValueError(f"解析逆解只适用于 MDH 参数的模型, 当前参数类型为 {self.param_type}, 请使用 ikine_LM")
+
+    def ikine_branch(self, q) -> tuple:
+        """关节角度所在的逆解分支 (肩部, 肘部, 腕部)，与 ikine_analytic 的分支划分一致"""
+        self._check_analytic_model()
+        q = np.asarray(q, dtype=float)
+        theta = q + self._mdh_params[:, 3]
+        T = self._fkine_matrix(q)
+        wx, wy, _ = T[:3, 3] - self._mdh_params[5, 2] * T[:3, 2]
+        shoulder = 1 if wx * np.cos(theta[0]) + wy * np.sin(theta[0]) >= 0 else -1
+        elbow = 1 if np.cos(theta[2]) >= 0 else -1
+        wrist = 1 if np.sin(theta[4]) >= 0 else -1
+        return shoulder, elbow, wrist
+
+    def ikine_analytic(self, T, q0=None, tol=1e-6):
+        """机械臂封闭解析逆解
+
+        参考固件 docs/v4.3.0/底层正逆解算法.c 中的 IK()，适用于当前 MDH 构型
+        (腕部 4、5、6 轴交于一点, alpha4 = alpha5 = pi/2)。
+        肩部(前/后)、肘部(上/下)、腕部(翻/不翻) 共 8 组分支，剔除超出关节限位的解后，
+        按与当前关节角度的距离选出最优解。
+
+        Args:
+            T (SE3 | ndarray): 末端目标位姿, 4x4 齐次矩阵
+            q0 (ndarray): 当前关节角度(弧度), 用于选择最近的解分支, 默认为零位
+            tol (float): 解回代正解时允许的位姿误差
+
+        Returns:
+            q_best (ndarray | None): 与当前关节角度最近的有效解, 无解时为 None
+            solutions (ndarray): 所有满足关节限位的解分支, 形状为 (k, 6)
+
+        Raises:
+            ValueError: 模型不是 MDH 参数类型
+        """
+        self._check_analytic_model()
+        T = np.asarray(T.A if hasattr(T, 'A') else T, dtype=float)
+        q0 = np.zeros(6) if q0 is None else np.asarray(q0, dtype=float)
+        R, p = T[:3, :3], T[:3, 3]
+        d1, a1, a2 = self._mdh_params[0, 2], self._mdh_params[1, 1], self._mdh_params[2, 1]
+        alpha3, d4 = self._mdh_params[3, 0], self._mdh_params[3, 2]
+        alpha4, alpha5, d6 = self._mdh_params[4, 0], self._mdh_params[5, 0], self._mdh_params[5, 2]
+        offsets = self._mdh_params[:, 3]
+
+        # 腕部中心点 = 末端位置沿末端 z 轴回退 d6
+        wx, wy, wz = p - d6 * R[:, 2]
+        radius = np.hypot(wx, wy)
+        solutions = []
+        for shoulder in (1, -1):
+            theta1 = np.arctan2(wy, wx) if shoulder == 1 else np.arctan2(-wy, -wx)
+            rho = shoulder * radius - a1
+            height = wz - d1
+            sin_theta3 = (a2 ** 2 + d4 ** 2 - rho ** 2 - height ** 2) / (2 * a2 * d4)
+            if abs(sin_theta3) > 1.0 + 1e-9:
+                continue  # 该肩部分支下目标超出臂展
+            sin_theta3 = np.clip(sin_theta3, -1.0, 1.0)
+            for theta3 in {np.arcsin(sin_theta3), pi - np.arcsin(sin_theta3)}:
+                vx, vy = a2 - d4 * np.sin(theta3), d4 * np.cos(theta3)
+                theta2 = np.arctan2(-height, rho) - np.arctan2(vy, vx)
+                q_arm = np.array([theta1, theta2, theta3]) - offsets[:3]
+
+                # 腕部姿态: M = Rx(alpha3)^T * R03^T * R = Rz(θ4) Rx(α4) Rz(θ5) Rx(α5) Rz(θ6)
+                R03 = self._fkine_matrix(q_arm, end_joint=3)[:3, :3]
+                M = self._mdh_link_matrix(alpha3, 0, 0, 0)[:3, :3].T @ R03.T @ R
+                for wrist in (1, -1):
+                    sin_theta5 = wrist * np.hypot(M[0, 2], M[1, 2])
+                    theta5 = np.arctan2(sin_theta5, -M[2, 2])
+                    if abs(sin_theta5) > 1e-9:
+                        theta4 = np.arctan2(M[1, 2] / sin_theta5, M[0, 2] / sin_theta5)
+                        theta6 = np.arctan2(-M[2, 1] / sin_theta5, M[2, 0] / sin_theta5)
+                    else:
+                        # 腕部奇异: 4、6 轴共线，保持 4 轴当前角度
+                        theta4 = q0[3] + offsets[3]
+                        A = (self._mdh_link_matrix(alpha4, 0, theta5, 0) @ self._mdh_link_matrix(alpha5, 0, 0, 0))[:3, :3]
+                        N = A.T @ self._mdh_link_matrix(0, 0, theta4, 0)[:3, :3].T @ M
+                        theta6 = np.arctan2(N[1, 0], N[0, 0])
+                    q = np.concatenate([q_arm, np.array([theta4, theta5, theta6]) - offsets[3:]])
+                    q = (q + pi) % (2 * pi) - pi
+                    if self._within_qlim(q) and np.abs(self._fkine_matrix(q) - T).max() < tol:
+                        solutions.append(q)
+
+        if not solutions:
+            return None, np.empty((0, 6))
+
+        solutions = np.unique(np.round(solutions, 9), axis=0)
+        q_best = solutions[np.argmin(np.linalg.norm(solutions - q0, axis=1))]
+        return q_best, solutions
+
+    def ikine_analytic_batch(self, T, branch, q_reference, tol=1e-6):
+        """批量解析逆解，所有位姿按同一个解分支一次求解
+
+        与 ikine_analytic 的公式相同, 但只求 branch 指定的一组分支, 按样本向量化计算。
+        结果从 q_reference 开始沿样本顺序展开(unwrap), 相邻样本之间不会出现 ±360° 的跳变。
+        腕部奇异(4、6 轴共线)的样本保持 4 轴为 q_reference 的角度。
+
+        Args:
+            T (ndarray): 末端目标位姿, 形状为 (N, 4, 4)
+            branch (tuple): 解分支 (肩部, 肘部, 腕部), 取值为 ±1, 见 ikine_branch
+            q_reference (ndarray): 参考关节角度(弧度), 通常为路径起点
+            tol (float): 解回代正解时允许的位姿误差
+
+        Returns:
+            q (ndarray): 关节角度(弧度), 形状为 (N, 6), 不检查关节限位
+            valid (ndarray): 每个样本在该分支下是否有解, 形状为 (N,)
+
+        Raises:
+            ValueError: 模型不是 MDH 参数类型
+        """
+        self._check_analytic_model()
+        T = np.asarray(T, dtype=float)
+        q_reference = np.asarray(q_reference, dtype=float)
+        shoulder, elbow, wrist = branch
+        R, p = T[:, :3, :3], T[:, :3, 3]
+        d1, a1, a2 = self._mdh_params[0, 2], self._mdh_params[1, 1], self._mdh_params[2, 1]
+        alpha3, d4 = self._mdh_params[3, 0], self._mdh_params[3, 2]
+        alpha4, alpha5, d6 = self._mdh_params[4, 0], self._mdh_params[5, 0], self._mdh_params[5, 2]
+        offsets = self._mdh_params[:, 3]
+
+        wx, wy, wz = (p - d6 * R[:, :, 2]).T
+        theta1 = np.arctan2(shoulder * wy, shoulder * wx)
+        rho = shoulder * np.hypot(wx, wy) - a1
+        height = wz - d1
+        sin_theta3 = (a2 ** 2 + d4 ** 2 - rho ** 2 - height ** 2) / (2 * a2 * d4)
+        valid = np.abs(sin_theta3) <= 1.0 + 1e-9
+        theta3 = np.arcsin(np.clip(sin_theta3, -1.0, 1.0))
+        if elbow != 1:
+            theta3 = pi - theta3
+        theta2 = np.arctan2(-height, rho) - np.arctan2(d4 * np.cos(theta3), a2 - d4 * np.sin(theta3))
+        q_arm = np.stack([theta1, theta2, theta3], axis=1) - offsets[:3]
+
+        # 腕部姿态 M = Rx(alpha3)^T * R03^T * R
+        R03 = np.stack(self._fkine_batch_axes(q_arm, end_joint=3)[:3], axis=-1).transpose(1, 0, 2)
+        M = np.einsum('ij,nkj,nkl->nil', self._mdh_link_matrix(alpha3, 0, 0, 0)[:3, :3].T, R03, R)
+        sin_theta5 = wrist * np.hypot(M[:, 0, 2], M[:, 1, 2])
+        theta5 = np.arctan2(sin_theta5, -M[:, 2, 2])
+        singular = np.abs(sin_theta5) <= 1e-9
+        safe_sin = np.where(singular, 1.0, sin_theta5)
+        theta4 = np.arctan2(M[:, 1, 2] / safe_sin, M[:, 0, 2] / safe_sin)
+        theta6 = np.arctan2(-M[:, 2, 1] / safe_sin, M[:, 2, 0] / safe_sin)
+        for row in np.flatnonzero(singular):
+            theta4[row] = q_reference[3] + offsets[3]
+            A = (self._mdh_link_matrix(alpha4, 0, theta5[row], 0) @ self._mdh_link_matrix(alpha5, 0, 0, 0))[:3, :3]
+            N = A.T @ self._mdh_link_matrix(0, 0, theta4[row], 0)[:3, :3].T @ M[row]
+            theta6[row] = np.arctan2(N[1, 0], N[0, 0])
+
+        q = np.concatenate([q_arm, np.stack([theta4, theta5, theta6], axis=1) - offsets[3:]], axis=1)
+        q = np.unwrap(np.vstack([q_reference, q]), axis=0)[1:]
+        valid &= np.abs(self._fkine_batch_matrix(q) - T).max(axis=(1, 2)) < tol
+        return q, valid
+
+    def linear_path(self, start_degrees, target, step=1.0, angle_step=1.0, max_joint_step=10.0) -> np.ndarray:
+        """末端直线运动(MoveL)的关节路径
+
+        末端位置沿直线等间隔采样, 姿态按四元数球面插值(SLERP), 所有采样点按起点所在的逆解分支一次批量求解,
+        发送之前检查整条路径: 每个采样点都有解、都在关节限位以内, 相邻采样点之间的关节角度变化不超过 max_joint_step
+        (超过时说明经过奇异位形附近)。
+
+        Args:
+            start_degrees (list): 起点关节角度(角度制)
+            target: 终点, 4x4 末端位姿(SE3 或 ndarray, 米), 或终点关节角度(角度制, 6 个值)
+            step (float): 位置采样间隔(mm)
+            angle_step (float): 姿态采样间隔(°)
+            max_joint_step (float): 相邻采样点之间允许的最大关节角度变化(°)
+
+        Returns:
+            ndarray: 关节角度(角度制), 形状为 (N, 6), 第一个为起点, 最后一个为终点
+
+        Raises:
+            ValueError: 路径上有不可达的采样点、超出关节限位、经过奇异位形附近, 或终点关节角度不在起点的逆解分支上
+        """
+        q_start = np.radians(np.asarray(start_degrees, dtype=float))
+        target_degrees = None
+        if hasattr(target, 'A') or np.shape(target) == (4, 4):
+            T_target = np.asarray(target.A if hasattr(target, 'A') else target, dtype=float)
+        else:
+            target_degrees = np.asarray(target, dtype=float)
+            T_target = self._fkine_matrix(np.radians(target_degrees))
+        T_start = self._fkine_matrix(q_start)
+
+        quaternions = self._rotation_to_quaternion(np.stack([T_start[:3, :3], T_target[:3, :3]]))
+        distance = np.linalg.norm(T_target[:3, 3] - T_start[:3, 3]) * 1000
+        angle = np.degrees(2 * np.arccos(np.clip(abs(quaternions[0] @ quaternions[1]), 0.0, 1.0)))
+        sample_count = max(int(np.ceil(distance / step)), int(np.ceil(angle / angle_step)), 1) + 1
+        s = np.linspace(0.0, 1.0, sample_count)
+        T = np.zeros((sample_count, 4, 4))
+        T[:, :3, :3] = self._quaternion_to_rotation(self._slerp(quaternions[0], quaternions[1], s))
+        T[:, :3, 3] = T_start[:3, 3] + s[:, np.newaxis] * (T_target[:3, 3] - T_start[:3, 3])
+        T[:, 3, 3] = 1.0
+
+        q, valid = self.ikine_analytic_batch(T, self.ikine_branch(q_start), q_start)
+        if not np.all(valid):
+            row = int(np.argmin(valid))
+            x, y, z = T[row, :3, 3] * 1000
+            raise ValueError(f"直线路径上的点 ({x:.1f}, {y:.1f}, {z:.1f}) mm 在起点的逆解分支下不可达")
+        path = np.degrees(q)
+        qlim = np.degrees(self._qlim_array)
+        outside = (path < qlim[:, 0] - 1e-6) | (path > qlim[:, 1] + 1e-6)
+        if np.any(outside):
+            row, joint = np.argwhere(outside)[0]
+            raise ValueError(f"直线路径超出 J{joint + 1} 限位: {path[row, joint]:.1f}° 不在 "
+                             f"[{qlim[joint, 0]:g}, {qlim[joint, 1]:g}] 范围内")
+        joint_steps = np.abs(np.diff(path, axis=0))
+        if len(joint_steps) and joint_steps.max() > max_joint_step:
+            joint = int(np.argmax(joint_steps.max(axis=0)))
+            raise ValueError(f"直线路径经过奇异位形附近, J{joint + 1} 在相邻采样点之间变化 {joint_steps.max():.1f}°")
+        if target_degrees is not None:
+            if np.abs(path[-1] - target_degrees).max() > 1e-3:
+                raise ValueError("直线运动的终点与起点不在同一个逆解分支上, 请改为关节运动")
+            path[-1] = target_degrees
+        path[0] = start_degrees
+        return path
+
+    @staticmethod
+    def _rotation_to_quaternion(R):
+        """旋转矩阵 (N, 3, 3) 转换为单位四元数 (N, 4), [w, x, y, z]"""
+        R = np.asarray(R, dtype=float)
+        trace = np.trace(R, axis1=1, axis2=2)
+        # 对每个样本取 w、x、y、z 中最大的分量求解, 避免除以接近 0 的数
+        candidates = np.stack([trace, R[:, 0, 0], R[:, 1, 1], R[:, 2, 2]], axis=1)
+        largest = np.argmax(candidates, axis=1)
+        quaternions = np.empty((len(R), 4))
+        for index in range(4):
+            rows = largest == index
+            if not np.any(rows):
+                continue
+            r = R[rows]
+            if index == 0:
+                w = np.sqrt(1.0 + trace[rows]) / 2
+                quaternions[rows] = np.stack([w, (r[:, 2, 1] - r[:, 1, 2]) / (4 * w), (r[:, 0, 2] - r[:, 2, 0]) / (4 * w),
+                                              (r[:, 1, 0] - r[:, 0, 1]) / (4 * w)], axis=1)
+            else:
+                i, j, k = index - 1, index % 3, (index + 1) % 3
+                v = np.sqrt(1.0 + r[:, i, i] - r[:, j, j] - r[:, k, k]) / 2
+                quaternion = np.empty((len(r), 4))
+                quaternion[:, 0] = (r[:, k, j] - r[:, j, k]) / (4 * v)
+                quaternion[:, 1 + i] = v
+                quaternion[:, 1 + j] = (r[:, j, i] + r[:, i, j]) / (4 * v)
+                quaternion[:, 1 + k] = (r[:, k, i] + r[:, i, k]) / (4 * v)
+                quaternions[rows] = quaternion
+        return quaternions
+
+    @staticmethod
+    def _quaternion_to_rotation(quaternions):
+        """单位四元数 (N, 4) 转换为旋转矩阵 (N, 3, 3)"""
+        w, x, y, z = np.asarray(quaternions, dtype=float).T
+        return np.stack([
+            np.stack([1 - 2 * (y * y + z * z), 2 * (x * y - w * z), 2 * (x * z + w * y)], axis=1),
+            np.stack([2 * (x * y + w * z), 1 - 2 * (x * x + z * z), 2 * (y * z - w * x)], axis=1),
+            np.stack([2 * (x * z - w * y), 2 * (y * z + w * x), 1 - 2 * (x * x + y * y)], axis=1),
+        ], axis=1)
+
+    @staticmethod
+    def _slerp(q0, q1, s):
+        """四元数球面插值, 沿较短的大圆弧, 返回 (len(s), 4)"""
+        dot = float(q0 @ q1)
+        if dot < 0:
+            q1, dot = -q1, -dot
+        s = np.asarray(s, dtype=float)[:, np.newaxis]
+        if dot > 1 - 1e-9:
+            quaternions = q0 + s * (q1 - q0)
+        else:
+            angle = np.arccos(dot)
+            quaternions = (np.sin((1 - s) * angle) * q0 + np.sin(s * angle) * q1) / np.sin(angle)
+        return quaternions / np.linalg.norm(quaternions, axis=1, keepdims=True)
+
+    def jacobian_analytic(self, q):
+        """基坐标系下的几何雅可比矩阵(封闭形式)
+
+        第 i 列为 [z_i × (p_e - p_i); z_i]，z_i、p_i 为第 i 个关节坐标系的 z 轴与原点，
+        与 jacob0(q) 结果一致，但只做一次正解的矩阵连乘。
+
+        Args:
+            q (ndarray): 关节角度(弧度)
+
+        Returns:
+            J (ndarray): 形状为 (6, 6), 前三行为线速度, 后三行为角速度
+            T (ndarray): 末端位姿 4x4 齐次矩阵
+        """
+        q = np.asarray(q, dtype=float)
+        T = np.eye(4)
+        joint_axes = np.empty((6, 3))
+        joint_origins = np.empty((6, 3))
+        for i, ((alpha, a, d, offset), q_i) in enumerate(zip(self._mdh_params, q)):
+            if self.param_type == 'MDH':
+                T = T @ self._mdh_link_matrix(alpha, a, q_i + offset, d)
+                joint_axes[i], joint_origins[i] = T[:3, 2], T[:3, 3]
+            else:
+                # 标准 DH 的第 i 个关节绕上一个坐标系的 z 轴转动
+                joint_axes[i], joint_origins[i] = T[:3, 2], T[:3, 3]
+                T = T @ self._dh_link_matrix(alpha, a, q_i + offset, d)
+
+        J = np.empty((6, 6))
+        J[:3] = np.cross(joint_axes, T[:3, 3] - joint_origins).T
+        J[3:] = joint_axes.T
+        return J, T
+
+    @staticmethod
+    def manipulability_index(J):
+        """Yoshikawa 可操作度 sqrt(det(J * J^T))，接近 0 时机械臂处于奇异位形"""
+        return float(np.sqrt(max(np.linalg.det(J @ J.T), 0.0)))
+
+    @staticmethod
+    def pose_error(T_target, T_current):
+        """两个位姿之间的误差旋量 [dp; dθ]，姿态误差为轴角形式"""
+        dp = T_target[:3, 3] - T_current[:3, 3]
+        R_error = T_target[:3, :3] @ T_current[:3, :3].T
+        axis = 0.5 * np.array([R_error[2, 1] - R_error[1, 2], R_error[0, 2] - R_error[2, 0], R_error[1, 0] - R_error[0, 1]])
+        sin_angle = np.linalg.norm(axis)
+        angle = np.arctan2(sin_angle, (np.trace(R_error) - 1) / 2)
+        rotation = axis * (angle / sin_angle) if sin_angle > 1e-12 else axis
+        return np.concatenate([dp, rotation])
+
+    def ikine_differential(self, T, q0, damping=0.02, manipulability_threshold=1e-3, singular_threshold=1e-5,
+                           position_tol=1e-5, rotation_tol=1e-4, max_iterations=3):
+        """微分逆解，以当前关节角度为起点做阻尼最小二乘(DLS)迭代
+
+        适用于点动这类小步长运动: dq = J^T (J J^T + λ^2 I)^-1 e。
+        雅可比矩阵只在当前关节角度处计算一次，后续迭代复用同一个 DLS 矩阵，每次只需一次正解。
+        可操作度低于 manipulability_threshold 时按 (1 - w / w0)^2 增大阻尼，
+        低于 singular_threshold 时视为奇异位形，直接返回 None。
+
+        Args:
+            T (SE3 | ndarray): 末端目标位姿
+            q0 (ndarray): 当前关节角度(弧度)
+            damping (float): 奇异位形处的最大阻尼系数 λ
+            manipulability_threshold (float): 开始增加阻尼的可操作度阈值 w0
+            singular_threshold (float): 判定为奇异位形的可操作度阈值
+            position_tol (float): 允许的线性化位置误差(米)
+            rotation_tol (float): 允许的线性化姿态误差(弧度)
+            max_iterations (int): 复用雅可比矩阵的最大迭代次数
+
+        Returns:
+            q (ndarray | None): 线性化误差在允许范围内且满足关节限位时为新的关节角度, 否则为 None
+            manipulability (float): 当前关节角度下的可操作度
+            error (ndarray): 剩余的位姿误差 [dp; dθ]
+        """
+        T = np.asarray(T.A if hasattr(T, 'A') else T, dtype=float)
+        q = np.asarray(q0, dtype=float)
+        J, T_current = self.jacobian_analytic(q)
+        manipulability = self.manipulability_index(J)
+        error = self.pose_error(T, T_current)
+        if manipulability < singular_threshold:
+            return None, manipulability, error
+
+        damping_square = 0.0
+        if manipulability < manipulability_threshold:
+            damping_square = (damping * (1 - manipulability / manipulability_threshold)) ** 2
+        dls_matrix = J.T @ np.linalg.inv(J @ J.T + damping_square * np.eye(6))
+
+        for _ in range(max_iterations):
+            q = q + dls_matrix @ error
+            error = self.pose_error(T, self._fkine_matrix(q))
+            if np.linalg.norm(error[:3]) <= position_tol and np.linalg.norm(error[3:]) <= rotation_tol:
+                if self._within_qlim(q):
+                    return q, manipulability, error
+                break
+        return None, manipulability, error
+
+    def _within_qlim(self, q):
+        """判断关节角度(弧度)是否在限位范围内"""
+        return bool(np.all((q >= self._qlim_array[:, 0] - 1e-9) & (q <= self._qlim_array[:, 1] + 1e-9)))
+
 
 if __name__ == "__main__":
     from pathlib import Path
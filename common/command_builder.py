@@ -0,0 +1,93 @@
+"""机械臂通信协议命令构造
+
+每条命令对应一个预先编码好的 bytes 模板, 直接按定点格式写入数值, 生成紧凑的 JSON 行(以 \r\n 结尾)。
+角度统一保留 3 位小数, 关节编号等整数参数按整数写入, 速度(表格中为浮点数)取整到最近的整数后写入, 不会被截断。
+与 json.dumps(...).replace(' ', '') + '\r\n' 再 encode() 的结果在控制器端等价, 但不经过 simplejson 和字符串替换。
+协议说明见 docs/v3.0.0/机械臂 API 接口.txt
+"""
+from typing import Sequence
+
+ANGLE_FORMAT = b'%.3f'
+TERMINATOR = b'\r\n'
+
+
+def _template(command: str, data_format: bytes = None) -> bytes:
+    """生成命令模板, data_format 为 None 时命令不带 data 字段"""
+    if data_format is None:
+        return b'{"command":"%s"}' % command.encode() + TERMINATOR
+    return b'{"command":"%s","data":[%s]}' % (command.encode(), data_format) + TERMINATOR
+
+
+_SIX_ANGLES = b','.join([ANGLE_FORMAT] * 6)
+
+# 无参数或参数固定的命令, 直接使用编码好的常量
+GET_JOINT_ANGLE_ALL = _template("get_joint_angle_all")
+GET_ROBOT_MODE = _template("get_robot_mode")
+SET_JOINT_AUTO_ZERO = _template("set_joint_Auto_zero")
+SET_JOINT_INITIALIZE = _template("set_joint_initialize", b'0')
+SET_JOINT_EMERGENCY_STOP = _template("set_joint_emergency_stop", b'0')
+SET_ROBOT_MODE_SEQ = _template("set_robot_mode", b'"SEQ"')
+SET_ROBOT_MODE_INT = _template("set_robot_mode", b'"INT"')
+
+_SET_JOINT_ANGLE = _template("set_joint_angle", b'%d,%d,' + ANGLE_FORMAT)
+_SET_JOINT_ANGLE_SPEED = _template("set_joint_angle_speed", b'%d,' + ANGLE_FORMAT + b',%d')
+_SET_JOINT_ANGLE_SPEED_PERCENTAGE = _template("set_joint_angle_speed_percentage", b'%d,' + ANGLE_FORMAT + b',%d')
+_SET_JOINT_ANGLE_ALL = _template("set_joint_angle_all", b'%d,' + _SIX_ANGLES)
+_SET_JOINT_ANGLE_ALL_TIME = _template("set_joint_angle_all_time", b'%d,' + _SIX_ANGLES)
+_SET_END_TOOL = _template("set_end_tool", b'%d,%d')
+_SET_TIME_DELAY = _template("set_time_delay", b'%d')
+_SET_ROBOT_IO_INTERFACE = _template("set_robot_io_interface", b'%d,%s')
+
+
+def _speed(value) -> int:
+    """速度取整到最近的整数, %d 格式会直接截断小数部分"""
+    return int(round(float(value)))
+
+
+def set_joint_angle(joint_number: int, speed_percentage: int, angle) -> bytes:
+    """单关节转动到指定角度"""
+    return _SET_JOINT_ANGLE % (joint_number, _speed(speed_percentage), angle)
+
+
+def set_joint_angle_speed(joint_number: int, angle, speed: int) -> bytes:
+    """单关节以指定速度转动到指定角度"""
+    return _SET_JOINT_ANGLE_SPEED % (joint_number, angle, _speed(speed))
+
+
+def set_joint_angle_speed_percentage(joint_number: int, angle, speed_percentage: int) -> bytes:
+    """单关节以最大速度的百分比转动到指定角度"""
+    return _SET_JOINT_ANGLE_SPEED_PERCENTAGE % (joint_number, angle, _speed(speed_percentage))
+
+
+def set_joint_angle_all(speed_percentage: int, joint_angles: Sequence) -> bytes:
+    """六个关节同时转动到指定角度"""
+    return _SET_JOINT_ANGLE_ALL % (_speed(speed_percentage), *joint_angles)
+
+
+def set_joint_angle_all_time(speed_percentage: int, joint_angles: Sequence) -> bytes:
+    """六个关节同步转动到指定角度(各关节同时到位)"""
+    return _SET_JOINT_ANGLE_ALL_TIME % (_speed(speed_percentage), *joint_angles)
+
+
+def set_end_tool(tool_type: int, tool_status: int) -> bytes:
+    """控制末端工具, 吸盘 tool_type 为 1, tool_status 1 开 / 0 关"""
+    return _SET_END_TOOL % (tool_type, tool_status)
+
+
+def set_time_delay(delay_ms: int) -> bytes:
+    """SEQ 模式下的动作间延时(毫秒)"""
+    return _SET_TIME_DELAY % delay_ms
+
+
+def set_robot_mode(mode: str) -> bytes:
+    """切换命令模式: SEQ 顺序模式, INT 实时模式"""
+    if mode == "SEQ":
+        return SET_ROBOT_MODE_SEQ
+    if mode == "INT":
+        return SET_ROBOT_MODE_INT
+    raise ValueError(f"未知的命令模式: {mode}")
+
+
+def set_robot_io_interface(io_index: int, enable: bool) -> bytes:
+    """设置 IO 接口输出"""
+    return _SET_ROBOT_IO_INTERFACE % (io_index, b'true' if enable else b'false')
@@ -0,0 +1,105 @@
+import time
+
+import simplejson as json
+
+
+class LineFramer(object):
+    """以 \r\n 分帧的增量解析器
+
+    接收到的数据追加到同一个 bytearray 中, 不完整的帧保留到下一次读取继续拼接,
+    避免 TCP 拆包时整段数据被丢弃。每次读取只从上次的位置查找最后一个分隔符, 一次性取出所有完整帧并删除已消费的部分。
+    command_name() 只查找 "command" 字段的值, 调用方可以在完整 JSON 解析之前按命令名过滤帧。
+    """
+
+    DELIMITER = b'\r\n'
+    COMMAND_KEY = b'"command"'
+    COMMAND_PREFIX = b'{"command":"'
+
+    def __init__(self, read_size=65536, max_frame_size=1024 * 1024):
+        self.read_size = read_size
+        self.max_frame_size = max_frame_size
+        self._buffer = bytearray()
+        self._read_buffer = bytearray(read_size)
+        self._read_view = memoryview(self._read_buffer)
+        self.reset_stats()
+
+    def reset(self):
+        """清空未完成的帧(连接重建时调用)"""
+        self._buffer.clear()
+
+    def reset_stats(self):
+        self.frames = 0
+        self.bytes = 0
+        self.overflows = 0
+        self._stats_start = time.perf_counter()
+
+    def read_from(self, client_socket) -> list:
+        """从 socket 读取一次数据, 返回本次拼接出的完整帧
+
+        Raises:
+            ConnectionError: 对端关闭连接
+        """
+        read_count = client_socket.recv_into(self._read_view)
+        if not read_count:
+            raise ConnectionError("连接已被对端关闭")
+        return self.feed(self._read_view[:read_count])
+
+    def feed(self, data) -> list:
+        """追加数据, 返回所有完整的帧(bytes, 不含分隔符与空帧)"""
+        buffer = self._buffer
+        search_start = max(len(buffer) - len(self.DELIMITER) + 1, 0)
+        buffer += data
+        self.bytes += len(data)
+
+        frames = []
+        frame_end = buffer.rfind(self.DELIMITER, search_start)
+        if frame_end >= 0:
+            # 一次拷贝出所有完整帧, 由 bytes.split 在 C 层完成分帧
+            with memoryview(buffer) as view:
+                complete = view[:frame_end].tobytes()
+            del buffer[:frame_end + len(self.DELIMITER)]
+            frames = [frame for frame in complete.split(self.DELIMITER) if frame]
+
+        if len(buffer) > self.max_frame_size:
+            # 超长且没有分隔符的数据无法组成有效帧, 直接丢弃
+            buffer.clear()
+            self.overflows += 1
+        self.frames += len(frames)
+        return frames
+
+    @classmethod
+    def command_name(cls, frame: bytes):
+        """不解析 JSON, 直接取出帧中 "command" 字段的值, 取不到时返回 None"""
+        if frame.startswith(cls.COMMAND_PREFIX):
+            # 控制器的响应都以 {"command":" 开头, 只需查找一次结束引号
+            value_end = frame.find(b'"', len(cls.COMMAND_PREFIX))
+            return frame[len(cls.COMMAND_PREFIX):value_end].decode('utf-8') if value_end >= 0 else None
+
+        key_index = frame.find(cls.COMMAND_KEY)
+        if key_index < 0:
+            return None
+        value_start = frame.find(b'"', key_index + len(cls.COMMAND_KEY))
+        value_end = frame.find(b'"', value_start + 1)
+        if value_start < 0 or value_end < 0:
+            return None
+        separator = frame[key_index + len(cls.COMMAND_KEY):value_start].strip()
+        if separator != b':':
+            return None
+        return frame[value_start + 1:value_end].decode('utf-8')
+
+    @staticmethod
+    def decode(frame: bytes):
+        """完整解析 JSON 帧"""
+        return json.loads(frame)
+
+    def stats(self) -> dict:
+        """帧率与吞吐量统计"""
+        elapsed = max(time.perf_counter() - self._stats_start, 1e-9)
+        return {
+            "frames": self.frames,
+            "bytes": self.bytes,
+            "overflows": self.overflows,
+            "buffered_bytes": len(self._buffer),
+            "frames_per_second": self.frames / elapsed,
+            "bytes_per_second": self.bytes / elapsed,
+        }
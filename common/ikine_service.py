@@ -0,0 +1,154 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from math import radians
+
+import numpy as np
+from loguru import logger
+
+from common.blinx_robot_module import Mirobot, KinematicsCache
+
+
+class IKineResult(object):
+    """逆解服务的单次求解结果"""
+
+    def __init__(self, q=None, success=False, method="", iterations=0, solve_time=0.0, joint_distance=None, reason="",
+                 manipulability=None):
+        self.q = q  # 关节角度(弧度)，求解失败时为 None
+        self.success = success
+        self.method = method  # differential(微分逆解), analytic(解析解), LM(当前角度为初值), LM-multistart(多初值并行), cache(缓存命中)
+        self.iterations = iterations  # 数值逆解的迭代次数，解析解为 0
+        self.solve_time = solve_time  # 求解耗时，单位 ms
+        self.joint_distance = joint_distance  # 与当前关节角度的最大关节差值(弧度)
+        self.reason = reason
+        self.manipulability = manipulability  # 当前关节角度下的可操作度，仅微分逆解时计算
+
+    def __repr__(self):
+        return (f"IKineResult(success={self.success}, method={self.method}, iterations={self.iterations}, "
+                f"solve_time={self.solve_time:.3f}ms, reason={self.reason!r})")
+
+
+class IKineService(object):
+    """以当前关节角度为初值的逆解服务
+
+    求解顺序:
+    0. 以量化后的位姿与当前解分支查询缓存
+    1. 微分逆解(DLS)，线性化误差超过容差或处于奇异位形时继续下一步
+    2. 解析逆解，选取与当前关节角度最近的分支
+    3. 以当前关节角度为初值的 ikine_LM，只搜索一次
+    4. 前两步失败时，在当前关节角度附近生成若干个初值，并行执行 ikine_LM
+
+    解析逆解与解分支只适用于 MDH 参数的模型，其他参数类型的模型跳过第 2 步，
+    缓存键也改用当前关节角度。
+
+    任何与当前关节角度的最大关节差值超过 max_joint_distance 的解都会被拒绝，
+    避免相邻两次点动之间，肘部或腕部切换到另一个解分支。
+
+    ikine_LM 的残差为 0.5 * |e|^2，默认 tol=1e-6 相当于允许约 1 mm 的误差，
+    以当前角度为初值时 1 mm 的点动会被直接判定为收敛，因此这里使用更小的 lm_tol。
+    """
+
+    def __init__(self, robot: Mirobot, max_joint_distance=radians(90), seed_pool_size=4,
+                 seed_spread=radians(15), use_analytic=True, lm_tol=1e-12, cache_max_bytes=4 * 1024 * 1024,
+                 use_differential=True, differential_position_tol=1e-5, differential_rotation_tol=1e-4):
+        self.robot = robot
+        self.cache = KinematicsCache(cache_max_bytes)
+        self.lm_tol = lm_tol
+        self.max_joint_distance = max_joint_distance
+        self.seed_pool_size = seed_pool_size
+        self.seed_spread = seed_spread
+        self.use_analytic = use_analytic and robot.param_type == 'MDH'
+        self.use_differential = use_differential
+        self.differential_position_tol = differential_position_tol
+        self.differential_rotation_tol = differential_rotation_tol
+        self.qlim = np.array([link.qlim for link in robot.links])
+        self.rng = np.random.default_rng()
+        self.seed_executor = ThreadPoolExecutor(max_workers=seed_pool_size, thread_name_prefix="ikine_seed")
+        self.last_result = None
+
+    def solve(self, T, current_joints) -> IKineResult:
+        """求解逆解
+
+        Args:
+            T (SE3 | ndarray): 末端目标位姿
+            current_joints (ndarray): 当前测量得到的关节角度(弧度)
+
+        Returns:
+            IKineResult: 求解结果，包含迭代次数与求解耗时
+        """
+        start_time = time.perf_counter()
+        current_joints = np.asarray(current_joints, dtype=float)
+        T = np.asarray(T.A if hasattr(T, 'A') else T, dtype=float)
+        cache_key = self._cache_key(T, current_joints)
+        cached_q = self.cache.get(cache_key)
+
+        q_differential, manipulability = None, None
+        if cached_q is None and self.use_differential:
+            q_differential, manipulability, _ = self.robot.ikine_differential(
+                T, current_joints, position_tol=self.differential_position_tol,
+                rotation_tol=self.differential_rotation_tol)
+
+        q_best = None
+        if cached_q is None and q_differential is None and self.use_analytic:
+            q_best, _ = self.robot.ikine_analytic(T, current_joints)
+
+        if cached_q is not None:
+            result = self._check_continuity(IKineResult(cached_q, True, "cache"), current_joints)
+        elif q_differential is not None:
+            result = self._check_continuity(IKineResult(q_differential, True, "differential"), current_joints)
+        elif q_best is not None:
+            # 解析解已给出全部分支，最近的分支被拒绝时数值解也不会更近
+            result = self._check_continuity(IKineResult(q_best, True, "analytic"), current_joints)
+        else:
+            sol = self.robot.ikine_LM(T, q0=current_joints, slimit=1, tol=self.lm_tol, joint_limits=True)
+            result = self._check_continuity(
+                IKineResult(sol.q if sol.success else None, sol.success, "LM", sol.iterations, reason=sol.reason),
+                current_joints
+            )
+            if not result.success:
+                result = self._solve_multistart(T, current_joints, result.iterations)
+
+        result.manipulability = manipulability
+        if result.success and cached_q is None:
+            result.q.setflags(write=False)
+            self.cache.put(cache_key, result.q)
+
+        result.solve_time = (time.perf_counter() - start_time) * 1000
+        self.last_result = result
+        logger.debug(f"逆解服务: {result}")
+        return result
+
+    def _cache_key(self, T, current_joints) -> tuple:
+        """逆解缓存键: 量化到 1e-6 的位姿矩阵 + 当前关节角度所在的解分支
+
+        非 MDH 参数的模型没有解析的解分支划分，改用量化到 0.001 弧度的当前关节角度。
+        """
+        pose_key = tuple(np.round(T[:3, :].ravel() * 1e6).astype(np.int64).tolist())
+        if self.robot.param_type != 'MDH':
+            return pose_key + tuple(np.round(current_joints * 1e3).astype(np.int64).tolist())
+        return pose_key + self.robot.ikine_branch(current_joints)
+
+    def _solve_multistart(self, T, current_joints, used_iterations=0) -> IKineResult:
+        """在当前关节角度附近生成多个初值，并行求解，取最近的解"""
+        seeds = current_joints + self.rng.normal(0.0, self.seed_spread, size=(self.seed_pool_size, 6))
+        seeds = np.clip(seeds, self.qlim[:, 0], self.qlim[:, 1])
+        solutions = list(self.seed_executor.map(
+            lambda seed: self.robot.ikine_LM(T, q0=seed, slimit=1, tol=self.lm_tol, joint_limits=True), seeds))
+
+        iterations = used_iterations + sum(sol.iterations for sol in solutions)
+        candidates = [sol.q for sol in solutions if sol.success]
+        if not candidates:
+            return IKineResult(None, False, "LM-multistart", iterations, reason="所有初值均未收敛")
+
+        distances = np.abs(np.array(candidates) - current_joints).max(axis=1)
+        q_best = candidates[int(np.argmin(distances))]
+        return self._check_continuity(IKineResult(q_best, True, "LM-multistart", iterations), current_joints)
+
+    def _check_continuity(self, result: IKineResult, current_joints) -> IKineResult:
+        """拒绝与当前关节角度相差过大的解"""
+        if result.success:
+            result.joint_distance = float(np.abs(result.q - current_joints).max())
+            if result.joint_distance > self.max_joint_distance:
+                result.success = False
+                result.reason = f"关节跳变 {np.degrees(result.joint_distance):.1f}° 超过阈值"
+                result.q = None
+        return result
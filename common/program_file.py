@@ -0,0 +1,170 @@
+"""示教程序的二进制文件格式(.bxp)
+
+按列存储, 可以直接内存映射读取, 文件大小和加载时间都远小于 JSON 动作文件, JSON 格式仍用于交换。
+
+文件布局(小端, 各段按 8 字节对齐):
+    文件头     magic "BXPG", 版本号 u16, 保留 u16, 动作数 u64, 字符串数 u64, 字符串表字节数 u64
+    joints     float32[动作数, 6]  关节角度(°)
+    speed      int16[动作数]       速度百分比
+    tool       uint8[动作数]       末端工具枚举: 0 无, 1 夹爪, 2 吸盘
+    switch     uint8[动作数]       工具开关枚举: 0 无, 1 关, 2 开
+    delay_ms   int32[动作数]       延时(毫秒)
+    blend_dmm  uint16[动作数]      过渡半径(0.1 mm), 版本 2 新增, 读取版本 1 的文件时为 0
+    motion     uint8[动作数]       运动方式枚举: 0 关节, 1 直线, 版本 3 新增, 读取旧版本的文件时为 0
+    note       uint32[动作数]      备注在字符串表中的序号, 0 为空字符串
+    offsets    uint64[字符串数 + 1] 字符串表中每个字符串的起止位置
+    strings    utf-8 字节          去重后的备注
+"""
+import mmap
+import struct
+from typing import Iterator, Sequence
+
+import numpy as np
+
+PROGRAM_FILE_SUFFIX = ".bxp"
+MAGIC = b"BXPG"
+VERSION = 3
+
+_HEADER = struct.Struct("<4sHHQQQ")
+COLUMN_DTYPES = (
+    ("joints", np.dtype("<f4"), 6),
+    ("speed", np.dtype("<i2"), 1),
+    ("tool", np.dtype("u1"), 1),
+    ("switch", np.dtype("u1"), 1),
+    ("delay_ms", np.dtype("<i4"), 1),
+    ("blend_dmm", np.dtype("<u2"), 1),
+    ("motion", np.dtype("u1"), 1),
+    ("note", np.dtype("<u4"), 1),
+)
+VERSION_COLUMNS = {  # 旧版本文件包含的列
+    1: ("joints", "speed", "tool", "switch", "delay_ms", "note"),
+    2: ("joints", "speed", "tool", "switch", "delay_ms", "blend_dmm", "note"),
+}
+
+
+def _align(offset, alignment=8):
+    return (offset + alignment - 1) // alignment * alignment
+
+
+def _column_layout(row_count, version=VERSION):
+    """各列在文件中的 (列名, 类型, 每行元素数, 起始位置), 以及列数据结束的位置"""
+    layout, offset = [], _align(_HEADER.size)
+    for name, dtype, width in COLUMN_DTYPES:
+        if version in VERSION_COLUMNS and name not in VERSION_COLUMNS[version]:
+            continue
+        layout.append((name, dtype, width, offset))
+        offset = _align(offset + dtype.itemsize * width * row_count)
+    return layout, offset
+
+
+def write_program_file(file_name, columns: dict, notes: Sequence[str]):
+    """写入二进制程序文件
+
+    Args:
+        columns: 列名到数组的映射, 列名与类型见 COLUMN_DTYPES(note 列由 notes 生成)
+        notes: 每个动作的备注
+    """
+    row_count = len(columns["joints"])
+    # 备注去重, 序号 0 固定为空字符串
+    string_table, note_index = [""], np.zeros(row_count, dtype="<u4")
+    string_index = {"": 0}
+    for row, note in enumerate(notes):
+        if note:
+            note_index[row] = string_index.setdefault(note, len(string_table))
+            if note_index[row] == len(string_table):
+                string_table.append(note)
+    encoded_strings = [string.encode("utf-8") for string in string_table]
+    offsets = np.zeros(len(encoded_strings) + 1, dtype="<u8")
+    offsets[1:] = np.cumsum([len(string) for string in encoded_strings])
+
+    layout, end = _column_layout(row_count)
+    with open(file_name, "wb") as file:
+        file.write(_HEADER.pack(MAGIC, VERSION, 0, row_count, len(encoded_strings), int(offsets[-1])))
+        for name, dtype, width, offset in layout:
+            column = note_index if name == "note" else columns[name]
+            file.write(b"\0" * (offset - file.tell()))
+            file.write(np.ascontiguousarray(column, dtype=dtype).tobytes())
+        file.write(b"\0" * (end - file.tell()))
+        file.write(offsets.tobytes())
+        file.write(b"".join(encoded_strings))
+
+
+class ProgramFileReader(object):
+    """内存映射读取二进制程序文件
+
+    columns 为各列的只读数组视图, 直接引用映射的文件内容, 不复制数据; 使用完后需要 close()。
+
+    Raises:
+        ValueError: 文件不是二进制程序文件或版本不支持
+    """
+
+    def __init__(self, file_name):
+        self.file_name = file_name
+        with open(file_name, "rb") as file:
+            self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            self._parse()
+        except Exception:
+            self.close()
+            raise
+        self.rows_read = 0
+
+    def _parse(self):
+        if len(self._mmap) < _HEADER.size:
+            raise ValueError("不是示教程序文件")
+        magic, version, _, self.row_count, string_count, string_bytes = _HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC:
+            raise ValueError("不是示教程序文件")
+        if version != VERSION and version not in VERSION_COLUMNS:
+            raise ValueError(f"不支持的示教程序文件版本: {version}")
+        layout, end = _column_layout(self.row_count, version)
+        if len(self._mmap) < end + 8 * (string_count + 1) + string_bytes:
+            raise ValueError("示教程序文件不完整")
+
+        self.columns = {}
+        for name, dtype, width, offset in layout:
+            column = np.frombuffer(self._mmap, dtype=dtype, count=self.row_count * width, offset=offset)
+            self.columns[name] = column.reshape(self.row_count, width) if width > 1 else column
+        for name, dtype, width in COLUMN_DTYPES:
+            if name not in self.columns:  # 旧版本文件没有的列
+                self.columns[name] = np.zeros(self.row_count, dtype=dtype)
+        self._offsets = np.frombuffer(self._mmap, dtype="<u8", count=string_count + 1, offset=end).tolist()
+        self._strings_start = end + 8 * (string_count + 1)
+        self._string_table = [None] * string_count
+
+    def string(self, index) -> str:
+        """字符串表中的第 index 个字符串, 用到时才解码"""
+        if self._string_table[index] is None:
+            start, stop = self._offsets[index] + self._strings_start, self._offsets[index + 1] + self._strings_start
+            self._string_table[index] = self._mmap[start:stop].decode("utf-8")
+        return self._string_table[index]
+
+    def notes(self, start=0, stop=None) -> list:
+        """第 start ~ stop 个动作的备注"""
+        return [self.string(index) if index else "" for index in self.columns["note"][start:stop].tolist()]
+
+    def iter_chunks(self, chunk_rows) -> Iterator[tuple]:
+        """按块读取 (列数组视图, 备注列表)"""
+        for start in range(0, self.row_count, chunk_rows):
+            stop = min(start + chunk_rows, self.row_count)
+            chunk = {name: column[start:stop] for name, column in self.columns.items()}
+            self.rows_read = stop
+            yield chunk, self.notes(start, stop)
+
+    @property
+    def progress(self) -> float:
+        return self.rows_read / self.row_count if self.row_count else 1.0
+
+    def close(self):
+        self.columns = {}
+        try:
+            self._mmap.close()
+        except BufferError:
+            pass  # 仍有数组引用映射内容时, 由垃圾回收释放
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
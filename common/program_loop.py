@@ -0,0 +1,162 @@
+import threading
+import time
+from collections import deque
+from typing import Callable, Iterator
+
+import numpy as np
+
+import common.command_builder as command_builder
+from common.setpoint_streamer import SetpointStreamer
+from common.teach_program import CompiledProgram
+
+
+class ProgramLoopRunner(object):
+    """环形循环执行编译好的示教程序
+
+    执行计划按环形读取, 循环之间不重新读取表格、不重置进度, 也不再固定等待 1 秒:
+    流式窗口在当前循环的最后几个动作执行时就下发下一次循环的前几个动作, 循环之间没有空档。
+
+    循环间停留 dwell 秒(最后一次循环之后不停留):
+    - 顺序模式(SEQ): 作为延时命令附加在每次循环的最后一个动作上, 由控制器执行, 不打断流水线
+    - 实时模式(INT): 控制器不执行延时命令, 等待最后一个动作到位后在上位机停留
+
+    streamer 为 ProgramStreamer 时按窗口下发预先编码的命令;
+    为 SetpointStreamer 时(实时模式), 动作作为路点插值为固定频率的设定点下发, 停留时保持位置不发送,
+    blend_times 为每个路点的过渡时间(BlendedTrajectory.plan 的结果), 第一次循环的第一个路点总是停稳;
+    直线运动的动作按编译时规划的路径与时间律下发, 第一次循环从当前位置到第一个动作总是关节运动。
+
+    每次循环的耗时为相邻两次循环最后一个动作的到位间隔(第一次循环从开始执行计时), 连续循环时包含一次停留,
+    统计平均值、最大最小值与抖动(标准差)。
+    """
+
+    def __init__(self, streamer, program: CompiledProgram, dwell=0.0, command_model="SEQ",
+                 history_size=1000, blend_times=None):
+        self.streamer = streamer
+        self.program = program
+        self.blend_times = np.zeros(len(program)) if blend_times is None else np.asarray(blend_times, dtype=np.float64)
+        self.dwell = max(float(dwell), 0.0)
+        self.command_model = command_model
+
+        self._lock = threading.Lock()
+        self.cycle_times = deque(maxlen=history_size)  # 最近的循环耗时(秒)
+        self.cycles_completed = 0
+        self._cycle_start_time = 0.0
+        self._on_cycle = None
+
+        # 顺序模式下每次循环最后一个动作附加的停留命令, 单条延时命令最长 MAX_DELAY 秒
+        delay_commands, remaining_ms = [], int(round(self.dwell * 1000))
+        while remaining_ms > 0:
+            delay_ms = min(remaining_ms, int(CompiledProgram.MAX_DELAY * 1000))
+            delay_commands.append(command_builder.set_time_delay(delay_ms))
+            remaining_ms -= delay_ms
+        self._dwell_payload = b''.join(delay_commands)
+
+    @property
+    def expected_cycle_time(self) -> float:
+        """连续循环时一次循环的预计耗时(秒), 包含循环间停留"""
+        return float(self.program.durations.sum()) + self.dwell
+
+    def iter_moves(self, loop_times=None, start_degrees=None) -> Iterator[tuple]:
+        """按环形执行计划生成 (命令 bytes, 预计耗时), loop_times 为 None 时一直循环
+
+        实时模式下循环之间的停留为 (None, 停留秒数)。
+        """
+        if not len(self.program):
+            return
+        payloads, durations = self.program.payloads, self.program.durations.tolist()
+        last_payload, last_duration = payloads[-1], durations[-1]
+        dwell_in_controller = self.command_model == "SEQ" and bool(self._dwell_payload)
+        cycle = 0
+        while loop_times is None or cycle < loop_times:
+            if cycle > 0 and self.dwell and not dwell_in_controller:
+                yield None, self.dwell
+            first_duration = self.program.first_duration(start_degrees) if cycle == 0 else durations[0]
+            is_last_cycle = loop_times is not None and cycle == loop_times - 1
+            if len(payloads) == 1:
+                yield self._last_move(payloads[0], first_duration, is_last_cycle, dwell_in_controller)
+            else:
+                yield payloads[0], first_duration
+                yield from zip(payloads[1:-1], durations[1:-1])
+                yield self._last_move(last_payload, last_duration, is_last_cycle, dwell_in_controller)
+            cycle += 1
+
+    def iter_waypoints(self, loop_times=None, start_degrees=None) -> Iterator[tuple]:
+        """按环形执行计划生成设定点下发的路点 (关节角度, 速度百分比, 末端工具命令, 预计耗时, 过渡时间, 直线运动时间律)
+
+        循环之间的停留为 (None, 0, b'', 停留秒数), 实时模式下动作的延时不执行。
+        """
+        if not len(self.program):
+            return
+        actions, durations = self.program.actions, self.program.durations.tolist()
+        tool_payloads = [command_builder.set_end_tool(1, int(tool_status)) if tool_status >= 0 else b''
+                         for tool_status in actions['tool_status']]
+        waypoints = list(zip(actions['joints'], actions['speed'].tolist(), tool_payloads, durations, self.blend_times.tolist(),
+                             self.program.linear_timings))
+        cycle = 0
+        while loop_times is None or cycle < loop_times:
+            if cycle > 0 and self.dwell:
+                yield None, 0, b'', self.dwell
+            if cycle == 0:
+                joints, speed, tool_payload, *_ = waypoints[0]
+                yield joints, speed, tool_payload, self.program.first_duration(start_degrees), 0.0, None
+                yield from waypoints[1:]
+            else:
+                yield from waypoints
+            cycle += 1
+
+    def run(self, loop_times=None, start_degrees=None, is_running: Callable[[], bool] = lambda: True,
+            on_progress: Callable[[int], None] = None, on_cycle: Callable[[int, float], None] = None) -> bool:
+        """循环执行, loop_times 为 None 时一直循环到 is_running 返回 False
+
+        Args:
+            on_progress: 每个动作到位后回调, 参数为已完成的动作数量
+            on_cycle: 每次循环完成时回调, 参数为已完成的循环次数与这次循环的耗时(秒), 可能在 I/O 线程中调用
+
+        Returns:
+            bool: 是否完整执行
+        """
+        with self._lock:
+            self.cycle_times.clear()
+            self.cycles_completed = 0
+            self._cycle_start_time = time.perf_counter()
+        self._on_cycle = on_cycle
+        try:
+            if isinstance(self.streamer, SetpointStreamer):
+                return self.streamer.run(self.iter_waypoints(loop_times, start_degrees), start_degrees,
+                                         is_running=is_running, on_progress=on_progress, on_move_done=self._on_move_done)
+            return self.streamer.run(self.iter_moves(loop_times, start_degrees), is_running=is_running,
+                                     on_progress=on_progress, on_move_done=self._on_move_done)
+        finally:
+            self._on_cycle = None
+
+    def stats(self) -> dict:
+        """循环耗时统计(秒), 抖动为循环耗时的标准差"""
+        with self._lock:
+            cycle_times = np.array(self.cycle_times)
+            cycles_completed = self.cycles_completed
+        return {
+            "cycles_completed": cycles_completed,
+            "expected_cycle_time": self.expected_cycle_time,
+            "cycle_time_mean": float(cycle_times.mean()) if len(cycle_times) else 0.0,
+            "cycle_time_min": float(cycle_times.min()) if len(cycle_times) else 0.0,
+            "cycle_time_max": float(cycle_times.max()) if len(cycle_times) else 0.0,
+            "jitter": float(cycle_times.std()) if len(cycle_times) else 0.0,
+        }
+
+    def _last_move(self, payload, duration, is_last_cycle, dwell_in_controller) -> tuple:
+        if dwell_in_controller and not is_last_cycle:
+            return payload + self._dwell_payload, duration + self.dwell
+        return payload, duration
+
+    def _on_move_done(self, move_index, done_time):
+        """每次循环最后一个动作完成时记录循环耗时"""
+        if (move_index + 1) % len(self.program):
+            return
+        with self._lock:
+            cycle_time = done_time - self._cycle_start_time
+            self._cycle_start_time = done_time
+            self.cycle_times.append(cycle_time)
+            self.cycles_completed += 1
+            cycles_completed = self.cycles_completed
+        if self._on_cycle is not None:
+            self._on_cycle(cycles_completed, cycle_time)
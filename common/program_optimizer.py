@@ -0,0 +1,145 @@
+"""示教程序优化
+
+录制模式下每次点动都会添加一行动作, 程序中有大量重复、共线的微小动作, 每个动作都要完整地运动、停稳并等待到位上报。
+这里在不改变末端工具动作、延时和速度的前提下精简动作:
+1. 删除与上一个动作关节角度相同的动作
+2. 在相邻的关键动作之间做 Ramer–Douglas–Peucker 简化: 去掉中间的动作后, 机械臂从前一个保留动作按关节插值运动到
+   后一个保留动作, 被去掉的动作的末端位置与这段路径的偏差不超过位置容差, 末端姿态的偏差不超过姿态容差
+关键动作不会被删除: 第一个和最后一个动作, 有开关动作、延时、过渡半径或备注的动作, 直线运动及其起点,
+以及下一个动作的速度或工具与其不同的动作。
+"""
+from typing import Sequence
+
+import numpy as np
+
+from common.blinx_robot_module import Mirobot
+from common.teach_program import action_durations
+
+
+class ProgramOptimizer(object):
+    """示教程序优化器
+
+    Args:
+        robot: 机械臂模型, 用于计算末端位姿和估算动作耗时
+        position_tolerance: 末端位置容差(mm)
+        orientation_tolerance: 末端姿态容差(°)
+        move_overhead: 每个动作启停与等待到位上报的额外耗时(秒), 用于估算节省的时间
+    """
+
+    DUPLICATE_TOLERANCE = 5e-4  # 关节角度相同的判断精度(°), 表格中保留 3 位小数
+    MOVE_OVERHEAD = 0.2
+
+    def __init__(self, robot: Mirobot, position_tolerance=1.0, orientation_tolerance=1.0, move_overhead=MOVE_OVERHEAD):
+        self.robot = robot
+        self.position_tolerance = position_tolerance
+        self.orientation_tolerance = orientation_tolerance
+        self.move_overhead = move_overhead
+
+    def optimize(self, rows: np.ndarray, notes: Sequence[str]) -> tuple:
+        """精简示教动作
+
+        Args:
+            rows: 动作数组(ActionTableModel.ROW_DTYPE), 包含 joints、speed、tool、switch、delay 字段
+            notes: 每个动作的备注
+
+        Returns:
+            tuple: (精简后的动作数组, 备注列表, 统计信息)
+        """
+        key_rows = self.key_rows(rows, notes)
+        same_as_previous = np.zeros(len(rows), dtype=bool)
+        same_as_previous[1:] = np.all(np.abs(np.diff(rows['joints'], axis=0)) < self.DUPLICATE_TOLERANCE, axis=1)
+        duplicates = same_as_previous & ~key_rows
+
+        candidates = np.flatnonzero(~duplicates)
+        keep = np.zeros(len(rows), dtype=bool)
+        keep[candidates[self._simplify(rows['joints'][candidates], key_rows[candidates])]] = True
+
+        kept_rows = np.flatnonzero(keep)
+        optimized_rows, optimized_notes = rows[kept_rows].copy(), [notes[row] for row in kept_rows]
+        cycle_time_before, cycle_time_after = self.cycle_time(rows), self.cycle_time(optimized_rows)
+        return optimized_rows, optimized_notes, {
+            "rows_before": len(rows),
+            "rows_after": len(optimized_rows),
+            "duplicates_removed": int(duplicates.sum()),
+            "simplified_removed": len(candidates) - len(optimized_rows),
+            "cycle_time_before": cycle_time_before,
+            "cycle_time_after": cycle_time_after,
+            "time_saved": cycle_time_before - cycle_time_after,
+        }
+
+    @staticmethod
+    def key_rows(rows: np.ndarray, notes: Sequence[str]) -> np.ndarray:
+        """不能删除的关键动作"""
+        key_rows = (rows['switch'] != 0) | (rows['delay'] != 0) | np.array([bool(note) for note in notes], dtype=bool)
+        # 设置了过渡半径的动作是连续路径的拐点, 删除后过渡的位置和半径都会改变
+        key_rows |= rows['blend'] != 0
+        # 速度或工具在下一个动作改变时, 保留改变前的动作, 精简后每段运动的速度不变
+        key_rows[:-1] |= (rows['speed'][:-1] != rows['speed'][1:]) | (rows['tool'][:-1] != rows['tool'][1:])
+        # 直线运动的路径由起点和终点决定, 两者都保留
+        key_rows |= rows['motion'] != 0
+        key_rows[:-1] |= rows['motion'][1:] != 0
+        if len(rows):
+            key_rows[[0, -1]] = True
+        return key_rows
+
+    def cycle_time(self, rows: np.ndarray) -> float:
+        """按循环执行估算一次循环的耗时(秒): 关节运动 + 延时 + 每个动作的额外耗时"""
+        durations = action_durations(rows['joints'], rows['speed'], rows['delay'], self.robot.joint_max_speeds)
+        return float(durations.sum() + self.move_overhead * len(rows))
+
+    def _simplify(self, joints: np.ndarray, key_rows: np.ndarray) -> np.ndarray:
+        """在相邻的关键动作之间做 RDP 简化, 返回保留的动作序号
+
+        同一轮中所有待拆分的分段一起计算偏差, 每轮只调用一次批量正解, 循环次数只与拆分的层数有关。
+        """
+        keep = key_rows.copy()
+        key_indices = np.flatnonzero(key_rows)
+        starts, stops = key_indices[:-1], key_indices[1:]
+        if not np.any(stops - starts > 1):
+            return key_indices
+        q = np.radians(joints)
+        axes = np.stack(self.robot._fkine_batch_axes(q))  # (4, 3, N): 末端 x、y、z 轴与原点
+        while len(starts):
+            pending = stops - starts > 1
+            starts, stops = starts[pending], stops[pending]
+            if not len(starts):
+                break
+            # 展开所有分段的中间动作
+            lengths = stops - starts - 1
+            segment = np.repeat(np.arange(len(starts)), lengths)
+            first = np.cumsum(lengths) - lengths
+            interior = starts[segment] + 1 + np.arange(len(segment)) - first[segment]
+
+            deviation = self._deviation(q[starts][segment], q[stops][segment], q[interior], axes[:, :, interior])
+            farthest = np.maximum.reduceat(deviation, first)
+            # 每段中偏差最大的第一个动作
+            is_farthest = np.flatnonzero(deviation == farthest[segment])
+            _, first_farthest = np.unique(segment[is_farthest], return_index=True)
+            split = interior[is_farthest[first_farthest]]
+
+            exceeded = farthest > 1.0
+            keep[split[exceeded]] = True
+            starts, stops = (np.concatenate([starts[exceeded], split[exceeded]]),
+                             np.concatenate([split[exceeded], stops[exceeded]]))
+        return np.flatnonzero(keep)
+
+    def _deviation(self, q_start, q_stop, q_interior, interior_axes) -> np.ndarray:
+        """中间动作与所在分段 q_start -> q_stop 关节插值路径的偏差, 以容差为单位(大于 1 即超出容差)
+
+        每个中间动作与路径上关节空间中最近的点比较末端位置和姿态。
+
+        Args:
+            q_start, q_stop, q_interior: 每个中间动作所在分段的起点、终点与其关节角度(弧度), 形状均为 (M, 6)
+            interior_axes: 中间动作的末端 x、y、z 轴与原点, 形状为 (4, 3, M)
+        """
+        direction = q_stop - q_start
+        length_squared = np.einsum('ij,ij->i', direction, direction)
+        projection = np.einsum('ij,ij->i', q_interior - q_start, direction)
+        t = np.clip(np.divide(projection, length_squared, out=np.zeros_like(projection), where=length_squared > 0), 0.0, 1.0)
+        path_axes = np.stack(self.robot._fkine_batch_axes(q_start + t[:, np.newaxis] * direction))
+
+        position_error = np.linalg.norm(interior_axes[3] - path_axes[3], axis=0) * 1000  # m -> mm
+        # 两个姿态之间的转角: cos(angle) = (trace(R1^T R2) - 1) / 2
+        trace = np.sum(interior_axes[:3] * path_axes[:3], axis=(0, 1))
+        orientation_error = np.degrees(np.arccos(np.clip((trace - 1) / 2, -1.0, 1.0)))
+        return np.maximum(position_error / self.position_tolerance, orientation_error / self.orientation_tolerance)
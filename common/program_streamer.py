@@ -0,0 +1,182 @@
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from typing import Callable, Iterable
+
+from loguru import logger
+
+from common.socket_client import RobotArmSession, LatencyHistogram
+
+
+class ProgramStreamer(object):
+    """示教程序流式下发
+
+    控制器的动作缓冲区有限, 一次性把整个程序写入会溢出(原来顺序模式限制最多 400 条动作)。
+    这里按窗口控制发送: 控制器上最多同时保留 window_size 个未完成的动作,
+    每收到一个 move_in_place(data 为 true) 的到位上报就补发一个动作, 程序和循环次数不再受限。
+
+    每个动作是一组已编码的命令(关节运动及其附带的末端工具、延时命令), 按一个动作计入窗口。
+    send_move() 为每个动作返回一个 Future, I/O 线程收到到位上报时按发送顺序完成, 等待方立即被唤醒。
+    动作的超时时间由预计耗时计算: 预计耗时 * timeout_factor + timeout_margin, 从动作开始执行(上一个动作到位)时计时。
+    实时模式(INT)下控制器收到命令立即执行, 使用 window_size=1 即为逐个动作等待到位。
+    命令为 None 的动作表示停留: 等待之前的动作全部到位后, 在上位机等待预计耗时秒数, 不发送命令。
+    """
+
+    ACK_COMMAND = "move_in_place"
+
+    def __init__(self, session: RobotArmSession, window_size=8, ack_timeout=60.0, timeout_factor=2.0, timeout_margin=1.0):
+        self.session = session
+        self.window_size = window_size
+        self.ack_timeout = ack_timeout  # 没有预计耗时的动作使用的超时时间
+        self.timeout_factor = timeout_factor
+        self.timeout_margin = timeout_margin
+
+        self._lock = threading.Lock()
+        self._in_flight = deque()  # 按发送顺序排列的未完成动作 Future
+
+        self.moves_sent = 0
+        self.moves_completed = 0
+        self.max_in_flight = 0
+        self.ack_timeouts = 0
+        self.elapsed = 0.0
+        self.refill_latency = LatencyHistogram()  # 收到到位上报到补发下一个动作的间隔
+        self._on_move_done = None
+
+    def move_timeout(self, expected_duration=None) -> float:
+        """根据动作预计耗时(秒)计算超时时间"""
+        if expected_duration is None:
+            return self.ack_timeout
+        return expected_duration * self.timeout_factor + self.timeout_margin
+
+    def send_move(self, payload: bytes, expected_duration=None) -> Future:
+        """发送一个动作, 返回到位时完成的 Future, 结果为收到到位上报的时间(perf_counter)
+
+        Future.deadline 为动作的超时时刻, 动作成为最早的未完成动作(开始执行)时设置。
+        """
+        future = Future()
+        future.timeout = self.move_timeout(expected_duration)
+        future.deadline = None
+        with self._lock:
+            if not self._in_flight:
+                future.deadline = time.monotonic() + future.timeout
+            self._in_flight.append(future)
+            self.max_in_flight = max(self.max_in_flight, len(self._in_flight))
+        self.session.send(payload)
+        self.moves_sent += 1
+        return future
+
+    def run(self, moves: Iterable, is_running: Callable[[], bool] = lambda: True,
+            on_progress: Callable[[int], None] = None, on_move_done: Callable[[int, float], None] = None) -> bool:
+        """按窗口发送所有动作, 等待最后一个动作到位后返回
+
+        Args:
+            moves: 动作序列, 元素为命令 bytes 或 (命令 bytes, 预计耗时秒数), 可以是生成器, 按需读取
+            is_running: 返回 False 时停止发送(急停、线程退出)
+            on_progress: 每个动作到位后回调, 参数为已完成的动作数量
+            on_move_done: 每个动作完成时回调, 参数为动作序号(从 0 开始, 不含停留)与完成时间(perf_counter),
+                可能在 I/O 线程中调用
+
+        Returns:
+            bool: 是否完整执行
+        """
+        with self._lock:
+            self._in_flight.clear()
+        self.moves_sent = self.moves_completed = self.max_in_flight = self.ack_timeouts = 0
+        self._on_move_done = on_move_done
+        start_time = time.perf_counter()
+        self.session.subscribe(self.ACK_COMMAND, self._on_move_status)
+        try:
+            for move in moves:
+                payload, expected_duration = move if isinstance(move, tuple) else (move, None)
+                if payload is None:
+                    if self._wait_for_window(0, is_running, on_progress) is None or not self._dwell(expected_duration, is_running):
+                        return False
+                    continue
+                freed_time = self._wait_for_window(self.window_size - 1, is_running, on_progress)
+                if freed_time is None:
+                    return False
+                self.send_move(payload, expected_duration)
+                if freed_time:
+                    self.refill_latency.record(time.perf_counter() - freed_time)
+            return self._wait_for_window(0, is_running, on_progress) is not None
+        finally:
+            self.session.unsubscribe(self.ACK_COMMAND, self._on_move_status)
+            self._on_move_done = None
+            self.elapsed = time.perf_counter() - start_time
+            logger.debug(f"示教程序下发结束: {self.stats()}")
+
+    def stats(self) -> dict:
+        return {
+            "moves_sent": self.moves_sent,
+            "moves_completed": self.moves_completed,
+            "max_in_flight": self.max_in_flight,
+            "ack_timeouts": self.ack_timeouts,
+            "elapsed": self.elapsed,
+            "moves_per_second": self.moves_completed / self.elapsed if self.elapsed else 0.0,
+            "refill_latency": self.refill_latency.summary(),
+        }
+
+    def _wait_for_window(self, max_in_flight, is_running, on_progress):
+        """等待未完成的动作数量不超过 max_in_flight
+
+        Returns:
+            float | None: 最后释放窗口的到位时间(没有等待时为 0.0), 停止执行时返回 None
+        """
+        freed_time = 0.0
+        while True:
+            with self._lock:
+                if len(self._in_flight) <= max_in_flight:
+                    break
+                future = self._in_flight[0]
+            if not is_running():
+                return None
+            try:
+                # 定期醒来检查急停标志
+                freed_time = future.result(timeout=max(min(0.1, future.deadline - time.monotonic()), 0.0))
+            except FutureTimeoutError:
+                if time.monotonic() < future.deadline:
+                    continue
+                logger.warning(f"动作 {future.timeout:.1f} s 内未收到到位上报, 默认完成!")
+                self.ack_timeouts += 1
+                self._complete_oldest(future)
+                freed_time = time.perf_counter()
+            if on_progress is not None:
+                on_progress(self.moves_completed)
+        return freed_time if is_running() else None
+
+    @staticmethod
+    def _dwell(duration, is_running) -> bool:
+        """停留 duration 秒, 期间定期检查急停标志, 停止执行时返回 False"""
+        deadline = time.monotonic() + (duration or 0.0)
+        while (remaining := deadline - time.monotonic()) > 0:
+            if not is_running():
+                return False
+            time.sleep(min(0.1, remaining))
+        return is_running()
+
+    def _complete_oldest(self, expected_future=None, ack_time=None) -> bool:
+        """完成最早的未完成动作, 下一个动作开始计时"""
+        with self._lock:
+            if not self._in_flight or (expected_future is not None and self._in_flight[0] is not expected_future):
+                return False
+            future = self._in_flight.popleft()
+            if self._in_flight:
+                next_future = self._in_flight[0]
+                next_future.deadline = time.monotonic() + next_future.timeout
+            self.moves_completed += 1
+            move_index = self.moves_completed - 1
+        if self._on_move_done is not None:
+            self._on_move_done(move_index, time.perf_counter() if ack_time is None else ack_time)
+        if ack_time is not None:
+            future.set_result(ack_time)
+        else:
+            future.set_exception(FutureTimeoutError("动作到位上报超时"))
+        return True
+
+    def _on_move_status(self, response: dict):
+        """I/O 线程回调: 动作到位后完成对应的 Future, 释放一个窗口"""
+        if response.get('data') is not True:
+            return
+        # 没有未完成的动作时(如连接时控制器主动上报的状态)不做处理
+        self._complete_oldest(ack_time=time.perf_counter())
@@ -0,0 +1,162 @@
+import hashlib
+import json
+import time
+from pathlib import Path
+
+import numpy as np
+from loguru import logger
+
+from common import settings
+from common.blinx_robot_module import Mirobot
+
+
+class ReachabilityIndex(object):
+    """机械臂末端可达位置的体素索引
+
+    在关节限位范围内随机采样，批量正解得到末端位置，落入的体素标记为可达，
+    再向外膨胀 dilation 个体素，减少采样稀疏造成的误判。
+    索引保存为 .npy 文件并以内存映射方式读取，元数据(配置文件哈希、体素尺寸、原点)保存在同名 .json 文件中，
+    机械臂模型配置文件变化后自动重建。
+
+    索引只根据末端位置判断，不考虑姿态，因此只用于提前拒绝明显不可达的目标，
+    索引判定可达的目标仍需由逆解确认。
+    """
+
+    VERSION = 2
+    LIMIT_SAMPLE_SHARE = 0.2  # 每个关节取限位值的比例
+
+    def __init__(self, robot: Mirobot, config_file=settings.ROBOT_MODEL_CONFIG_FILE_PATH,
+                 index_file=settings.REACHABILITY_INDEX_FILE_PATH, voxel_size=0.01,
+                 sample_count=5000000, dilation=1, chunk_size=200000):
+        self.robot = robot
+        self.config_file = Path(config_file)
+        self.index_file = Path(index_file)
+        self.meta_file = self.index_file.with_suffix('.json')
+        self.voxel_size = voxel_size
+        self.sample_count = sample_count
+        self.dilation = dilation
+        self.chunk_size = chunk_size
+        self.grid = None
+        self.origin = None
+        self.load_or_build()
+
+    def load_or_build(self):
+        """加载已有索引，配置文件或采样参数变化时重新生成"""
+        expected_meta = self._expected_meta()
+        if self.index_file.exists() and self.meta_file.exists():
+            try:
+                with open(self.meta_file, 'r', encoding='utf-8') as f:
+                    meta = json.load(f)
+                if all(meta.get(k) == v for k, v in expected_meta.items()):
+                    self._attach(np.load(self.index_file, mmap_mode='r'), meta)
+                    return
+                logger.info("机械臂模型配置已变化, 重新生成可达空间索引")
+            except Exception as e:
+                logger.warning(f"读取可达空间索引失败, 重新生成: {e}")
+        self.build()
+
+    def build(self):
+        """采样关节空间，生成并保存可达空间索引"""
+        start_time = time.perf_counter()
+        qlim = np.array([link.qlim for link in self.robot.links])
+        reach = np.abs(self.robot._mdh_params[:, 1]).sum() + np.abs(self.robot._mdh_params[1:, 2]).sum()
+        base_height = self.robot._mdh_params[0, 2]
+        origin = np.array([-reach, -reach, base_height - reach]) - self.voxel_size * (self.dilation + 1)
+        shape = (int(np.ceil(2 * reach / self.voxel_size)) + 2 * (self.dilation + 1) + 1,) * 3
+
+        grid = np.zeros(shape, dtype=bool)
+        rng = np.random.default_rng(0)
+        for chunk_start in range(0, self.sample_count, self.chunk_size):
+            chunk = min(self.chunk_size, self.sample_count - chunk_start)
+            q = rng.uniform(qlim[:, 0], qlim[:, 1], size=(chunk, 6))
+            # 部分关节取限位值, 覆盖关节限位围成的工作空间边界
+            at_limit = rng.random((chunk, 6)) < self.LIMIT_SAMPLE_SHARE
+            q = np.where(at_limit, np.where(rng.random((chunk, 6)) < 0.5, qlim[:, 0], qlim[:, 1]), q)
+            q[:, 5] = 0.0  # 末端位置与 6 轴无关
+            position = self.robot._fkine_batch_axes(q)[3]
+            index = np.floor((position.T - origin) / self.voxel_size).astype(np.intp)
+            grid[index[:, 0], index[:, 1], index[:, 2]] = True
+        grid = self._dilate(grid, self.dilation)
+
+        meta = self._expected_meta()
+        meta.update({"origin": origin.tolist(), "shape": list(shape)})
+        self.index_file.parent.mkdir(parents=True, exist_ok=True)
+        np.save(self.index_file, grid)
+        with open(self.meta_file, 'w', encoding='utf-8') as f:
+            json.dump(meta, f, indent=2)
+        logger.info(f"可达空间索引生成完成, 体素数量: {int(grid.sum())}, 耗时: {time.perf_counter() - start_time:.2f} s")
+        self._attach(np.load(self.index_file, mmap_mode='r'), meta)
+
+    def is_reachable(self, position) -> bool:
+        """判断单个末端位置(米)是否落在可达空间内"""
+        x, y, z = position
+        fx = (x - self.origin[0]) * self._inv_voxel_size
+        fy = (y - self.origin[1]) * self._inv_voxel_size
+        fz = (z - self.origin[2]) * self._inv_voxel_size
+        nx, ny, nz = self._shape
+        if not (0 <= fx < nx and 0 <= fy < ny and 0 <= fz < nz):
+            return False
+        return bool(self.grid[int(fx), int(fy), int(fz)])
+
+    def contains(self, positions) -> np.ndarray:
+        """批量判断末端位置(米)是否可达, positions 形状为 (N, 3)"""
+        index = np.floor((np.atleast_2d(positions) - self.origin) * self._inv_voxel_size).astype(np.intp)
+        inside = np.all((index >= 0) & (index < self._shape), axis=1)
+        reachable = np.zeros(index.shape[0], dtype=bool)
+        valid = index[inside]
+        reachable[inside] = self.grid[valid[:, 0], valid[:, 1], valid[:, 2]]
+        return reachable
+
+    def clamp_step(self, start, target) -> np.ndarray:
+        """沿 start -> target 的直线，将点动目标截断到可达空间边界
+
+        Returns:
+            ndarray: 直线上最后一个可达的位置; 目标可达时返回 target, 起点已不可达时返回 start
+        """
+        start = np.asarray(start, dtype=float)
+        target = np.asarray(target, dtype=float)
+        step_count = max(int(np.ceil(np.linalg.norm(target - start) / (self.voxel_size / 2))), 1)
+        points = start + np.linspace(0.0, 1.0, step_count + 1)[:, None] * (target - start)
+        reachable = self.contains(points)
+        if reachable.all():
+            return target
+        first_unreachable = int(np.argmin(reachable))
+        if first_unreachable == 0:
+            return start
+        return points[first_unreachable - 1]
+
+    def _attach(self, grid, meta):
+        self.grid = grid
+        self.origin = np.array(meta["origin"])
+        self._shape = tuple(meta["shape"])
+        self._inv_voxel_size = 1.0 / self.voxel_size
+
+    def _expected_meta(self) -> dict:
+        with open(self.config_file, 'rb') as f:
+            config_hash = hashlib.sha256(f.read()).hexdigest()
+        return {
+            "version": self.VERSION,
+            "config_hash": config_hash,
+            "voxel_size": self.voxel_size,
+            "sample_count": self.sample_count,
+            "dilation": self.dilation,
+        }
+
+    @staticmethod
+    def _dilate(grid, iterations):
+        """按 3x3x3 邻域膨胀体素"""
+        for _ in range(iterations):
+            for axis in range(3):
+                dilated = grid.copy()
+                forward = [slice(None)] * 3
+                backward = [slice(None)] * 3
+                forward[axis], backward[axis] = slice(1, None), slice(None, -1)
+                dilated[tuple(forward)] |= grid[tuple(backward)]
+                dilated[tuple(backward)] |= grid[tuple(forward)]
+                grid = dilated
+        return grid
+
+
+if __name__ == "__main__":
+    # 离线生成可达空间索引: python -m common.reachability_index
+    ReachabilityIndex(Mirobot(settings.ROBOT_MODEL_CONFIG_FILE_PATH, param_type='MDH')).build()
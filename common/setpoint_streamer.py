@@ -0,0 +1,184 @@
+"""实时模式(INT)下的关节设定点流式下发
+
+原来实时模式下每个动作发送一条 set_joint_angle_all_time 后等待 move_in_place 到位上报, 动作之间走走停停。
+这里把示教动作在关节空间中插值为固定频率的设定点, 按单调时钟定时下发, 控制器收到后立即跟随, 动作之间不再停顿。
+
+设定点由生成器流水线逐个产生, 内存占用与路径长短无关:
+    路点 (关节角度, 速度, 附带命令, 预计耗时) -> interpolate_setpoints -> encode_setpoints -> SetpointStreamer.run
+连续路径过渡时由 trajectory.BlendedTrajectory.iter_setpoints 代替 interpolate_setpoints。
+直线运动(MoveL)的路点带有 Mirobot.linear_path 规划、TimeOptimalParameterization 计算的时间律, 按时间律采样下发。
+"""
+import math
+import time
+from typing import Callable, Iterable, Iterator
+
+import numpy as np
+from loguru import logger
+
+import common.command_builder as command_builder
+from common.socket_client import RobotArmSession, LatencyHistogram
+from common.time_parameterization import TimeOptimalParameterization
+
+
+def interpolate_setpoints(waypoints: Iterable, period: float, start_degrees=None) -> Iterator[tuple]:
+    """把路点插值为每个周期一个的关节设定点
+
+    每段运动的耗时向上取整为整数个周期, 按关节线性插值(各关节同时到位), 最后一个设定点正好是路点,
+    附带的命令(末端工具)随最后一个设定点发送。带有直线运动时间律的路点按时间律采样, 路径起点为上一个路点。
+
+    Args:
+        waypoints: 路点序列, 元素为 (关节角度(°), 速度百分比, 附带命令 bytes, 预计耗时秒数[, 过渡时间[, 直线运动时间律]]),
+            关节角度为 None 时表示停留预计耗时秒数, 过渡时间在这里不使用
+        period: 设定点周期(秒)
+        start_degrees: 当前关节角度(°), 为 None 时第一个路点不插值, 直接发送后等待预计耗时再记为到达
+
+    Yields:
+        tuple: (关节角度 ndarray | None, 速度百分比, 附带命令 bytes, 是否到达路点), 停留期间关节角度为 None
+    """
+    previous = None if start_degrees is None else np.asarray(start_degrees, dtype=np.float64)
+    for joints, speed, extra_payload, duration, *options in waypoints:
+        tick_count = max(int(math.ceil((duration or 0.0) / period - 1e-9)), 1)
+        if joints is None:
+            for _ in range(tick_count):
+                yield None, speed, b'', False
+            continue
+        joints = np.asarray(joints, dtype=np.float64)
+        linear_timing = options[1] if len(options) > 1 else None
+        if linear_timing is not None and previous is not None:
+            setpoints = TimeOptimalParameterization.sample(linear_timing, period)
+            for setpoint in setpoints[:-1]:
+                yield setpoint, speed, b'', False
+            yield joints, speed, extra_payload, True
+        elif previous is None:
+            # 没有起点无法插值, 控制器按速度百分比自行运动到路点
+            yield joints, speed, extra_payload, tick_count == 1
+            for tick in range(1, tick_count):
+                yield None, speed, b'', tick == tick_count - 1
+        else:
+            alphas = np.arange(1, tick_count + 1)[:, np.newaxis] / tick_count
+            setpoints = previous + alphas * (joints - previous)
+            setpoints[-1] = joints
+            for setpoint in setpoints[:-1]:
+                yield setpoint, speed, b'', False
+            yield joints, speed, extra_payload, True
+        previous = joints
+
+
+def encode_setpoints(setpoints: Iterable, resolution=5e-4) -> Iterator[tuple]:
+    """把设定点编码为命令, 与上一个发送的设定点相同(差值小于 resolution°)且没有附带命令时不发送
+
+    Yields:
+        tuple: (命令 bytes | None, 是否到达路点), 命令为 None 时这个周期不发送
+    """
+    last_sent = None
+    for joints, speed, extra_payload, waypoint_reached in setpoints:
+        if joints is None or (not extra_payload and last_sent is not None
+                              and np.all(np.abs(joints - last_sent) < resolution)):
+            yield None, waypoint_reached
+            continue
+        last_sent = joints
+        yield command_builder.set_joint_angle_all_time(speed, joints.tolist()) + extra_payload, waypoint_reached
+
+
+class SetpointStreamer(object):
+    """按固定频率定时下发关节设定点
+
+    第 k 个设定点在 start + k * period 时刻发送, 按单调时钟的绝对时刻计算, sleep 的误差不会逐周期累积。
+    设定点在它所在的周期结束前仍未发出时记为一次超时(deadline miss)。
+    落后超过 max_lag 秒时(线程被长时间阻塞)不再集中补发落后的设定点, 而是把时间基准整体后移, 记为一次重新同步,
+    轨迹按原来的速度继续执行。
+
+    Args:
+        session: 机械臂会话
+        rate: 设定点频率(Hz)
+        max_lag: 允许落后的最长时间(秒), 超过后重新同步
+        trajectory: 连续路径过渡(BlendedTrajectory), 为 None 时路点之间按关节直线插值
+    """
+
+    def __init__(self, session: RobotArmSession, rate=100.0, max_lag=0.05, trajectory=None):
+        if rate <= 0:
+            raise ValueError(f"设定点频率必须大于 0: {rate}")
+        self.session = session
+        self.rate = float(rate)
+        self.period = 1.0 / self.rate
+        self.max_lag = max_lag
+        self.trajectory = trajectory
+
+        self.ticks = 0
+        self.setpoints_sent = 0
+        self.moves_completed = 0
+        self.deadline_misses = 0
+        self.resyncs = 0
+        self.elapsed = 0.0
+        self.send_lateness = LatencyHistogram()  # 设定点实际发送时刻与计划时刻的差
+
+    def run(self, waypoints: Iterable, start_degrees=None, is_running: Callable[[], bool] = lambda: True,
+            on_progress: Callable[[int], None] = None, on_move_done: Callable[[int, float], None] = None) -> bool:
+        """插值并定时下发所有路点, 最后一个设定点所在的周期结束后返回
+
+        Args:
+            waypoints: 路点序列, 见 interpolate_setpoints, 可以是生成器, 按需读取
+            start_degrees: 当前关节角度(°)
+            is_running: 返回 False 时停止发送(急停、线程退出)
+            on_progress: 每到达一个路点回调, 参数为已到达的路点数量
+            on_move_done: 每到达一个路点回调, 参数为路点序号(从 0 开始, 不含停留)与到达时间(perf_counter)
+
+        Returns:
+            bool: 是否完整执行
+        """
+        self.ticks = self.setpoints_sent = self.moves_completed = self.deadline_misses = self.resyncs = 0
+        self.send_lateness.reset()
+        start_time = time.perf_counter()
+        schedule_start = time.monotonic()
+        try:
+            if self.trajectory is not None:
+                setpoints = self.trajectory.iter_setpoints(waypoints, self.period, start_degrees)
+            else:
+                setpoints = interpolate_setpoints(waypoints, self.period, start_degrees)
+            for payload, waypoint_reached in encode_setpoints(setpoints):
+                scheduled_time = schedule_start + self.ticks * self.period
+                self.ticks += 1
+                if not self._sleep_until(scheduled_time, is_running):
+                    return False
+                lateness = time.monotonic() - scheduled_time
+                if lateness > self.period:
+                    self.deadline_misses += 1
+                if lateness > self.max_lag:
+                    schedule_start += lateness  # 重新同步, 之后的设定点从现在开始按周期发送
+                    self.resyncs += 1
+                if payload is not None:
+                    self.session.send(payload)
+                    self.setpoints_sent += 1
+                    self.send_lateness.record(max(lateness, 0.0))
+                if waypoint_reached:
+                    self.moves_completed += 1
+                    if on_move_done is not None:
+                        on_move_done(self.moves_completed - 1, time.perf_counter())
+                    if on_progress is not None:
+                        on_progress(self.moves_completed)
+            # 等待最后一个设定点所在的周期结束
+            return self._sleep_until(schedule_start + self.ticks * self.period, is_running)
+        finally:
+            self.elapsed = time.perf_counter() - start_time
+            logger.debug(f"设定点下发结束: {self.stats()}")
+
+    def stats(self) -> dict:
+        return {
+            "rate": self.rate,
+            "ticks": self.ticks,
+            "setpoints_sent": self.setpoints_sent,
+            "moves_completed": self.moves_completed,
+            "deadline_misses": self.deadline_misses,
+            "resyncs": self.resyncs,
+            "elapsed": self.elapsed,
+            "send_lateness": self.send_lateness.summary(),
+        }
+
+    @staticmethod
+    def _sleep_until(deadline, is_running) -> bool:
+        """等待到 deadline(monotonic), 期间定期检查急停标志, 停止执行时返回 False"""
+        while (remaining := deadline - time.monotonic()) > 0:
+            if not is_running():
+                return False
+            time.sleep(min(0.1, remaining))
+        return is_running()
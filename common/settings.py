@@ -13,5 +13,14 @@ WIFI_INFO_FILE_PATH = PROJECT_ROOT_PATH / "config/WiFi_Info"
 # 机械臂模型配置文件路径
 ROBOT_MODEL_CONFIG_FILE_PATH = PROJECT_ROOT_PATH / "config/robot_mdh_parameters.yaml"
 
+# 机械臂可达空间索引文件路径(由机械臂模型配置文件自动生成)
+REACHABILITY_INDEX_FILE_PATH = PROJECT_ROOT_PATH / "config/reachability_index.npy"
+
 # 图标路径
-WINDOWS_ICON_PATH = PROJECT_ROOT_PATH / "assets/icons/Robot_arm_log.png"
\ No newline at end of file
+WINDOWS_ICON_PATH = PROJECT_ROOT_PATH / "assets/icons/Robot_arm_log.png"
+
+# 实时模式(INT)下示教动作插值为关节设定点的下发频率(Hz), 建议 50 ~ 200
+INT_SETPOINT_RATE = 100
+
+# 实时模式下示教路点之间的过渡曲线: parabolic(抛物线) 或 quintic(五次多项式, 加速度连续)
+INT_BLEND_PROFILE = "parabolic"
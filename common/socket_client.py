@@ -1,9 +1,20 @@
+import bisect
+import selectors
 import socket
+import threading
+import time
+from collections import defaultdict, deque
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from queue import Queue, Empty
 
 from PySide6.QtCore import QRunnable, Slot
 
 from loguru import logger
 
+from common.command_builder import SET_JOINT_EMERGENCY_STOP
+from common.frame_parser import LineFramer
+
+
 class Worker(QRunnable):
     """Worker thread
 
@@ -53,3 +64,656 @@ class ClientSocket:
     
     def __exit__(self, exc_type, exc_val, exc_tb):
         self.client_socket_list.pop().close()
+
+
+class LatencyHistogram(object):
+    """延迟直方图, 按对数分桶统计, 并保留最近的样本用于计算分位数"""
+
+    BUCKET_EDGES_MS = (0.1, 0.2, 0.5, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+
+    def __init__(self, sample_size=10000):
+        self.counts = [0] * (len(self.BUCKET_EDGES_MS) + 1)
+        self.samples = deque(maxlen=sample_size)
+        self._lock = threading.Lock()
+
+    def record(self, seconds):
+        latency_ms = seconds * 1000
+        with self._lock:
+            self.counts[bisect.bisect_left(self.BUCKET_EDGES_MS, latency_ms)] += 1
+            self.samples.append(latency_ms)
+
+    def reset(self):
+        with self._lock:
+            self.counts = [0] * (len(self.BUCKET_EDGES_MS) + 1)
+            self.samples.clear()
+
+    def percentile(self, percent):
+        with self._lock:
+            samples = sorted(self.samples)
+        if not samples:
+            return 0.0
+        return samples[min(int(len(samples) * percent / 100), len(samples) - 1)]
+
+    def summary(self) -> dict:
+        """统计结果, 单位 ms"""
+        with self._lock:
+            samples = list(self.samples)
+            counts = list(self.counts)
+        labels = [f"<={edge}ms" for edge in self.BUCKET_EDGES_MS] + [f">{self.BUCKET_EDGES_MS[-1]}ms"]
+        return {
+            "count": sum(counts),
+            "mean_ms": sum(samples) / len(samples) if samples else 0.0,
+            "p50_ms": self.percentile(50),
+            "p99_ms": self.percentile(99),
+            "max_ms": max(samples) if samples else 0.0,
+            "buckets": {label: count for label, count in zip(labels, counts) if count},
+        }
+
+    def format(self, title="") -> str:
+        """文本形式的直方图, 用于日志与基准测试输出"""
+        summary = self.summary()
+        lines = [f"{title} 样本数: {summary['count']}, 平均: {summary['mean_ms']:.3f} ms, "
+                 f"p50: {summary['p50_ms']:.3f} ms, p99: {summary['p99_ms']:.3f} ms"]
+        peak = max(summary["buckets"].values(), default=1)
+        for label, count in summary["buckets"].items():
+            lines.append(f"  {label:>9} | {'#' * max(1, round(40 * count / peak))} {count}")
+        return '\n'.join(lines)
+
+
+class CommandQueue(Queue):
+    """写入时唤醒 I/O 线程的命令队列
+
+    与 Queue 的用法一致, 额外记录每条命令的入队时间, 用于统计命令发送延迟。
+    """
+
+    def __init__(self, maxsize=0):
+        super().__init__(maxsize)
+        self._listeners = []
+
+    def add_listener(self, listener):
+        if listener not in self._listeners:
+            self._listeners.append(listener)
+
+    def remove_listener(self, listener):
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def put(self, item, block=True, timeout=None):
+        super().put(item, block, timeout)
+        for listener in list(self._listeners):
+            listener()
+
+    def get_timestamped_nowait(self):
+        """取出命令及其入队时间 (perf_counter 秒), 队列为空时抛出 Empty"""
+        with self.not_empty:
+            if not self._qsize():
+                raise Empty
+            item = self.queue.popleft()
+            self.not_full.notify()
+            return item
+
+    def _put(self, item):
+        self.queue.append((time.perf_counter(), item))
+
+    def _get(self):
+        return self.queue.popleft()[1]
+
+
+class RobotArmSession(object):
+    """与机械臂之间的长连接会话
+
+    每台机械臂(host, port)只保留一个会话对象, 发送与接收共用同一条 TCP 连接, 由一个 I/O 线程处理:
+    - I/O 线程阻塞在 selector 上, socket 可读或有新的命令写入时立即唤醒, 不再按固定周期轮询
+    - send() 发送命令, 需要响应时返回 Future, 按响应中的 command 字段分发给最早等待该类型响应的调用方
+    - attach_command_queue() 绑定界面的命令队列, 队列写入即唤醒 I/O 线程发送
+    - 每次唤醒取出全部积压的命令合并写入, 一次 sendall 不超过 max_batch_bytes 字节
+    - subscribe() 订阅机械臂主动上报的数据(关节角度、运动到位状态等)
+    - 连接断开后 I/O 线程自动重连, 未发送的命令在重连后继续发送, 调用方无需感知
+
+    latency 中记录三类延迟直方图: dispatch(命令入队到写入 socket)、response(发送到收到响应)、
+    telemetry(socket 可读到上报数据分发完成)。
+    """
+
+    _sessions = {}
+    _registry_lock = threading.Lock()
+
+    def __init__(self, host, port, connect_timeout=6, reconnect_interval=1.0, max_batch_bytes=16384):
+        self.host = host
+        self.port = port
+        self.connect_timeout = connect_timeout
+        self.reconnect_interval = reconnect_interval
+        self.max_batch_bytes = max_batch_bytes
+
+        self._socket = None
+        self._closed = False
+        self._connect_lock = threading.Lock()
+        self._route_lock = threading.Lock()
+        self._outgoing = deque()  # (入队时间, 命令, Future), 由 _outgoing_lock 保护
+        self._outgoing_lock = threading.Lock()
+        self._command_queues = []
+        self._pending = defaultdict(deque)  # 命令类型 -> 等待响应的 (发送时间, Future) 队列
+        self._subscribers = defaultdict(list)  # 命令类型 -> 回调函数列表
+        self._wakeup_reader, self._wakeup_writer = socket.socketpair()
+        self._wakeup_reader.setblocking(False)
+        self._wakeup_writer.setblocking(False)
+        self._io_thread = None
+        self.framer = LineFramer()
+
+        self.connects = 0
+        self.reconnects = 0
+        self.commands_sent = 0
+        self.batches_sent = 0  # sendall 调用次数, 每次可能合并多条命令
+        self.bytes_sent = 0
+        self.responses_received = 0
+        self.frames_skipped = 0  # 没有调用方关心, 未做 JSON 解析直接跳过的帧
+        self.latency = {
+            "dispatch": LatencyHistogram(),
+            "response": LatencyHistogram(),
+            "telemetry": LatencyHistogram(),
+        }
+
+    @classmethod
+    def get(cls, host, port) -> "RobotArmSession":
+        """获取机械臂对应的会话, 不存在或已关闭时创建新的会话"""
+        with cls._registry_lock:
+            session = cls._sessions.get((host, port))
+            if session is None or session._closed:
+                session = cls(host, port)
+                cls._sessions[(host, port)] = session
+            return session
+
+    @classmethod
+    def close_all(cls):
+        """关闭所有会话"""
+        with cls._registry_lock:
+            sessions = list(cls._sessions.values())
+            cls._sessions.clear()
+        for session in sessions:
+            session.close()
+
+    @property
+    def is_connected(self) -> bool:
+        return self._socket is not None
+
+    def connect(self):
+        """建立连接并启动 I/O 线程, 已连接时直接返回"""
+        with self._connect_lock:
+            if self._closed:
+                raise ConnectionError("会话已关闭")
+            if self._socket is None:
+                client_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+                client_socket.settimeout(self.connect_timeout)
+                try:
+                    client_socket.connect((self.host, self.port))
+                except (socket.timeout, socket.error) as e:
+                    logger.error(f"机械臂连接失败: {e}")
+                    client_socket.close()
+                    raise e
+                client_socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+                if self.connects:
+                    self.reconnects += 1
+                    logger.warning(f"机械臂重新连接成功: {self.host}:{self.port}")
+                self.connects += 1
+                self._socket = client_socket
+
+            if self._io_thread is None or not self._io_thread.is_alive():
+                self._io_thread = threading.Thread(target=self._io_loop, name="robot_arm_session_io", daemon=True)
+                self._io_thread.start()
+        self._wakeup()
+        return self._socket
+
+    def close(self):
+        """关闭会话, 未完成的 Future 以 ConnectionError 结束"""
+        if not self._closed:
+            logger.info(f"机械臂会话关闭 {self.host}:{self.port}, 连接统计: {self.stats()}")
+        self._closed = True
+        self._wakeup()
+        if self._io_thread is None:
+            self._shutdown()
+
+    def getpeername(self):
+        return self.connect().getpeername()
+
+    def send(self, payload, expect=None) -> Future:
+        """发送命令, 由 I/O 线程写入 socket
+
+        Args:
+            payload (bytes | str): 以 \\r\\n 结尾的命令
+            expect (str): 需要等待的响应命令类型, 为 None 时 Future 在写入 socket 后即结束
+
+        Returns:
+            Future: 结果为响应的 JSON 对象(expect 不为 None 时)
+        """
+        if isinstance(payload, str):
+            payload = payload.encode('utf-8')
+        future = Future()
+        future.expect = expect
+        with self._outgoing_lock:
+            # 与 _shutdown 清空队列互斥, 关闭后不会再有命令留在队列中
+            if self._closed:
+                future.set_exception(ConnectionError("会话已关闭"))
+                return future
+            self._outgoing.append((time.perf_counter(), payload, future))
+        self._ensure_io_thread()
+        return future
+
+    def request(self, payload, expect, timeout=3):
+        """发送命令并阻塞等待对应类型的响应, 超时后取消等待, 之后的同类型响应交给后续的请求"""
+        future = self.send(payload, expect)
+        try:
+            return future.result(timeout=timeout)
+        except FutureTimeoutError:
+            self.cancel(future)
+            raise
+
+    def cancel(self, future: Future):
+        """取消等待响应的 Future, 之后收到的响应不再交给它"""
+        future.cancel()
+        expect = getattr(future, 'expect', None)
+        with self._route_lock:
+            pending = self._pending.get(expect)
+            if pending:
+                self._pending[expect] = deque(item for item in pending if item[1] is not future)
+
+    def attach_command_queue(self, command_queue: CommandQueue):
+        """绑定命令队列, 队列中的命令由 I/O 线程发送"""
+        if command_queue not in self._command_queues:
+            self._command_queues.append(command_queue)
+            command_queue.add_listener(self._wakeup)
+        self._ensure_io_thread()
+
+    def detach_command_queue(self, command_queue: CommandQueue):
+        if command_queue in self._command_queues:
+            self._command_queues.remove(command_queue)
+            command_queue.remove_listener(self._wakeup)
+
+    def subscribe(self, command_type, callback):
+        """订阅指定类型的上报数据, callback 在 I/O 线程中调用, 参数为响应的 JSON 对象"""
+        with self._route_lock:
+            if callback not in self._subscribers[command_type]:
+                self._subscribers[command_type].append(callback)
+
+    def unsubscribe(self, command_type, callback):
+        with self._route_lock:
+            if callback in self._subscribers[command_type]:
+                self._subscribers[command_type].remove(callback)
+
+    def stats(self) -> dict:
+        """连接复用与延迟统计"""
+        with self._route_lock:
+            pending = sum(len(futures) for futures in self._pending.values())
+        return {
+            "connects": self.connects,
+            "reconnects": self.reconnects,
+            "commands_sent": self.commands_sent,
+            "batches_sent": self.batches_sent,
+            "bytes_sent": self.bytes_sent,
+            "average_batch_commands": self.commands_sent / self.batches_sent if self.batches_sent else 0.0,
+            "average_batch_bytes": self.bytes_sent / self.batches_sent if self.batches_sent else 0.0,
+            "responses_received": self.responses_received,
+            "frames_skipped": self.frames_skipped,
+            "pending": pending,
+            "commands_per_connect": self.commands_sent / self.connects if self.connects else 0.0,
+            "latency": {name: histogram.summary() for name, histogram in self.latency.items()},
+            "framer": self.framer.stats(),
+        }
+
+    def _wakeup(self):
+        """唤醒 I/O 线程"""
+        try:
+            self._wakeup_writer.send(b'\0')
+        except (BlockingIOError, OSError):
+            pass  # 缓冲区已满说明已有未处理的唤醒
+
+    def _ensure_io_thread(self):
+        if self._io_thread is None or not self._io_thread.is_alive():
+            try:
+                self.connect()
+            except OSError:
+                # 首次连接失败时仍启动 I/O 线程, 由 I/O 线程继续重连
+                with self._connect_lock:
+                    if not self._closed and (self._io_thread is None or not self._io_thread.is_alive()):
+                        self._io_thread = threading.Thread(target=self._io_loop, name="robot_arm_session_io", daemon=True)
+                        self._io_thread.start()
+        self._wakeup()
+
+    def _io_loop(self):
+        """I/O 线程: 等待 socket 可读或唤醒信号, 收发数据, 连接断开后自动重连"""
+        selector = selectors.DefaultSelector()
+        selector.register(self._wakeup_reader, selectors.EVENT_READ)
+        registered_socket = None
+        try:
+            while not self._closed:
+                if self._socket is None:
+                    try:
+                        self.connect()
+                    except (OSError, ConnectionError):
+                        selector.select(timeout=self.reconnect_interval)
+                        continue
+
+                client_socket = self._socket
+                if registered_socket is not client_socket:
+                    if registered_socket is not None:
+                        selector.unregister(registered_socket)
+                    selector.register(client_socket, selectors.EVENT_READ)
+                    registered_socket = client_socket
+                    self.framer.reset()  # 丢弃旧连接上未完成的帧
+
+                if not self._flush_outgoing(client_socket):
+                    selector.unregister(client_socket)
+                    registered_socket = None
+                    continue
+
+                for key, _ in selector.select():
+                    if key.fileobj is self._wakeup_reader:
+                        self._drain_wakeup()
+                        continue
+
+                    ready_time = time.perf_counter()
+                    try:
+                        frames = self.framer.read_from(client_socket)
+                    except OSError as e:
+                        if not self._closed:
+                            logger.warning(f"机械臂连接断开, 等待重新连接: {e}")
+                        selector.unregister(client_socket)
+                        registered_socket = None
+                        self._drop_socket(ConnectionError("机械臂连接断开"), client_socket)
+                        break
+
+                    for frame in frames:
+                        self._dispatch(frame, ready_time)
+        except Exception as e:
+            # I/O 线程异常退出后会话无法再收发, 标记为关闭, RobotArmSession.get() 会创建新的会话重新连接
+            logger.exception(f"机械臂会话 I/O 线程异常退出 {self.host}:{self.port}: {e}")
+            self._closed = True
+        finally:
+            selector.close()
+            self._shutdown()
+
+    def _drain_wakeup(self):
+        try:
+            while self._wakeup_reader.recv(4096):
+                pass
+        except (BlockingIOError, OSError):
+            pass
+
+    def _flush_outgoing(self, client_socket) -> bool:
+        """发送 send() 与命令队列中积压的命令, 写入失败时保留在队首, 重连后继续发送
+
+        Returns:
+            bool: 连接是否仍然可用
+        """
+        for command_queue in list(self._command_queues):
+            while True:
+                try:
+                    enqueue_time, payload = command_queue.get_timestamped_nowait()
+                except Empty:
+                    break
+                if isinstance(payload, str):
+                    payload = payload.encode('utf-8')
+                with self._outgoing_lock:
+                    self._outgoing.append((enqueue_time, payload, None))
+
+        while True:
+            # 合并积压的命令, 一次 sendall 写入, 单批不超过 max_batch_bytes (单条超长命令单独发送)
+            # 其他线程同时在 send() 中追加命令, 加锁从队首逐条取出, 不遍历共享的队列
+            batch, batch_bytes = [], 0
+            with self._outgoing_lock:
+                while self._outgoing:
+                    if batch and batch_bytes + len(self._outgoing[0][1]) > self.max_batch_bytes:
+                        break
+                    batch.append(self._outgoing.popleft())
+                    batch_bytes += len(batch[-1][1])
+            if not batch:
+                break
+            payload = batch[0][1] if len(batch) == 1 else b''.join(item[1] for item in batch)
+            try:
+                client_socket.sendall(payload)
+            except OSError as e:
+                logger.warning(f"命令发送失败, 等待重新连接: {e}")
+                with self._outgoing_lock:
+                    self._outgoing.extendleft(reversed(batch))
+                self._drop_socket(ConnectionError("机械臂连接断开"), client_socket)
+                return False
+            sent_time = time.perf_counter()
+            self.batches_sent += 1
+            self.commands_sent += len(batch)
+            self.bytes_sent += batch_bytes
+            logger.debug(f"命令发送({len(batch)} 条): {payload}")
+            for enqueue_time, _, future in batch:
+                self.latency["dispatch"].record(sent_time - enqueue_time)
+                if future is None or future.done():
+                    continue
+                if future.expect is None:
+                    future.set_result(None)
+                else:
+                    # 响应只会在 I/O 线程中分发, 写入后再登记不会错过响应; 加锁后再次检查, 避免登记已取消的 Future
+                    with self._route_lock:
+                        if not future.done():
+                            self._pending[future.expect].append((sent_time, future))
+        return True
+
+    def _dispatch(self, frame: bytes, ready_time: float):
+        """按响应中的 command 字段分发数据, 没有调用方关心的帧不做 JSON 解析"""
+        command_type = self.framer.command_name(frame)
+        if command_type is not None:
+            with self._route_lock:
+                wanted = self._pending.get(command_type) or self._subscribers.get(command_type)
+            if not wanted:
+                self.frames_skipped += 1
+                return
+
+        try:
+            response = self.framer.decode(frame)
+        except ValueError:
+            logger.error(rf"异常响应: {frame}")
+            return
+        command_type = response.get('command') if isinstance(response, dict) else None
+        self.responses_received += 1
+
+        with self._route_lock:
+            pending = self._pending.get(command_type)
+            while pending and pending[0][1].done():  # 已超时取消的请求不再接收响应
+                pending.popleft()
+            sent_time, future = pending.popleft() if pending else (None, None)
+            subscribers = list(self._subscribers.get(command_type, ()))
+
+        if future is not None:
+            self.latency["response"].record(time.perf_counter() - sent_time)
+            if not future.done():
+                future.set_result(response)
+        for callback in subscribers:
+            try:
+                callback(response)
+            except Exception as e:
+                logger.exception(f"处理 {command_type} 数据异常: {e}")
+        if subscribers:
+            self.latency["telemetry"].record(time.perf_counter() - ready_time)
+
+    def _drop_socket(self, error=None, expected_socket=None):
+        """关闭当前连接, error 不为 None 时结束所有等待响应的 Future"""
+        with self._connect_lock:
+            if expected_socket is not None and self._socket is not expected_socket:
+                return  # 连接已被其他线程替换
+            client_socket, self._socket = self._socket, None
+        if client_socket is not None:
+            try:
+                client_socket.close()
+            except OSError:
+                pass
+        if error is not None:
+            with self._route_lock:
+                futures = [future for pending in self._pending.values() for _, future in pending]
+                self._pending.clear()
+            for future in futures:
+                if not future.done():
+                    future.set_exception(error)
+
+    def _shutdown(self):
+        """会话关闭后释放连接, 未发送的命令以 ConnectionError 结束"""
+        error = ConnectionError("会话已关闭")
+        self._drop_socket(error)
+        with self._outgoing_lock:
+            outgoing, self._outgoing = list(self._outgoing), deque()
+        for _, _, future in outgoing:
+            if future is not None and not future.done():
+                future.set_exception(error)
+        for command_queue in list(self._command_queues):
+            self.detach_command_queue(command_queue)
+        for each_socket in (self._wakeup_reader, self._wakeup_writer):
+            each_socket.close()
+
+
+class EmergencyStopChannel(object):
+    """急停专用连接
+
+    连接机械臂时提前建立一条独立的 TCP 连接, 只用于发送预先编码好的急停命令:
+    - stop() 在调用线程中直接写 socket, 不经过命令队列、会话的 I/O 线程, 也不读取配置文件
+    - 后台线程读取并丢弃控制器在这条连接上的上报数据, 连接断开后自动重连, 保证急停时连接已就绪
+    - latency 中记录 send(调用 stop 到写入完成)与 ack(调用 stop 到收到急停响应)两类延迟,
+      写入耗时超过 latency_budget 时记录错误日志。写入耗时包含系统调用返回后重新获取 GIL 的等待,
+      界面线程繁忙时可达数毫秒, 默认预算按 20 ms 设置
+    """
+
+    def __init__(self, latency_budget=0.02, connect_timeout=1.0, reconnect_interval=0.5):
+        self.latency_budget = latency_budget
+        self.connect_timeout = connect_timeout
+        self.reconnect_interval = reconnect_interval
+        self.host = None
+        self.port = None
+
+        self._socket = None
+        self._send_lock = threading.Lock()
+        self._closed = threading.Event()
+        self._connected = threading.Event()
+        self._keeper_thread = None
+        self._stop_times = deque()  # 等待响应的急停命令发送时间
+
+        self.connects = 0
+        self.stops_sent = 0
+        self.budget_exceeded = 0
+        self.latency = {
+            "send": LatencyHistogram(),
+            "ack": LatencyHistogram(),
+        }
+
+    @property
+    def is_connected(self) -> bool:
+        return self._socket is not None
+
+    def open(self, host, port, wait=True) -> bool:
+        """建立急停连接并启动后台线程, 已打开同一地址时直接返回
+
+        Returns:
+            bool: 急停连接是否已建立
+        """
+        if self._keeper_thread is not None and self._keeper_thread.is_alive() and (host, port) == (self.host, self.port):
+            return self.is_connected
+        self.close()
+        self.host, self.port = host, port
+        self._closed = threading.Event()
+        self._connected = threading.Event()
+        self._keeper_thread = threading.Thread(target=self._keep_alive, name="emergency_stop_channel", daemon=True)
+        self._keeper_thread.start()
+        if wait:
+            self._connected.wait(self.connect_timeout)
+        return self.is_connected
+
+    def stop(self) -> float:
+        """发送急停命令
+
+        Returns:
+            float: 写入 socket 的耗时(秒)
+
+        Raises:
+            ConnectionError: 急停连接不可用, 调用方需要改用其他连接发送
+        """
+        start_time = time.perf_counter()
+        client_socket = self._socket
+        if client_socket is None:
+            raise ConnectionError("急停连接未建立")
+        with self._send_lock:
+            try:
+                client_socket.sendall(SET_JOINT_EMERGENCY_STOP)
+            except OSError as e:
+                self._drop_socket(client_socket)
+                raise ConnectionError(f"急停命令发送失败: {e}") from e
+            self._stop_times.append(start_time)
+        elapsed = time.perf_counter() - start_time
+
+        self.stops_sent += 1
+        self.latency["send"].record(elapsed)
+        if elapsed > self.latency_budget:
+            self.budget_exceeded += 1
+            logger.error(f"急停命令写入耗时 {elapsed * 1000:.3f} ms, 超过预算 {self.latency_budget * 1000:.3f} ms")
+        return elapsed
+
+    def close(self):
+        """关闭急停连接"""
+        self._closed.set()
+        self._drop_socket(self._socket)
+        if self._keeper_thread is not None and self._keeper_thread is not threading.current_thread():
+            self._keeper_thread.join(self.connect_timeout + self.reconnect_interval)
+        self._keeper_thread = None
+
+    def stats(self) -> dict:
+        return {
+            "connects": self.connects,
+            "stops_sent": self.stops_sent,
+            "budget_exceeded": self.budget_exceeded,
+            "latency_budget_ms": self.latency_budget * 1000,
+            "latency": {name: histogram.summary() for name, histogram in self.latency.items()},
+        }
+
+    def _drop_socket(self, client_socket):
+        if client_socket is None:
+            return
+        if self._socket is client_socket:
+            self._socket = None
+        try:
+            client_socket.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        client_socket.close()
+
+    def _keep_alive(self):
+        """保持连接: 断开后重连, 读取并丢弃上报数据, 统计急停响应延迟"""
+        framer = LineFramer(read_size=4096)
+        closed = self._closed
+        while not closed.is_set():
+            client_socket = self._socket
+            if client_socket is None:
+                try:
+                    client_socket = socket.create_connection((self.host, self.port), timeout=self.connect_timeout)
+                except OSError as e:
+                    logger.warning(f"急停连接建立失败, {self.reconnect_interval} s 后重试: {e}")
+                    closed.wait(self.reconnect_interval)
+                    continue
+                client_socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+                if closed.is_set():
+                    client_socket.close()
+                    break
+                framer.reset()
+                with self._send_lock:
+                    self._stop_times.clear()
+                    self._socket = client_socket
+                self.connects += 1
+                self._connected.set()
+
+            try:
+                frames = framer.read_from(client_socket)
+            except socket.timeout:
+                continue
+            except OSError as e:
+                if not closed.is_set():
+                    logger.warning(f"急停连接断开, 重新连接: {e}")
+                self._drop_socket(client_socket)
+                continue
+
+            for frame in frames:
+                if framer.command_name(frame) != "set_joint_emergency_stop":
+                    continue
+                with self._send_lock:
+                    start_time = self._stop_times.popleft() if self._stop_times else None
+                if start_time is not None:
+                    self.latency["ack"].record(time.perf_counter() - start_time)
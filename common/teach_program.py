@@ -0,0 +1,187 @@
+from typing import Sequence
+
+import numpy as np
+
+import common.command_builder as command_builder
+from common.blinx_robot_module import Mirobot
+from common.time_parameterization import TimeOptimalParameterization
+
+
+def move_durations(joints: np.ndarray, speeds: np.ndarray, joint_max_speeds: np.ndarray) -> np.ndarray:
+    """估算每个动作从上一个动作位置出发的关节运动耗时(秒), 第 0 个动作按循环从最后一个动作出发计算
+
+    与 Mirobot.joint_move_time 相同的估算, 按行向量化计算。
+
+    Args:
+        joints: 关节角度(°), 形状为 (N, 6)
+        speeds: 速度百分比, 形状为 (N,)
+        joint_max_speeds: 各关节最大速度(°/s)
+    """
+    travel = np.abs(joints - np.roll(joints, 1, axis=0))
+    # 速度百分比对各关节相同, 先按最大速度找出最慢的关节, 再除以速度百分比
+    return np.max(travel / joint_max_speeds, axis=1, initial=0.0) / (np.maximum(speeds, 1.0) / 100.0)
+
+
+def action_durations(joints: np.ndarray, speeds: np.ndarray, delays: np.ndarray, joint_max_speeds: np.ndarray,
+                     command_model="SEQ", joint_max_accelerations: np.ndarray = None) -> np.ndarray:
+    """估算每个动作的耗时(秒): 关节运动耗时 + 延时, 延时只在 SEQ 模式下发送
+
+    示教表格中每行的预计耗时、执行时每个动作的到位超时都按这里的结果计算。
+    INT 模式下设定点由上位机按时间最优时间律生成, 给出 joint_max_accelerations 时按同样的时间律
+    估算停稳到停稳的耗时(含加减速); SEQ 模式下由控制器规划运动, 仍按最大速度估算。
+    """
+    if command_model == "INT" and joint_max_accelerations is not None:
+        durations = TimeOptimalParameterization(joint_max_speeds, joint_max_accelerations).move_durations(joints, speeds)
+    else:
+        durations = move_durations(joints, speeds, joint_max_speeds)
+    if command_model == "SEQ":
+        durations += delays
+    return durations
+
+
+class CompiledProgram(object):
+    """编译后的示教程序(只读执行计划)
+
+    在界面线程中对示教表格做一次快照, 编译为:
+    - actions: 结构化数组, 每行为一个动作的关节角度、速度、末端工具状态、延时与过渡半径
+    - payloads: 每个动作预先编码好的命令 bytes(关节运动 + 末端工具 + 延时)
+    - step_payloads: 单次执行时使用的命令 bytes(关节运动 + 末端工具, 不含延时)
+    - durations: 每个动作从上一个动作位置出发的预计耗时(秒, 含延时), 第 0 个动作按循环时从最后一个动作出发计算,
+      INT 模式下按时间最优时间律估算(含加减速)
+    - linear_timings: 直线运动动作的关节路径与时间律(TimeOptimalParameterization.parameterize 的结果), 其他动作为 None
+    执行时只读取执行计划, 不再访问界面控件, 循环执行多少次都不需要重新解析和编码。
+    """
+
+    ACTION_DTYPE = np.dtype([
+        ('joints', np.float64, (6,)),  # 关节角度(°)
+        ('speed', np.float64),  # 速度百分比
+        ('tool_status', np.int8),  # 吸盘状态: -1 不控制, 0 关, 1 开
+        ('delay', np.float64),  # 动作完成后的延时(秒), 只在 SEQ 模式下发送
+        ('blend', np.float64),  # 过渡半径(mm), 只在 INT 模式下按连续路径下发时使用
+        ('linear', np.bool_),  # 从上一个动作沿直线运动到这个动作(MoveL), 只在 INT 模式下执行
+    ])
+    MAX_DELAY = 30.0  # 控制器支持的最大延时(秒)
+
+    def __init__(self, actions: np.ndarray, payloads: tuple, step_payloads: tuple, durations: np.ndarray, robot: Mirobot,
+                 command_model="SEQ", linear_timings: tuple = None):
+        self.actions = actions
+        self.payloads = payloads
+        self.step_payloads = step_payloads
+        self.durations = durations
+        self.robot = robot
+        self.command_model = command_model
+        self.linear_timings = (None,) * len(actions) if linear_timings is None else linear_timings
+        for array in (self.actions, self.durations):
+            array.setflags(write=False)
+
+    @classmethod
+    def compile(cls, actions: Sequence, robot: Mirobot, command_model="SEQ") -> "CompiledProgram":
+        """编译示教动作
+
+        Args:
+            actions: 动作列表, 每个元素为 (关节角度列表, 速度百分比, 吸盘状态, 延时秒数[, 过渡半径 mm[, 是否直线运动]])
+            robot: 机械臂模型, 用于估算动作耗时与规划直线运动
+            command_model: 命令模式, INT 模式不发送延时命令
+
+        Raises:
+            ValueError: SEQ 模式下动作延时超出范围, 过渡半径为负数, 或直线运动无法执行
+        """
+        table = np.zeros(len(actions), dtype=cls.ACTION_DTYPE)
+        for row, (joints, speed, tool_status, delay, *options) in enumerate(actions):
+            if command_model == "SEQ" and not 0 <= delay <= cls.MAX_DELAY:
+                raise ValueError(f"第 {row + 1} 个动作的延时 {delay} s 超出范围: 0 ~ {cls.MAX_DELAY:g} s")
+            blend, linear = (*options, 0.0, False)[:2]
+            if blend < 0:
+                raise ValueError(f"第 {row + 1} 个动作的过渡半径 {blend} mm 不能为负数")
+            table[row] = (joints, speed, tool_status, delay, blend, linear)
+
+        payloads, step_payloads = [], []
+        for action in table:
+            step_payload = command_builder.set_joint_angle_all_time(action['speed'], action['joints'].tolist())
+            if action['tool_status'] >= 0:
+                step_payload += command_builder.set_end_tool(1, int(action['tool_status']))
+            step_payloads.append(step_payload)
+            if command_model == "SEQ" and action['delay'] != 0:
+                step_payload += command_builder.set_time_delay(int(action['delay'] * 1000))
+            payloads.append(step_payload)
+
+        durations = action_durations(table['joints'], table['speed'], table['delay'], robot.joint_max_speeds, command_model,
+                                     robot.joint_max_accelerations)
+        linear_timings = cls._plan_linear_moves(table, robot, command_model)
+        for row, timing in enumerate(linear_timings):
+            if timing is not None:
+                durations[row] = timing["duration"]
+        return cls(table, tuple(payloads), tuple(step_payloads), durations, robot, command_model, linear_timings)
+
+    @staticmethod
+    def _plan_linear_moves(table: np.ndarray, robot: Mirobot, command_model) -> tuple:
+        """规划直线运动动作的关节路径与时间律, 起点为上一个动作(第 0 个动作按循环从最后一个动作出发)
+
+        整条路径在编译时检查, 有问题的程序不会开始下发; 与上一个动作位置相同的动作不需要直线运动。
+        """
+        linear_timings = [None] * len(table)
+        for row in np.flatnonzero(table['linear']).tolist():
+            start, target = table['joints'][row - 1], table['joints'][row]
+            if np.array_equal(start, target):
+                continue
+            if command_model != "INT":
+                raise ValueError(f"第 {row + 1} 个动作为直线运动, 需要切换到实时模式(INT)执行")
+            try:
+                path = robot.linear_path(start, target)
+            except ValueError as e:
+                raise ValueError(f"第 {row + 1} 个动作的直线运动无法执行: {e}") from None
+            linear_timings[row] = robot.time_parameterization.parameterize(path, table['speed'][row])
+        return tuple(linear_timings)
+
+    def __len__(self):
+        return len(self.payloads)
+
+    def first_duration(self, start_degrees=None) -> float:
+        """第 0 个动作从 start_degrees 出发的预计耗时, start_degrees 为 None 时按循环从最后一个动作出发"""
+        if start_degrees is None:
+            return float(self.durations[0])
+        first_action = self.actions[0]
+        move_time = self.robot.time_parameterization.move_time if self.command_model == "INT" else self.robot.joint_move_time
+        # 第一次循环从 start_degrees 出发的第一段总是关节运动
+        if self.linear_timings[0] is not None:
+            ring_move_time = self.linear_timings[0]["duration"]
+        else:
+            ring_move_time = move_time(self.actions[-1]['joints'], first_action['joints'], first_action['speed'])
+        return float(self.durations[0] - ring_move_time
+                     + move_time(start_degrees, first_action['joints'], first_action['speed']))
+
+    def dry_run(self, loop_times=1, start_degrees=None, dwell=0.0) -> dict:
+        """空跑: 不下发命令, 按执行计划估算每个动作的起止时间与总耗时
+
+        Args:
+            dwell: 循环之间的停留时间(秒)
+
+        Returns:
+            dict:
+                start_times, finish_times: 连续循环时每个动作在一次循环中的开始、结束时间(秒)
+                tool_travel: 每个动作末端移动的直线距离(mm)
+                cycle_time: 连续循环时一次循环的耗时(含停留), 第 0 个动作从最后一个动作出发
+                first_cycle_time: 第一次循环的耗时(不含停留), 第 0 个动作从 start_degrees 出发
+                total_time: 执行 loop_times 次循环的总耗时
+                joint_limit_rows: 关节角度超出限位的动作序号
+        """
+        finish_times = np.cumsum(self.durations)
+        if len(self):
+            first_cycle_time = float(finish_times[-1] - self.durations[0]) + self.first_duration(start_degrees)
+            cycle_time = float(finish_times[-1]) + dwell
+        else:
+            first_cycle_time = cycle_time = 0.0
+
+        q = np.radians(self.actions['joints'])
+        positions = self.robot._fkine_batch_axes(q)[3] * 1000  # 只需要末端原点, (3, N), m -> mm
+        tool_travel = np.linalg.norm(positions - np.roll(positions, 1, axis=1), axis=0)
+        within_limits = (q >= self.robot.qlim[0] - 1e-9) & (q <= self.robot.qlim[1] + 1e-9)
+        return {
+            "start_times": finish_times - self.durations,
+            "finish_times": finish_times,
+            "tool_travel": tool_travel,
+            "cycle_time": cycle_time,
+            "first_cycle_time": first_cycle_time,
+            "total_time": first_cycle_time + cycle_time * (loop_times - 1) if loop_times > 0 else 0.0,
+            "joint_limit_rows": np.flatnonzero(~np.all(within_limits, axis=1)),
+        }
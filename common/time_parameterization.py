@@ -0,0 +1,165 @@
+"""关节路径的时间最优参数化(TOPP)
+
+给定关节空间中的一条路径 q(s) 与各关节的最大速度、最大加速度, 求沿路径运动最快的时间律 s(t)。
+路径按采样点离散, s 为关节空间中的累计弧长(°), 记 x = ṡ²:
+- 速度约束: |q'(s)| ṡ <= 最大速度, 给出每段的 x 上限
+- 加速度约束: q̈ = q'(s) s̈ + q''(s) ṡ², 曲率项最多占用各关节最大加速度的 CURVATURE_SHARE,
+  其余留给切向加速度, 每段得到一个切向加速度上限 a
+- 相邻采样点之间 x 的变化不超过 2 a Δs
+
+在速度上限曲线上先反向、再正向各扫描一次即得到时间最优的 x(s)。
+两次扫描都是 x_i = min(x_i, x_j ± 累计 2aΔs) 形式的递推, 用前缀和加累计最小值(np.minimum.accumulate)一次算出,
+几千个采样点也只需要几毫秒。
+每段内按匀加速 -> 匀速 -> 匀减速(梯形速度)运动, 关节直线运动(两个采样点)时就是各关节同步的梯形速度曲线。
+"""
+import math
+
+import numpy as np
+
+
+class TimeOptimalParameterization(object):
+    """按各关节速度、加速度限制计算关节路径的最短时间时间律
+
+    Args:
+        joint_max_speeds: 各关节最大速度(°/s)
+        joint_max_accelerations: 各关节最大加速度(°/s²)
+    """
+
+    CURVATURE_SHARE = 0.5  # 路径弯曲产生的加速度最多占用最大加速度的比例
+
+    def __init__(self, joint_max_speeds, joint_max_accelerations):
+        self.joint_max_speeds = np.asarray(joint_max_speeds, dtype=np.float64)
+        self.joint_max_accelerations = np.asarray(joint_max_accelerations, dtype=np.float64)
+        if np.any(self.joint_max_speeds <= 0) or np.any(self.joint_max_accelerations <= 0):
+            raise ValueError("关节最大速度与最大加速度必须大于 0")
+
+    def segment_bounds(self, travel: np.ndarray, speeds) -> tuple:
+        """关节直线运动按归一化路径参数 s ∈ [0, 1] 计算的 (ṡ 上限, s̈ 上限)
+
+        各关节同时到位时, 行程与限制之比最大的关节决定整段的速度与加速度; 速度百分比只限制速度。
+
+        Args:
+            travel: 各关节的运动距离(°), 形状为 (..., 6)
+            speeds: 速度百分比, 形状为 (...)
+        """
+        with np.errstate(divide='ignore'):
+            speed_limits = self.joint_max_speeds * (np.maximum(speeds, 1.0) / 100.0)[..., np.newaxis]
+            path_speeds = np.min(speed_limits / travel, axis=-1)
+            path_accelerations = np.min(self.joint_max_accelerations / travel, axis=-1)
+        return path_speeds, path_accelerations
+
+    def segment_durations(self, travel: np.ndarray, speeds) -> np.ndarray:
+        """关节直线运动从静止到静止的最短耗时(秒), 按行向量化计算, 没有运动的行为 0"""
+        path_speeds, path_accelerations = self.segment_bounds(travel, speeds)
+        moving = np.isfinite(path_accelerations)
+        peak = np.where(moving, np.minimum(path_speeds ** 2, path_accelerations), 1.0)
+        durations = self._interval_durations(0.0, 0.0, peak, np.where(moving, path_accelerations, 1.0), 1.0)
+        return np.where(moving, durations, 0.0)
+
+    def move_durations(self, joints: np.ndarray, speeds: np.ndarray) -> np.ndarray:
+        """每个动作从上一个动作位置出发、停稳到停稳的最短耗时(秒), 第 0 个动作按循环从最后一个动作出发计算"""
+        return self.segment_durations(np.abs(joints - np.roll(joints, 1, axis=0)), speeds)
+
+    def move_time(self, start_degrees, target_degrees, speed_percentage=100) -> float:
+        """单个关节直线运动停稳到停稳的最短耗时(秒)"""
+        travel = np.abs(np.asarray(target_degrees, dtype=np.float64) - np.asarray(start_degrees, dtype=np.float64))
+        return float(self.segment_durations(travel[np.newaxis], np.array([speed_percentage], dtype=np.float64))[0])
+
+    def parameterize(self, path, speed_percentage=100) -> dict:
+        """计算沿采样路径从静止到静止的最短时间时间律
+
+        Args:
+            path: 关节角度采样点(°), 形状为 (N, 6), 连续重复的采样点会被去掉
+            speed_percentage: 速度百分比, 只限制速度
+
+        Returns:
+            dict:
+                path: 去掉重复点后的采样点 (M, 6)
+                s: 各采样点的累计弧长(°)
+                times: 到达各采样点的时间(秒)
+                velocities: 各采样点的路径速度 ṡ
+                peak_velocities: 每段的最高路径速度
+                accelerations: 每段的切向加速度上限 s̈
+                duration: 总耗时(秒)
+        """
+        path = np.asarray(path, dtype=np.float64)
+        if len(path):
+            path = path[np.r_[True, np.any(path[1:] != path[:-1], axis=1)]]
+        if len(path) < 2:
+            return {"path": path, "s": np.zeros(len(path)), "times": np.zeros(len(path)), "velocities": np.zeros(len(path)),
+                    "peak_velocities": np.zeros(0), "accelerations": np.zeros(0), "duration": 0.0}
+
+        steps = np.diff(path, axis=0)
+        lengths = np.linalg.norm(steps, axis=1)
+        directions = np.abs(steps / lengths[:, np.newaxis])  # 每段的 |q'(s)|
+        speed_limits = self.joint_max_speeds * (max(float(speed_percentage), 1.0) / 100.0)
+        with np.errstate(divide='ignore'):
+            interval_caps = np.min(speed_limits / directions, axis=1) ** 2  # 每段的 x 上限
+            # 采样点处的曲率 q''(s), 起点、终点为 0
+            curvature = np.zeros_like(path)
+            curvature[1:-1] = np.abs(np.diff(steps / lengths[:, np.newaxis], axis=0)) / ((lengths[:-1] + lengths[1:]) / 2)[:, np.newaxis]
+            curvature_caps = np.min(self.CURVATURE_SHARE * self.joint_max_accelerations / curvature, axis=1)
+        point_caps = np.minimum(np.minimum(np.r_[np.inf, interval_caps], np.r_[interval_caps, np.inf]), curvature_caps)
+        point_caps[[0, -1]] = 0.0  # 起点、终点静止
+
+        # 曲率项按两端 x 上限估算, 剩余的加速度留给切向
+        curvature_accelerations = np.maximum(curvature[:-1] * point_caps[:-1, np.newaxis], curvature[1:] * point_caps[1:, np.newaxis])
+        with np.errstate(divide='ignore'):
+            accelerations = np.min((self.joint_max_accelerations - curvature_accelerations) / directions, axis=1)
+
+        # 反向扫描: x_i = min(上限_i, x_{i+1} + 2 a_i Δs_i); 正向扫描: x_{i+1} = min(x_{i+1}, x_i + 2 a_i Δs_i)
+        reach = np.r_[0.0, np.cumsum(2 * accelerations * lengths)]
+        backward = np.minimum.accumulate((point_caps + reach)[::-1])[::-1] - reach
+        x = np.maximum(np.minimum.accumulate(backward - reach) + reach, 0.0)
+
+        peaks = np.minimum(interval_caps, (x[:-1] + x[1:]) / 2 + accelerations * lengths)
+        durations = self._interval_durations(x[:-1], x[1:], peaks, accelerations, lengths)
+        times = np.r_[0.0, np.cumsum(durations)]
+        return {
+            "path": path,
+            "s": np.r_[0.0, np.cumsum(lengths)],
+            "times": times,
+            "velocities": np.sqrt(x),
+            "peak_velocities": np.sqrt(peaks),
+            "accelerations": accelerations,
+            "duration": float(times[-1]),
+        }
+
+    @staticmethod
+    def sample(timing: dict, period: float) -> np.ndarray:
+        """按固定周期对时间律采样, 返回每个周期末的关节角度 (K, 6)
+
+        总耗时向上取整为整数个周期, 最后一个设定点正好是路径终点。
+        """
+        path, times = timing["path"], timing["times"]
+        if len(path) < 2:
+            return path.copy()
+        tick_count = max(int(math.ceil(timing["duration"] / period - 1e-9)), 1)
+        t = np.minimum(period * np.arange(1, tick_count + 1), timing["duration"])
+        index = np.clip(np.searchsorted(times, t, side='right') - 1, 0, len(path) - 2)
+        tau = t - times[index]
+
+        lengths = np.diff(timing["s"])[index]
+        v0, v1 = timing["velocities"][index], timing["velocities"][index + 1]
+        peak, acceleration = timing["peak_velocities"][index], timing["accelerations"][index]
+        accelerate_time = (peak - v0) / acceleration
+        accelerate_distance = (peak ** 2 - v0 ** 2) / (2 * acceleration)
+        decelerate_distance = (peak ** 2 - v1 ** 2) / (2 * acceleration)
+        cruise_time = np.maximum(lengths - accelerate_distance - decelerate_distance, 0.0) / peak
+        decelerate_tau = np.clip(tau - accelerate_time - cruise_time, 0.0, (peak - v1) / acceleration)
+        distance = np.where(
+            tau < accelerate_time, v0 * tau + acceleration * tau ** 2 / 2,
+            np.where(tau < accelerate_time + cruise_time, accelerate_distance + peak * (tau - accelerate_time),
+                     lengths - decelerate_distance + peak * decelerate_tau - acceleration * decelerate_tau ** 2 / 2))
+        fraction = np.clip(distance / lengths, 0.0, 1.0)[:, np.newaxis]
+        setpoints = path[index] + fraction * (path[index + 1] - path[index])
+        setpoints[-1] = path[-1]
+        return setpoints
+
+    @staticmethod
+    def _interval_durations(x_start, x_end, x_peak, acceleration, length):
+        """每段按 匀加速 -> 匀速 -> 匀减速 运动的耗时, x 为路径速度的平方"""
+        peak = np.sqrt(x_peak)
+        ramp_time = (2 * peak - np.sqrt(x_start) - np.sqrt(x_end)) / acceleration
+        cruise_distance = length - (2 * x_peak - x_start - x_end) / (2 * acceleration)
+        return ramp_time + np.maximum(cruise_distance, 0.0) / peak
@@ -0,0 +1,250 @@
+"""示教路点之间的连续路径过渡
+
+原来每个动作都要在路点停稳后才开始下一个动作, 每次停稳都要减速到 0 再加速。
+这里在实时模式(INT)下把相邻两段关节直线运动在路点附近用多项式过渡连接起来, 经过路点时不减速:
+过渡从路点前 tau 秒开始、到路点后 tau 秒结束, 关节速度从前一段的速度平滑变化到后一段的速度,
+过渡段上的末端位置与路点的距离不超过该路点的过渡半径, 因而与原路径的偏差也不超过过渡半径。
+
+过渡曲线:
+- parabolic: 抛物线过渡, 过渡段内加速度恒定
+- quintic: 五次多项式过渡, 两端加速度为 0(加速度连续), 化简后为 2s³ - s⁴, 峰值加速度是抛物线过渡的 1.5 倍
+
+不过渡的路点(过渡半径为 0, 有末端工具动作或延时, 直线运动的起点与终点, 或者过渡段找不到满足半径与加速度的时间)仍然停稳:
+用同样的曲线在路点前减速到 0、路点后从 0 加速, 加减速时间按关节最大加速度(模型配置文件中的 max_acceleration)计算。
+每段的匀速速度与加减速时间由 time_parameterization 按各关节速度、加速度限制计算, 抛物线过渡时停稳的一段运动
+就是时间最优的梯形速度曲线, 与 INT 模式下估算的动作耗时一致。
+"""
+import math
+from typing import Iterable, Iterator
+
+import numpy as np
+
+from common.blinx_robot_module import Mirobot
+from common.teach_program import CompiledProgram
+from common.time_parameterization import TimeOptimalParameterization
+
+
+def _parabolic(s):
+    return s * s
+
+
+def _quintic(s):
+    return s ** 3 * (2 - s)
+
+
+class BlendedTrajectory(object):
+    """连续路径过渡规划与设定点生成
+
+    plan() 对编译好的程序按环形(循环执行时最后一个动作接第一个动作)向量化计算每个路点的过渡时间,
+    过渡段的末端偏差按采样点批量正解检查; iter_setpoints() 按过渡时间把路点逐段展开为固定周期的关节设定点。
+
+    Args:
+        robot: 机械臂模型, 用于批量正解检查过渡段的末端偏差
+        profile: 过渡曲线, "parabolic" 或 "quintic"
+        joint_accelerations: 各关节最大加速度(°/s²), 默认使用模型配置文件中的 robot.joint_max_accelerations
+        samples: 检查末端偏差时每个过渡段的采样点数
+        max_halvings: 过渡时间超出半径时减半重试的最多次数, 仍超出时在该路点停稳
+    """
+
+    PROFILES = {"parabolic": (_parabolic, 1.0), "quintic": (_quintic, 1.5)}  # 过渡曲线与峰值加速度系数
+
+    def __init__(self, robot: Mirobot, profile="parabolic", joint_accelerations=None, samples=9, max_halvings=8):
+        if profile not in self.PROFILES:
+            raise ValueError(f"未知的过渡曲线: {profile}")
+        self.robot = robot
+        self.profile = profile
+        self._shape, self._peak_factor = self.PROFILES[profile]
+        if joint_accelerations is None:
+            joint_accelerations = robot.joint_max_accelerations
+        self.joint_accelerations = np.asarray(joint_accelerations, dtype=np.float64)
+        self.parameterization = TimeOptimalParameterization(robot.joint_max_speeds, self.joint_accelerations)
+        self.samples = samples
+        self.max_halvings = max_halvings
+
+    def segment_times(self, travel: np.ndarray, speeds, period: float) -> tuple:
+        """每段运动的匀速耗时与停稳时的加(减)速时间(秒), 均向上取整为周期的整数倍
+
+        匀速耗时由各关节的速度限制决定, 运动太短、来不及加速到匀速时延长耗时, 使加速、减速时间都不超过耗时的一半。
+
+        Args:
+            travel: 各关节的运动距离(°), 形状为 (..., 6)
+            speeds: 速度百分比, 形状为 (...)
+        """
+        path_speeds, path_accelerations = self.parameterization.segment_bounds(travel, speeds)
+        times = self._ceil_periods(np.maximum(1 / path_speeds, np.sqrt(self._peak_factor / path_accelerations)),
+                                   period, minimum=1)
+        velocities = travel / times[..., np.newaxis]
+        ramp_times = self._ceil_periods(
+            self._peak_factor * np.max(velocities / (2 * self.joint_accelerations), axis=-1), period)
+        return np.maximum(times, 2 * ramp_times), ramp_times
+
+    def plan(self, program: CompiledProgram, period: float) -> dict:
+        """计算每个路点的过渡时间
+
+        Returns:
+            dict:
+                blend_times: 每个路点的过渡时间 tau(秒), 0 为停稳
+                blended_count: 过渡的路点数量
+                cycle_time: 连续循环时一次循环的耗时(秒)
+                stop_cycle_time: 所有路点都停稳时一次循环的耗时(秒)
+        """
+        actions = program.actions
+        count = len(actions)
+        joints = actions['joints']
+        travel = np.abs(joints - np.roll(joints, 1, axis=0))
+        times, ramp_times = self.segment_times(travel, actions['speed'], period)  # 第 i 段运动到达第 i 个路点
+        # 直线运动按编译时的时间律执行, 耗时已包含加减速
+        linear = np.array([timing is not None for timing in program.linear_timings], dtype=bool)
+        times[linear] = self._ceil_periods(program.durations[linear], period, minimum=1)
+        ramp_times[linear] = 0.0
+        blend_times = np.zeros(count)
+
+        stops = (actions['blend'] <= 0) | (actions['tool_status'] >= 0) | (actions['delay'] > 0)
+        stops |= linear | np.roll(linear, -1)
+        if count > 1 and not np.all(stops):
+            velocities = (joints - np.roll(joints, 1, axis=0)) / times[:, np.newaxis]
+            velocities_out = np.roll(velocities, -1, axis=0)
+            max_blend_times = np.minimum(times, np.roll(times, -1)) / 2
+            # 过渡段的加速度 = 峰值系数 * 速度变化 / (2 * tau), 不超过关节最大加速度
+            min_blend_times = self._peak_factor * np.max(
+                np.abs(velocities_out - velocities) / (2 * self.joint_accelerations), axis=1)
+            pending = ~stops & (max_blend_times >= min_blend_times)
+            blend_times[pending] = max_blend_times[pending]
+            waypoint_positions = self.robot._fkine_batch_axes(np.radians(joints))[3]
+            for _ in range(self.max_halvings + 1):
+                rows = np.flatnonzero(pending)
+                if not len(rows):
+                    break
+                deviation = self._blend_deviation(joints[rows], velocities[rows], velocities_out[rows], blend_times[rows],
+                                                  waypoint_positions[:, rows])
+                within_radius = deviation <= actions['blend'][rows]
+                pending[rows[within_radius]] = False
+                failed = rows[~within_radius]
+                blend_times[failed] /= 2
+                too_short = blend_times[failed] < min_blend_times[failed]  # 加速度超出限制, 改为停稳
+                blend_times[failed[too_short]] = 0.0
+                pending[failed[too_short]] = False
+            blend_times[pending] = 0.0
+
+        stopped = blend_times == 0
+        stop_times = ramp_times + np.roll(ramp_times, -1)  # 到达第 i 个路点的减速与离开时的加速
+        return {
+            "blend_times": blend_times,
+            "blended_count": int(count - stopped.sum()),
+            "cycle_time": float(times.sum() + stop_times[stopped].sum()),
+            "stop_cycle_time": float(times.sum() + stop_times.sum()),
+        }
+
+    def iter_setpoints(self, waypoints: Iterable, period: float, start_degrees=None) -> Iterator[tuple]:
+        """把路点展开为每个周期一个的关节设定点, 与 setpoint_streamer.interpolate_setpoints 的输入输出相同
+
+        路点的第 5 个元素为过渡时间 tau(秒, 由 plan() 计算), 没有或为 0 时停稳; 有附带命令(末端工具)的路点、
+        停留前、直线运动前以及最后一个路点总是停稳。第 6 个元素为直线运动的时间律, 这一段按时间律采样。
+        只向后多读一个路点, 内存占用与路径长短无关。
+        每段运动的耗时按速度百分比与关节速度、加速度限制计算, 路点中的预计耗时只用于停留和没有起点时的第一个路点。
+        """
+        waypoints = iter(waypoints)
+        current = next(waypoints, None)
+        previous = None if start_degrees is None else np.asarray(start_degrees, dtype=np.float64)
+        start_blend = None  # 上一个路点的过渡 (上一段速度, tau), None 为停稳
+        while current is not None:
+            following = next(waypoints, None)
+            joints, speed, extra_payload, duration, *options = current
+            blend_time = options[0] if options else 0.0
+            if joints is None:
+                for _ in range(self._tick_count(duration, period)):
+                    yield None, speed, b'', False
+                start_blend, current = None, following
+                continue
+            joints = np.asarray(joints, dtype=np.float64)
+            if previous is None:
+                # 没有起点无法插值, 控制器按速度百分比自行运动到路点
+                tick_count = self._tick_count(duration, period)
+                yield joints, speed, extra_payload, tick_count == 1
+                for tick in range(1, tick_count):
+                    yield None, speed, b'', tick == tick_count - 1
+                previous, start_blend, current = joints, None, following
+                continue
+            if len(options) > 1 and options[1] is not None:
+                # 直线运动按时间律采样, 起点与终点都停稳
+                setpoints = TimeOptimalParameterization.sample(options[1], period)
+                for setpoint in setpoints[:-1]:
+                    yield setpoint, speed, b'', False
+                yield joints, speed, extra_payload, True
+                previous, start_blend, current = joints, None, following
+                continue
+
+            segment_time, ramp_time, velocity = self._segment(previous, joints, speed, period)
+            end_blend = None
+            if (blend_time > 0 and not extra_payload and following is not None and following[0] is not None
+                    and (len(following) < 6 or following[5] is None)):
+                next_time, _, next_velocity = self._segment(joints, np.asarray(following[0], dtype=np.float64),
+                                                            following[1], period)
+                end_blend = (next_velocity, min(blend_time, segment_time / 2, next_time / 2))
+
+            start_ramp = 0.0 if start_blend is not None else ramp_time
+            end_ramp = 0.0 if end_blend is not None else ramp_time
+            tick_count = int(round((start_ramp + segment_time + end_ramp) / period))
+            u = -start_ramp + period * np.arange(1, tick_count + 1)  # 相对本段匀速运动开始的时间
+            setpoints = previous + u[:, np.newaxis] * velocity
+            setpoints += self._start_correction(u, velocity, start_blend, start_ramp)
+            setpoints += self._end_correction(u - segment_time, velocity, end_blend, end_ramp)
+            if end_blend is None:
+                setpoints[-1] = joints
+            for setpoint in setpoints[:-1]:
+                yield setpoint, speed, b'', False
+            yield setpoints[-1], speed, extra_payload, True
+            previous = joints
+            start_blend = None if end_blend is None else (velocity, end_blend[1])
+            current = following
+
+    def _segment(self, start, stop, speed, period) -> tuple:
+        """单段运动的 (匀速耗时, 加减速时间, 关节速度)"""
+        travel = np.abs(stop - start)
+        segment_time, ramp_time = self.segment_times(travel, np.float64(speed), period)
+        return float(segment_time), float(ramp_time), (stop - start) / float(segment_time)
+
+    def _start_correction(self, u, velocity, start_blend, start_ramp) -> np.ndarray:
+        """本段开始处相对匀速运动的修正: 上一个路点过渡的后半段, 或从停稳加速"""
+        if start_blend is None:
+            velocity_in, tau = np.zeros_like(velocity), start_ramp
+        else:
+            velocity_in, tau = start_blend
+        correction = np.zeros((len(u), len(velocity)))
+        if tau <= 0:
+            return correction
+        window = u <= tau
+        s = (u[window] + tau) / (2 * tau)
+        correction[window] = (velocity - velocity_in) * (tau * self._shape(s) - u[window])[:, np.newaxis]
+        return correction
+
+    def _end_correction(self, u, velocity, end_blend, end_ramp) -> np.ndarray:
+        """本段结束处相对匀速运动的修正: 本段终点过渡的前半段, 或减速到停稳; u 为相对本段终点的时间"""
+        if end_blend is None:
+            velocity_out, tau = np.zeros_like(velocity), end_ramp
+        else:
+            velocity_out, tau = end_blend
+        correction = np.zeros((len(u), len(velocity)))
+        if tau <= 0:
+            return correction
+        window = u >= -tau
+        s = (u[window] + tau) / (2 * tau)
+        correction[window] = (velocity_out - velocity) * (tau * self._shape(s))[:, np.newaxis]
+        return correction
+
+    def _blend_deviation(self, joints, velocities_in, velocities_out, blend_times, waypoint_positions) -> np.ndarray:
+        """过渡段采样点的末端位置与路点的最大距离(mm), 所有路点的采样点一次批量正解"""
+        s = np.linspace(0.0, 1.0, self.samples)
+        u = blend_times[:, np.newaxis] * (2 * s - 1)  # (M, S)
+        q = (joints[:, np.newaxis] + velocities_in[:, np.newaxis] * u[..., np.newaxis]
+             + (velocities_out - velocities_in)[:, np.newaxis] * (blend_times[:, np.newaxis] * self._shape(s))[..., np.newaxis])
+        positions = self.robot._fkine_batch_axes(np.radians(q.reshape(-1, q.shape[-1])))[3].reshape(3, *u.shape)
+        return np.max(np.linalg.norm(positions - waypoint_positions[:, :, np.newaxis], axis=0), axis=1) * 1000
+
+    @staticmethod
+    def _tick_count(duration, period) -> int:
+        return max(int(math.ceil((duration or 0.0) / period - 1e-9)), 1)
+
+    @staticmethod
+    def _ceil_periods(seconds, period, minimum=0):
+        return np.maximum(np.ceil(np.asarray(seconds) / period - 1e-9), minimum) * period
@@ -1,18 +1,18 @@
+import threading
 from decimal import Decimal
-import socket
-import simplejson as json
-import shelve
-from queue import Queue
-import time
+from queue import Queue, Empty
+from typing import Callable, Iterable
 
-import numpy as np
 from loguru import logger
 from pubsub import pub
 from PySide6.QtCore import QRunnable, Signal, QObject
 
 from common import settings
+from common.action_file import ActionFileWriter
+from common.program_file import write_program_file
 from common.blinx_robot_module import Mirobot
-from common.socket_client import ClientSocket
+from common.reachability_index import ReachabilityIndex
+from common.socket_client import RobotArmSession, CommandQueue
 
 
 class SingalEmitter(QObject):
@@ -23,6 +23,145 @@ class SingalEmitter(QObject):
     command_signal = Signal(str)
 
 
+class ActionFileSignalEmitter(QObject):
+    """动作文件导入/导出线程的信号"""
+    chunk_loaded_signal = Signal(object, object)  # 转换后的一块动作数据
+    progress_signal = Signal(float)  # 进度 0 ~ 100
+    finished_signal = Signal(bool, str)  # 是否完整执行, 错误信息(取消时为空)
+
+
+class ActionFileImportTask(QRunnable):
+    """导入动作文件的线程
+
+    从 reader(ActionFileReader 或 ProgramFileReader) 按块读取, 每块由 convert 转换后发送给界面线程追加到表格。
+    界面线程处理完一块后调用 chunk_consumed(), 未处理的块最多 max_pending_chunks 个, 内存占用与文件大小无关。
+    """
+
+    def __init__(self, reader, convert: Callable, chunk_rows=2000, max_pending_chunks=4):
+        super().__init__()
+        self.reader = reader
+        self.convert = convert  # 读取的一块数据转换为表格数据 (动作数组, 备注列表)
+        self.chunk_rows = chunk_rows
+        self.singal_emitter = ActionFileSignalEmitter()
+        self.setAutoDelete(False)  # 界面线程在任务结束后仍会访问任务对象
+        self.rows_loaded = 0
+        self._pending_chunks = threading.Semaphore(max_pending_chunks)
+        self._cancelled = threading.Event()
+
+    def cancel(self):
+        self._cancelled.set()
+
+    def chunk_consumed(self):
+        self._pending_chunks.release()
+
+    def run(self):
+        try:
+            for chunk in self.reader.iter_chunks(self.chunk_rows):
+                # 等待界面线程有空闲后再发送
+                while not self._pending_chunks.acquire(timeout=0.1):
+                    if self._cancelled.is_set():
+                        break
+                if self._cancelled.is_set():
+                    self.singal_emitter.finished_signal.emit(False, "")
+                    return
+                rows, notes = self.convert(chunk)
+                self.singal_emitter.chunk_loaded_signal.emit(rows, notes)
+                self.rows_loaded += len(rows)
+                self.singal_emitter.progress_signal.emit(100 * self.reader.progress)
+            logger.info(f"动作文件 {self.reader.file_name} 读取完成, 共 {self.rows_loaded} 个动作")
+            self.singal_emitter.finished_signal.emit(True, "")
+        except Exception as e:
+            logger.error(f"导入动作文件失败: {e}")
+            self.singal_emitter.finished_signal.emit(False, str(e) or type(e).__name__)
+        finally:
+            self.reader.close()
+
+
+class ActionFileExportTask(QRunnable):
+    """导出动作文件的线程, 逐条写出动作记录"""
+
+    def __init__(self, file_name, records: Iterable[dict], total_count: int, progress_interval=1000):
+        super().__init__()
+        self.file_name = file_name
+        self.records = records
+        self.total_count = total_count
+        self.progress_interval = progress_interval
+        self.singal_emitter = ActionFileSignalEmitter()
+        self.setAutoDelete(False)
+        self._cancelled = threading.Event()
+
+    def cancel(self):
+        self._cancelled.set()
+
+    def run(self):
+        try:
+            with ActionFileWriter(self.file_name) as writer:
+                for record in self.records:
+                    if self._cancelled.is_set():
+                        writer.abort()
+                        self.singal_emitter.finished_signal.emit(False, "")
+                        return
+                    writer.write(record)
+                    if writer.records_written % self.progress_interval == 0:
+                        self.singal_emitter.progress_signal.emit(100 * writer.records_written / max(self.total_count, 1))
+            logger.info(f"动作文件 {self.file_name} 写入完成, 共 {writer.records_written} 个动作")
+            self.singal_emitter.finished_signal.emit(True, "")
+        except Exception as e:
+            logger.error(f"导出动作文件失败: {e}")
+            self.singal_emitter.finished_signal.emit(False, str(e) or type(e).__name__)
+
+
+class ProgramFileExportTask(QRunnable):
+    """导出二进制程序文件的线程, 各列整体写入"""
+
+    def __init__(self, file_name, columns: dict, notes: list):
+        super().__init__()
+        self.file_name = file_name
+        self.columns = columns
+        self.notes = notes
+        self.singal_emitter = ActionFileSignalEmitter()
+        self.setAutoDelete(False)
+        self._cancelled = threading.Event()
+
+    def cancel(self):
+        self._cancelled.set()
+
+    def run(self):
+        if self._cancelled.is_set():
+            self.singal_emitter.finished_signal.emit(False, "")
+            return
+        try:
+            write_program_file(self.file_name, self.columns, self.notes)
+            logger.info(f"示教程序文件 {self.file_name} 写入完成, 共 {len(self.notes)} 个动作")
+            self.singal_emitter.finished_signal.emit(True, "")
+        except Exception as e:
+            logger.error(f"导出示教程序文件失败: {e}")
+            self.singal_emitter.finished_signal.emit(False, str(e) or type(e).__name__)
+
+
+class ReachabilityIndexSignalEmitter(QObject):
+    """可达空间索引线程的信号"""
+    finished_signal = Signal(object)  # 加载或生成的索引, 失败时为 None
+
+
+class ReachabilityIndexTask(QRunnable):
+    """加载可达空间索引的线程, 首次启动或模型配置变化时生成索引需要几秒, 不阻塞界面线程"""
+
+    def __init__(self, robot: Mirobot):
+        super().__init__()
+        self.robot = robot
+        self.singal_emitter = ReachabilityIndexSignalEmitter()
+        self.setAutoDelete(False)
+
+    def run(self):
+        try:
+            index = ReachabilityIndex(self.robot)
+        except Exception as e:
+            logger.error(f"加载可达空间索引失败: {e}")
+            index = None
+        self.singal_emitter.finished_signal.emit(index)
+
+
 class UpdateJointAnglesTask(QRunnable):
     """更新上位机发送的关节角度数据的线程"""
     
@@ -36,19 +175,28 @@ class UpdateJointAnglesTask(QRunnable):
     @logger.catch
     def run(self):
         while self.update_joint_angles_thread_flag:
-            time.sleep(0.1)
             pub.subscribe(self.check_update_joint_angles_thread_flag, 'update_joint_angles_thread_flag')
-            if not self.joints_angle_queue.empty():
-                angle_data_list = self.joints_angle_queue.get()
-                # 关节角度更新信号
-                self.singal_emitter.joint_angles_update_signal.emit(list(map(self.decimal_round_for_joints, angle_data_list)))
-                
-                # 末端坐标与位姿更新信号
-                arm_joint_radians = np.radians(angle_data_list)  # 正逆解需要弧度制
-                translation_vector = self.blinx_robot_arm.fkine(arm_joint_radians)
-                X, Y, Z = map(self.decimal_round_for_positions, translation_vector.t)  # 末端坐标
-                R_x, P_y, Y_z = map(self.decimal_round_for_joints, translation_vector.rpy(unit='deg', order='zyx'))  # 末端姿态
-                self.singal_emitter.arm_endfactor_positions_update_signal.emit([X, Y, Z, R_x, P_y, Y_z])
+            # 阻塞等待新的角度数据, 有数据写入时立即唤醒
+            try:
+                angle_data_batch = [self.joints_angle_queue.get(timeout=0.1)]
+            except Empty:
+                continue
+
+            # 取出队列中积压的所有角度数据
+            while not self.joints_angle_queue.empty():
+                angle_data_batch.append(self.joints_angle_queue.get())
+
+            # 界面只显示最新的一组数据，机械臂静止时正解直接命中缓存
+            angle_data_list = angle_data_batch[-1]
+            X, Y, Z, R_x, P_y, Y_z = self.blinx_robot_arm.fkine_cached(angle_data_list)
+
+            # 关节角度更新信号
+            self.singal_emitter.joint_angles_update_signal.emit(list(map(self.decimal_round_for_joints, angle_data_list)))
+
+            # 末端坐标与位姿更新信号
+            X, Y, Z = map(self.decimal_round_for_positions, [X, Y, Z])  # 末端坐标
+            R_x, P_y, Y_z = map(self.decimal_round_for_joints, [R_x, P_y, Y_z])  # 末端姿态
+            self.singal_emitter.arm_endfactor_positions_update_signal.emit([X, Y, Z, R_x, P_y, Y_z])
     
     def decimal_round_for_joints(self, joints_angle: float) -> Decimal:
         """用精确的方式四舍五入, 保留关节角度的三位小数"""
@@ -66,178 +214,41 @@ class UpdateJointAnglesTask(QRunnable):
         self.update_joint_angles_thread_flag = flag
             
 
-class AgnleDegreeWatchTask(QRunnable):
-    """订阅关节角度值的线程"""
-    
-    def __init__(self, joints_angle_queue: Queue):
-        super().__init__()
-        self.is_on = True
-        self.joints_angle_queue = joints_angle_queue        
-    
-    @logger.catch        
-    def run(self):
-        with self.get_robot_arm_connector() as coon:
-            while self.is_on:
-                time.sleep(0.1)
-                pub.subscribe(self.check_flag, 'thread_work_flag')
-                try:
-                    response_str = coon.recv(2048).decode('utf-8')
-                    if response_str.startswith('{') and response_str.endswith('\r\n'):
-                        recv_buffer = self.split_by_symbol(response_str)  # 命令缓冲区
-                        recv_joint_angle_datas = list(filter(self.keep_joint_datas_str, recv_buffer))  # 保留关节角度值
-                        for recv in recv_joint_angle_datas:
-                            
-                            try:
-                                joints_angle = json.loads(recv)
-                            except json.JSONDecodeError as e:
-                                logger.exception(f"解析命令处理异常: {e}")
-                                logger.error(rf"异常命令: {recv}")
-                                
-                            joints_angle_list = joints_angle['data']
-                            self.joints_angle_queue.put(joints_angle_list)
-                    else:
-                        logger.warning(f"数据不完整: {response_str}")
-                except socket.timeout:
-                    self.is_on = False        
-                    logger.error("机械臂连接超时！")
-                
-    def split_by_symbol(self, response_str: str, split_symbol='\r\n') -> list:
-        """根据指定的分隔符拆分字符串, 并清理空字符串"""
-        recv_buffer = list(filter(lambda s: s and s.strip(), response_str.split(split_symbol)))
-        return recv_buffer
-    
-    def keep_joint_datas_str(self, json_str: str):
-        """保留关节角度值"""
-        if 'get_joint_angle_all' in json_str:
-            return True
-        else:
-            return False
-    
-    def check_flag(self, flag=True):
-        self.is_on = flag
-    
-    @logger.catch
-    def get_robot_arm_connector(self):
-        """获取与机械臂的连接对象"""
-        try:
-            socket_info = shelve.open(str(settings.IP_PORT_INFO_FILE_PATH))
-            host = socket_info['target_ip']
-            port = int(socket_info['target_port'])
-            robot_arm_client = ClientSocket(host, port)
-            socket_info.close()
-        except Exception as e:
-            logger.exception(str(e))
-        return robot_arm_client
+class RobotArmDataRouter(object):
+    """机械臂数据分发
 
-    
-class CommandSenderTask(QRunnable):
-    """发送命令的线程"""
-    
-    def __init__(self, command_queue: Queue):
-        super().__init__()
+    命令发送与数据接收都由 RobotArmSession 的 I/O 线程完成:
+    - 命令队列绑定到会话, 写入后立即唤醒 I/O 线程发送
+    - 关节角度与运动到位状态由 I/O 线程收到后直接回调分发
+    因此不再需要单独轮询 socket 与命令队列的线程。
+    """
+
+    def __init__(self, command_queue: CommandQueue, joints_angle_queue: Queue):
         self.command_queue = command_queue
-        self.is_on = True
-    
-    @logger.catch
-    def run(self):
-        while self.is_on:
-            pub.subscribe(self.check_flag, 'thread_work_flag')  # 检查线程是否需要继续运行
-            time.sleep(0.1)
-            if not self.command_queue.empty():
-                try:
-                    # 发送命令
-                    command_str = self.command_queue.get()
-                    with self.get_robot_arm_connector() as conn:
-                        conn.sendall(command_str)
-                        logger.debug(f"命令发送线程，发送的命令: {command_str}")
-                                
-                except Exception as e:
-                    logger.error(f"命令发送异常: {e}")
-                    logger.error(rf"异常命令: {command_str.decode('utf-8')}")
-                    
-    def check_flag(self, flag=True):
-        self.is_on = flag
-                    
-    @logger.catch
-    def get_robot_arm_connector(self):
-        """获取与机械臂的连接对象"""
-        try:
-            socket_info = shelve.open(str(settings.IP_PORT_INFO_FILE_PATH))
-            host = socket_info['target_ip']
-            port = int(socket_info['target_port'])
-            robot_arm_client = ClientSocket(host, port)
-            socket_info.close()
-        except Exception as e:
-            logger.error(str(e))
-        return robot_arm_client
-    
+        self.joints_angle_queue = joints_angle_queue
+        self.session = None
 
-class CommandReceiverTask(QRunnable):
-    """命令接收与分流(发布)线程"""
-    
-    def __init__(self):
-        super().__init__()
-        self.is_on = True
-        
-    @logger.catch
-    def run(self):
-        """接收命令并发布对应的响应数据"""
-        with self.get_robot_arm_connector() as conn:
-            while self.is_on:
-                pub.subscribe(self.check_flag, 'thread_work_flag')
-                time.sleep(0.1)
-                try:
-                    response_str = conn.recv(2048).decode('utf-8')
-                    if response_str.startswith('{') and response_str.endswith('\r\n'):
-                        # 命令缓冲区
-                        recv_buffer = self.split_by_symbol(response_str, split_symbol='\r\n')
-                        # TODO: 分流命令, 需要做并发处理
-                        self.get_joints_move_status(recv_buffer)
-                    else:
-                        logger.warning(f"数据不完整: {response_str}")
-
-                except Exception as e:
-                    logger.error(f"解析命令处理异常: {e}")
-                    logger.error(rf"异常命令: {recv_buffer}")
-
-    def split_by_symbol(self, response_str: str, split_symbol='\r\n') -> list:
-        """根据指定的分隔符拆分字符串"""
-        recv_buffer = list(filter(lambda s: s and s.strip(), response_str.split(split_symbol)))
-        return recv_buffer
-
-    def get_joints_move_status(self, recv_buffer: list):
-        """获取并发布机械臂运动状态"""
-        # 剔除不需要的命令
-        recv_arm_move_status = list(filter(self.get_arm_move_state, recv_buffer))
-        try:
-            for move_status in recv_arm_move_status:
-                json_data = json.loads(move_status)
-                logger.warning(f"机械臂运动状态: {json_data}")
-                pub.sendMessage('joints/move_status', move_status=json_data['data'])
-        except Exception as e:
-            logger.error(f"解析命令处理异常: {e}")
-            logger.error(rf"异常命令: {move_status}")
-    
-    def get_arm_move_state(self, json_str):
-        """获取机械臂运动到位状态"""
-        if'move_in_place' in json_str:
-            return True
-        else:
-            return False
-        
-    def check_flag(self, flag=True):
-        """线程工作控制位"""
-        self.is_on = flag
-        
-    @logger.catch
-    def get_robot_arm_connector(self):
-        """获取与机械臂的连接对象"""
-        try:
-            socket_info = shelve.open(str(settings.IP_PORT_INFO_FILE_PATH))
-            host = socket_info['target_ip']
-            port = int(socket_info['target_port'])
-            robot_arm_client = ClientSocket(host, port)
-            socket_info.close()
-        except Exception as e:
-            logger.exception(str(e))
-        return robot_arm_client
\ No newline at end of file
+    def start(self, session: RobotArmSession):
+        """绑定会话, 开始发送命令与分发数据"""
+        self.stop()
+        self.session = session
+        session.subscribe('get_joint_angle_all', self.put_joint_angles)
+        session.subscribe('move_in_place', self.publish_joints_move_status)
+        session.attach_command_queue(self.command_queue)
+
+    def stop(self):
+        """解除与会话的绑定"""
+        if self.session is not None:
+            self.session.detach_command_queue(self.command_queue)
+            self.session.unsubscribe('get_joint_angle_all', self.put_joint_angles)
+            self.session.unsubscribe('move_in_place', self.publish_joints_move_status)
+            self.session = None
+
+    def put_joint_angles(self, response: dict):
+        """关节角度数据放入队列"""
+        self.joints_angle_queue.put(response['data'])
+
+    def publish_joints_move_status(self, response: dict):
+        """发布机械臂运动状态"""
+        logger.warning(f"机械臂运动状态: {response}")
+        pub.sendMessage('joints/move_status', move_status=response['data'])
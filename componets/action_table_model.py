@@ -0,0 +1,368 @@
+from typing import Callable, Iterable, Iterator, Sequence
+
+import numpy as np
+from PySide6.QtCore import QAbstractTableModel, QModelIndex, Qt
+
+
+class ActionTableModel(QAbstractTableModel):
+    """示教动作表格模型
+
+    动作数据保存在 numpy 结构化数组中(按容量倍增预留空间), 备注单独保存在列表中,
+    表格只在绘制可见单元格时把数值格式化为文本, 不再为每个单元格创建 QTableWidgetItem 和下拉框控件。
+    添加、插入、删除、更新动作的开销只与涉及的行数有关。
+    最后一列为每个动作的预计耗时(只读, 不保存到动作文件), 动作改变后按整个表格向量化重新估算。
+    """
+
+    COLUMNS = ("J1", "J2", "J3", "J4", "J5", "J6", "速度", "工具", "开关", "延时", "过渡", "运动", "备注", "耗时")
+    RECORD_KEYS = ("J1/X", "J2/X", "J3/X", "J4/X", "J5/X", "J6/X", "速度", "工具", "开关", "延时", "过渡", "运动", "备注")  # 动作文件字段
+    SPEED_COLUMN, TOOL_COLUMN, SWITCH_COLUMN, DELAY_COLUMN, BLEND_COLUMN, MOTION_COLUMN = 6, 7, 8, 9, 10, 11
+    NOTE_COLUMN, DURATION_COLUMN = 12, 13
+    NUMBER_FIELDS = {SPEED_COLUMN: 'speed', DELAY_COLUMN: 'delay', BLEND_COLUMN: 'blend'}  # 数值列对应的字段
+    TOOL_OPTIONS = ("", "夹爪", "吸盘")
+    SWITCH_OPTIONS = ("", "关", "开")
+    MOTION_OPTIONS = ("关节", "直线")
+    OPTION_FIELDS = {TOOL_COLUMN: (TOOL_OPTIONS, 'tool'), SWITCH_COLUMN: (SWITCH_OPTIONS, 'switch'),
+                     MOTION_COLUMN: (MOTION_OPTIONS, 'motion')}  # 选项列对应的 (选项, 字段)
+    DEFAULT_SPEED = 30  # 动作文件中没有速度时, 默认速度百分比为 30%
+
+    ROW_DTYPE = np.dtype([
+        ('joints', np.float64, (6,)),  # 关节角度(°)
+        ('speed', np.float64),  # 速度百分比
+        ('tool', np.int8),  # 末端工具, TOOL_OPTIONS 的索引
+        ('switch', np.int8),  # 工具开关, SWITCH_OPTIONS 的索引
+        ('delay', np.float64),  # 延时(秒)
+        ('blend', np.float64),  # 过渡半径(mm), 0 为停稳后再执行下一个动作
+        ('motion', np.int8),  # 从上一个动作到这个动作的运动方式, MOTION_OPTIONS 的索引
+    ])
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._data = np.zeros(64, dtype=self.ROW_DTYPE)
+        self._size = 0
+        self._notes = []
+        self._duration_estimator = None
+        self._durations = None  # 预计耗时的缓存, 动作改变后清空
+
+    # Qt 模型接口
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self._size
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.COLUMNS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation == Qt.Horizontal and section == self.BLEND_COLUMN and role == Qt.ToolTipRole:
+            return "过渡半径(mm): 实时模式下经过该动作时不停顿, 末端在半径以内圆滑过渡到下一个动作; 0 为停稳"
+        if orientation == Qt.Horizontal and section == self.MOTION_COLUMN and role == Qt.ToolTipRole:
+            return "运动方式: 关节 为各关节同步运动; 直线 为末端从上一个动作沿直线运动到这个动作(只支持实时模式)"
+        if orientation == Qt.Horizontal and section == self.DURATION_COLUMN:
+            if role == Qt.ToolTipRole:
+                return "预计耗时(秒): 关节运动 + 延时, 按循环执行估算, 第 1 个动作从最后一个动作出发"
+            if role == Qt.DisplayRole and (durations := self.durations()) is not None and len(durations):
+                return f"耗时(共 {durations.sum():.1f} s)"
+        if role != Qt.DisplayRole:
+            return None
+        if orientation == Qt.Horizontal:
+            return self.COLUMNS[section]
+        return str(section + 1)
+
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.NoItemFlags
+        if index.column() == self.DURATION_COLUMN:
+            return Qt.ItemIsEnabled | Qt.ItemIsSelectable
+        return Qt.ItemIsEnabled | Qt.ItemIsSelectable | Qt.ItemIsEditable
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or role not in (Qt.DisplayRole, Qt.EditRole):
+            return None
+        return self.cell_text(index.row(), index.column())
+
+    def setData(self, index, value, role=Qt.EditRole):
+        if not index.isValid() or role != Qt.EditRole:
+            return False
+        try:
+            self.update_cells([index.row()], index.column(), value)
+        except ValueError:
+            return False
+        return True
+
+    def removeRows(self, row, count, parent=QModelIndex()):
+        if parent.isValid() or row < 0 or count <= 0 or row + count > self._size:
+            return False
+        self.remove_rows(range(row, row + count))
+        return True
+
+    # 数据操作
+    @classmethod
+    def make_rows(cls, count=1) -> np.ndarray:
+        """创建 count 行空白动作"""
+        return np.zeros(count, dtype=cls.ROW_DTYPE)
+
+    @classmethod
+    def make_row(cls, joints: Sequence, speed, tool="", switch="", delay=0, blend=0, motion="关节") -> np.ndarray:
+        """由界面输入创建一行动作, 文本参数按表格单元格的规则解析"""
+        row = cls.make_rows(1)
+        row['joints'][0] = [float(joint) for joint in joints]
+        for column, value in ((cls.SPEED_COLUMN, speed), (cls.TOOL_COLUMN, tool), (cls.SWITCH_COLUMN, switch),
+                              (cls.DELAY_COLUMN, delay), (cls.BLEND_COLUMN, blend), (cls.MOTION_COLUMN, motion)):
+            field, parsed_value = cls._parse_cell(column, value)
+            row[field] = parsed_value
+        return row
+
+    def rows(self) -> np.ndarray:
+        """当前所有动作(数组视图, 只读)"""
+        view = self._data[:self._size]
+        view.flags.writeable = False
+        return view
+
+    def notes(self) -> list:
+        return list(self._notes)
+
+    def append_rows(self, rows: np.ndarray, notes: Sequence = None):
+        """在末尾追加动作"""
+        self.insert_rows(self._size, rows, notes)
+
+    def insert_rows(self, position: int, rows: np.ndarray, notes: Sequence = None):
+        """在 position 行之前插入动作"""
+        count = len(rows)
+        if not count:
+            return
+        notes = [""] * count if notes is None else [str(note) for note in notes]
+        self.beginInsertRows(QModelIndex(), position, position + count - 1)
+        self._reserve(self._size + count)
+        self._data[position + count:self._size + count] = self._data[position:self._size]
+        self._data[position:position + count] = rows
+        self._notes[position:position] = notes
+        self._size += count
+        self.endInsertRows()
+        self.invalidate_durations()
+
+    def remove_rows(self, rows: Iterable[int]):
+        """删除指定的行, 连续的行合并为一次删除"""
+        ranges = self._contiguous_ranges(rows)
+        for first, last in reversed(ranges):
+            self.beginRemoveRows(QModelIndex(), first, last)
+            self._data[first:self._size - (last - first + 1)] = self._data[last + 1:self._size]
+            del self._notes[first:last + 1]
+            self._size -= last - first + 1
+            self.endRemoveRows()
+        if ranges:
+            self.invalidate_durations()
+
+    def clear(self):
+        self.beginResetModel()
+        self._size = 0
+        self._notes = []
+        self._durations = None
+        self.endResetModel()
+        self.headerDataChanged.emit(Qt.Horizontal, self.DURATION_COLUMN, self.DURATION_COLUMN)
+
+    def update_cells(self, rows: Sequence[int], column: int, value):
+        """把指定行的某一列设置为同一个值
+
+        Raises:
+            ValueError: 单元格的值无法解析
+        """
+        rows = np.asarray(rows, dtype=np.intp)
+        if not len(rows):
+            return
+        if column == self.NOTE_COLUMN:
+            for row in rows:
+                self._notes[row] = str(value)
+        elif column < 6:
+            self._data['joints'][rows, column] = float(value)
+        else:
+            field, parsed_value = self._parse_cell(column, value)
+            self._data[field][rows] = parsed_value
+        self.dataChanged.emit(self.index(int(rows.min()), column), self.index(int(rows.max()), column))
+        if column != self.NOTE_COLUMN:
+            self.invalidate_durations()
+
+    def cell_text(self, row: int, column: int) -> str:
+        """单元格显示的文本"""
+        if column == self.NOTE_COLUMN:
+            return self._notes[row]
+        if column == self.DURATION_COLUMN:
+            durations = self.durations()
+            return "" if durations is None else f"{durations[row]:.2f}"
+        return self._action_text(self._data[row], column)
+
+    # 预计耗时
+    def set_duration_estimator(self, estimator: Callable[[np.ndarray], np.ndarray]):
+        """设置预计耗时的估算函数, 参数为动作数组, 返回每个动作的耗时(秒)"""
+        self._duration_estimator = estimator
+        self.invalidate_durations()
+
+    def durations(self) -> np.ndarray:
+        """每个动作的预计耗时(秒, 只读), 没有设置估算函数时为 None"""
+        if self._duration_estimator is None:
+            return None
+        if self._durations is None:
+            self._durations = np.asarray(self._duration_estimator(self._data[:self._size]), dtype=np.float64)
+            self._durations.setflags(write=False)
+        return self._durations
+
+    def invalidate_durations(self):
+        """动作或估算条件(如命令模式)改变后重新估算, 一次刷新整列"""
+        self._durations = None
+        if self._size:
+            self.dataChanged.emit(self.index(0, self.DURATION_COLUMN), self.index(self._size - 1, self.DURATION_COLUMN))
+        self.headerDataChanged.emit(Qt.Horizontal, self.DURATION_COLUMN, self.DURATION_COLUMN)
+
+    def snapshot(self) -> tuple:
+        """当前动作的副本 (动作数组, 备注列表), 可以交给其他线程使用"""
+        return self._data[:self._size].copy(), list(self._notes)
+
+    def teach_actions(self, rows: Iterable[int] = None) -> list:
+        """转换为 CompiledProgram.compile 使用的动作列表: (关节角度, 速度百分比, 吸盘状态, 延时, 过渡半径, 是否直线运动)
+
+        吸盘状态: 工具为吸盘且选择了开关时 1 开 / 0 关, 其他情况为 -1 不控制
+        """
+        actions = self._data[:self._size] if rows is None else self._data[:self._size][list(rows)]
+        tool_status = np.where(
+            (actions['tool'] == self.TOOL_OPTIONS.index("吸盘")) & (actions['switch'] != 0),
+            (actions['switch'] == self.SWITCH_OPTIONS.index("开")).astype(np.int8), -1)
+        linear = actions['motion'] == self.MOTION_OPTIONS.index("直线")
+        return list(zip(actions['joints'].tolist(), actions['speed'].tolist(), tool_status.tolist(),
+                        actions['delay'].tolist(), actions['blend'].tolist(), linear.tolist()))
+
+    # 动作文件记录
+    @classmethod
+    def from_records(cls, records: Sequence[dict]) -> tuple:
+        """把动作文件中的记录转换为 (动作数组, 备注列表)
+
+        Raises:
+            ValueError: 记录中的值无法解析
+        """
+        rows = cls.make_rows(len(records))
+        # 按列整体转换, 避免逐个单元格解析
+        for column, key in enumerate(cls.RECORD_KEYS[:cls.NOTE_COLUMN]):
+            default = {cls.SPEED_COLUMN: cls.DEFAULT_SPEED, cls.MOTION_COLUMN: cls.MOTION_OPTIONS[0]}.get(column, "")
+            values = [record.get(key, default) for record in records]
+            if column < 6:
+                rows['joints'][:, column] = cls._to_floats(values)
+            elif column in cls.NUMBER_FIELDS:
+                rows[cls.NUMBER_FIELDS[column]] = cls._to_floats(values, default or 0.0)
+            else:
+                options, field = cls.OPTION_FIELDS[column]
+                option_index = {option: i for i, option in enumerate(options)}
+                try:
+                    rows[field] = [option_index[str(value)] for value in values]
+                except KeyError as e:
+                    raise ValueError(f"第 {column + 1} 列不支持的值: {e.args[0]}") from None
+        notes = [str(record.get("备注", "")) for record in records]
+        return rows, notes
+
+    def iter_records(self) -> Iterator[dict]:
+        """按动作文件的格式逐行生成记录, 数值写为单元格文本"""
+        return self.records_from_rows(*self.snapshot())
+
+    @classmethod
+    def records_from_rows(cls, rows: np.ndarray, notes: Sequence, block_rows=1000) -> Iterator[dict]:
+        """把动作数组与备注逐行转换为动作文件的记录
+
+        按块转换为 Python 数值后再格式化, 比逐个读取 numpy 标量快, 内存占用只与块大小有关。
+        """
+        format_number = cls._format_number
+        for start in range(0, len(rows), block_rows):
+            block = rows[start:start + block_rows]
+            for joints, speed, tool, switch, delay, blend, motion, note in zip(
+                    block['joints'].tolist(), block['speed'].tolist(), block['tool'].tolist(), block['switch'].tolist(),
+                    block['delay'].tolist(), block['blend'].tolist(), block['motion'].tolist(), notes[start:start + block_rows]):
+                values = [format_number(joint) for joint in joints]
+                values += [format_number(speed), cls.TOOL_OPTIONS[tool], cls.SWITCH_OPTIONS[switch], format_number(delay),
+                           format_number(blend), cls.MOTION_OPTIONS[motion], note]
+                yield dict(zip(cls.RECORD_KEYS, values))
+
+    # 二进制程序文件的列
+    @classmethod
+    def to_program_columns(cls, rows: np.ndarray) -> dict:
+        """转换为二进制程序文件的列, 速度取整, 延时按毫秒取整, 过渡半径按 0.1 mm 取整"""
+        return {
+            'joints': rows['joints'].astype(np.float32),
+            'speed': np.rint(rows['speed']).astype(np.int16),
+            'tool': rows['tool'].astype(np.uint8),
+            'switch': rows['switch'].astype(np.uint8),
+            'delay_ms': np.rint(rows['delay'] * 1000).astype(np.int32),
+            'blend_dmm': np.rint(rows['blend'] * 10).astype(np.uint16),
+            'motion': rows['motion'].astype(np.uint8),
+        }
+
+    @classmethod
+    def from_program_chunk(cls, chunk: tuple) -> tuple:
+        """把二进制程序文件的一块 (列, 备注列表) 转换为 (动作数组, 备注列表)"""
+        columns, notes = chunk
+        if (columns['tool'].max(initial=0) >= len(cls.TOOL_OPTIONS) or columns['switch'].max(initial=0) >= len(cls.SWITCH_OPTIONS)
+                or columns['motion'].max(initial=0) >= len(cls.MOTION_OPTIONS)):
+            raise ValueError("示教程序文件中的工具、开关或运动方式取值无效")
+        rows = cls.make_rows(len(columns['joints']))
+        rows['joints'] = np.round(columns['joints'].astype(np.float64), 3)  # 去掉 float32 的尾差
+        rows['speed'] = columns['speed']
+        rows['tool'] = columns['tool']
+        rows['switch'] = columns['switch']
+        rows['delay'] = columns['delay_ms'] / 1000
+        rows['blend'] = columns['blend_dmm'] / 10
+        rows['motion'] = columns['motion']
+        return rows, notes
+
+    @classmethod
+    def _action_text(cls, action, column) -> str:
+        if column < 6:
+            return cls._format_number(action['joints'][column])
+        if column in cls.OPTION_FIELDS:
+            options, field = cls.OPTION_FIELDS[column]
+            return options[action[field]]
+        return cls._format_number(action[cls.NUMBER_FIELDS[column]])
+
+    def _reserve(self, size):
+        if size > len(self._data):
+            data = np.zeros(max(size, 2 * len(self._data)), dtype=self.ROW_DTYPE)
+            data[:self._size] = self._data[:self._size]
+            self._data = data
+
+    @classmethod
+    def _parse_cell(cls, column, value) -> tuple:
+        """解析速度、工具、开关、延时、过渡、运动列的值, 返回 (字段名, 存储值)"""
+        if column == cls.SPEED_COLUMN:
+            return 'speed', cls._to_float(value, cls.DEFAULT_SPEED)
+        if column == cls.DELAY_COLUMN:
+            return 'delay', cls._to_float(value)
+        if column == cls.BLEND_COLUMN:
+            if (blend := cls._to_float(value)) < 0:
+                raise ValueError(f"过渡半径不能为负数: {value}")
+            return 'blend', blend
+        if column not in cls.OPTION_FIELDS or str(value) not in cls.OPTION_FIELDS[column][0]:
+            raise ValueError(f"第 {column + 1} 列不支持的值: {value}")
+        options, field = cls.OPTION_FIELDS[column]
+        return field, options.index(str(value))
+
+    @staticmethod
+    def _to_float(value, default=0.0) -> float:
+        """空白单元格按默认值处理"""
+        if isinstance(value, str) and not value.strip():
+            return float(default)
+        return float(value)
+
+    @classmethod
+    def _to_floats(cls, values: list, default=0.0) -> np.ndarray:
+        try:
+            return np.asarray(values, dtype=np.float64)
+        except ValueError:
+            return np.array([cls._to_float(value, default) for value in values], dtype=np.float64)
+
+    @staticmethod
+    def _format_number(value) -> str:
+        text = f"{value:.3f}".rstrip('0').rstrip('.')
+        return "0" if text == "-0" else text
+
+    @staticmethod
+    def _contiguous_ranges(rows: Iterable[int]) -> list:
+        """把行号合并为连续区间 [(first, last), ...]"""
+        ranges = []
+        for row in sorted(set(rows)):
+            if ranges and row == ranges[-1][1] + 1:
+                ranges[-1][1] = row
+            else:
+                ranges.append([row, row])
+        return [tuple(each_range) for each_range in ranges]
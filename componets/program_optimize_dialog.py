@@ -0,0 +1,36 @@
+from qfluentwidgets import BodyLabel, DoubleSpinBox, MessageBoxBase, SubtitleLabel
+
+
+class ProgramOptimizeDialog(MessageBoxBase):
+    """示教动作优化参数对话框: 末端位置容差与姿态容差"""
+
+    def __init__(self, parent=None, position_tolerance=1.0, orientation_tolerance=1.0):
+        super().__init__(parent)
+        self.titleLabel = SubtitleLabel("优化动作", self)
+        self.descriptionLabel = BodyLabel("删除重复的动作, 合并末端偏差在容差以内的连续动作。\n"
+                                          "有开关、延时、过渡半径、备注的动作, 直线运动及其起点, 以及速度、工具改变的动作会保留。", self)
+        self.positionLabel = BodyLabel("末端位置容差(mm)", self)
+        self.positionSpinBox = self._create_spin_box(position_tolerance, 0.1, 50.0)
+        self.orientationLabel = BodyLabel("末端姿态容差(°)", self)
+        self.orientationSpinBox = self._create_spin_box(orientation_tolerance, 0.1, 30.0)
+
+        for widget in (self.titleLabel, self.descriptionLabel, self.positionLabel, self.positionSpinBox,
+                       self.orientationLabel, self.orientationSpinBox):
+            self.viewLayout.addWidget(widget)
+        self.yesButton.setText("优化")
+        self.cancelButton.setText("取消")
+        self.widget.setMinimumWidth(360)
+
+    def _create_spin_box(self, value, minimum, maximum):
+        spin_box = DoubleSpinBox(self)
+        spin_box.setRange(minimum, maximum)
+        spin_box.setSingleStep(0.5)
+        spin_box.setDecimals(1)
+        spin_box.setValue(value)
+        return spin_box
+
+    def position_tolerance(self) -> float:
+        return self.positionSpinBox.value()
+
+    def orientation_tolerance(self) -> float:
+        return self.orientationSpinBox.value()
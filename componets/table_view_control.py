@@ -1,8 +1,8 @@
-from PySide6.QtCore import QRegularExpression
+from PySide6.QtCore import QRegularExpression, Qt
 from PySide6.QtGui import QRegularExpressionValidator
 from PySide6.QtWidgets import QItemDelegate
 
-from qfluentwidgets import LineEdit
+from qfluentwidgets import ComboBox, LineEdit
 
 class JointOneDelegate(QItemDelegate):
     def createEditor(self, parent, option, index):
@@ -66,4 +66,33 @@ class JointDelayTimeDelegate(QItemDelegate):
         only_float_regx = QRegularExpression(r'^(30|[1-2]?[0-9]|0)$')
         only_float_validator = QRegularExpressionValidator(only_float_regx)
         editor.setValidator(only_float_validator)
-        return editor
\ No newline at end of file
+        return editor
+
+class BlendRadiusDelegate(QItemDelegate):
+    """过渡半径(mm), 0 ~ 999.9"""
+    def createEditor(self, parent, option, index):
+        editor = LineEdit(parent)
+        only_float_regx = QRegularExpression(r'^\d{1,3}(\.\d)?$')
+        only_float_validator = QRegularExpressionValidator(only_float_regx)
+        editor.setValidator(only_float_validator)
+        return editor
+
+class ComboBoxDelegate(QItemDelegate):
+    """下拉选择列, 只在编辑单元格时创建下拉框"""
+    def __init__(self, options, parent=None):
+        super().__init__(parent)
+        self.options = list(options)
+
+    def createEditor(self, parent, option, index):
+        editor = ComboBox(parent)
+        editor.addItems(self.options)
+        editor.currentIndexChanged.connect(lambda: self.commitData.emit(editor))
+        return editor
+
+    def setEditorData(self, editor, index):
+        editor.blockSignals(True)
+        editor.setCurrentText(index.data(Qt.EditRole) or "")
+        editor.blockSignals(False)
+
+    def setModelData(self, editor, model, index):
+        model.setData(index, editor.currentText(), Qt.EditRole)
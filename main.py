@@ -7,25 +7,40 @@ import sys
 import time
 from datetime import datetime
 from decimal import Decimal
+from concurrent.futures import TimeoutError as FutureTimeoutError
 from functools import partial
 from queue import Queue
 from pubsub import pub
 
 import common.settings as settings
+import common.command_builder as command_builder
 from common.blinx_robot_module import Mirobot
+from common.ikine_service import IKineService
 from common.check_tools import check_robot_arm_connection, check_robot_arm_is_working, check_robot_arm_emergency_stop
-from common.socket_client import ClientSocket, Worker
-from common.work_threads import UpdateJointAnglesTask, AgnleDegreeWatchTask, CommandSenderTask, CommandReceiverTask
+from common.socket_client import RobotArmSession, CommandQueue, EmergencyStopChannel, Worker
+from common.program_streamer import ProgramStreamer
+from common.program_loop import ProgramLoopRunner
+from common.setpoint_streamer import SetpointStreamer
+from common.trajectory import BlendedTrajectory
+from common.teach_program import CompiledProgram, action_durations
+from common.program_optimizer import ProgramOptimizer
+from common.work_threads import (UpdateJointAnglesTask, RobotArmDataRouter, ActionFileImportTask, ActionFileExportTask,
+                                 ProgramFileExportTask, ReachabilityIndexTask)
+from common.action_file import ActionFileReader
+from common.program_file import PROGRAM_FILE_SUFFIX, ProgramFileReader
 from componets.table_view_control import (JointOneDelegate, JointTwoDelegate, JointThreeDelegate,
                                           JointFourDelegate, JointFiveDelegate, JointSixDelegate, 
-                                          JointSpeedDelegate, JointDelayTimeDelegate)
+                                          JointSpeedDelegate, JointDelayTimeDelegate, BlendRadiusDelegate, ComboBoxDelegate)
+from componets.action_table_model import ActionTableModel
+from componets.program_optimize_dialog import ProgramOptimizeDialog
 
 # UI 相关模块
 from PySide6.QtCore import Qt, QThreadPool, QTimer, Slot, QUrl, QRegularExpression
 from PySide6.QtGui import QDesktopServices, QIcon, QRegularExpressionValidator
-from PySide6.QtWidgets import (QApplication, QFrame, QMenu, QTableWidgetItem, QFileDialog)
+from PySide6.QtWidgets import (QApplication, QFrame, QMenu, QFileDialog)
 from qfluentwidgets import (MSFluentWindow, CardWidget, ComboBox, 
-                            NavigationItemPosition, MessageBox, setThemeColor, InfoBar, InfoBarPosition, Dialog)
+                            NavigationItemPosition, MessageBox, setThemeColor, InfoBar, InfoBarPosition, Dialog,
+                            PushButton)
 from qfluentwidgets import FluentIcon as FIF
 
 # 导入子页面控件布局文件
@@ -35,6 +50,7 @@ from app.connect_page import connect_page_frame
 
 # 正逆解相关模块
 from math import degrees
+import numpy as np
 from spatialmath import SE3
 from spatialmath.base import rpy2tr
 
@@ -87,7 +103,7 @@ class CommandPage(QFrame, command_page_frame):
             command_wait_for_send = self.CommandEditWindow.toPlainText().strip()
             
             try:
-                json.loads(command_wait_for_send)
+                command_json = json.loads(command_wait_for_send)
             except json.JSONDecodeError:
                 raise ValueError("输入的内容不是有效的 JSON 字符串!")
             
@@ -110,26 +126,24 @@ class CommandPage(QFrame, command_page_frame):
             )
             self.CommandResWindow.appendPlainText(f"error: {str(e)}")
         else:
-            # 发送机械臂命令
-            robot_arm_client = self.get_robot_arm_connector()
-            with robot_arm_client as rac:
-                rac.send(json_data.encode('utf-8'))
-                try:
-                    rs_data = json.loads(rac.recv(1024).decode('utf-8').strip())
-                except json.JSONDecodeError:
-                    logger.error("接收到的数据不是有效的 JSON 字符串!")
-                    InfoBar.error(
-                        title='错误',
-                        content="接收到的数据不是有效的 JSON 字符串!",
-                        orient=Qt.Horizontal,
-                        isClosable=True,
-                        duration=3000,
-                        position=InfoBarPosition.TOP,
-                        parent=self
-                    )
-                    self.CommandResWindow.appendPlainText("error: 接收到的数据不是有效的 JSON 字符串!")
-                else:
-                    self.CommandResWindow.appendPlainText(json.dumps(rs_data, use_decimal=True))  # 命令响应填入到响应窗口
+            # 发送机械臂命令, 等待与命令同类型的响应
+            command_type = command_json.get('command') if isinstance(command_json, dict) else None
+            try:
+                rs_data = self.get_robot_arm_session().request(json_data, expect=command_type)
+            except (FutureTimeoutError, OSError) as e:
+                logger.error(f"等待机械臂响应失败: {e!r}")
+                InfoBar.error(
+                    title='错误',
+                    content="没有收到机械臂的响应!",
+                    orient=Qt.Horizontal,
+                    isClosable=True,
+                    duration=3000,
+                    position=InfoBarPosition.TOP,
+                    parent=self
+                )
+                self.CommandResWindow.appendPlainText("error: 没有收到机械臂的响应!")
+            else:
+                self.CommandResWindow.appendPlainText(json.dumps(rs_data, use_decimal=True))  # 命令响应填入到响应窗口
     
     def _get_robot_arm_connect_status(self):
         """获取机械臂连接状态"""
@@ -148,14 +162,14 @@ class CommandPage(QFrame, command_page_frame):
         self.robot_arm_table_action_status = status
     
     @logger.catch
-    def get_robot_arm_connector(self):
-        """获取与机械臂的连接对象"""
+    def get_robot_arm_session(self):
+        """获取与机械臂的长连接会话"""
         try:
             socket_info = shelve.open(str(settings.IP_PORT_INFO_FILE_PATH))
             host = socket_info['target_ip']
             port = int(socket_info['target_port'])
             if host and port:
-                robot_arm_client = ClientSocket(host, port)
+                robot_arm_session = RobotArmSession.get(host, port)
             else:
                 logger.error("IP 和 Port 信息为空!")
                 InfoBar.warning(
@@ -180,20 +194,28 @@ class CommandPage(QFrame, command_page_frame):
             )
         finally:
             socket_info.close()
-        return robot_arm_client
+        return robot_arm_session
     
 
 class TeachPage(QFrame, teach_page_frame):
     """示教控制页面"""
-    def __init__(self, page_name: str, thread_pool: QThreadPool, command_queue: Queue, joints_angle_queue: Queue):
+    SEQ_STREAM_WINDOW = 8  # 顺序模式下控制器上同时保留的未完成动作数量
+
+    def __init__(self, page_name: str, thread_pool: QThreadPool, command_queue: Queue, joints_angle_queue: Queue,
+                 emergency_stop_channel: EmergencyStopChannel):
         super().__init__()
         self.setupUi(self)
         self.setObjectName(page_name.replace(' ', '-'))
         self.initButtonIcon()
         self.initJointControlWidiget()
         
+        # 示教动作表格, 数据保存在数组模型中
+        self.action_table_model = ActionTableModel(self)
+        self.ActionTableWidget.setModel(self.action_table_model)
+        self.action_file_task = None  # 进行中的动作文件导入/导出任务
+        self.action_file_info_bar = None
+        
         # 状态标志
-        self.move_status = True  # 机械臂运动状态
         self.thread_is_on = True  # 线程工作标志位
         self.table_action_thread_flag = True  # 顺序执行示教动作线程标志位
         self.robot_arm_table_action_status = False  # 顺序执行示教动作任务进行标志位
@@ -206,7 +228,11 @@ class TeachPage(QFrame, teach_page_frame):
         self.thread_pool = thread_pool  
         self.command_queue = command_queue  # 控制命令队列
         self.joints_angle_queue = joints_angle_queue  # 查询到的机械臂关节角度队列
+        self.emergency_stop_channel = emergency_stop_channel  # 急停专用连接
         self.blinx_robot_arm = Mirobot(settings.ROBOT_MODEL_CONFIG_FILE_PATH, param_type='MDH')
+        self.ikine_service = IKineService(self.blinx_robot_arm)  # 以当前关节角度为初值的逆解服务
+        self.reachability_index = None  # 末端可达空间索引, 后台加载完成前逆解不做预检查
+        self.action_table_model.set_duration_estimator(self.estimate_action_durations)  # 表格中每行的预计耗时
         
         # 开启角度更新与末端工具位姿的更新线程
         self.back_task_start()
@@ -247,6 +273,8 @@ class TeachPage(QFrame, teach_page_frame):
         self.ActionRunButton.setToolTipDuration(2000)
         self.ActionLoopRunButton.setToolTip("循环执行指定次数动作")
         self.ActionLoopRunButton.setToolTipDuration(2000)
+        self.ActionLoopDwellEdit.setToolTip("每次循环之间的停留时间(秒)")
+        self.ActionLoopDwellEdit.setToolTipDuration(2000)
         self.ActionDeleteButton.setToolTip("删除指定动作")
         self.ActionDeleteButton.setToolTipDuration(2000)
         self.ActionUpdateRowButton.setToolTip("更新指定行动作")
@@ -259,8 +287,12 @@ class TeachPage(QFrame, teach_page_frame):
         self.context_menu = QMenu(self)
         self.updata_action = self.context_menu.addAction("更新单元格")  # TODO: 暂时无法使用
         self.insert_row_action = self.context_menu.addAction("插入一行")  # 默认插入到最后一行，无法插入当前行的下一行
+        self.optimize_action = self.context_menu.addAction("优化动作")  # 精简录制的重复、共线动作
+        self.dry_run_action = self.context_menu.addAction("空跑估算")  # 不运动机械臂, 估算执行耗时
         self.updata_action.triggered.connect(self.update_cell)
         self.insert_row_action.triggered.connect(self.insert_row)
+        self.optimize_action.triggered.connect(self.optimize_actions)
+        self.dry_run_action.triggered.connect(self.dry_run_actions)
         self.ActionTableWidget.setContextMenuPolicy(Qt.CustomContextMenu)
         self.ActionTableWidget.customContextMenuRequested.connect(self.show_context_menu)
         self.copied_row = None
@@ -333,130 +365,154 @@ class TeachPage(QFrame, teach_page_frame):
         self.update_joint_angles_thread.singal_emitter.joint_angles_update_signal.connect(self.update_joint_degrees_text)
         self.update_joint_angles_thread.singal_emitter.arm_endfactor_positions_update_signal.connect(self.update_arm_pose_text)
 
+        logger.warning("加载末端可达空间索引线程，启动!")
+        self.reachability_index_task = ReachabilityIndexTask(self.blinx_robot_arm)
+        self.reachability_index_task.singal_emitter.finished_signal.connect(self.set_reachability_index)
+        self.thread_pool.start(self.reachability_index_task)
+
+    @Slot(object)
+    def set_reachability_index(self, reachability_index):
+        """可达空间索引加载完成"""
+        self.reachability_index = reachability_index
+
     # 顶部工具栏
     @check_robot_arm_connection                    
     @check_robot_arm_is_working
     @Slot()
     def import_data(self):
-        """导入动作"""
+        """导入动作, 在后台线程中逐块解析动作文件并追加到表格"""
+        if self.action_file_task is not None:
+            self.warn_action_file_task_running()
+            return
         file_name, _ = QFileDialog.getOpenFileName(self, "导入动作文件", "",
-                                                   "JSON Files (*.json);;All Files (*)")
-        try:
-            if file_name:
-                logger.info(f"开始导入 {file_name} 动作文件")
-                with open(file_name, "r", encoding="utf-8") as json_file:
-                    data = json.load(json_file)
-
-                    self.ActionTableWidget.setRowCount(0)  # 清空表格
-
-                    for item in data:
-                        angle_1 = item.get("J1/X", "")
-                        angle_2 = item.get("J2/X", "")
-                        angle_3 = item.get("J3/X", "")
-                        angle_4 = item.get("J4/X", "")
-                        angle_5 = item.get("J5/X", "")
-                        angle_6 = item.get("J6/X", "")
-                        speed_percentage = item.get("速度", 30)  # 速度百分比默认为 30%
-                        arm_tool_option = item.get("工具", "")
-                        arm_tool_control = item.get("开关", "")
-                        arm_action_delay_time = item.get("延时", "")
-                        note = item.get("备注", "")
-
-                        row_position = self.ActionTableWidget.rowCount()
-                        self.ActionTableWidget.insertRow(row_position)
-                        self.update_table_cell(row_position, 0, angle_1)
-                        self.update_table_cell(row_position, 1, angle_2)
-                        self.update_table_cell(row_position, 2, angle_3)
-                        self.update_table_cell(row_position, 3, angle_4)
-                        self.update_table_cell(row_position, 4, angle_5)
-                        self.update_table_cell(row_position, 5, angle_6)
-                        self.update_table_cell(row_position, 6, speed_percentage)
-
-                        # 工具列
-                        arm_tool_combobox = ComboBox()
-                        arm_tool_combobox.addItems(["", "夹爪", "吸盘"])
-                        arm_tool_combobox.setCurrentText(arm_tool_option)
-                        self.update_table_cell_widget(row_position, 7, arm_tool_combobox)
-
-                        # 开关列
-                        arm_tool_control_combobox = ComboBox()
-                        arm_tool_control_combobox.addItems(["", "关", "开"])
-                        arm_tool_control_combobox.setCurrentText(arm_tool_control)
-                        self.update_table_cell_widget(row_position, 8, arm_tool_control_combobox)
-
-                        # 延时列
-                        self.update_table_cell(row_position, 9, arm_action_delay_time)
-                        
-                        # 备注列
-                        self.update_table_cell(row_position, 10, note)
-                        
-                    logger.info("完成导入动作文件!")
-            else:
-                logger.warning("取消导入动作文件!")
-        except Exception as e:
-            logger.error(f"导入动作文件失败: {e}")
-            InfoBar.error(
-                title="错误",
-                content="⬇️ 导入动作文件失败!",
-                isClosable=True,
-                orient=Qt.Horizontal,
-                duration=3000,
-                position=InfoBarPosition.TOP_LEFT,
-                parent=self
-            )
+                                                   "JSON Files (*.json);;Program Files (*.bxp);;All Files (*)")
+        if file_name:
+            logger.info(f"开始导入 {file_name} 动作文件")
+            try:
+                if file_name.endswith(PROGRAM_FILE_SUFFIX):
+                    reader, convert = ProgramFileReader(file_name), ActionTableModel.from_program_chunk
+                else:
+                    reader, convert = ActionFileReader(file_name), ActionTableModel.from_records
+            except (OSError, ValueError) as e:
+                logger.error(f"导入动作文件失败: {e}")
+                InfoBar.error(
+                    title="错误",
+                    content="⬇️ 导入动作文件失败!",
+                    isClosable=True,
+                    orient=Qt.Horizontal,
+                    duration=3000,
+                    position=InfoBarPosition.TOP_LEFT,
+                    parent=self
+                )
+                return
+            self.action_table_model.clear()  # 清空表格
+            import_task = ActionFileImportTask(reader, convert)
+            import_task.singal_emitter.chunk_loaded_signal.connect(partial(self.append_imported_actions, import_task))
+            self.start_action_file_task(import_task, "导入")
+        else:
+            logger.warning("取消导入动作文件!")
     
     @check_robot_arm_connection
     @check_robot_arm_is_working
     @Slot()                    
     def export_data(self):
-        """导出动作"""
+        """导出动作, 在后台线程中逐条写出表格动作的快照"""
+        if self.action_file_task is not None:
+            self.warn_action_file_task_running()
+            return
         file_timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        file_name, _ = QFileDialog.getSaveFileName(self, "导出动作文件", f"robot_arm_action_{file_timestamp}.json", "JSON Files (*.json);;All Files (*)",
-                                                   )
+        file_name, _ = QFileDialog.getSaveFileName(self, "导出动作文件", f"robot_arm_action_{file_timestamp}.json",
+                                                   "JSON Files (*.json);;Program Files (*.bxp);;All Files (*)")
         if file_name:
             logger.info("开始导出动作文件")
             logger.debug(f"导出的配置文件的路径 {file_name}")
-            data = []
-            for row in range(self.ActionTableWidget.rowCount()):
-                angle_1 = self.ActionTableWidget.item(row, 0).text()
-                angle_2 = self.ActionTableWidget.item(row, 1).text()
-                angle_3 = self.ActionTableWidget.item(row, 2).text()
-                angle_4 = self.ActionTableWidget.item(row, 3).text()
-                angle_5 = self.ActionTableWidget.item(row, 4).text()
-                angle_6 = self.ActionTableWidget.item(row, 5).text()
-                speed_percentage = self.ActionTableWidget.item(row, 6).text()        # 速度列
-                arm_tool_widget = self.ActionTableWidget.cellWidget(row, 7)          # 工具列
-                arm_tool_control_widget = self.ActionTableWidget.cellWidget(row, 8)  # 开关列
-                arm_action_delay_time = self.ActionTableWidget.item(row, 9).text()   # 延时列
-                note = self.ActionTableWidget.item(row, 10).text()                   # 备注列
-
-                if arm_tool_widget is not None:
-                    arm_tool_option = arm_tool_widget.currentText()
-                else:
-                    arm_tool_option = ""
-
-                if arm_tool_control_widget is not None:
-                    arm_tool_control_widget = arm_tool_control_widget.currentText()
-                else:
-                    arm_tool_control_widget = ""
+            rows, notes = self.action_table_model.snapshot()
+            if file_name.endswith(PROGRAM_FILE_SUFFIX):
+                export_task = ProgramFileExportTask(file_name, ActionTableModel.to_program_columns(rows), notes)
+            else:
+                export_task = ActionFileExportTask(file_name, ActionTableModel.records_from_rows(rows, notes), len(rows))
+            self.start_action_file_task(export_task, "导出")
+        else:
+            logger.warning("取消导出动作文件!")
+    
+    def start_action_file_task(self, task, action_name):
+        """启动动作文件导入/导出任务, 显示进度与取消按钮"""
+        self.action_file_task = task
+        task.singal_emitter.progress_signal.connect(self.ProgressBar.setVal)
+        task.singal_emitter.finished_signal.connect(partial(self.action_file_task_finished, action_name))
+        self.action_file_info_bar = InfoBar.info(
+            title="提示",
+            content=f"正在{action_name}动作文件...",
+            isClosable=False,
+            orient=Qt.Horizontal,
+            duration=-1,
+            position=InfoBarPosition.TOP_LEFT,
+            parent=self
+        )
+        cancel_button = PushButton("取消")
+        cancel_button.clicked.connect(task.cancel)
+        self.action_file_info_bar.addWidget(cancel_button)
+        self.thread_pool.start(task)
+    
+    def append_imported_actions(self, import_task, rows, notes):
+        """追加导入线程解析好的一块动作"""
+        self.action_table_model.append_rows(rows, notes)
+        import_task.chunk_consumed()
+    
+    def action_file_task_finished(self, action_name, completed, error):
+        """动作文件导入/导出结束"""
+        is_import = isinstance(self.action_file_task, ActionFileImportTask)
+        self.action_file_task = None
+        self.action_file_info_bar.close()
+        self.action_file_info_bar = None
+        self.ProgressBar.setVal(0)
+        if completed:
+            logger.info(f"{action_name}动作文件成功!")
+            InfoBar.success(
+                title="成功",
+                content=f"{action_name}动作文件完成, 共 {self.action_table_model.rowCount()} 个动作",
+                isClosable=True,
+                orient=Qt.Horizontal,
+                duration=3000,
+                position=InfoBarPosition.TOP_LEFT,
+                parent=self
+            )
+            return
 
-                data.append({
-                    "J1/X": angle_1,
-                    "J2/X": angle_2,
-                    "J3/X": angle_3,
-                    "J4/X": angle_4,
-                    "J5/X": angle_5,
-                    "J6/X": angle_6,
-                    "速度": speed_percentage,
-                    "工具": arm_tool_option,
-                    "开关": arm_tool_control_widget,
-                    "延时": arm_action_delay_time,
-                    "备注": note
-                })
+        if is_import:
+            self.action_table_model.clear()  # 不保留不完整的动作
+        if error:
+            InfoBar.error(
+                title="错误",
+                content=f"{'⬇️' if is_import else '⬆️'} {action_name}动作文件失败!",
+                isClosable=True,
+                orient=Qt.Horizontal,
+                duration=3000,
+                position=InfoBarPosition.TOP_LEFT,
+                parent=self
+            )
+        else:
+            logger.warning(f"取消{action_name}动作文件!")
+            InfoBar.warning(
+                title="警告",
+                content=f"已取消{action_name}动作文件",
+                isClosable=True,
+                orient=Qt.Horizontal,
+                duration=3000,
+                position=InfoBarPosition.TOP_LEFT,
+                parent=self
+            )
     
-            with open(file_name, "w", encoding="utf-8") as json_file:
-                json.dump(data, json_file, indent=4, ensure_ascii=False)
-                logger.info("导出配置文件成功!")
+    def warn_action_file_task_running(self):
+        InfoBar.warning(
+            title="警告",
+            content="动作文件正在导入/导出, 请稍后再试!",
+            isClosable=True,
+            orient=Qt.Horizontal,
+            duration=3000,
+            position=InfoBarPosition.TOP_LEFT,
+            parent=self
+        )
     
     @check_robot_arm_connection
     @check_robot_arm_is_working
@@ -469,84 +525,87 @@ class TeachPage(QFrame, teach_page_frame):
         logger.debug(f"命令模式当前索引: {mode_index}")
         self.command_model = "SEQ" if mode_index == 0 else "INT"
         logger.warning(f"命令模式切换: {self.command_model} !")
-        command_model_payload = {"command": "set_robot_mode", "data": [self.command_model]}
-        command_model_payload_str = json.dumps(command_model_payload).replace(' ', "") + '\r\n'
-        self.command_queue.put(command_model_payload_str.encode('utf-8'))
+        if self.command_model == "INT":
+            logger.info(f"实时模式下示教动作按 {settings.INT_SETPOINT_RATE} Hz 的关节设定点流式下发")
+        self.command_queue.put(command_builder.set_robot_mode(self.command_model))
+        self.action_table_model.invalidate_durations()  # INT 模式不发送延时, 重新估算耗时
+    
+    def estimate_action_durations(self, rows):
+        """示教表格每行的预计耗时, 与执行时到位超时使用的估算一致"""
+        return action_durations(rows['joints'], rows['speed'], rows['delay'], self.blinx_robot_arm.joint_max_speeds,
+                                self.command_model, self.blinx_robot_arm.joint_max_accelerations)
     
-    def tale_action_thread(self, total_action_row: int):
-        """顺序执行示教动作线程"""
-        if total_action_row:
+    def compile_action_table(self, rows=None):
+        """在界面线程中对示教表格做一次快照, 编译为只读的执行计划
+
+        Args:
+            rows (list): 需要编译的行号, 默认编译全部动作
+
+        Returns:
+            CompiledProgram | None: 执行计划, 动作参数有误时提示并返回 None
+        """
+        if isinstance(self.action_file_task, ActionFileImportTask):
+            self.warn_action_file_task_running()  # 动作还没有导入完
+            return None
+        actions = self.action_table_model.teach_actions(rows)
+        try:
+            return CompiledProgram.compile(actions, self.blinx_robot_arm, self.command_model)
+        except ValueError as e:
+            logger.error(e)
+            InfoBar.error(
+                title="错误",
+                content=str(e),
+                isClosable=True,
+                orient=Qt.Horizontal,
+                duration=3000,
+                position=InfoBarPosition.TOP_LEFT,
+                parent=self
+            )
+            return None
+
+    def tale_action_thread(self, program: CompiledProgram, loop_times: int = 1, dwell: float = 0.0):
+        """执行示教动作线程
+
+        只读取界面线程编译好的执行计划, 不访问表格控件, 循环执行不需要重新解析和编码命令。
+        顺序模式下按窗口流式下发: 控制器上最多保留 SEQ_STREAM_WINDOW 个未完成的动作,
+        收到到位上报后补发下一个动作, 动作总数不受控制器缓冲区限制。
+        实时模式下动作插值为 settings.INT_SETPOINT_RATE 频率的关节设定点定时下发,
+        过渡半径不为 0 的动作与前后动作连续过渡, 经过时不停顿。
+        多次循环按环形执行计划连续下发, 循环之间停留 dwell 秒。
+        """
+        if len(program):
+            robot_arm_session = self.get_robot_arm_session()
+            if robot_arm_session is None:
+                return
             self.update_table_action_task_status(status_flag=True)
-            logger.debug(f"动作总数: {total_action_row}")
-            for each_row in range(total_action_row):
-                if self.table_action_thread_flag:
-                    pub.subscribe(self._check_tale_action_thread_flag, 'tale_action_thread_flag')
-                    if self.command_model == "SEQ":
-                        logger.warning(f"【顺序执行】模式，机械臂正在发送第 {each_row + 1} 个动作")
-                    else:
-                        logger.warning(f"【立即执行】模式，机械臂正在执行第 {each_row + 1} 个动作")
-                    
-                    # 更新任务执行的进度条
-                    self.ProgressBar.setVal(100 * (each_row + 1) / total_action_row)
-                    
-                    # 构造机械臂执行动作的数据
-                    arm_payload_data, tool_type_data, delay_time = self.get_arm_action_payload(each_row)
-                    
-                    # 订阅机械臂的角度信息，判断是否到达目标位置
-                    logger.debug(f'运动状态: {self.move_status}')
-                    
-                    # 发送机械臂执行动作的命令
-                    json_command = {"command": "set_joint_angle_all_time", "data": arm_payload_data}
-                    str_command = json.dumps(json_command, use_decimal=True).replace(' ', "") + '\r\n'
-                    self.command_queue.put(str_command.encode())
-                
-                    # 控制末端工具动作的命令
-                    if tool_type_data[0] == "吸盘" and tool_type_data[1] != "":
-                        tool_status = 1 if tool_type_data[1] == "开" else 0
-                        json_command = {"command":"set_end_tool", "data": [1, tool_status]}
-                        str_command = json.dumps(json_command).replace(' ', "") + '\r\n'
-                        self.command_queue.put(str_command.encode())
-                        
-                    # SEQ 顺序模式下，发送延时命令，INT 模式不发送延时命令
-                    if self.command_model == 'SEQ' and delay_time != 0:
-                        set_delay_time = int(delay_time * 1000)
-                        if set_delay_time <= 30000:
-                            json_command = {"command": "set_time_delay", "data": [set_delay_time]}
-                            str_command = json.dumps(json_command).replace(' ', "") + '\r\n'
-                            self.command_queue.put(str_command.encode())
-                        else:
-                            logger.error("延时时间超过 30s, 请重新设置!")
-                            break
-                    
-                    # 根据动作是否到位，以及线程是否工作判断是否执行
-                    if self.command_model == "INT":
-                        pub.subscribe(self._check_tale_action_thread_flag, 'tale_action_thread_flag')
-                        delay_count = 0  # 动作超时计数器
-                        while not self.move_status and self.table_action_thread_flag and self.thread_is_on:
-                            time.sleep(0.1)
-                            pub.subscribe(self._joints_move_status, 'joints/move_status')  # 机械臂动作执行状态标识
-                            pub.subscribe(self._check_flag, 'thread_work_flag')  # 线程控制标识
-                            pub.subscribe(self._check_tale_action_thread_flag, 'tale_action_thread_flag')  # 示教线程运动标识
-                            
-                            logger.warning("等待上一个动作完成")
-                            delay_count += 1
-                            logger.debug(f"等待次数: {delay_count}")
-                            if delay_count >= 100:
-                                logger.warning("等待时间过长，默认完成!")
-                                self.move_status = True
-                                
-                            # 完成所有动作后，退出循环
-                            if each_row + 1 == total_action_row:
-                                logger.debug("所有动作执行完成")
-                                self.move_status = True
-                                
-                    self.move_status = False  # 单个动作执行完成后需要重置状态，否则无法进入 while 循环
-                    self.ProgressBar.setVal(0)  # 进度条清零
-                else:
-                    logger.warning("急停, 线程退出!")
-                    self.ProgressBar.setVal(0)  # 重置进度条
-                    self.update_table_action_task_status(status_flag=False)
-                    break
+            total_action_count = len(program) * loop_times
+            logger.debug(f"动作总数: {total_action_count}")
+            pub.subscribe(self._check_tale_action_thread_flag, 'tale_action_thread_flag')  # 示教线程运动标识
+            pub.subscribe(self._check_flag, 'thread_work_flag')  # 线程控制标识
+
+            blend_times = None
+            if self.command_model == "SEQ":
+                streamer = ProgramStreamer(robot_arm_session, window_size=self.SEQ_STREAM_WINDOW)
+            else:
+                trajectory = BlendedTrajectory(self.blinx_robot_arm, settings.INT_BLEND_PROFILE)
+                streamer = SetpointStreamer(robot_arm_session, rate=settings.INT_SETPOINT_RATE, trajectory=trajectory)
+                blend_plan = trajectory.plan(program, streamer.period)
+                blend_times = blend_plan["blend_times"]
+                logger.info(f"连续过渡 {blend_plan['blended_count']}/{len(program)} 个动作, 每次循环预计 "
+                            f"{blend_plan['cycle_time']:.3f} s(全部停稳 {blend_plan['stop_cycle_time']:.3f} s)")
+            loop_runner = ProgramLoopRunner(streamer, program, dwell, self.command_model, blend_times=blend_times)
+            start_degrees = [float(getattr(self, f'q{i}', 0)) for i in range(1, 7)]  # 从当前关节角度开始估算
+            completed = loop_runner.run(
+                loop_times, start_degrees,
+                is_running=lambda: self.table_action_thread_flag and self.thread_is_on,
+                on_progress=lambda done_count: self.ProgressBar.setVal(100 * done_count / total_action_count),  # 更新任务执行的进度条
+                on_cycle=lambda cycles, cycle_time: logger.info(f"第 {cycles}/{loop_times} 次循环完成, 耗时 {cycle_time:.3f} s")
+            )
+            if completed:
+                logger.info(f"示教动作执行完成: {streamer.stats()}, 循环耗时: {loop_runner.stats()}")
+            else:
+                logger.warning("急停, 线程退出!")
+            self.ProgressBar.setVal(0)  # 重置进度条
             self.update_table_action_task_status(status_flag=False)
         else:
             logger.warning("机械臂没有动作可以执行!")
@@ -560,17 +619,15 @@ class TeachPage(QFrame, teach_page_frame):
         """示教线程工作控制位"""
         self.table_action_thread_flag = flag
     
-    def _joints_move_status(self, move_status=True):
-        """订阅机械臂的关节运动状态"""
-        self.move_status = move_status
-    
     @check_robot_arm_connection
     @check_robot_arm_is_working
     @check_robot_arm_emergency_stop
     @Slot()
     def run_all_action(self):
         """顺序执行示教动作"""
-        if (total_row_count := self.ActionTableWidget.rowCount()) > 0:
+        if self.action_table_model.rowCount() > 0:
+            if (program := self.compile_action_table()) is None:
+                return
             InfoBar.success(
                 title="成功",
                 content="【顺序执行】任务开始",
@@ -580,7 +637,7 @@ class TeachPage(QFrame, teach_page_frame):
                 position=InfoBarPosition.TOP_LEFT,
                 parent=self
             )
-            run_all_action_thread = Worker(self.tale_action_thread, total_row_count)
+            run_all_action_thread = Worker(self.tale_action_thread, program)
             self.thread_pool.start(run_all_action_thread)
         else:
             InfoBar.warning(
@@ -593,50 +650,10 @@ class TeachPage(QFrame, teach_page_frame):
                 parent=self
             )
         
-    def get_arm_action_payload(self, row):
-        """获取机械臂示执行示教动作的角度数据
-
-        Args:
-            row (QTableWidget): 用户在示教界面，点击选中的行
-
-        Returns:
-            arm_payload_data (list): 机械臂的关节角度数据
-            tool_type_data (list): 末端工具的类型数据
-            delay_time (float): 执行动作需要的时间
-        """
-        angle_1 = float(self.ActionTableWidget.item(row, 0).text())
-        angle_2 = float(self.ActionTableWidget.item(row, 1).text())
-        angle_3 = float(self.ActionTableWidget.item(row, 2).text())
-        angle_4 = float(self.ActionTableWidget.item(row, 3).text())
-        angle_5 = float(self.ActionTableWidget.item(row, 4).text())
-        angle_6 = float(self.ActionTableWidget.item(row, 5).text())
-        speed_percentage = float(self.ActionTableWidget.item(row, 6).text())
-        type_of_tool = self.ActionTableWidget.cellWidget(row, 7).currentText()
-        tool_switch = self.ActionTableWidget.cellWidget(row, 8).currentText()
-        delay_time = float(self.ActionTableWidget.item(row, 9).text())  # 执行动作需要的时间
-        
-        # 机械臂执行命令
-        arm_payload = [speed_percentage, angle_1, angle_2, angle_3, angle_4, angle_5, angle_6]
-        tool_payload = [type_of_tool, tool_switch]
-        return arm_payload, tool_payload, delay_time
-
-    def robot_arm_step_action_thread(self, row):
+    def robot_arm_step_action_thread(self, program: CompiledProgram):
         """机械臂单次执行示教动作线程"""
         self.update_table_action_task_status(status_flag=True)
-        
-        arm_payload_data, tool_type_data, _ = self.get_arm_action_payload(row)
-        
-        json_command = {"command": "set_joint_angle_all_time", "data": arm_payload_data}
-        str_command = json.dumps(json_command, use_decimal=True).replace(' ', "") + '\r\n'
-        self.command_queue.put(str_command.encode())
-        
-        # 末端工具动作
-        if tool_type_data[0] == "吸盘" and tool_type_data[1] != "":
-            tool_status = 1 if tool_type_data[1] == "开" else 0
-            json_command = {"command":"set_end_tool", "data": [1, tool_status]}
-            str_command = json.dumps(json_command).replace(' ', "") + '\r\n'
-            self.command_queue.put(str_command.encode())
-
+        self.command_queue.put(program.step_payloads[0])  # 单次执行只发送运动和末端工具命令, 不发送延时
         self.update_table_action_task_status(status_flag=False)
         
     def update_table_action_task_status(self, status_flag=True):
@@ -656,7 +673,9 @@ class TeachPage(QFrame, teach_page_frame):
     def run_action_step(self):
         """单次执行选定的动作"""
         # 获取到选定的动作
-        if (selected_row := self.ActionTableWidget.currentRow()) >= 0:
+        if (selected_row := self.ActionTableWidget.currentIndex().row()) >= 0:
+            if (program := self.compile_action_table([selected_row])) is None:
+                return
             InfoBar.success(
                 title="成功",
                 content=f"【单次执行】正则执行第 {selected_row + 1} 个动作",
@@ -667,7 +686,7 @@ class TeachPage(QFrame, teach_page_frame):
                 parent=self
             )
             # 启动机械臂动作执行线程
-            run_action_step_thread = Worker(self.robot_arm_step_action_thread, selected_row)
+            run_action_step_thread = Worker(self.robot_arm_step_action_thread, program)
             self.thread_pool.start(run_action_step_thread)
         else:
             InfoBar.warning(
@@ -680,21 +699,9 @@ class TeachPage(QFrame, teach_page_frame):
                 parent=self
             )
 
-    def arm_action_loop_thread(self, loop_times):
-        """机械臂循环执行指定次数的示教动作线程"""
-        # 获取循环动作循环执行的次数
-        if (action_count := self.ActionTableWidget.rowCount()) > 0:
-            for loop_time in range(loop_times):
-                logger.warning(f"机械臂正在执行第 {loop_time + 1} 次循环动作")
-                if self.table_action_thread_flag:
-                    self.tale_action_thread(action_count)
-                    time.sleep(1)  # 循环组间的间隔时间
-                else:
-                    logger.warning("急停, 循环执行任务退出!")
-                    self.update_table_action_task_status(status_flag=False)
-                    break
-        else:
-            logger.warning("机械臂没有动作可以执行!")
+    def arm_action_loop_thread(self, program: CompiledProgram, loop_times, dwell=0.0):
+        """机械臂循环执行指定次数的示教动作线程, 各次循环连续下发, 循环之间停留 dwell 秒"""
+        self.tale_action_thread(program, loop_times, dwell)
     
     @check_robot_arm_connection
     @check_robot_arm_is_working
@@ -702,52 +709,25 @@ class TeachPage(QFrame, teach_page_frame):
     @Slot()
     def run_action_loop(self):
         """循环执行动作"""
-        if (row_count := self.ActionTableWidget.rowCount()) > 0:
+        if self.action_table_model.rowCount() > 0:
             if self.ActionLoopTimes.text().isdigit():
                 loop_times = int(self.ActionLoopTimes.text().strip())
+                dwell = float(self.ActionLoopDwellEdit.text() or 0)  # 循环间停留(秒)
+                if (program := self.compile_action_table()) is None:
+                    return
                 
-                # 顺序模式下，最多执行 400 条动作
-                # TODO: 需要优化，判断在顺序模式下，发送的一组任务是否完成，完成后再发送下一组任务
-                total_action_count = loop_times * row_count
-                if self.command_model == "SEQ":
-                    if total_action_count <= 400:
-                        
-                        InfoBar.success(
-                            title="成功",
-                            content="【循环执行】任务开始",
-                            orient=Qt.Horizontal,
-                            duration=3000,
-                            isClosable=True,
-                            position=InfoBarPosition.TOP_LEFT,
-                            parent=self
-                        )
-                        
-                        loop_work_thread = Worker(self.arm_action_loop_thread, loop_times)
-                        self.thread_pool.start(loop_work_thread)
-                    else:
-                        InfoBar.warning(
-                            title="警告",
-                            content=f"顺序模式下，最多执行 400 条动作\n当前 {total_action_count} 条，请减少循环次数!",
-                            isClosable=True,
-                            orient=Qt.Horizontal,
-                            duration=-1,
-                            position=InfoBarPosition.TOP,
-                            parent=self
-                        )
-                elif self.command_model == "INT":
-                    loop_work_thread = Worker(self.arm_action_loop_thread, loop_times)
-                    self.thread_pool.start(loop_work_thread)
-                    InfoBar.success(
-                            title="成功",
-                            content="【循环执行】任务开始",
-                            orient=Qt.Horizontal,
-                            duration=3000,
-                            isClosable=True,
-                            position=InfoBarPosition.TOP_LEFT,
-                            parent=self
-                        )
-                else:
-                    logger.error(f"未知命令模式: {self.command_model}")
+                # 两种命令模式都由 ProgramLoopRunner 连续下发: SEQ 按窗口流式下发动作, INT 按固定周期下发设定点
+                InfoBar.success(
+                    title="成功",
+                    content="【循环执行】任务开始",
+                    orient=Qt.Horizontal,
+                    duration=3000,
+                    isClosable=True,
+                    position=InfoBarPosition.TOP_LEFT,
+                    parent=self
+                )
+                loop_work_thread = Worker(self.arm_action_loop_thread, program, loop_times, dwell)
+                self.thread_pool.start(loop_work_thread)
             else:
                 InfoBar.warning(
                     title="警告",
@@ -775,38 +755,7 @@ class TeachPage(QFrame, teach_page_frame):
     @Slot()
     def add_item(self):
         """示教控制添加一行动作"""
-        speed_percentage = self.JointSpeedEdit.text()  # 速度值，暂定百分比
-        type_of_tool = self.ArmToolComboBox.currentText()  # 获取末端工具类型
-        
-        
-        
-        row_position = self.ActionTableWidget.rowCount()
-        self.ActionTableWidget.insertRow(row_position)
-        self.ActionTableWidget.setItem(row_position, 0, QTableWidgetItem(str(self.q1)))
-        self.ActionTableWidget.setItem(row_position, 1, QTableWidgetItem(str(self.q2)))
-        self.ActionTableWidget.setItem(row_position, 2, QTableWidgetItem(str(self.q3)))
-        self.ActionTableWidget.setItem(row_position, 3, QTableWidgetItem(str(self.q4)))
-        self.ActionTableWidget.setItem(row_position, 4, QTableWidgetItem(str(self.q5)))
-        self.ActionTableWidget.setItem(row_position, 5, QTableWidgetItem(str(self.q6)))
-        self.ActionTableWidget.setItem(row_position, 6, QTableWidgetItem(speed_percentage))
-        
-
-        # 工具列添加下拉选择框
-        arm_tool_combobox = ComboBox()
-        arm_tool_combobox.addItems(["", "夹爪", "吸盘"])
-        arm_tool_combobox.setCurrentText(type_of_tool)
-        self.ActionTableWidget.setCellWidget(row_position, 7, arm_tool_combobox)
-
-        # 开关列添加下拉选择框
-        arm_tool_control = ComboBox()
-        arm_tool_control.addItems(["", "关", "开"])
-        self.ActionTableWidget.setCellWidget(row_position, 8, arm_tool_control)
-        
-        # 获取延时长短
-        self.ActionTableWidget.setItem(row_position, 9, QTableWidgetItem(str(self.JointDelayTimeEdit.text())))
-        
-        # 备注列
-        self.ActionTableWidget.setItem(row_position, 10, QTableWidgetItem(""))
+        self.action_table_model.append_rows(self.current_action_row())
 
     @check_robot_arm_connection
     @check_robot_arm_is_working
@@ -816,16 +765,12 @@ class TeachPage(QFrame, teach_page_frame):
         """示教控制删除一行动作"""
         selected_rows = self.ActionTableWidget.selectionModel().selectedRows()
         delete_confirm_window = Dialog("⚠️警告", "确定要删除选择的动作吗？删除动作不可恢复(不选择动作，默认从最后一行开始删除)", parent=self)
-        if not selected_rows:
-            # 如果没有选中行，则删除最后一行
-            if delete_confirm_window.exec():
-                last_row = self.ActionTableWidget.rowCount() - 1
-                if last_row >= 0:
-                    self.ActionTableWidget.removeRow(last_row)
-        else:
-            if delete_confirm_window.exec():
-                for row in reversed(selected_rows):
-                    self.ActionTableWidget.removeRow(row.row())
+        if delete_confirm_window.exec():
+            if selected_rows:
+                self.action_table_model.remove_rows(index.row() for index in selected_rows)
+            elif (last_row := self.action_table_model.rowCount() - 1) >= 0:
+                # 如果没有选中行，则删除最后一行
+                self.action_table_model.remove_rows([last_row])
                     
                     
     @check_robot_arm_connection
@@ -836,29 +781,10 @@ class TeachPage(QFrame, teach_page_frame):
         """示教控制更新指定行的动作"""
         selected_rows = self.ActionTableWidget.selectionModel().selectedRows()
         if selected_rows:
-            for row in selected_rows:
-                for col in range(self.ActionTableWidget.columnCount()):
-                    if col == 0:
-                        self.update_table_cell(row.row(), col, self.q1)
-                    elif col == 1:
-                        self.update_table_cell(row.row(), col, self.q2)
-                    elif col == 2:
-                        self.update_table_cell(row.row(), col, self.q3)
-                    elif col == 3:
-                        self.update_table_cell(row.row(), col, self.q4)
-                    elif col == 4:
-                        self.update_table_cell(row.row(), col, self.q5)
-                    elif col == 5:
-                        self.update_table_cell(row.row(), col, self.q6)
-                    elif col == 6:
-                        self.update_table_cell(row.row(), col, self.JointSpeedEdit.text())
-                    elif col == 7:
-                        arm_tool_combobox = ComboBox()
-                        arm_tool_combobox.addItems(["", "夹爪", "吸盘"])
-                        arm_tool_combobox.setCurrentText(self.ArmToolComboBox.currentText())
-                        self.update_table_cell_widget(row.row(), col, arm_tool_combobox)
-                    elif col == 9:
-                        self.update_table_cell(row.row(), col, self.JointDelayTimeEdit.text())
+            rows = [index.row() for index in selected_rows]
+            for col, value in enumerate(self.current_action_values()):
+                if col != ActionTableModel.SWITCH_COLUMN:  # 开关列保持不变
+                    self.action_table_model.update_cells(rows, col, value)
         else:
             InfoBar.warning(
                 title="警告",
@@ -877,34 +803,11 @@ class TeachPage(QFrame, teach_page_frame):
         """更新选中的列"""
         selected_columns = self.ActionTableWidget.selectionModel().selectedColumns()
         if selected_columns:
+            action_values = self.current_action_values()
+            all_rows = range(self.action_table_model.rowCount())
             for col in selected_columns:
-                column_number = col.column()
-                for row in range(self.ActionTableWidget.rowCount()):
-                    if column_number == 0:
-                        self.update_table_cell(row, column_number, self.q1)
-                    elif column_number == 1:
-                        self.update_table_cell(row, column_number, self.q2)
-                    elif column_number == 2:
-                        self.update_table_cell(row, column_number, self.q3)
-                    elif column_number == 3:
-                        self.update_table_cell(row, column_number, self.q4)
-                    elif column_number == 4:
-                        self.update_table_cell(row, column_number, self.q5)
-                    elif column_number == 5:
-                        self.update_table_cell(row, column_number, self.q6)
-                    elif column_number == 6:
-                        self.update_table_cell(row, column_number, self.JointSpeedEdit.text())
-                    elif column_number == 7:
-                        arm_tool_combobox = ComboBox()
-                        arm_tool_combobox.addItems(["", "夹爪", "吸盘"])
-                        arm_tool_combobox.setCurrentText(self.ArmToolComboBox.currentText())
-                        self.update_table_cell_widget(row, column_number, arm_tool_combobox)
-                    elif column_number == 8:
-                        arm_tool_control = ComboBox()
-                        arm_tool_control.addItems(["", "关", "开"])
-                        self.update_table_cell_widget(row, column_number, arm_tool_control)
-                    elif column_number == 9:
-                        self.update_table_cell(row, column_number, self.JointDelayTimeEdit.text())
+                if (column_number := col.column()) < len(action_values):
+                    self.action_table_model.update_cells(all_rows, column_number, action_values[column_number])
         else:
             InfoBar.warning(
                 title="警告",
@@ -924,35 +827,13 @@ class TeachPage(QFrame, teach_page_frame):
     @Slot()
     def update_cell(self):
         """更新选中的单元格"""
-        selected_items = self.ActionTableWidget.selectedItems()
+        selected_items = self.ActionTableWidget.selectionModel().selectedIndexes()
         if selected_items:
             selected_row = selected_items[0].row()
             sellected_col = selected_items[0].column()
-            if sellected_col == 0:
-                self.update_table_cell(selected_row, sellected_col, self.q1)
-            elif sellected_col == 1:
-                self.update_table_cell(selected_row, sellected_col, self.q2)
-            elif sellected_col == 2:
-                self.update_table_cell(selected_row, sellected_col, self.q3)
-            elif sellected_col == 3:
-                self.update_table_cell(selected_row, sellected_col, self.q4)
-            elif sellected_col == 4:
-                self.update_table_cell(selected_row, sellected_col, self.q5)
-            elif sellected_col == 5:
-                self.update_table_cell(selected_row, sellected_col, self.q6)
-            elif sellected_col == 6:
-                self.update_table_cell(selected_row, sellected_col, self.JointSpeedEdit.text())
-            elif sellected_col == 7:
-                arm_tool_combobox = ComboBox()
-                arm_tool_combobox.addItems(["", "夹爪", "吸盘"])
-                arm_tool_combobox.setCurrentText(self.ArmToolComboBox.currentText())
-                self.update_table_cell_widget(selected_row, sellected_col, arm_tool_combobox)
-            elif sellected_col == 8:
-                arm_tool_control = ComboBox()
-                arm_tool_control.addItems(["", "关", "开"])
-                self.update_table_cell_widget(selected_row, sellected_col, arm_tool_control)
-            elif sellected_col == 9:
-                self.update_table_cell(selected_row, sellected_col, self.JointDelayTimeEdit.text())
+            action_values = self.current_action_values()
+            if sellected_col < len(action_values):
+                self.action_table_model.update_cells([selected_row], sellected_col, action_values[sellected_col])
         else:
             InfoBar.warning(
                 title="警告",
@@ -967,39 +848,95 @@ class TeachPage(QFrame, teach_page_frame):
     @Slot()
     def insert_row(self):
         """在当前行下插入一行"""
-        selected_row = self.ActionTableWidget.currentRow()
+        selected_row = self.ActionTableWidget.currentIndex().row()
         if selected_row >= 0:
-            row_position = selected_row + 1
-            self.ActionTableWidget.insertRow(row_position)
-            for col in range(self.ActionTableWidget.columnCount()):
-                if col == 0:
-                    self.update_table_cell(row_position, col, self.q1)
-                elif col == 1:
-                    self.update_table_cell(row_position, col, self.q2)
-                elif col == 2:
-                    self.update_table_cell(row_position, col, self.q3)
-                elif col == 3:
-                    self.update_table_cell(row_position, col, self.q4)
-                elif col == 4:
-                    self.update_table_cell(row_position, col, self.q5)
-                elif col == 5:
-                    self.update_table_cell(row_position, col, self.q6)
-                elif col == 6:
-                    self.update_table_cell(row_position, col, self.JointSpeedEdit.text())
-                elif col == 7:  
-                    # 工具列、开关列需要获取下拉框的选中值
-                    # 工具列添加下拉选择框
-                    arm_tool_combobox = ComboBox()
-                    arm_tool_combobox.addItems(["", "夹爪", "吸盘"])
-                    arm_tool_combobox.setCurrentText(self.ArmToolComboBox.currentText())
-                    self.update_table_cell_widget(row_position, col, arm_tool_combobox)
-                elif col == 8:
-                    # 开关列添加下拉选择框
-                    arm_tool_control = ComboBox()
-                    arm_tool_control.addItems(["", "关", "开"])
-                    self.update_table_cell_widget(row_position, col, arm_tool_control)
-                elif col == 9:
-                    self.update_table_cell(row_position, col, self.JointDelayTimeEdit.text())
+            self.action_table_model.insert_rows(selected_row + 1, self.current_action_row())
+    
+    @check_robot_arm_is_working
+    @Slot()
+    def optimize_actions(self):
+        """精简示教动作: 删除重复动作, 合并末端偏差在容差以内的连续动作"""
+        if self.action_file_task is not None:
+            self.warn_action_file_task_running()
+            return
+        optimize_dialog = ProgramOptimizeDialog(self)
+        if not optimize_dialog.exec():
+            return
+        optimizer = ProgramOptimizer(self.blinx_robot_arm, optimize_dialog.position_tolerance(),
+                                     optimize_dialog.orientation_tolerance())
+        rows, notes, report = optimizer.optimize(*self.action_table_model.snapshot())
+        logger.info(f"示教动作优化: {report}")
+        if report["rows_after"] == report["rows_before"]:
+            InfoBar.info(
+                title="提示",
+                content="没有可以精简的动作",
+                isClosable=True,
+                orient=Qt.Horizontal,
+                duration=3000,
+                position=InfoBarPosition.TOP_LEFT,
+                parent=self
+            )
+            return
+        confirm_window = Dialog(
+            "优化动作",
+            f"动作数量: {report['rows_before']} -> {report['rows_after']}"
+            f"(删除重复动作 {report['duplicates_removed']} 个, 合并动作 {report['simplified_removed']} 个)\n"
+            f"预计每次循环节省 {report['time_saved']:.1f} 秒: "
+            f"{report['cycle_time_before']:.1f} s -> {report['cycle_time_after']:.1f} s\n"
+            f"确定用优化后的动作替换表格中的动作吗？",
+            parent=self
+        )
+        if confirm_window.exec():
+            self.action_table_model.clear()
+            self.action_table_model.append_rows(rows, notes)
+    
+    @Slot()
+    def dry_run_actions(self):
+        """空跑估算: 不运动机械臂, 按执行计划估算执行示教动作的耗时"""
+        if (program := self.compile_action_table()) is None:
+            return
+        if not len(program):
+            InfoBar.warning(
+                title="警告",
+                content="没有动作可以执行, 请添加动作!",
+                isClosable=True,
+                orient=Qt.Horizontal,
+                duration=3000,
+                position=InfoBarPosition.TOP_LEFT,
+                parent=self
+            )
+            return
+        loop_times = int(self.ActionLoopTimes.text()) if self.ActionLoopTimes.text().isdigit() else 1
+        dwell = float(self.ActionLoopDwellEdit.text() or 0)
+        start_degrees = [float(getattr(self, f'q{i}', 0)) for i in range(1, 7)]
+        result = program.dry_run(loop_times, start_degrees, dwell)
+        logger.info(f"空跑估算: 每次循环 {result['cycle_time']:.3f} s, 循环 {loop_times} 次共 {result['total_time']:.3f} s")
+        content = (f"动作数量: {len(program)}, 末端行程: {result['tool_travel'].sum():.0f} mm\n"
+                   f"第一次循环(从当前位置出发): {result['first_cycle_time']:.1f} s\n"
+                   f"每次循环: {result['cycle_time']:.1f} s\n"
+                   f"循环 {loop_times} 次共: {result['total_time']:.1f} s")
+        if self.command_model == "INT":
+            blend_plan = BlendedTrajectory(self.blinx_robot_arm, settings.INT_BLEND_PROFILE).plan(
+                program, 1 / settings.INT_SETPOINT_RATE)
+            content += (f"\n实时模式连续过渡 {blend_plan['blended_count']} 个动作, 每次循环约 {blend_plan['cycle_time']:.1f} s"
+                        f"(全部停稳 {blend_plan['stop_cycle_time']:.1f} s)")
+        if len(limit_rows := result['joint_limit_rows']):
+            row_numbers = ", ".join(str(row + 1) for row in limit_rows[:10])
+            content += f"\n⚠️第 {row_numbers}{' 等' if len(limit_rows) > 10 else ''} 个动作的关节角度超出限位!"
+        dry_run_window = MessageBox("空跑估算", content, self)
+        dry_run_window.yesButton.setText("确定")
+        dry_run_window.cancelButton.hide()
+        dry_run_window.exec()
+    
+    def current_action_values(self) -> list:
+        """界面上当前的动作参数, 按表格列的顺序(不含过渡、运动、备注列), 开关列为空"""
+        return [self.q1, self.q2, self.q3, self.q4, self.q5, self.q6, self.JointSpeedEdit.text(),
+                self.ArmToolComboBox.currentText(), "", self.JointDelayTimeEdit.text()]
+    
+    def current_action_row(self):
+        """由界面上当前的关节角度和动作参数创建一行动作"""
+        action_values = self.current_action_values()
+        return ActionTableModel.make_row(action_values[:6], *action_values[6:])
     
     @check_robot_arm_connection
     @check_robot_arm_is_working
@@ -1074,9 +1011,7 @@ class TeachPage(QFrame, teach_page_frame):
                 logger.error(f"第 {joint_number} 关节角度超出范围: {min_degrade} ~ {max_degrade}")
             else:
                 # 构造发送命令
-                command = json.dumps(
-                    {"command": "set_joint_angle", "data": [joint_number, speed_percentage, degrade]}, use_decimal=True) + '\r\n'
-                self.command_queue.put(command.encode())
+                self.command_queue.put(command_builder.set_joint_angle(joint_number, speed_percentage, degrade))
                 logger.debug(f"机械臂关节 {joint_number} 转动 {degrade} 度")
                 
                 #  录制操作激活时
@@ -1202,8 +1137,7 @@ class TeachPage(QFrame, teach_page_frame):
                 self.RobotArmStopButton.setText("急停")
                 self.RobotArmStopButton.setEnabled(True)
                 
-        command = json.dumps({"command": "set_joint_initialize", "data": [0]}).replace('', "") + '\r\n'
-        self.command_queue.put(command.encode())
+        self.command_queue.put(command_builder.SET_JOINT_INITIALIZE)
         self.JointDelayTimeEdit.setText("0")  # 复位时延时时间设置为 0
         self.table_action_thread_flag = True
         
@@ -1225,8 +1159,7 @@ class TeachPage(QFrame, teach_page_frame):
     @Slot()
     def reset_to_zero(self):
         """机械臂回零"""
-        command = json.dumps({"command": "set_joint_angle_all", "data": [100, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0]}).replace(' ', "") + '\r\n'
-        self.command_queue.put(command.encode())
+        self.command_queue.put(command_builder.set_joint_angle_all(100, (0.0, 0.0, 0.0, 0.0, 0.0, 0.0)))
         self.JointDelayTimeEdit.setText("0")  # 归零时延时时间设置为 0
         InfoBar.warning(
             title="⚠️警告",
@@ -1243,10 +1176,13 @@ class TeachPage(QFrame, teach_page_frame):
     @Slot()
     def stop_robot_arm_emergency(self):
         """机械臂急停"""
-        # 发送急停命令
-        emergency_stop_command = json.dumps({"command": "set_joint_emergency_stop", "data": [0]}).replace(' ', "") + '\r\n'
-        with self.get_robot_arm_connector() as robot_arm_connector:
-            robot_arm_connector.send(emergency_stop_command.encode())
+        # 优先通过预先建立的急停连接直接发送, 不等待命令队列和配置文件读取
+        try:
+            self.emergency_stop_channel.stop()
+        except ConnectionError as e:
+            logger.error(f"{e}, 改用会话连接发送急停命令")
+            self.get_robot_arm_session().send(command_builder.SET_JOINT_EMERGENCY_STOP)
+        self.command_queue.queue.clear()  # 丢弃尚未发送的运动命令
         
         # 重置线程工作状态
         pub.sendMessage('tale_action_thread_flag', flag=False)  # 示教线程标志位设置为 False
@@ -1277,13 +1213,13 @@ class TeachPage(QFrame, teach_page_frame):
         type_of_tool = self.ArmToolComboBox.currentText()
         if type_of_tool == "吸盘":
             if isChecked:
-                command = json.dumps({"command":"set_end_tool", "data": [1, 1]}) + '\r\n'
+                command = command_builder.set_end_tool(1, 1)
                 logger.warning("吸盘开启!")
             else:
-                command = json.dumps({"command":"set_end_tool", "data": [1, 0]}) + '\r\n'
+                command = command_builder.set_end_tool(1, 0)
                 logger.warning("吸盘关闭!")
                 
-            self.command_queue.put(command.encode())
+            self.command_queue.put(command)
         else:
             InfoBar.warning(
                 title="警告",
@@ -1319,6 +1255,17 @@ class TeachPage(QFrame, teach_page_frame):
         else:
             new_coordinate = old_coordinate - change_value
 
+        # 目标超出可达空间时，将步长截断到可达空间边界
+        start_position = [self._decimal_exp(coordinates[k]) for k in ('x', 'y', 'z')]
+        coordinates[axis] = new_coordinate
+        target_position = [self._decimal_exp(coordinates[k]) for k in ('x', 'y', 'z')]
+        clamped_position = target_position
+        if self.reachability_index is not None:
+            clamped_position = self.reachability_index.clamp_step(start_position, target_position)
+        if not np.allclose(clamped_position, target_position):
+            new_coordinate = self._decimal_round(clamped_position['xyz'.index(axis)] * 1000)
+            logger.warning(f"末端工具目标坐标超出可达空间, 截断到 {axis.upper()}: {new_coordinate}")
+
         logger.debug(f"末端工具, 目标坐标 {axis.upper()}: {new_coordinate}")
 
         # 通过逆解算出机械臂各个关节角度值
@@ -1509,15 +1456,6 @@ class TeachPage(QFrame, teach_page_frame):
                 parent=self
             )
     
-    # 一些 qt 界面的常用的抽象操作
-    def update_table_cell_widget(self, row, col, widget):
-        """更新表格指定位置的小部件"""
-        self.ActionTableWidget.setCellWidget(row, col, widget)
-    
-    def update_table_cell(self, row, col, value):
-        """更新表格指定位置的项"""
-        self.ActionTableWidget.setItem(row, col, QTableWidgetItem(str(value)))
-    
     def initJointControlWidiget(self):
         """分段导航栏添加子页面控件"""
         self.addSubInterface(self.ArmAngleControlCard, 'ArmAngleControlCard', '关节角度控制')
@@ -1634,12 +1572,10 @@ class TeachPage(QFrame, teach_page_frame):
     def construct_and_send_command(self, joint_degrees, speed_percentage):
         """构造逆解后的发送命令"""
         if joint_degrees is not None:
-            speed_degree_data = [speed_percentage]
-            speed_degree_data.extend(joint_degrees)
-            command = json.dumps({"command": "set_joint_angle_all_time", "data": speed_degree_data}, use_decimal=True).replace(' ', "") + '\r\n'
+            command = command_builder.set_joint_angle_all_time(speed_percentage, joint_degrees)
             logger.debug(f"逆解后的所有关节角度值: {list(map(lambda d: float(d), joint_degrees))}")
             # 发送命令
-            self.command_queue.put(command.encode())
+            self.command_queue.put(command)
         else:
             logger.warning("关节运动范围超出超限!")
             InfoBar.warning(
@@ -1658,24 +1594,36 @@ class TeachPage(QFrame, teach_page_frame):
         x_coordinate, y_coordinate, z_coordinate = map(self._decimal_exp, [x_coordinate, y_coordinate, z_coordinate])
         logger.debug(f"缩小后的末端工具坐标: {x_coordinate}, {y_coordinate}, {z_coordinate}")
         logger.debug(f"末端工具姿态: {rx_pose}, {ry_pose}, {rz_pose}")
+        # 明显超出可达空间的目标直接拒绝，不进入逆解迭代
+        if (self.reachability_index is not None
+                and not self.reachability_index.is_reachable((x_coordinate, y_coordinate, z_coordinate))):
+            logger.warning(f"末端工具目标位置超出可达空间: {x_coordinate}, {y_coordinate}, {z_coordinate}")
+            return None
+
         R_T = SE3([x_coordinate, y_coordinate, z_coordinate]) * rpy2tr([float(rx_pose), float(ry_pose), float(rz_pose)], unit='deg', order='zyx')
-        sol = self.blinx_robot_arm.ikine_LM(R_T, joint_limits=True)
-        if sol.success:
-            joint_degrees = [self._decimal_round(degrees(d)) for d in sol.q]
+
+        # 以当前关节角度为初值求解，优先解析逆解，失败后退回数值逆解
+        current_joints = np.radians([float(getattr(self, f'q{i}', 0)) for i in range(1, 7)])
+        ikine_result = self.ikine_service.solve(R_T, current_joints)
+        logger.debug(f"逆解方式: {ikine_result.method}, 迭代次数: {ikine_result.iterations}, 耗时: {ikine_result.solve_time:.3f} ms")
+
+        if ikine_result.success:
+            joint_degrees = [self._decimal_round(degrees(d)) for d in ikine_result.q]
         else:
+            logger.warning(f"逆解失败: {ikine_result.reason}")
             joint_degrees = None
         
         return joint_degrees
     
     @logger.catch
-    def get_robot_arm_connector(self):
-        """获取与机械臂的连接对象"""
+    def get_robot_arm_session(self):
+        """获取与机械臂的长连接会话"""
         try:
             socket_info = shelve.open(str(settings.IP_PORT_INFO_FILE_PATH))
             host = socket_info['target_ip']
             port = int(socket_info['target_port'])
             if host and port:
-                robot_arm_client = ClientSocket(host, port)
+                robot_arm_session = RobotArmSession.get(host, port)
             else:
                 logger.error("IP 和 Port 信息为空!")
                 InfoBar.warning(
@@ -1700,45 +1648,40 @@ class TeachPage(QFrame, teach_page_frame):
             )
         finally:
             socket_info.close()
-        return robot_arm_client
+        return robot_arm_session
     
     def get_current_cmd_model(self):
         """连接上机械臂后，获取当前的命令模式并更新"""
         pub.subscribe(self._get_robot_arm_connect_status, 'robot_arm_connect_status')
         if self.robot_arm_is_connected:
-            get_cmd_model_payload = json.dumps({"command": "get_robot_mode"}).replace(' ', "") + '\r\n'
-            
-            with self.get_robot_arm_connector() as conn:
-                conn.send(get_cmd_model_payload.encode())
-                try:
-                    cmd_model_str = conn.recv(1024).decode()
-                    cmd_model = json.loads(cmd_model_str)['data']
-                    logger.debug(f"机械臂当前的命令模式为: {cmd_model}")
-                    
-                    if cmd_model == "SEQ":
-                        logger.warning(f"机械臂当前为 SEQ 顺序模式!")
-                        self.CommandModeComboBox.setCurrentIndex(0)
-                        self.command_model = "SEQ"
-                    else:
-                        logger.warning(f"机械臂当前为 INT 实时模式!")
-                        self.CommandModeComboBox.setCurrentIndex(1)
-                        self.command_model = "INT"
-                        
-                    logger.warning("更新机械臂命令模式定时器停止!")
-                    self.update_connect_status_timer.stop()
+            try:
+                cmd_model = self.get_robot_arm_session().request(command_builder.GET_ROBOT_MODE, expect='get_robot_mode')['data']
+                logger.debug(f"机械臂当前的命令模式为: {cmd_model}")
+                
+                if cmd_model == "SEQ":
+                    logger.warning(f"机械臂当前为 SEQ 顺序模式!")
+                    self.CommandModeComboBox.setCurrentIndex(0)
+                    self.command_model = "SEQ"
+                else:
+                    logger.warning(f"机械臂当前为 INT 实时模式!")
+                    self.CommandModeComboBox.setCurrentIndex(1)
+                    self.command_model = "INT"
                     
-                except Exception as e:
-                    logger.exception(str(e))
-                    InfoBar.error(
-                        title="错误",
-                        content="获取机械臂命令模式失败!",
-                        isClosable=True,
-                        orient=Qt.Horizontal,
-                        duration=3000,
-                        position=InfoBarPosition.TOP,
-                        parent=self
-                    )
+                logger.warning("更新机械臂命令模式定时器停止!")
+                self.update_connect_status_timer.stop()
                 
+            except Exception as e:
+                logger.exception(str(e))
+                InfoBar.error(
+                    title="错误",
+                    content="获取机械臂命令模式失败!",
+                    isClosable=True,
+                    orient=Qt.Horizontal,
+                    duration=3000,
+                    position=InfoBarPosition.TOP,
+                    parent=self
+                )
+            
     def get_robot_arm_connect_status_timer(self):
         """获取机械臂连接状态的定时器"""
         pub.subscribe(self._get_robot_arm_connect_status, 'robot_arm_connect_status')
@@ -1787,6 +1730,7 @@ class TeachPage(QFrame, teach_page_frame):
         self.JointFourEdit.setValidator(only_float_validator)
         self.JointFiveEdit.setValidator(only_float_validator)
         self.JointSixEdit.setValidator(only_float_validator)
+        self.ActionLoopDwellEdit.setValidator(only_float_validator)  # 循环间停留时间
         
         # 坐标控制正则过滤
         self.XAxisEdit.setValidator(only_float_validator)
@@ -1817,10 +1761,16 @@ class TeachPage(QFrame, teach_page_frame):
         self.ActionTableWidget.setItemDelegateForColumn(5, ColumnSixdelegate)
         self.ActionTableWidget.setItemDelegateForColumn(6, ColumnSpeeddelegate)
         self.ActionTableWidget.setItemDelegateForColumn(9, ColumnDelayTimedelegate)
+        self.ActionTableWidget.setItemDelegateForColumn(7, ComboBoxDelegate(ActionTableModel.TOOL_OPTIONS, parent=self))
+        self.ActionTableWidget.setItemDelegateForColumn(8, ComboBoxDelegate(ActionTableModel.SWITCH_OPTIONS, parent=self))
+        self.ActionTableWidget.setItemDelegateForColumn(ActionTableModel.BLEND_COLUMN, BlendRadiusDelegate(parent=self))
+        self.ActionTableWidget.setItemDelegateForColumn(ActionTableModel.MOTION_COLUMN,
+                                                        ComboBoxDelegate(ActionTableModel.MOTION_OPTIONS, parent=self))
         
 class ConnectPage(QFrame, connect_page_frame):
     """连接配置页面"""
-    def __init__(self, page_name: str, thread_pool: QThreadPool, command_queue: Queue, joints_angle_queue: Queue):
+    def __init__(self, page_name: str, thread_pool: QThreadPool, command_queue: Queue, joints_angle_queue: Queue,
+                 emergency_stop_channel: EmergencyStopChannel):
         super().__init__()
         self.setupUi(self)
         self.setObjectName(page_name.replace(' ', '-'))
@@ -1830,6 +1780,7 @@ class ConnectPage(QFrame, connect_page_frame):
         self.thread_pool = thread_pool
         self.command_queue = command_queue
         self.joints_angle_queue = joints_angle_queue
+        self.emergency_stop_channel = emergency_stop_channel
         
         self.init_task_thread()
         self.init_input_validator()
@@ -1878,10 +1829,8 @@ class ConnectPage(QFrame, connect_page_frame):
         self.WiFiPasswordLineEdit.setValidator(password_validator)
         
     def init_task_thread(self):
-        """初始化后台线程任务"""
-        self.angle_degree_thread = AgnleDegreeWatchTask(self.joints_angle_queue)
-        self.command_sender_thread = CommandSenderTask(self.command_queue)
-        self.command_recver_thread = CommandReceiverTask()
+        """初始化后台任务: 命令发送与数据接收由会话的 I/O 线程完成"""
+        self.robot_arm_data_router = RobotArmDataRouter(self.command_queue, self.joints_angle_queue)
     
     # 机械臂连接配置回调函数
     def reload_ip_port_history(self):
@@ -2091,10 +2040,11 @@ class ConnectPage(QFrame, connect_page_frame):
             )
             raise KeyError("IP 或 Port 信息未填写!")
         else:
-            robot_arm_client = ClientSocket(host, port)
-            with robot_arm_client as rac:
-                remote_address = rac.getpeername()
-                logger.info("机械臂连接成功!")
+            # 建立长连接会话, 之后所有命令与上报数据共用这条连接
+            remote_address = RobotArmSession.get(host, port).getpeername()
+            if not self.emergency_stop_channel.open(host, port):
+                logger.warning("急停连接建立失败, 急停命令将通过会话连接发送")
+            logger.info("机械臂连接成功!")
             return remote_address
         
         finally:
@@ -2122,6 +2072,9 @@ class ConnectPage(QFrame, connect_page_frame):
         # 关闭线程池
         pub.sendMessage("thread_work_flag", flag=False)
         pub.sendMessage("robot_arm_connect_status", status=False)
+        self.robot_arm_data_router.stop()
+        self.emergency_stop_channel.close()
+        RobotArmSession.close_all()
         
         InfoBar.warning(
             title='连接断开',
@@ -2141,24 +2094,15 @@ class ConnectPage(QFrame, connect_page_frame):
         self.init_task_thread()
     
     def start_sender_recv_threads(self):
-        """启动命令发送与命令接收线程"""
-        # 启用实时获取机械臂角度线程
+        """启动命令发送与数据接收, 由会话的 I/O 线程在 socket 可读或命令写入时唤醒处理"""
         self.joints_angle_queue.queue.clear()  # 清空队列
-        self.thread_pool.start(self.angle_degree_thread)
-        logger.info("后台获取机械臂角度启动!")
-                
-        # 启用轮询队列中所有命令的线程
         self.command_queue.queue.clear()  # 清空队列
-        self.thread_pool.start(self.command_sender_thread)
-        logger.info("命令发送线程启动!")
-                
-        # 启动命令接收线程
-        self.thread_pool.start(self.command_recver_thread)
-        logger.info("命令接收线程启动!")
+        self.robot_arm_data_router.start(self.get_robot_arm_session())
+        logger.info("命令发送与数据接收启动!")
         
     @logger.catch
-    def get_robot_arm_connector(self):
-        """获取与机械臂的连接对象"""
+    def get_robot_arm_session(self):
+        """获取与机械臂的长连接会话"""
         try:
             socket_info = shelve.open(str(settings.IP_PORT_INFO_FILE_PATH))
             host = socket_info['target_ip']
@@ -2166,24 +2110,27 @@ class ConnectPage(QFrame, connect_page_frame):
         except KeyError:
             raise KeyError("IP 或 Port 信息未填写!")
         else:
-             robot_arm_client = ClientSocket(host, port)
+             robot_arm_session = RobotArmSession.get(host, port)
         finally:
             socket_info.close()
         
-        return robot_arm_client
+        return robot_arm_session
             
     
 class BlinxRobotArmControlWindow(MSFluentWindow):
     """上位机主窗口"""    
     def __init__(self):
         super().__init__()
-        self.command_queue = Queue()  # 控件发送的命令队列
+        self.command_queue = CommandQueue()  # 控件发送的命令队列, 写入时唤醒会话的 I/O 线程
         self.joints_angle_queue = Queue()  # 查询到关节角度信息的队列
+        self.emergency_stop_channel = EmergencyStopChannel()  # 急停专用连接, 不经过命令队列
         self.threadpool = QThreadPool()
         self.threadpool.globalInstance()
+        # 关节角度更新线程常驻占用一个线程, 单核机器上默认只有一个线程, 其他后台任务会一直排队
+        self.threadpool.setMaxThreadCount(max(self.threadpool.maxThreadCount(), 4))
         self.commandInterface = CommandPage('命令控制')
-        self.teachInterface = TeachPage('示教控制', self.threadpool, self.command_queue, self.joints_angle_queue)
-        self.connectionInterface = ConnectPage('连接设置', self.threadpool, self.command_queue, self.joints_angle_queue)
+        self.teachInterface = TeachPage('示教控制', self.threadpool, self.command_queue, self.joints_angle_queue, self.emergency_stop_channel)
+        self.connectionInterface = ConnectPage('连接设置', self.threadpool, self.command_queue, self.joints_angle_queue, self.emergency_stop_channel)
         
         self.initNavigation()
         self.initWindow()
@@ -2234,6 +2181,7 @@ class BlinxRobotArmControlWindow(MSFluentWindow):
         pub.sendMessage("thread_work_flag", flag=False)
         pub.sendMessage("update_joint_angles_thread_flag", flag=False)
         pub.sendMessage("robot_arm_connect_status", status=False)
+        self.emergency_stop_channel.close()
         logger.warning("程序退出")
         return super().closeEvent(e)    
     
@@ -0,0 +1,48 @@
+"""命令构造耗时对比: json.dumps + replace + encode vs common.command_builder
+
+运行方式: python tests/benchmark_command_builder.py [每种命令的构造次数]
+"""
+import sys
+import timeit
+from decimal import Decimal
+from pathlib import Path
+sys.path.append(str(Path(__file__).absolute().parent.parent))
+
+import simplejson as json
+
+import common.command_builder as command_builder
+
+
+def legacy_command(payload, use_decimal=False):
+    return (json.dumps(payload, use_decimal=use_decimal).replace(' ', "") + '\r\n').encode()
+
+
+def run_benchmark(count=100000):
+    decimal_angles = [Decimal('12.345'), Decimal('-3.500'), Decimal('0.000'), Decimal('90.000'), Decimal('-45.125'), Decimal('7.001')]
+    float_angles = [float(angle) for angle in decimal_angles]
+    cases = (
+        ("逆解点动 set_joint_angle_all_time (Decimal)",
+         lambda: legacy_command({"command": "set_joint_angle_all_time", "data": [50] + decimal_angles}, use_decimal=True),
+         lambda: command_builder.set_joint_angle_all_time(50, decimal_angles)),
+        ("示教动作 set_joint_angle_all_time (float)",
+         lambda: legacy_command({"command": "set_joint_angle_all_time", "data": [50.0] + float_angles}, use_decimal=True),
+         lambda: command_builder.set_joint_angle_all_time(50.0, float_angles)),
+        ("关节点动 set_joint_angle",
+         lambda: legacy_command({"command": "set_joint_angle", "data": [1, Decimal('50'), Decimal('12.5')]}, use_decimal=True),
+         lambda: command_builder.set_joint_angle(1, Decimal('50'), Decimal('12.5'))),
+        ("末端工具 set_end_tool",
+         lambda: legacy_command({"command": "set_end_tool", "data": [1, 1]}),
+         lambda: command_builder.set_end_tool(1, 1)),
+        ("急停 set_joint_emergency_stop",
+         lambda: legacy_command({"command": "set_joint_emergency_stop", "data": [0]}),
+         lambda: command_builder.SET_JOINT_EMERGENCY_STOP),
+    )
+    print(f"{'命令':<44}{'旧方案 (us)':>12}{'command_builder (us)':>22}{'加速比':>8}")
+    for name, legacy, builder in cases:
+        legacy_time = min(timeit.repeat(legacy, number=count, repeat=3)) / count * 1e6
+        builder_time = min(timeit.repeat(builder, number=count, repeat=3)) / count * 1e6
+        print(f"{name:<44}{legacy_time:>12.2f}{builder_time:>22.2f}{legacy_time / builder_time:>8.1f}x")
+
+
+if __name__ == "__main__":
+    run_benchmark(*map(int, sys.argv[1:2]))
@@ -0,0 +1,107 @@
+"""急停延迟对比: 旧方案(读取配置 + 新建连接) / 会话连接(排在命令队列之后) / 急停专用连接
+
+运行方式: python tests/benchmark_emergency_stop.py [急停次数]
+测试期间后台不断向命令队列成批写入关节运动命令(模拟示教程序连续下发), 模拟器持续上报关节角度,
+统计从发出急停到模拟器收到急停命令的延迟。
+本机回环连接几乎没有建连开销, 旧方案在真实 WiFi 网络下还要额外付出握手耗时, 最坏等待 6 s 的连接超时。
+"""
+import sys
+import shelve
+import tempfile
+import threading
+import time
+from pathlib import Path
+sys.path.append(str(Path(__file__).absolute().parent.parent))
+
+from loguru import logger
+
+import common.command_builder as command_builder
+from common.socket_client import ClientSocket, CommandQueue, EmergencyStopChannel, LatencyHistogram, RobotArmSession
+from tests.robot_arm_simulator import RobotArmSimulator
+
+
+def wait_for(condition, timeout=30):
+    deadline = time.time() + timeout
+    while not condition() and time.time() < deadline:
+        time.sleep(0.001)
+    return condition()
+
+
+def start_background_load(simulator, session, command_queue):
+    """后台负载: 成批写入运动命令, 模拟器持续上报关节角度"""
+    running = threading.Event()
+    running.set()
+
+    def load():
+        i = 0
+        while running.is_set():
+            if command_queue.qsize() < 1000:
+                for _ in range(500):
+                    command_queue.put(command_builder.set_joint_angle_all_time(50, [i % 90, 0, 0, 0, 0, 0]))
+                    i += 1
+            simulator.push({"command": "get_joint_angle_all", "data": [0, 0, 0, 0, 0, 0]})
+            time.sleep(0.005)
+
+    session.attach_command_queue(command_queue)
+    threading.Thread(target=load, daemon=True).start()
+    return running
+
+
+def measure_stops(simulator, stop_count, send_stop):
+    """依次发出急停, 记录从发出到模拟器收到急停命令的延迟"""
+    latency = LatencyHistogram()
+    received = simulator.received_times.setdefault("set_joint_emergency_stop", [])
+    for _ in range(stop_count):
+        expected_count = len(received) + 1
+        start_time = time.perf_counter()
+        send_stop()
+        wait_for(lambda: len(received) >= expected_count)
+        latency.record(received[expected_count - 1] - start_time)
+        time.sleep(0.01)
+    return latency
+
+
+def legacy_stop(settings_file):
+    """旧方案: 每次急停读取配置文件并新建连接"""
+    with shelve.open(settings_file) as socket_info:
+        host, port = socket_info['target_ip'], int(socket_info['target_port'])
+    with ClientSocket(host, port) as conn:
+        conn.sendall(command_builder.SET_JOINT_EMERGENCY_STOP)
+
+
+def run_benchmark(stop_count=100):
+    logger.remove()
+    simulator = RobotArmSimulator()
+    session = RobotArmSession('127.0.0.1', simulator.port)
+    session.connect()
+    running = start_background_load(simulator, session, CommandQueue())
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        settings_file = str(Path(temp_dir) / "Socket_Info")
+        with shelve.open(settings_file) as socket_info:
+            socket_info['target_ip'], socket_info['target_port'] = '127.0.0.1', simulator.port
+        legacy = measure_stops(simulator, stop_count, lambda: legacy_stop(settings_file))
+    via_session = measure_stops(simulator, stop_count, lambda: session.send(command_builder.SET_JOINT_EMERGENCY_STOP))
+    channel = EmergencyStopChannel()
+    channel.open('127.0.0.1', simulator.port)
+    via_channel = measure_stops(simulator, stop_count, channel.stop)
+    channel.close()
+
+    running.clear()
+    session.close()
+    simulator.close()
+
+    print(legacy.format("旧方案: 读取配置 + 新建连接"))
+    print(via_session.format("会话连接: 排在命令队列之后"))
+    print(via_channel.format("急停专用连接"))
+    print(channel.latency["send"].format("急停专用连接 (写入 socket 耗时)"))
+    stats = channel.stats()
+    worst_ms = via_channel.summary()["max_ms"]
+    print(f"急停预算 {stats['latency_budget_ms']:.1f} ms, 最坏到达延迟 {worst_ms:.3f} ms, "
+          f"最坏写入耗时 {stats['latency']['send']['max_ms']:.3f} ms, 写入超出预算 {stats['budget_exceeded']} 次")
+    assert worst_ms < stats["latency_budget_ms"], "急停命令到达延迟超过预算"
+    assert stats["budget_exceeded"] == 0, "急停命令写入耗时超过预算"
+
+
+if __name__ == "__main__":
+    run_benchmark(*map(int, sys.argv[1:2]))
@@ -0,0 +1,39 @@
+"""批量正解 fkine_batch 与逐个 fkine + rpy 的耗时对比
+
+运行方式: python tests/benchmark_fkine_batch.py [样本数量] [逐个计算的抽样数量]
+逐个计算的耗时按抽样数量测量后线性外推到全部样本。
+"""
+import sys
+import time
+from pathlib import Path
+sys.path.append(str(Path(__file__).absolute().parent.parent))
+
+import numpy as np
+
+from common import settings
+from common.blinx_robot_module import Mirobot
+
+
+def run_benchmark(sample_count=100000, loop_sample_count=5000):
+    robot = Mirobot(settings.ROBOT_MODEL_CONFIG_FILE_PATH, param_type='MDH')
+    qlim = np.array([link.qlim for link in robot.links])
+    joints = np.random.default_rng(0).uniform(qlim[:, 0], qlim[:, 1], size=(sample_count, 6))
+
+    loop_start = time.perf_counter()
+    for q in joints[:loop_sample_count]:
+        translation_vector = robot.fkine(q)
+        translation_vector.t, translation_vector.rpy(unit='deg', order='zyx')
+    loop_cost = (time.perf_counter() - loop_start) / loop_sample_count * sample_count
+
+    batch_start = time.perf_counter()
+    robot.fkine_batch(joints, unit='deg')
+    batch_cost = time.perf_counter() - batch_start
+
+    print(f"样本数量: {sample_count}")
+    print(f"逐个 fkine 耗时(外推): {loop_cost:.3f} s")
+    print(f"fkine_batch 耗时: {batch_cost * 1000:.1f} ms")
+    print(f"加速比: {loop_cost / batch_cost:.0f}x")
+
+
+if __name__ == "__main__":
+    run_benchmark(*map(int, sys.argv[1:3]))
@@ -0,0 +1,88 @@
+"""遥测数据分帧对比: 旧的 decode/split/filter + 全量 JSON 解析 vs LineFramer
+
+运行方式: python tests/benchmark_frame_parser.py [帧数量]
+模拟控制器连续推送 get_joint_angle_all 与其他命令的响应, 数据按随机长度切块到达,
+调用方只关心 get_joint_angle_all。分别测试关心的帧占比不同、以及大帧被拆成很多小块到达的情况。
+"""
+import sys
+import random
+import time
+from pathlib import Path
+sys.path.append(str(Path(__file__).absolute().parent.parent))
+
+import simplejson as json
+
+from common.frame_parser import LineFramer
+
+
+def build_stream(frame_count, wanted_ratio, payload_size=6):
+    frames = []
+    for _ in range(frame_count):
+        if random.random() < wanted_ratio:
+            frames.append({"command": "get_joint_angle_all", "data": [round(random.uniform(-90, 90), 2) for _ in range(payload_size)]})
+        else:
+            frames.append({"command": "set_joint_angle", "data": [round(random.uniform(-90, 90), 2) for _ in range(payload_size)]})
+    return b''.join(json.dumps(frame).replace(' ', '').encode() + b'\r\n' for frame in frames)
+
+
+def split_chunks(stream, min_size=64, max_size=4096):
+    chunks, start = [], 0
+    while start < len(stream):
+        size = random.randint(min_size, max_size)
+        chunks.append(stream[start:start + size])
+        start += size
+    return chunks
+
+
+def run_legacy(chunks):
+    """复现旧方案: 每次读取单独 split, 跨读取的半帧拼接到 bytes 上, 所有帧都做 JSON 解析"""
+    matched, recv_buffer = 0, b''
+    for chunk in chunks:
+        recv_buffer += chunk
+        *lines, recv_buffer = recv_buffer.split(b'\r\n')
+        for line in filter(None, lines):
+            response = json.loads(line.decode('utf-8'))
+            if response.get('command') == 'get_joint_angle_all':
+                matched += 1
+    return matched
+
+
+def run_framer(chunks):
+    matched, framer = 0, LineFramer()
+    for chunk in chunks:
+        for frame in framer.feed(chunk):
+            if framer.command_name(frame) == 'get_joint_angle_all':
+                framer.decode(frame)
+                matched += 1
+    return matched, framer.stats()
+
+
+def compare(title, stream, chunks, frame_count):
+    start = time.perf_counter()
+    legacy_matched = run_legacy(chunks)
+    legacy_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    framer_matched, stats = run_framer(chunks)
+    framer_time = time.perf_counter() - start
+
+    assert legacy_matched == framer_matched and stats["overflows"] == 0
+    print(f"== {title}: {frame_count} 帧, {len(stream) / 1e6:.1f} MB, {len(chunks)} 次读取 ==")
+    for name, elapsed in (("旧方案", legacy_time), ("LineFramer", framer_time)):
+        print(f"{name:<12} {elapsed * 1000:8.1f} ms  {frame_count / elapsed:12.0f} 帧/s  {len(stream) / elapsed / 1e6:8.1f} MB/s")
+    print()
+
+
+def run_benchmark(frame_count=200000):
+    random.seed(0)
+    for wanted_ratio in (0.5, 0.1):
+        stream = build_stream(frame_count, wanted_ratio)
+        compare(f"关心的帧占 {wanted_ratio:.0%}", stream, split_chunks(stream), frame_count)
+
+    large_count = max(frame_count // 1000, 1)
+    stream = build_stream(large_count, 0.5, payload_size=20000)
+    compare("大帧按 1~4 KB 拆包到达", stream, split_chunks(stream, 1024, 4096), large_count)
+
+
+if __name__ == "__main__":
+    run_benchmark(*map(int, sys.argv[1:2]))
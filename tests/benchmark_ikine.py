@@ -0,0 +1,52 @@
+"""解析逆解 ikine_analytic 与数值逆解 ikine_LM 的耗时、成功率对比
+
+运行方式: python tests/benchmark_ikine.py [样本数量]
+"""
+import sys
+import time
+from pathlib import Path
+sys.path.append(str(Path(__file__).absolute().parent.parent))
+
+import numpy as np
+
+from common import settings
+from common.blinx_robot_module import Mirobot
+
+
+def sample_reachable_poses(robot: Mirobot, sample_count: int, seed=0):
+    """在关节限位内随机采样关节角度，并计算对应的末端位姿"""
+    rng = np.random.default_rng(seed)
+    qlim = np.array([link.qlim for link in robot.links])
+    joints = rng.uniform(qlim[:, 0], qlim[:, 1], size=(sample_count, 6))
+    poses = [robot.fkine(q) for q in joints]
+    return joints, poses
+
+
+def run_benchmark(sample_count=200):
+    robot = Mirobot(settings.ROBOT_MODEL_CONFIG_FILE_PATH, param_type='MDH')
+    joints, poses = sample_reachable_poses(robot, sample_count)
+
+    # 模拟点动: 当前关节角度为目标附近的角度
+    current_joints = joints + np.radians(1.0)
+
+    lm_success = 0
+    lm_start = time.perf_counter()
+    for pose in poses:
+        lm_success += robot.ikine_LM(pose, joint_limits=True).success
+    lm_cost = time.perf_counter() - lm_start
+
+    analytic_success = 0
+    analytic_start = time.perf_counter()
+    for pose, q0 in zip(poses, current_joints):
+        q_best, _ = robot.ikine_analytic(pose, q0)
+        analytic_success += q_best is not None
+    analytic_cost = time.perf_counter() - analytic_start
+
+    print(f"样本数量: {sample_count}")
+    print(f"ikine_LM       平均耗时: {lm_cost / sample_count * 1000:.3f} ms, 成功率: {lm_success / sample_count:.1%}")
+    print(f"ikine_analytic 平均耗时: {analytic_cost / sample_count * 1000:.3f} ms, 成功率: {analytic_success / sample_count:.1%}")
+    print(f"加速比: {lm_cost / analytic_cost:.1f}x")
+
+
+if __name__ == "__main__":
+    run_benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 200)
@@ -0,0 +1,124 @@
+"""命令发送与遥测数据延迟对比: 旧的 100 ms 轮询线程 vs RobotArmSession 的 I/O 线程
+
+运行方式: python tests/benchmark_io_latency.py [命令数量]
+旧方案按修改前 CommandSenderTask / AgnleDegreeWatchTask 的逻辑复现:
+每 100 ms 检查一次队列, 每条命令新建一次连接; 角度数据每 100 ms 读取一次 socket。
+"""
+import sys
+import random
+import socket
+import threading
+import time
+from pathlib import Path
+from queue import Queue
+sys.path.append(str(Path(__file__).absolute().parent.parent))
+
+import simplejson as json
+from loguru import logger
+
+from common.socket_client import ClientSocket, CommandQueue, LatencyHistogram, RobotArmSession
+from tests.robot_arm_simulator import RobotArmSimulator
+
+
+def telemetry_message():
+    return {"command": "get_joint_angle_all", "data": [time.perf_counter(), 0, 0, 0, 0, 0]}
+
+
+def wait_for(condition, timeout=30):
+    deadline = time.time() + timeout
+    while not condition() and time.time() < deadline:
+        time.sleep(0.005)
+
+
+def run_legacy(simulator, command_count):
+    """复现旧方案的轮询线程"""
+    command_queue, dispatch, telemetry = Queue(), LatencyHistogram(), LatencyHistogram()
+    running = True
+
+    def sender():
+        while running:
+            time.sleep(0.1)
+            if not command_queue.empty():
+                enqueue_time, command_str = command_queue.get()
+                with ClientSocket('127.0.0.1', simulator.port) as conn:
+                    conn.sendall(command_str)
+                dispatch.record(time.perf_counter() - enqueue_time)
+
+    def watcher():
+        with ClientSocket('127.0.0.1', simulator.port) as conn:
+            while running:
+                time.sleep(0.1)
+                try:
+                    response_str = conn.recv(65536).decode('utf-8')
+                except socket.timeout:
+                    continue
+                for line in filter(None, response_str.split('\r\n')):
+                    telemetry.record(time.perf_counter() - json.loads(line)['data'][0])
+
+    threads = [threading.Thread(target=sender, daemon=True), threading.Thread(target=watcher, daemon=True)]
+    for thread in threads:
+        thread.start()
+    wait_for(lambda: simulator.connections)
+    for i in range(command_count):
+        time.sleep(random.uniform(0.02, 0.15))  # 模拟点动按钮的点击间隔
+        command_queue.put((time.perf_counter(), json.dumps({"command": "set_joint_angle", "data": [1, 50, i]}).encode() + b'\r\n'))
+        simulator.push(telemetry_message())
+    wait_for(lambda: dispatch.summary()["count"] == command_count)
+    running = False
+    return dispatch, telemetry
+
+
+def run_session(simulator, command_count):
+    """I/O 线程方案"""
+    command_queue, telemetry = CommandQueue(), LatencyHistogram()
+    session = RobotArmSession('127.0.0.1', simulator.port)
+    session.subscribe('get_joint_angle_all', lambda response: telemetry.record(time.perf_counter() - response['data'][0]))
+    session.attach_command_queue(command_queue)
+    wait_for(lambda: simulator.connections)
+    for i in range(command_count):
+        time.sleep(random.uniform(0.02, 0.15))
+        command_queue.put(json.dumps({"command": "set_joint_angle", "data": [1, 50, i]}).encode() + b'\r\n')
+        simulator.push(telemetry_message())
+    wait_for(lambda: session.commands_sent == command_count)
+    dispatch = session.latency["dispatch"]
+    session.close()
+    return dispatch, telemetry
+
+
+def run_burst(command_count):
+    """示教动作连续入队: 每行依次写入关节运动、末端工具、延时三条命令"""
+    command_queue = CommandQueue()
+    simulator = RobotArmSimulator()
+    session = RobotArmSession('127.0.0.1', simulator.port)
+    session.connect()
+    session.attach_command_queue(command_queue)
+    start = time.perf_counter()
+    for i in range(command_count):
+        command_queue.put(json.dumps({"command": "set_joint_angle_all_time", "data": [50, i, 0, 0, 0, 0, 0]}).encode() + b'\r\n')
+        command_queue.put(json.dumps({"command": "set_end_tool", "data": [1, i % 2]}).encode() + b'\r\n')
+        command_queue.put(json.dumps({"command": "set_time_delay", "data": [100]}).encode() + b'\r\n')
+    wait_for(lambda: session.commands_sent == command_count * 3)
+    elapsed = time.perf_counter() - start
+    stats = session.stats()
+    session.close()
+    simulator.close()
+    print(f"== 批量入队 {command_count * 3} 条命令 ==")
+    print(f"耗时: {elapsed * 1000:.1f} ms, sendall 次数: {stats['batches_sent']}, "
+          f"平均每批 {stats['average_batch_commands']:.1f} 条 / {stats['average_batch_bytes']:.0f} 字节")
+
+
+def run_benchmark(command_count=100):
+    logger.remove()
+    for name, runner in (("旧方案(100 ms 轮询)", run_legacy), ("I/O 线程", run_session)):
+        simulator = RobotArmSimulator()
+        dispatch, telemetry = runner(simulator, command_count)
+        simulator.close()
+        print(f"== {name} ==")
+        print(dispatch.format("命令发送延迟"))
+        print(telemetry.format("遥测数据延迟"))
+        print()
+    run_burst(command_count * 10)
+
+
+if __name__ == "__main__":
+    run_benchmark(*map(int, sys.argv[1:2]))
@@ -0,0 +1,93 @@
+"""示教程序文件对比: JSON 动作文件 / 二进制程序文件(.bxp)
+
+运行方式: python tests/benchmark_program_file.py [动作数量 ...]  (默认 10000 1000000)
+统计文件大小, 以及加载为表格数据(动作数组 + 备注)的耗时:
+- JSON json.load: 整个文件读入后转换(旧的导入方式)
+- JSON 流式读取: ActionFileReader 逐条解析
+- 二进制内存映射: 只映射文件, 直接使用列视图
+- 二进制转换: 映射后转换为表格数据
+"""
+import sys
+import json
+import tempfile
+import time
+from pathlib import Path
+sys.path.append(str(Path(__file__).absolute().parent.parent))
+
+import numpy as np
+
+from common.action_file import ActionFileReader, ActionFileWriter
+from common.program_file import ProgramFileReader, write_program_file
+from componets.action_table_model import ActionTableModel
+
+
+def make_program(action_count):
+    rng = np.random.default_rng(0)
+    rows = ActionTableModel.make_rows(action_count)
+    rows['joints'] = np.round(rng.uniform(-90, 90, (action_count, 6)), 3)
+    rows['speed'] = rng.integers(1, 101, action_count)
+    rows['tool'] = 2
+    rows['switch'] = rng.integers(0, 3, action_count)
+    rows['delay'] = rng.integers(0, 3, action_count)
+    notes = ["" if i % 10 else f"第 {i // 10} 段" for i in range(action_count)]
+    return rows, notes
+
+
+def timed(function):
+    start_time = time.perf_counter()
+    result = function()
+    return time.perf_counter() - start_time, result
+
+
+def load_json(file_name):
+    with open(file_name, encoding="utf-8") as json_file:
+        return ActionTableModel.from_records(json.load(json_file))
+
+
+def load_json_streaming(file_name):
+    chunks = [ActionTableModel.from_records(records) for records in ActionFileReader(file_name).iter_chunks(2000)]
+    return np.concatenate([rows for rows, _ in chunks]), [note for _, notes in chunks for note in notes]
+
+
+def map_program(file_name):
+    with ProgramFileReader(file_name) as reader:
+        return reader.row_count, float(reader.columns['joints'][-1, 0])
+
+
+def load_program(file_name):
+    with ProgramFileReader(file_name) as reader:
+        return ActionTableModel.from_program_chunk((reader.columns, reader.notes()))
+
+
+def run_benchmark(action_counts=(10000, 1000000)):
+    for action_count in action_counts:
+        rows, notes = make_program(action_count)
+        with tempfile.TemporaryDirectory() as temp_dir:
+            json_file = str(Path(temp_dir) / "program.json")
+            program_file = str(Path(temp_dir) / "program.bxp")
+            json_write, _ = timed(lambda: _write_json(json_file, rows, notes))
+            program_write, _ = timed(lambda: write_program_file(program_file, ActionTableModel.to_program_columns(rows), notes))
+            json_size, program_size = Path(json_file).stat().st_size, Path(program_file).stat().st_size
+
+            print(f"{action_count} 个动作")
+            print(f"  文件大小: JSON {json_size / 1e6:.2f} MB, 二进制 {program_size / 1e6:.2f} MB ({json_size / program_size:.1f} 倍)")
+            print(f"  写入: JSON {json_write * 1000:.0f} ms, 二进制 {program_write * 1000:.0f} ms")
+            results = {}
+            for name, load in (("JSON json.load", load_json), ("JSON 流式读取", load_json_streaming),
+                               ("二进制内存映射", map_program), ("二进制转换", load_program)):
+                results[name], loaded = timed(lambda: load(json_file if name.startswith("JSON") else program_file))
+                print(f"  加载 {name}: {results[name] * 1000:.1f} ms")
+                if name != "二进制内存映射":
+                    np.testing.assert_array_equal(loaded[0], rows)
+                    assert loaded[1] == notes
+            print(f"  二进制加载比 json.load 快 {results['JSON json.load'] / results['二进制转换']:.0f} 倍")
+
+
+def _write_json(file_name, rows, notes):
+    with ActionFileWriter(file_name) as writer:
+        for record in ActionTableModel.records_from_rows(rows, notes):
+            writer.write(record)
+
+
+if __name__ == "__main__":
+    run_benchmark(*[tuple(map(int, sys.argv[1:]))] if len(sys.argv) > 1 else ())
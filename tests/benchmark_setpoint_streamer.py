@@ -0,0 +1,56 @@
+"""实时模式设定点流式下发的定时精度与生成开销
+
+运行方式: python tests/benchmark_setpoint_streamer.py [每个频率的运行秒数]
+对本地模拟器按 50 / 100 / 200 Hz 下发设定点, 统计实际发送时刻相对计划时刻的延迟、超时次数与总耗时的漂移;
+另外统计生成器流水线(插值 + 编码)每秒能产生的设定点数量, 需要远大于下发频率。
+"""
+import sys
+import time
+from pathlib import Path
+sys.path.append(str(Path(__file__).absolute().parent.parent))
+
+import numpy as np
+
+from common.setpoint_streamer import SetpointStreamer, encode_setpoints, interpolate_setpoints
+from common.socket_client import RobotArmSession
+from tests.robot_arm_simulator import RobotArmSimulator
+
+
+def make_waypoints(count, duration):
+    rng = np.random.default_rng(0)
+    for _ in range(count):
+        yield rng.uniform(-90, 90, 6), 50, b'', duration
+
+
+def run_pipeline_benchmark(waypoint_count=2000, rate=200):
+    start_time = time.perf_counter()
+    setpoint_count = sum(1 for _ in encode_setpoints(interpolate_setpoints(make_waypoints(waypoint_count, 0.5), 1 / rate, [0] * 6)))
+    elapsed = time.perf_counter() - start_time
+    print(f"流水线生成 {setpoint_count} 个设定点耗时 {elapsed:.3f} s, {setpoint_count / elapsed:.0f} 个/s")
+
+
+def run_rate_benchmark(rate, seconds):
+    simulator = RobotArmSimulator()
+    session = RobotArmSession.get('127.0.0.1', simulator.port)
+    session.connect()
+    try:
+        streamer = SetpointStreamer(session, rate=rate)
+        segment_count = max(int(seconds / 0.5), 1)
+        streamer.run(make_waypoints(segment_count, 0.5), [0] * 6)
+        stats = streamer.stats()
+        drift = stats["elapsed"] - stats["ticks"] / rate
+        print(f"{rate:>4} Hz: 设定点 {stats['setpoints_sent']}, 超时 {stats['deadline_misses']}, 重新同步 {stats['resyncs']}, "
+              f"总耗时漂移 {drift * 1000:.2f} ms")
+        print(streamer.send_lateness.format("  发送延迟"))
+    finally:
+        RobotArmSession.close_all()
+        simulator.close()
+
+
+if __name__ == '__main__':
+    from loguru import logger
+    logger.remove()
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 3.0
+    run_pipeline_benchmark()
+    for rate in (50, 100, 200):
+        run_rate_benchmark(rate, seconds)
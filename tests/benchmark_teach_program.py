@@ -0,0 +1,103 @@
+"""示教程序执行开销对比: 每次循环重新解析表格并编码命令 / 编译一次后只读取执行计划
+
+运行方式: python tests/benchmark_teach_program.py [动作数量] [循环次数] [空跑动作数量]
+旧方案每个动作都要从表格文本解析角度、速度、延时, 再编码命令和估算耗时; 编译后循环只迭代预先编码好的命令。
+另外统计大程序的空跑估算(每行耗时、时间线、末端行程、关节限位检查)耗时。
+"""
+import sys
+import time
+from pathlib import Path
+sys.path.append(str(Path(__file__).absolute().parent.parent))
+
+import numpy as np
+
+import common.command_builder as command_builder
+from common import settings
+from common.blinx_robot_module import Mirobot
+from common.program_loop import ProgramLoopRunner
+from common.teach_program import CompiledProgram, action_durations
+
+
+def make_table(action_count):
+    """模拟示教表格的文本内容: 6 个角度, 速度, 工具, 开关, 延时"""
+    rng = np.random.default_rng(0)
+    return [[f"{angle:.2f}" for angle in rng.uniform(-90, 90, 6)] + ["50", "吸盘", ("开", "关", "")[row % 3], "0.2"]
+            for row in range(action_count)]
+
+
+def legacy_moves(table, robot, loop_times):
+    """旧方案: 每次循环逐行解析表格文本并编码命令"""
+    start_degrees = [0.0] * 6
+    for _ in range(loop_times):
+        for cells in table:
+            target_degrees = [float(cell) for cell in cells[:6]]
+            speed_percentage, delay_time = float(cells[6]), float(cells[9])
+            commands = [command_builder.set_joint_angle_all_time(speed_percentage, target_degrees)]
+            expected_duration = robot.joint_move_time(start_degrees, target_degrees, speed_percentage)
+            start_degrees = target_degrees
+            if cells[7] == "吸盘" and cells[8] != "":
+                commands.append(command_builder.set_end_tool(1, 1 if cells[8] == "开" else 0))
+            if delay_time != 0:
+                commands.append(command_builder.set_time_delay(int(delay_time * 1000)))
+                expected_duration += delay_time
+            yield b''.join(commands), expected_duration
+
+
+def compile_table(table, robot):
+    actions = []
+    for cells in table:
+        tool_status = (1 if cells[8] == "开" else 0) if cells[7] == "吸盘" and cells[8] != "" else -1
+        actions.append(([float(cell) for cell in cells[:6]], float(cells[6]), tool_status, float(cells[9])))
+    return CompiledProgram.compile(actions, robot, "SEQ")
+
+
+def run_benchmark(action_count=20, loop_times=1000):
+    robot = Mirobot(settings.ROBOT_MODEL_CONFIG_FILE_PATH, param_type='MDH')
+    table = make_table(action_count)
+    total = action_count * loop_times
+
+    start_time = time.perf_counter()
+    for _ in legacy_moves(table, robot, loop_times):
+        pass
+    legacy_elapsed = time.perf_counter() - start_time
+
+    start_time = time.perf_counter()
+    program = compile_table(table, robot)
+    runner = ProgramLoopRunner(None, program)
+    compile_elapsed = time.perf_counter() - start_time
+    start_time = time.perf_counter()
+    for _ in runner.iter_moves(loop_times, [0.0] * 6):
+        pass
+    plan_elapsed = time.perf_counter() - start_time
+
+    print(f"{action_count} 个动作 x {loop_times} 次循环 = {total} 个动作")
+    print(f"逐行解析编码: {legacy_elapsed * 1000:.1f} ms ({legacy_elapsed / total * 1e6:.2f} us/动作)")
+    print(f"编译执行计划: {compile_elapsed * 1000:.2f} ms (只执行一次)")
+    print(f"读取执行计划: {plan_elapsed * 1000:.1f} ms ({plan_elapsed / total * 1e6:.2f} us/动作), "
+          f"加速 {legacy_elapsed / (compile_elapsed + plan_elapsed):.1f} 倍")
+
+
+def run_dry_run_benchmark(action_count=100000):
+    robot = Mirobot(settings.ROBOT_MODEL_CONFIG_FILE_PATH, param_type='MDH')
+    rng = np.random.default_rng(0)
+    actions = [(joints, 50.0, -1, 0.2) for joints in rng.uniform(-40, 40, (action_count, 6)).tolist()]
+    program = CompiledProgram.compile(actions, robot, "SEQ")
+
+    start_time = time.perf_counter()
+    durations = action_durations(program.actions['joints'], program.actions['speed'], program.actions['delay'],
+                                 robot.joint_max_speeds)
+    estimate_elapsed = time.perf_counter() - start_time
+    start_time = time.perf_counter()
+    result = program.dry_run(loop_times=100, start_degrees=[0.0] * 6)
+    dry_run_elapsed = time.perf_counter() - start_time
+
+    assert np.allclose(durations, program.durations)
+    print(f"{action_count} 个动作空跑估算")
+    print(f"表格每行耗时: {estimate_elapsed * 1000:.1f} ms")
+    print(f"空跑(时间线 + 末端行程 + 限位检查): {dry_run_elapsed * 1000:.1f} ms, "
+          f"每次循环 {result['cycle_time']:.0f} s, 100 次循环 {result['total_time'] / 3600:.1f} h")
+
+
+if __name__ == "__main__":
+    run_benchmark(*map(int, sys.argv[1:3]))
+    run_dry_run_benchmark(*map(int, sys.argv[3:4]))
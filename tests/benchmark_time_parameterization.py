@@ -0,0 +1,46 @@
+"""时间最优参数化的计算耗时与节省的时间
+
+运行方式: python tests/benchmark_time_parameterization.py [采样点数量]
+对一条弯曲的关节路径计算时间律并按 200 Hz 采样, 统计耗时;
+另外对随机示教程序比较 INT 模式下按速度估算(不含加减速)与按时间最优时间律估算的循环耗时。
+"""
+import sys
+import time
+from pathlib import Path
+sys.path.append(str(Path(__file__).absolute().parent.parent))
+
+import numpy as np
+
+from common import settings
+from common.blinx_robot_module import Mirobot
+from common.teach_program import move_durations
+
+
+def run_path_benchmark(robot, sample_count):
+    s = np.linspace(0, 1, sample_count)
+    path = np.stack([60 * np.sin(2 * np.pi * s), 40 * s, 30 * np.cos(3 * np.pi * s), 0 * s, 20 * s, -50 * s], axis=1)
+    start_time = time.perf_counter()
+    timing = robot.time_parameterization.parameterize(path)
+    parameterize_elapsed = time.perf_counter() - start_time
+    setpoints = robot.time_parameterization.sample(timing, 1 / 200)
+    sample_elapsed = time.perf_counter() - start_time - parameterize_elapsed
+    print(f"{sample_count} 个采样点: 时间律 {parameterize_elapsed * 1000:.1f} ms, 采样 {len(setpoints)} 个设定点 "
+          f"{sample_elapsed * 1000:.1f} ms, 路径耗时 {timing['duration']:.3f} s")
+
+
+def run_estimate_comparison(robot, action_count=1000):
+    joints = np.cumsum(np.random.default_rng(0).uniform(-8, 8, (action_count, 6)), axis=0)
+    speeds = np.full(action_count, 100.0)
+    start_time = time.perf_counter()
+    durations = robot.time_parameterization.move_durations(joints, speeds)
+    elapsed = time.perf_counter() - start_time
+    velocity_only = move_durations(joints, speeds, robot.joint_max_speeds)
+    print(f"{action_count} 个动作的耗时估算 {elapsed * 1000:.2f} ms; 循环耗时: 只按速度 {velocity_only.sum():.2f} s, "
+          f"含加减速(实际执行) {durations.sum():.2f} s")
+
+
+if __name__ == '__main__':
+    robot = Mirobot(settings.ROBOT_MODEL_CONFIG_FILE_PATH, param_type='MDH')
+    for sample_count in map(int, sys.argv[1:2] or (1000, 5000, 20000)):
+        run_path_benchmark(robot, sample_count)
+    run_estimate_comparison(robot)
@@ -0,0 +1,107 @@
+"""本地机械臂控制器模拟器, 用于会话与通信相关的测试和基准测试"""
+import queue
+import socket
+import threading
+import time
+
+import simplejson as json
+
+
+class RobotArmSimulator(object):
+    """模拟机械臂控制器: 对每条命令回复同类型的响应, 可主动断开连接
+
+    move_duration 不为 None 时模拟动作缓冲区: 运动命令进入缓冲区依次执行, 每个动作耗时 move_duration 秒,
+    完成后上报 move_in_place; 缓冲区超过 buffer_size 个动作时记录溢出。
+    """
+
+    MOTION_COMMANDS = ("set_joint_angle_all_time", "set_joint_angle_all")
+
+    def __init__(self, move_duration=None, buffer_size=400):
+        self.server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.server_socket.bind(('127.0.0.1', 0))
+        self.server_socket.listen(5)
+        self.port = self.server_socket.getsockname()[1]
+        self.accept_count = 0
+        self.received_commands = []
+        self.received_times = {}  # 命令类型 -> 收到该命令的时间(perf_counter)列表
+        self.connections = []
+        self.move_duration = move_duration
+        self.buffer_size = buffer_size
+        self.motion_buffer = queue.Queue()
+        self.max_buffered = 0
+        self.overflows = 0
+        self.moves_completed = 0
+        threading.Thread(target=self._accept_loop, daemon=True).start()
+        if move_duration is not None:
+            threading.Thread(target=self._motion_loop, daemon=True).start()
+
+    def _accept_loop(self):
+        while True:
+            try:
+                conn, _ = self.server_socket.accept()
+            except OSError:
+                return
+            conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)  # 避免 Nagle 与延迟确认叠加出 40 ms 的响应延迟
+            self.accept_count += 1
+            self.connections.append(conn)
+            threading.Thread(target=self._serve, args=(conn,), daemon=True).start()
+
+    def _serve(self, conn):
+        buffer = b''
+        while True:
+            try:
+                data = conn.recv(4096)
+            except OSError:
+                return
+            if not data:
+                return
+            buffer += data
+            *lines, buffer = buffer.split(b'\r\n')
+            for line in lines:
+                command = json.loads(line)
+                self.received_commands.append(command)
+                self.received_times.setdefault(command["command"], []).append(time.perf_counter())
+                if self.move_duration is not None and command["command"] in self.MOTION_COMMANDS:
+                    self.motion_buffer.put(conn)
+                    buffered = self.motion_buffer.qsize()
+                    self.max_buffered = max(self.max_buffered, buffered)
+                    if buffered > self.buffer_size:
+                        self.overflows += 1
+                response = {"command": command["command"], "data": command.get("data", "ok")}
+                try:
+                    conn.sendall(json.dumps(response).encode() + b'\r\n')
+                except OSError:
+                    return
+
+    def _motion_loop(self):
+        """依次执行缓冲区中的动作, 完成后上报到位状态"""
+        while True:
+            conn = self.motion_buffer.get()
+            time.sleep(self.move_duration)
+            self.moves_completed += 1
+            try:
+                conn.sendall(json.dumps({"command": "move_in_place", "data": True}).encode() + b'\r\n')
+            except OSError:
+                pass
+
+    def push(self, message: dict):
+        """向所有连接主动上报数据"""
+        for conn in list(self.connections):
+            try:
+                conn.sendall(json.dumps(message).encode() + b'\r\n')
+            except OSError:
+                self.connections.remove(conn)  # 客户端已断开
+
+    def drop_connections(self):
+        connections, self.connections = self.connections, []
+        for conn in connections:
+            try:
+                conn.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            conn.close()
+
+    def close(self):
+        self.drop_connections()
+        self.server_socket.close()
@@ -0,0 +1,111 @@
+import sys
+sys.path.append("..")
+import json
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+from common.action_file import ActionFileReader, ActionFileWriter
+from common.work_threads import ActionFileImportTask, ActionFileExportTask
+from componets.action_table_model import ActionTableModel
+
+
+def make_records(count):
+    return [{"J1/X": str(i), "J2/X": "0", "J3/X": "-1.5", "J4/X": "0", "J5/X": "0", "J6/X": "0",
+             "速度": "50", "工具": "吸盘", "开关": ("", "开", "关")[i % 3], "延时": "0", "过渡": "0",
+             "运动": ("关节", "直线")[i % 2], "备注": f"动作 {i} \"引号\""}
+            for i in range(count)]
+
+
+class TestActionFile(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.file_name = str(Path(self.temp_dir.name) / "actions.json")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def write_json(self, data, **kwargs):
+        with open(self.file_name, "w", encoding="utf-8") as json_file:
+            json.dump(data, json_file, ensure_ascii=False, **kwargs)
+
+    def test_reader_matches_json_load(self):
+        records = make_records(200)
+        for kwargs in ({"indent": 4}, {}, {"separators": (",", ":")}):
+            self.write_json(records, **kwargs)
+            for read_size in (7, 64, 1 << 16):  # 记录跨越读取块
+                reader = ActionFileReader(self.file_name, read_size=read_size)
+                self.assertEqual(list(reader), records)
+                self.assertEqual(reader.bytes_read, reader.file_size)
+
+    def test_reader_empty_and_invalid(self):
+        self.write_json([])
+        self.assertEqual(list(ActionFileReader(self.file_name)), [])
+        for content in ('{"J1/X": 1}', '[{"J1/X": 1}', '[{"J1/X": 1} {"J1/X": 2}]', '[1, 2]', '[{"J1/X": 1},]'):
+            with open(self.file_name, "w", encoding="utf-8") as json_file:
+                json_file.write(content)
+            with self.assertRaises(ValueError, msg=content):
+                list(ActionFileReader(self.file_name, read_size=4))
+
+    def test_writer_matches_json_dump(self):
+        for records in (make_records(5), [], [{}, {"J1/X": 1.5, "备注": None, "扩展": {"a": [1, 2]}}]):
+            with ActionFileWriter(self.file_name) as writer:
+                for record in records:
+                    writer.write(record)
+            expected = json.dumps(records, indent=4, ensure_ascii=False)
+            self.assertEqual(Path(self.file_name).read_text(encoding="utf-8"), expected)
+
+    def test_writer_abort_keeps_old_file(self):
+        self.write_json(make_records(1))
+        with ActionFileWriter(self.file_name) as writer:
+            writer.write(make_records(2)[1])
+            writer.abort()
+        self.assertEqual(json.loads(Path(self.file_name).read_text(encoding="utf-8")), make_records(1))
+        self.assertEqual(os.listdir(self.temp_dir.name), ["actions.json"])
+
+    def test_import_task_emits_chunks(self):
+        records = make_records(10)
+        self.write_json(records, indent=4)
+        task = ActionFileImportTask(ActionFileReader(self.file_name), ActionTableModel.from_records, chunk_rows=4, max_pending_chunks=1)
+        model, finished = ActionTableModel(), []
+
+        def append(rows, notes):
+            model.append_rows(rows, notes)
+            task.chunk_consumed()
+        task.singal_emitter.chunk_loaded_signal.connect(append)
+        task.singal_emitter.finished_signal.connect(lambda completed, error: finished.append((completed, error)))
+        task.run()
+        self.assertEqual(finished, [(True, "")])
+        self.assertEqual(list(model.iter_records()), records)
+
+    def test_import_task_cancel_and_error(self):
+        self.write_json(make_records(10))
+        task = ActionFileImportTask(ActionFileReader(self.file_name), ActionTableModel.from_records, chunk_rows=4)
+        finished = []
+        task.singal_emitter.finished_signal.connect(lambda completed, error: finished.append((completed, error)))
+        task.cancel()
+        task.run()
+        self.assertEqual(finished, [(False, "")])
+
+        self.write_json([dict(make_records(1)[0], 工具="焊枪")])
+        task = ActionFileImportTask(ActionFileReader(self.file_name), ActionTableModel.from_records)
+        task.singal_emitter.finished_signal.connect(lambda completed, error: finished.append((completed, error)))
+        task.run()
+        self.assertFalse(finished[-1][0])
+        self.assertIn("焊枪", finished[-1][1])
+
+    def test_export_task(self):
+        rows, notes = ActionTableModel.from_records(make_records(10))
+        task = ActionFileExportTask(self.file_name, ActionTableModel.records_from_rows(rows, notes), len(rows),
+                                    progress_interval=4)
+        progress = []
+        task.singal_emitter.progress_signal.connect(progress.append)
+        task.run()
+        self.assertEqual(Path(self.file_name).read_text(encoding="utf-8"),
+                         json.dumps(make_records(10), indent=4, ensure_ascii=False))
+        self.assertEqual(progress, [40.0, 80.0])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,128 @@
+import sys
+sys.path.append("..")
+import unittest
+
+import numpy as np
+from PySide6.QtCore import Qt
+
+from componets.action_table_model import ActionTableModel
+
+
+RECORDS = [
+    {"J1/X": "10.5", "J2/X": "0", "J3/X": "-20", "J4/X": "0", "J5/X": "0", "J6/X": "0",
+     "速度": "50", "工具": "吸盘", "开关": "开", "延时": "1", "过渡": "2.5", "运动": "直线", "备注": "抓取"},
+    {"J1/X": 0, "J2/X": 0, "J3/X": 0, "J4/X": 0, "J5/X": 0, "J6/X": 0.125,
+     "工具": "", "开关": "", "延时": ""},
+]
+
+
+class TestActionTableModel(unittest.TestCase):
+    def setUp(self):
+        self.model = ActionTableModel()
+
+    def append(self, count):
+        rows = ActionTableModel.make_rows(count)
+        rows['joints'][:, 0] = np.arange(count)
+        self.model.append_rows(rows, [f"#{i}" for i in range(count)])
+
+    def test_records_round_trip(self):
+        rows, notes = ActionTableModel.from_records(RECORDS)
+        self.model.append_rows(rows, notes)
+        records = list(self.model.iter_records())
+        self.assertEqual(records[0], RECORDS[0])
+        self.assertEqual(records[1]["速度"], "30")  # 没有速度时默认为 30%
+        self.assertEqual(records[1]["J6/X"], "0.125")
+        self.assertEqual(records[1]["延时"], "0")
+        self.assertEqual(records[1]["过渡"], "0")  # 旧动作文件没有过渡半径
+        self.assertEqual(records[1]["运动"], "关节")  # 也没有运动方式
+        self.assertEqual(records[1]["备注"], "")
+
+    def test_records_unknown_option(self):
+        with self.assertRaisesRegex(ValueError, "第 8 列"):
+            ActionTableModel.from_records([dict(RECORDS[0], 工具="焊枪")])
+
+    def test_display_and_header(self):
+        self.append(2)
+        self.assertEqual(self.model.rowCount(), 2)
+        self.assertEqual(self.model.columnCount(), 14)
+        self.assertEqual(self.model.headerData(6, Qt.Horizontal), "速度")
+        self.assertEqual(self.model.headerData(0, Qt.Vertical), "1")
+        self.assertEqual(self.model.data(self.model.index(1, 0)), "1")
+        self.assertEqual(self.model.data(self.model.index(1, ActionTableModel.NOTE_COLUMN)), "#1")
+
+    def test_set_data_parses_cells(self):
+        self.append(1)
+        self.assertTrue(self.model.setData(self.model.index(0, 2), "-12.5"))
+        self.assertTrue(self.model.setData(self.model.index(0, 7), "夹爪"))
+        self.assertFalse(self.model.setData(self.model.index(0, 8), "半开"))
+        self.assertFalse(self.model.setData(self.model.index(0, 0), "abc"))
+        self.assertTrue(self.model.setData(self.model.index(0, ActionTableModel.BLEND_COLUMN), "5"))
+        self.assertFalse(self.model.setData(self.model.index(0, ActionTableModel.BLEND_COLUMN), "-1"))
+        self.assertEqual(self.model.rows()['joints'][0, 2], -12.5)
+        self.assertEqual(self.model.cell_text(0, 7), "夹爪")
+        self.assertEqual(self.model.cell_text(0, 8), "")
+        self.assertEqual(self.model.rows()['blend'][0], 5)
+        self.assertTrue(self.model.setData(self.model.index(0, ActionTableModel.MOTION_COLUMN), "直线"))
+        self.assertFalse(self.model.setData(self.model.index(0, ActionTableModel.MOTION_COLUMN), "圆弧"))
+        self.assertEqual(self.model.rows()['motion'][0], 1)
+
+    def test_insert_and_remove_rows(self):
+        self.append(100)  # 超过初始容量
+        self.model.insert_rows(1, ActionTableModel.make_row([99, 0, 0, 0, 0, 0], 20), ["new"])
+        self.assertEqual(self.model.rowCount(), 101)
+        np.testing.assert_array_equal(self.model.rows()['joints'][:3, 0], [0, 99, 1])
+        self.assertEqual(self.model.notes()[:3], ["#0", "new", "#1"])
+
+        self.model.remove_rows([0, 1, 2, 50, 100])
+        self.assertEqual(self.model.rowCount(), 96)
+        np.testing.assert_array_equal(self.model.rows()['joints'][:2, 0], [2, 3])
+        self.assertEqual(self.model.notes()[0], "#2")
+        self.assertNotIn("#49", self.model.notes())
+        self.assertEqual(self.model.notes()[-1], "#98")
+
+    def test_update_cells_signals_once(self):
+        self.append(10)
+        changes = []
+        self.model.dataChanged.connect(
+            lambda top_left, bottom_right: changes.append((top_left.column(), top_left.row(), bottom_right.row())))
+        self.model.update_cells(range(10), ActionTableModel.SPEED_COLUMN, "80")
+        # 修改的列与预计耗时列各刷新一次
+        self.assertEqual(changes, [(ActionTableModel.SPEED_COLUMN, 0, 9), (ActionTableModel.DURATION_COLUMN, 0, 9)])
+        np.testing.assert_array_equal(self.model.rows()['speed'], [80] * 10)
+
+    def test_teach_actions(self):
+        rows, notes = ActionTableModel.from_records(RECORDS + [dict(RECORDS[0], 开关="关"), dict(RECORDS[0], 工具="夹爪")])
+        self.model.append_rows(rows, notes)
+        actions = self.model.teach_actions()
+        self.assertEqual(actions[0], ([10.5, 0.0, -20.0, 0.0, 0.0, 0.0], 50.0, 1, 1.0, 2.5, True))
+        self.assertEqual([action[2] for action in actions], [1, -1, 0, -1])
+        self.assertEqual([action[5] for action in actions], [True, False, True, True])
+        self.assertEqual(self.model.teach_actions([1]), [actions[1]])
+
+    def test_durations_column(self):
+        self.append(3)
+        self.assertEqual(self.model.cell_text(0, ActionTableModel.DURATION_COLUMN), "")  # 没有估算函数
+        self.model.set_duration_estimator(lambda rows: rows['joints'][:, 0] + rows['delay'])
+        self.assertEqual(self.model.cell_text(2, ActionTableModel.DURATION_COLUMN), "2.00")
+        self.assertEqual(self.model.headerData(ActionTableModel.DURATION_COLUMN, Qt.Horizontal), "耗时(共 3.0 s)")
+        self.assertFalse(self.model.flags(self.model.index(0, ActionTableModel.DURATION_COLUMN)) & Qt.ItemIsEditable)
+        self.assertFalse(self.model.setData(self.model.index(0, ActionTableModel.DURATION_COLUMN), "5"))
+
+        changes = []
+        self.model.dataChanged.connect(lambda top_left, bottom_right: changes.append((top_left.column(), bottom_right.row())))
+        self.model.update_cells([2], ActionTableModel.DELAY_COLUMN, "1.5")
+        self.assertIn((ActionTableModel.DURATION_COLUMN, 2), changes)
+        self.assertEqual(self.model.cell_text(2, ActionTableModel.DURATION_COLUMN), "3.50")
+        self.model.remove_rows([2])
+        self.assertEqual(self.model.durations().tolist(), [0.0, 1.0])
+        self.assertNotIn("耗时", list(self.model.iter_records())[0])  # 不保存到动作文件
+
+    def test_rows_view_read_only(self):
+        self.append(3)
+        with self.assertRaises(ValueError):
+            self.model.rows()['speed'][0] = 1
+        self.model.update_cells([0], ActionTableModel.SPEED_COLUMN, 1)  # 模型内部仍可修改
+
+
+if __name__ == '__main__':
+    unittest.main()
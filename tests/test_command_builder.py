@@ -0,0 +1,67 @@
+import sys
+sys.path.append("..")
+import unittest
+from decimal import Decimal
+
+import numpy as np
+import simplejson as json
+
+import common.command_builder as command_builder
+
+
+def legacy_command(command_type, data=None):
+    """旧的命令构造方式"""
+    payload = {"command": command_type} if data is None else {"command": command_type, "data": data}
+    return (json.dumps(payload, use_decimal=True).replace(' ', "") + '\r\n').encode()
+
+
+class TestCommandBuilder(unittest.TestCase):
+    def assertSameCommand(self, command, expected):
+        """与旧方式构造的命令解析结果一致"""
+        self.assertTrue(command.endswith(b'\r\n'))
+        self.assertNotIn(b' ', command)
+        self.assertEqual(json.loads(command, use_decimal=True), json.loads(expected, use_decimal=True))
+
+    def test_joint_commands(self):
+        joint_angles = [Decimal('12.345'), Decimal('-3.500'), Decimal('0.000'), Decimal('90'), Decimal('-45.125'), Decimal('7.001')]
+        self.assertSameCommand(command_builder.set_joint_angle_all_time(50, joint_angles),
+                               legacy_command("set_joint_angle_all_time", [50] + joint_angles))
+        self.assertSameCommand(command_builder.set_joint_angle_all(100, (0.0,) * 6),
+                               legacy_command("set_joint_angle_all", [100, 0, 0, 0, 0, 0, 0]))
+        self.assertSameCommand(command_builder.set_joint_angle(1, Decimal('50'), Decimal('-12.5')),
+                               legacy_command("set_joint_angle", [1, 50, Decimal('-12.5')]))
+        self.assertSameCommand(command_builder.set_joint_angle_speed(1, 50, 40),
+                               legacy_command("set_joint_angle_speed", [1, 50, 40]))
+        self.assertSameCommand(command_builder.set_joint_angle_speed_percentage(1, 50, 80),
+                               legacy_command("set_joint_angle_speed_percentage", [1, 50, 80]))
+
+    def test_angle_rounded_to_three_decimals(self):
+        command = command_builder.set_joint_angle_all_time(30.0, [1 / 3, -2 / 3, 10, 0.0005, 0, 179.9999])
+        self.assertEqual(json.loads(command)["data"], [30, 0.333, -0.667, 10.0, 0.001, 0.0, 180.0])
+
+    def test_speed_rounded_not_truncated(self):
+        # 表格中的速度为浮点数, 30.7 应发送 31 而不是截断为 30
+        angles = [0.0] * 6
+        self.assertEqual(json.loads(command_builder.set_joint_angle_all_time(30.7, angles))["data"][0], 31)
+        self.assertEqual(json.loads(command_builder.set_joint_angle_all(np.float64(49.6), angles))["data"][0], 50)
+        self.assertEqual(json.loads(command_builder.set_joint_angle(1, Decimal('30.7'), 0))["data"][1], 31)
+        self.assertEqual(json.loads(command_builder.set_joint_angle_speed(1, 0, 40.9))["data"][2], 41)
+        self.assertEqual(json.loads(command_builder.set_joint_angle_speed_percentage(1, 0, 79.5))["data"][2], 80)
+        self.assertEqual(json.loads(command_builder.set_joint_angle_all_time(30.2, angles))["data"][0], 30)
+
+    def test_fixed_commands(self):
+        self.assertSameCommand(command_builder.GET_ROBOT_MODE, legacy_command("get_robot_mode"))
+        self.assertSameCommand(command_builder.GET_JOINT_ANGLE_ALL, legacy_command("get_joint_angle_all"))
+        self.assertSameCommand(command_builder.SET_JOINT_AUTO_ZERO, legacy_command("set_joint_Auto_zero"))
+        self.assertSameCommand(command_builder.SET_JOINT_INITIALIZE, legacy_command("set_joint_initialize", [0]))
+        self.assertSameCommand(command_builder.SET_JOINT_EMERGENCY_STOP, legacy_command("set_joint_emergency_stop", [0]))
+        self.assertSameCommand(command_builder.set_end_tool(1, 0), legacy_command("set_end_tool", [1, 0]))
+        self.assertSameCommand(command_builder.set_time_delay(2000), legacy_command("set_time_delay", [2000]))
+        self.assertSameCommand(command_builder.set_robot_io_interface(0, True), legacy_command("set_robot_io_interface", [0, True]))
+        self.assertSameCommand(command_builder.set_robot_mode("INT"), legacy_command("set_robot_mode", ["INT"]))
+        with self.assertRaises(ValueError):
+            command_builder.set_robot_mode("ABC")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,55 @@
+import sys
+sys.path.append("..")
+import socket
+import unittest
+
+from common.frame_parser import LineFramer
+
+
+class TestLineFramer(unittest.TestCase):
+    def test_frame_split_across_reads(self):
+        framer = LineFramer()
+        self.assertEqual(framer.feed(b'{"command":"get_joint'), [])
+        self.assertEqual(framer.feed(b'_angle_all","data":[1]}\r'), [])
+        self.assertEqual(framer.feed(b'\n{"command":"move_in_place"'), [b'{"command":"get_joint_angle_all","data":[1]}'])
+        self.assertEqual(framer.feed(b',"data":true}\r\n'), [b'{"command":"move_in_place","data":true}'])
+        self.assertEqual(framer.stats()["buffered_bytes"], 0)
+
+    def test_multiple_frames_in_one_read(self):
+        framer = LineFramer()
+        frames = framer.feed(b'{"command":"a"}\r\n\r\n{"command":"b"}\r\n{"comm')
+        self.assertEqual(frames, [b'{"command":"a"}', b'{"command":"b"}'])
+        self.assertEqual(framer.stats()["frames"], 2)
+        self.assertEqual(framer.stats()["buffered_bytes"], 6)
+
+    def test_command_name(self):
+        self.assertEqual(LineFramer.command_name(b'{"command":"get_robot_mode","data":1}'), "get_robot_mode")
+        self.assertEqual(LineFramer.command_name(b'{"data": 1, "command" : "set_joint_angle"}'), "set_joint_angle")
+        self.assertIsNone(LineFramer.command_name(b'{"data":"command"}'))
+        self.assertIsNone(LineFramer.command_name(b'{"data":1}'))
+        self.assertIsNone(LineFramer.command_name(b'{"command":'))
+
+    def test_overflow_discards_buffer(self):
+        framer = LineFramer(max_frame_size=16)
+        framer.feed(b'x' * 32)
+        self.assertEqual(framer.stats()["overflows"], 1)
+        self.assertEqual(framer.feed(b'{"command":"a"}\r\n'), [b'{"command":"a"}'])
+
+    def test_read_from_socket(self):
+        reader, writer = socket.socketpair()
+        try:
+            framer = LineFramer(read_size=8)
+            writer.sendall(b'{"command":"a"}\r\n')
+            frames = []
+            while not frames:
+                frames = framer.read_from(reader)
+            self.assertEqual(framer.decode(frames[0]), {"command": "a"})
+            writer.close()
+            with self.assertRaises(ConnectionError):
+                framer.read_from(reader)
+        finally:
+            reader.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,6 +1,7 @@
 import sys
 sys.path.append("..")
 import unittest
+from common import settings
 from common.blinx_robot_module import Mirobot
 import numpy as np
 import pandas as pd
@@ -8,7 +9,7 @@ import pandas as pd
 
 class TestMirobot(unittest.TestCase):
     def setUp(self):
-        self.robot = Mirobot()
+        self.robot = Mirobot(settings.ROBOT_MODEL_CONFIG_FILE_PATH, param_type='MDH')
         self.joint_angle_datas = self.generate_joint_angles_data()
         
     def generate_joint_angles(self, num_joints, angle_range, step_size):
@@ -27,28 +28,36 @@ class TestMirobot(unittest.TestCase):
         joint_angles = self.generate_joint_angles(num_joints, angle_range, step_size)
         return joint_angles
 
-    # 通过角度计算末端位姿集合
-    def test_xyz(self):
+    def check_fkine_batch(self, robot):
         #  将角度集合转为 pandas 中的 dataframe 对象
         df = pd.DataFrame(self.joint_angle_datas).T
         # 修改列名，列名为 joint1 ~ joint6
         df.fillna(0, inplace=True)
         df.columns = ['joint' + str(i) for i in range(1, 7)]
-        # 遍历每一行，计算末端位姿
-        for i in range(df.shape[0]):
-            joint_angles = np.array(df.iloc[i].values)
-            # 通过末端位姿计算角度
-            translation_vector = self.robot.fkine(joint_angles)
-            print("joint_angles: ", joint_angles)
+        # 批量计算所有行的末端位姿
+        joint_radians = np.radians(df.values)
+        endfactor_pose = pd.DataFrame(robot.fkine_batch(joint_radians, unit='deg'),
+                                      columns=['x', 'y', 'z', 'R', 'P', 'Y'])
+        self.assertEqual(endfactor_pose.shape, (df.shape[0], 6))
+
+        # 抽样与逐个计算的 fkine 结果对比
+        for i in range(0, df.shape[0], 50):
+            translation_vector = robot.fkine(joint_radians[i])
             x, y, z = translation_vector.t
-            R, P, Y = translation_vector.rpy(unit='deg')
-            print("x: ", round(x, 3), "y: ", round(y, 3), "z: ", round(z, 3))
-            print("R: ", round(R, 3), "P: ", round(P, 3), "Y: ", round(Y, 3))
-            # 用 x, y, z, R, P, Y 数据生成新的 DataFrame 对象
-            endfactor_pose = pd.DataFrame([[x, y, z, R, P, Y]], columns=['x', 'y', 'z', 'R', 'P', 'Y'])
-            # 用于测试逆解
+            R, P, Y = translation_vector.rpy(unit='deg', order='zyx')
+            np.testing.assert_allclose(endfactor_pose.iloc[i].values, [x, y, z, R, P, Y], atol=1e-9)
 
+    # 通过角度计算末端位姿集合
+    def test_xyz(self):
+        self.check_fkine_batch(self.robot)
 
+    # DH 参数的模型按标准 DH 的连杆变换计算
+    def test_xyz_dh(self):
+        dh_robot = Mirobot(settings.PROJECT_ROOT_PATH / "config/robot_dh_parameters.yaml", param_type='DH')
+        self.check_fkine_batch(dh_robot)
+        q = np.radians([10, 20, 30, 40, 50, 60])
+        np.testing.assert_allclose(dh_robot.fkine_batch(q)[0, :3], dh_robot.fkine(q).t, atol=1e-12)
+        np.testing.assert_allclose(dh_robot._fkine_matrix(q), dh_robot.fkine(q).A, atol=1e-12)
 
 if __name__ == '__main__':
     unittest.main()
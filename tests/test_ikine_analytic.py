@@ -0,0 +1,65 @@
+import sys
+sys.path.append("..")
+import unittest
+
+import numpy as np
+
+from common import settings
+from common.blinx_robot_module import Mirobot
+
+
+class TestIkineAnalytic(unittest.TestCase):
+    def setUp(self):
+        self.robot = Mirobot(settings.ROBOT_MODEL_CONFIG_FILE_PATH, param_type='MDH')
+        self.rng = np.random.default_rng(2024)
+
+    def random_joints(self, count):
+        qlim = np.array([link.qlim for link in self.robot.links])
+        return self.rng.uniform(qlim[:, 0], qlim[:, 1], size=(count, 6))
+
+    def test_round_trip_selects_current_branch(self):
+        """正解求出的位姿，以原关节角度作为当前角度逆解，应得到原关节角度"""
+        for q in self.random_joints(100):
+            q_best, solutions = self.robot.ikine_analytic(self.robot.fkine(q), q)
+            self.assertIsNotNone(q_best)
+            np.testing.assert_allclose(q_best, q, atol=1e-6)
+            self.assertGreaterEqual(len(solutions), 1)
+
+    def test_all_branches_reach_target(self):
+        """所有返回的分支都满足关节限位, 且正解回到目标位姿"""
+        q = np.radians([10, 20, -10, 30, -40, 50])
+        target = self.robot.fkine(q).A
+        _, solutions = self.robot.ikine_analytic(target, q)
+        self.assertGreater(len(solutions), 1)
+        for each_solution in solutions:
+            np.testing.assert_allclose(self.robot.fkine(each_solution).A, target, atol=1e-6)
+
+    def test_wrist_singularity_keeps_joint_four(self):
+        """腕部奇异位形下保持 4 轴当前角度"""
+        q = np.radians([10, 20, -10, 30, -90, 50])
+        q_best, _ = self.robot.ikine_analytic(self.robot.fkine(q), q)
+        np.testing.assert_allclose(q_best, q, atol=1e-6)
+
+    def test_unreachable_target(self):
+        """超出工作空间的目标返回 None"""
+        target = np.eye(4)
+        target[:3, 3] = [1.0, 1.0, 1.0]
+        q_best, solutions = self.robot.ikine_analytic(target)
+        self.assertIsNone(q_best)
+        self.assertEqual(solutions.shape, (0, 6))
+
+    def test_dh_model_rejected(self):
+        """解析逆解按 MDH 建系推导, DH 参数的模型直接报错, 不返回错误的关节角度"""
+        dh_robot = Mirobot(settings.PROJECT_ROOT_PATH / "config/robot_dh_parameters.yaml", param_type='DH')
+        q = np.radians([10, 20, 30, 40, 50, 60])
+        target = dh_robot.fkine(q).A
+        with self.assertRaisesRegex(ValueError, "MDH"):
+            dh_robot.ikine_analytic(target, q)
+        with self.assertRaisesRegex(ValueError, "MDH"):
+            dh_robot.ikine_analytic_batch(target[np.newaxis], (1, 1, 1), q)
+        with self.assertRaisesRegex(ValueError, "MDH"):
+            dh_robot.ikine_branch(q)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+import sys
+sys.path.append("..")
+import unittest
+
+import numpy as np
+from spatialmath.base import rpy2r
+
+from common import settings
+from common.blinx_robot_module import Mirobot
+
+
+class TestIkineDifferential(unittest.TestCase):
+    def setUp(self):
+        self.robot = Mirobot(settings.ROBOT_MODEL_CONFIG_FILE_PATH, param_type='MDH')
+        self.current_joints = np.radians([10, 20, -10, 30, -40, 50])
+
+    def test_jacobian_matches_jacob0(self):
+        qlim = np.array([link.qlim for link in self.robot.links])
+        for q in np.random.default_rng(3).uniform(qlim[:, 0], qlim[:, 1], size=(50, 6)):
+            J, T = self.robot.jacobian_analytic(q)
+            np.testing.assert_allclose(J, self.robot.jacob0(q), atol=1e-9)
+            np.testing.assert_allclose(T, self.robot.fkine(q).A, atol=1e-12)
+
+    def test_dh_model_jacobian(self):
+        """DH 参数的模型, 第 i 个关节绕上一个坐标系的 z 轴转动"""
+        dh_robot = Mirobot(settings.PROJECT_ROOT_PATH / "config/robot_dh_parameters.yaml", param_type='DH')
+        for q in np.random.default_rng(4).uniform(-np.pi, np.pi, size=(20, 6)):
+            J, T = dh_robot.jacobian_analytic(q)
+            np.testing.assert_allclose(J, dh_robot.jacob0(q), atol=1e-9)
+            np.testing.assert_allclose(T, dh_robot.fkine(q).A, atol=1e-12)
+
+    def test_small_translation_and_rotation_steps(self):
+        T = self.robot.fkine(self.current_joints).A
+        translated = T.copy()
+        translated[:3, 3] += [0.001, -0.002, 0.001]
+        rotated = T.copy()
+        rotated[:3, :3] = rpy2r([0.0, 0.0, np.radians(1)]) @ T[:3, :3]
+        for target in (translated, rotated):
+            q, manipulability, error = self.robot.ikine_differential(target, self.current_joints)
+            self.assertIsNotNone(q)
+            self.assertGreater(manipulability, 1e-3)
+            np.testing.assert_allclose(self.robot.fkine(q).A, target, atol=1e-5)
+
+    def test_singular_configuration_returns_none(self):
+        """腕部奇异位形(5 轴 -90°)可操作度为 0, 交给完整逆解处理"""
+        singular_joints = np.radians([10, 20, -10, 30, -90, 50])
+        target = self.robot.fkine(singular_joints).A
+        target[0, 3] += 0.001
+        q, manipulability, _ = self.robot.ikine_differential(target, singular_joints)
+        self.assertIsNone(q)
+        self.assertLess(manipulability, 1e-5)
+
+    def test_large_step_exceeds_linearization_tolerance(self):
+        target = self.robot.fkine(self.current_joints).A
+        target[0, 3] += 0.05
+        q, _, error = self.robot.ikine_differential(target, self.current_joints)
+        self.assertIsNone(q)
+        self.assertGreater(np.linalg.norm(error[:3]), 1e-5)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+import sys
+sys.path.append("..")
+import unittest
+from math import radians
+
+import numpy as np
+
+from common import settings
+from common.blinx_robot_module import Mirobot
+from common.ikine_service import IKineService
+
+
+class TestIKineService(unittest.TestCase):
+    def setUp(self):
+        self.robot = Mirobot(settings.ROBOT_MODEL_CONFIG_FILE_PATH, param_type='MDH')
+        self.current_joints = np.radians([10, 20, -10, 30, -40, 50])
+
+    def jog_target(self, dx=0.001):
+        """在当前位姿的基础上沿 x 轴点动 dx 米"""
+        T = self.robot.fkine(self.current_joints).A
+        T[0, 3] += dx
+        return T
+
+    def test_differential_jog(self):
+        """小步长点动使用微分逆解"""
+        service = IKineService(self.robot)
+        result = service.solve(self.jog_target(), self.current_joints)
+        self.assertTrue(result.success)
+        self.assertEqual(result.method, "differential")
+        self.assertGreater(result.manipulability, 0)
+        np.testing.assert_allclose(self.robot.fkine(result.q).A, self.jog_target(), atol=1e-5)
+
+    def test_large_step_falls_back_to_full_ikine(self):
+        """线性化误差超过容差时退回完整逆解"""
+        service = IKineService(self.robot)
+        result = service.solve(self.jog_target(dx=0.05), self.current_joints)
+        self.assertTrue(result.success)
+        self.assertEqual(result.method, "analytic")
+
+    def test_analytic_solution_is_continuous(self):
+        service = IKineService(self.robot, use_differential=False)
+        result = service.solve(self.jog_target(), self.current_joints)
+        self.assertTrue(result.success)
+        self.assertEqual(result.method, "analytic")
+        self.assertEqual(result.iterations, 0)
+        self.assertLess(result.joint_distance, radians(2))
+        self.assertGreater(result.solve_time, 0)
+
+    def test_lm_seeded_from_current_joints(self):
+        service = IKineService(self.robot, use_analytic=False, use_differential=False)
+        result = service.solve(self.jog_target(), self.current_joints)
+        self.assertTrue(result.success)
+        self.assertIn(result.method, ("LM", "LM-multistart"))
+        self.assertGreater(result.iterations, 0)
+        self.assertLess(result.joint_distance, radians(2))
+        np.testing.assert_allclose(self.robot.fkine(result.q).A, self.jog_target(), atol=1e-5)
+
+    def test_reject_branch_jump(self):
+        """目标只能通过大幅关节运动到达时，拒绝该解"""
+        far_joints = np.radians([60, 20, -10, 30, -40, 50])
+        service = IKineService(self.robot, max_joint_distance=radians(5))
+        result = service.solve(self.robot.fkine(far_joints), self.current_joints)
+        self.assertFalse(result.success)
+        self.assertIsNone(result.q)
+
+    def test_unreachable_target(self):
+        target = np.eye(4)
+        target[:3, 3] = [1.0, 1.0, 1.0]
+        service = IKineService(self.robot, seed_pool_size=2)
+        result = service.solve(target, self.current_joints)
+        self.assertFalse(result.success)
+        self.assertEqual(result.method, "LM-multistart")
+
+    def test_dh_model_falls_back_to_lm(self):
+        """DH 参数的模型不使用解析逆解, 退回以当前角度为初值的 ikine_LM"""
+        dh_robot = Mirobot(settings.PROJECT_ROOT_PATH / "config/robot_dh_parameters.yaml", param_type='DH')
+        service = IKineService(dh_robot, use_differential=False)
+        self.assertFalse(service.use_analytic)
+        target = dh_robot.fkine(self.current_joints).A
+        target[0, 3] += 0.001
+        result = service.solve(target, self.current_joints)
+        self.assertTrue(result.success)
+        self.assertIn(result.method, ("LM", "LM-multistart"))
+        np.testing.assert_allclose(dh_robot.fkine(result.q).A, target, atol=1e-5)
+        self.assertEqual(service.solve(target, self.current_joints).method, "cache")
+
+
+if __name__ == '__main__':
+    unittest.main()
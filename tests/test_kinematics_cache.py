@@ -0,0 +1,83 @@
+import sys
+sys.path.append("..")
+import unittest
+
+import numpy as np
+
+from common import settings
+from common.blinx_robot_module import Mirobot, KinematicsCache
+from common.ikine_service import IKineService
+
+
+class TestKinematicsCache(unittest.TestCase):
+    def setUp(self):
+        self.robot = Mirobot(settings.ROBOT_MODEL_CONFIG_FILE_PATH, param_type='MDH')
+
+    def test_lru_eviction_under_memory_ceiling(self):
+        value = np.zeros(6)
+        entry_bytes = KinematicsCache.ENTRY_OVERHEAD + KinematicsCache.sizeof((1, 2, 3)) + KinematicsCache.sizeof(value)
+        cache = KinematicsCache(max_bytes=entry_bytes * 2)
+        cache.put((1, 2, 3), value)
+        cache.put((1, 2, 4), value)
+        cache.get((1, 2, 3))  # 访问后 (1, 2, 3) 成为最近使用的条目
+        cache.put((1, 2, 5), value)
+
+        self.assertIsNone(cache.get((1, 2, 4)))
+        self.assertIsNotNone(cache.get((1, 2, 3)))
+        self.assertLessEqual(cache.stats()["bytes"], entry_bytes * 2)
+        self.assertEqual(cache.stats()["entries"], 2)
+
+    def test_entry_size_counts_elements_and_array_header(self):
+        key = (10123, 20000, -10500, 30001, -40000, 50000)
+        value = np.zeros(6)
+        self.assertEqual(KinematicsCache.sizeof(key), sys.getsizeof(key) + sum(sys.getsizeof(item) for item in key))
+        self.assertGreater(KinematicsCache.sizeof(value), value.nbytes)
+        self.assertEqual(KinematicsCache.sizeof(value[:3]), sys.getsizeof(value[:3]) + 24)
+        # 嵌套元组键(逆解的位姿与解分支)
+        self.assertGreater(KinematicsCache.sizeof((key, (1, -1))), KinematicsCache.sizeof(key))
+
+        # 上限按实际占用计算: 1 KB 只能放下很少的条目
+        cache = KinematicsCache(max_bytes=1024)
+        for i in range(100):
+            cache.put(key[:5] + (i,), np.zeros(6))
+        self.assertLess(cache.stats()["entries"], 1024 // (sys.getsizeof(key) + value.nbytes))
+        self.assertLessEqual(cache.stats()["bytes"], 1024)
+
+    def test_fkine_cached_matches_fkine_batch(self):
+        joints = [10.123, 20.0, -10.5, 30.001, -40.0, 50.0]
+        expected = self.robot.fkine_batch(np.radians([joints]), unit='deg')[0]
+        np.testing.assert_allclose(self.robot.fkine_cached(joints), expected)
+        np.testing.assert_allclose(self.robot.fkine_cached(joints), expected)
+
+        stats = self.robot.fkine_cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"]), (1, 1))
+        self.assertFalse(self.robot.fkine_cached(joints).flags.writeable)
+
+    def test_ikine_cache_hit_on_repeated_target(self):
+        current_joints = np.radians([10, 20, -10, 30, -40, 50])
+        target = self.robot.fkine(current_joints).A
+        target[0, 3] += 0.001
+        service = IKineService(self.robot)
+
+        first = service.solve(target, current_joints)
+        second = service.solve(target, current_joints)
+        self.assertEqual(first.method, "differential")
+        self.assertEqual(second.method, "cache")
+        np.testing.assert_allclose(second.q, first.q)
+        self.assertEqual(service.cache.stats()["hits"], 1)
+
+    def test_ikine_cache_separates_branches(self):
+        """同一位姿在不同解分支下不共享缓存"""
+        current_joints = np.radians([10, 20, -10, 30, -40, 50])
+        flipped_joints = np.radians([10, 20, -10, 30, -140, 50])
+        self.assertNotEqual(self.robot.ikine_branch(current_joints), self.robot.ikine_branch(flipped_joints))
+
+        service = IKineService(self.robot)
+        target = self.robot.fkine(current_joints)
+        service.solve(target, current_joints)
+        result = service.solve(target, flipped_joints)
+        self.assertNotEqual(result.method, "cache")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,135 @@
+import sys
+sys.path.append("..")
+import time
+import unittest
+
+import numpy as np
+
+from common import settings
+from common.blinx_robot_module import Mirobot
+from common.program_loop import ProgramLoopRunner
+from common.setpoint_streamer import SetpointStreamer, interpolate_setpoints
+from common.socket_client import RobotArmSession
+from common.teach_program import CompiledProgram
+from common.trajectory import BlendedTrajectory
+from tests.robot_arm_simulator import RobotArmSimulator
+
+
+START = [0, 10, -10, 0, -60, 0]
+TARGET = [30, 20, -20, 10, -50, 20]
+PERIOD = 0.01
+
+
+def line_deviation(robot, path):
+    """关节路径上各点的末端位置与起点、终点连线的距离(mm)"""
+    positions = robot._fkine_batch_axes(np.radians(path))[3].T * 1000
+    direction = positions[-1] - positions[0]
+    offsets = positions - positions[0]
+    return np.linalg.norm(offsets - np.outer(offsets @ direction / (direction @ direction), direction), axis=1)
+
+
+class TestLinearPath(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.robot = Mirobot(settings.ROBOT_MODEL_CONFIG_FILE_PATH, param_type='MDH')
+
+    def test_batch_ik_matches_analytic(self):
+        rng = np.random.default_rng(0)
+        q = np.radians(rng.uniform(-40, 40, (50, 6)))
+        q[:, 4] = np.radians(rng.uniform(-100, -20, 50))
+        T = self.robot._fkine_batch_matrix(q)
+        for row in range(50):
+            solution, valid = self.robot.ikine_analytic_batch(T[row:row + 1], self.robot.ikine_branch(q[row]), q[row])
+            self.assertTrue(valid[0])
+            np.testing.assert_allclose(solution[0], q[row], atol=1e-6)
+
+    def test_path_is_straight(self):
+        path = self.robot.linear_path(START, TARGET)
+        np.testing.assert_array_equal(path[0], START)
+        np.testing.assert_array_equal(path[-1], TARGET)
+        self.assertLess(line_deviation(self.robot, path).max(), 1e-6)
+        self.assertLess(np.abs(np.diff(path, axis=0)).max(), 1.0)
+        # 末端位姿作为终点
+        pose_path = self.robot.linear_path(START, self.robot._fkine_matrix(np.radians(TARGET)))
+        np.testing.assert_allclose(pose_path[-1], TARGET, atol=1e-6)
+
+    def test_invalid_paths(self):
+        with self.assertRaisesRegex(ValueError, "J5 限位"):
+            self.robot.linear_path(START, [0, 10, -10, 0, 60, 0])
+        with self.assertRaises(ValueError):
+            # 终点在另一个腕部分支上, 直线路径经过腕部奇异位形
+            self.robot.linear_path(START, [0, 10, -10, 0, -120, 0])
+
+
+class TestLinearProgram(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.robot = Mirobot(settings.ROBOT_MODEL_CONFIG_FILE_PATH, param_type='MDH')
+
+    def compile(self, command_model="INT", target=TARGET, blend=0.0):
+        actions = [(START, 100, -1, 0.0, blend, False), (target, 50, -1, 0.0, blend, True)]
+        return CompiledProgram.compile(actions, self.robot, command_model)
+
+    def test_compiled_timing(self):
+        program = self.compile()
+        self.assertIsNone(program.linear_timings[0])
+        timing = program.linear_timings[1]
+        self.assertAlmostEqual(program.durations[1], timing["duration"])
+        # 直线运动比关节运动慢
+        self.assertGreater(timing["duration"], self.robot.time_parameterization.move_time(START, TARGET, 50))
+        # 第一次循环从当前位置出发的第一段是关节运动
+        self.assertAlmostEqual(program.first_duration(TARGET), program.durations[0])
+
+    def test_seq_mode_and_unreachable_rejected(self):
+        with self.assertRaisesRegex(ValueError, "第 2 个动作.*INT"):
+            self.compile("SEQ")
+        with self.assertRaisesRegex(ValueError, "第 2 个动作的直线运动无法执行"):
+            self.compile(target=[0, 10, -10, 0, 60, 0])
+
+    def test_setpoints_follow_line(self):
+        program = self.compile()
+        waypoints = [(program.actions['joints'][1], 50, b'', program.durations[1], 0.0, program.linear_timings[1])]
+        setpoints = list(interpolate_setpoints(waypoints, PERIOD, START))
+        self.assertEqual(len(setpoints), int(np.ceil(program.durations[1] / PERIOD - 1e-9)))
+        self.assertEqual([reached for *_, reached in setpoints], [False] * (len(setpoints) - 1) + [True])
+        path = np.vstack([START] + [setpoint[0] for setpoint in setpoints])
+        np.testing.assert_array_equal(path[-1], TARGET)
+        self.assertLess(line_deviation(self.robot, path).max(), 0.05)
+
+        # 连续路径过渡在直线运动的两端停稳
+        trajectory = BlendedTrajectory(self.robot)
+        plan = trajectory.plan(self.compile(blend=50), PERIOD)
+        self.assertEqual(plan["blended_count"], 0)
+        trajectory_setpoints = list(trajectory.iter_setpoints(waypoints, PERIOD, START))
+        np.testing.assert_array_equal([setpoint[0] for setpoint in trajectory_setpoints],
+                                      [setpoint[0] for setpoint in setpoints])
+
+
+class TestLinearLoop(unittest.TestCase):
+    def setUp(self):
+        self.simulator = RobotArmSimulator()
+        self.session = RobotArmSession.get('127.0.0.1', self.simulator.port)
+        self.session.connect()
+
+    def tearDown(self):
+        RobotArmSession.close_all()
+        self.simulator.close()
+
+    def test_int_loop_streamed(self):
+        robot = Mirobot(settings.ROBOT_MODEL_CONFIG_FILE_PATH, param_type='MDH')
+        actions = [(START, 100, -1, 0.0, 0.0, False), (TARGET, 100, -1, 0.0, 0.0, True)]
+        program = CompiledProgram.compile(actions, robot, "INT")
+        runner = ProgramLoopRunner(SetpointStreamer(self.session, rate=1 / PERIOD), program, command_model="INT")
+        self.assertTrue(runner.run(loop_times=2, start_degrees=START))
+        self.assertEqual(runner.streamer.moves_completed, 4)
+        time.sleep(0.05)
+        setpoints = [command["data"][1:] for command in self.simulator.received_commands
+                     if command["command"] == "set_joint_angle_all_time"]
+        self.assertEqual(setpoints[-1], TARGET)
+        # 直线段按时间律逐点下发, 末端沿直线运动
+        target_index = setpoints.index(TARGET)
+        self.assertLess(line_deviation(robot, np.array([START] + setpoints[:target_index + 1])).max(), 0.05)
+
+
+if __name__ == '__main__':
+    unittest.main()
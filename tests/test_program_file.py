@@ -0,0 +1,136 @@
+import sys
+sys.path.append("..")
+import struct
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+from common import program_file
+from common.program_file import ProgramFileReader, write_program_file
+from common.work_threads import ActionFileImportTask, ProgramFileExportTask
+from componets.action_table_model import ActionTableModel
+
+
+def make_model_rows(count):
+    rows = ActionTableModel.make_rows(count)
+    rows['joints'] = np.round(np.random.default_rng(0).uniform(-180, 180, (count, 6)), 3)
+    rows['speed'] = np.arange(count) % 100 + 1
+    rows['tool'] = np.arange(count) % 3
+    rows['switch'] = (np.arange(count) // 3) % 3
+    rows['delay'] = (np.arange(count) % 7) * 0.25
+    rows['blend'] = (np.arange(count) % 5) * 2.5
+    rows['motion'] = np.arange(count) % 2
+    notes = [("", "抓取", "放置 #1")[i % 3] for i in range(count)]
+    return rows, notes
+
+
+class TestProgramFile(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.file_name = str(Path(self.temp_dir.name) / "program.bxp")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_round_trip_through_model(self):
+        rows, notes = make_model_rows(1000)
+        write_program_file(self.file_name, ActionTableModel.to_program_columns(rows), notes)
+        with ProgramFileReader(self.file_name) as reader:
+            self.assertEqual(reader.row_count, 1000)
+            loaded_rows, loaded_notes = ActionTableModel.from_program_chunk((reader.columns, reader.notes()))
+        np.testing.assert_array_equal(loaded_rows, rows)
+        self.assertEqual(loaded_notes, notes)
+
+    def test_columns_are_memory_mapped(self):
+        rows, notes = make_model_rows(10)
+        write_program_file(self.file_name, ActionTableModel.to_program_columns(rows), notes)
+        with ProgramFileReader(self.file_name) as reader:
+            self.assertEqual(reader.columns['joints'].dtype, np.float32)
+            self.assertEqual(reader.columns['joints'].shape, (10, 6))
+            self.assertEqual(reader.columns['delay_ms'].tolist()[:3], [0, 250, 500])
+            with self.assertRaises(ValueError):
+                reader.columns['speed'][0] = 1  # 只读映射
+            self.assertEqual(reader._string_table, [None] * 3)  # 去重后的字符串表, 用到时才解码
+
+    def test_smaller_than_json(self):
+        rows, notes = make_model_rows(1000)
+        write_program_file(self.file_name, ActionTableModel.to_program_columns(rows), notes)
+        json_size = len(''.join(map(str, ActionTableModel.records_from_rows(rows, notes))).encode())
+        self.assertLess(Path(self.file_name).stat().st_size * 4, json_size)
+
+    def test_empty_program(self):
+        write_program_file(self.file_name, ActionTableModel.to_program_columns(ActionTableModel.make_rows(0)), [])
+        with ProgramFileReader(self.file_name) as reader:
+            self.assertEqual(reader.row_count, 0)
+            self.assertEqual(list(reader.iter_chunks(10)), [])
+            self.assertEqual(reader.progress, 1.0)
+
+    def test_invalid_files(self):
+        rows, notes = make_model_rows(10)
+        write_program_file(self.file_name, ActionTableModel.to_program_columns(rows), notes)
+        data = Path(self.file_name).read_bytes()
+        for content, message in ((b"[]" + b" " * 40, "不是示教程序文件"),
+                                 (data[:4] + struct.pack("<H", 99) + data[6:], "版本"),
+                                 (data[:-1], "不完整")):
+            Path(self.file_name).write_bytes(content)
+            with self.assertRaisesRegex(ValueError, message):
+                ProgramFileReader(self.file_name)
+
+    def write_old_version(self, rows, version):
+        """按旧版本的列布局写入文件, 备注都为空"""
+        columns = ActionTableModel.to_program_columns(rows)
+        layout, end = program_file._column_layout(len(rows), version=version)
+        with open(self.file_name, "wb") as file:
+            file.write(program_file._HEADER.pack(program_file.MAGIC, version, 0, len(rows), 1, 0))
+            for name, dtype, width, offset in layout:
+                file.write(b"\0" * (offset - file.tell()))
+                file.write(np.ascontiguousarray(np.zeros(len(rows)) if name == "note" else columns[name],
+                                                dtype=dtype).tobytes())
+            file.write(b"\0" * (end - file.tell()))
+            file.write(np.zeros(2, dtype="<u8").tobytes())
+        with ProgramFileReader(self.file_name) as reader:
+            return ActionTableModel.from_program_chunk((reader.columns, reader.notes()))
+
+    def test_reads_version_1(self):
+        # 版本 1 的文件没有过渡半径列和运动方式列
+        rows, _ = make_model_rows(10)
+        loaded_rows, loaded_notes = self.write_old_version(rows, 1)
+        np.testing.assert_array_equal(loaded_rows['joints'], rows['joints'])
+        np.testing.assert_array_equal(loaded_rows['delay'], rows['delay'])
+        np.testing.assert_array_equal(loaded_rows['blend'], np.zeros(10))
+        np.testing.assert_array_equal(loaded_rows['motion'], np.zeros(10))
+        self.assertEqual(loaded_notes, [""] * 10)
+
+    def test_reads_version_2(self):
+        # 版本 2 的文件没有运动方式列, 都按关节运动读取
+        rows, _ = make_model_rows(10)
+        loaded_rows, _ = self.write_old_version(rows, 2)
+        np.testing.assert_array_equal(loaded_rows['blend'], rows['blend'])
+        np.testing.assert_array_equal(loaded_rows['motion'], np.zeros(10))
+
+    def test_import_and_export_tasks(self):
+        rows, notes = make_model_rows(10)
+        export_task = ProgramFileExportTask(self.file_name, ActionTableModel.to_program_columns(rows), notes)
+        export_task.run()
+
+        reader = ProgramFileReader(self.file_name)
+        import_task = ActionFileImportTask(reader, ActionTableModel.from_program_chunk, chunk_rows=4)
+        model, progress, finished = ActionTableModel(), [], []
+
+        def append(chunk_rows, chunk_notes):
+            model.append_rows(chunk_rows, chunk_notes)
+            import_task.chunk_consumed()
+        import_task.singal_emitter.chunk_loaded_signal.connect(append)
+        import_task.singal_emitter.progress_signal.connect(progress.append)
+        import_task.singal_emitter.finished_signal.connect(lambda completed, error: finished.append((completed, error)))
+        import_task.run()
+        self.assertEqual(finished, [(True, "")])
+        self.assertEqual(progress, [40.0, 80.0, 100.0])
+        np.testing.assert_array_equal(model.rows(), rows)
+        self.assertEqual(model.notes(), notes)
+
+
+if __name__ == '__main__':
+    unittest.main()
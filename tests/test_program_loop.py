@@ -0,0 +1,90 @@
+import sys
+sys.path.append("..")
+import time
+import unittest
+
+import common.command_builder as command_builder
+from common import settings
+from common.blinx_robot_module import Mirobot
+from common.program_loop import ProgramLoopRunner
+from common.program_streamer import ProgramStreamer
+from common.socket_client import RobotArmSession
+from common.teach_program import CompiledProgram
+from tests.robot_arm_simulator import RobotArmSimulator
+
+
+ACTIONS = [
+    ([0, 0, 0, 0, 0, 0], 100, -1, 0.0),
+    ([10, 0, 0, 0, 0, 0], 100, 1, 0.0),
+    ([10, 10, 0, 0, 0, 0], 100, 0, 0.0),
+]
+
+
+class TestProgramLoopRunner(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.robot = Mirobot(settings.ROBOT_MODEL_CONFIG_FILE_PATH, param_type='MDH')
+
+    def setUp(self):
+        self.simulator = None
+
+    def tearDown(self):
+        RobotArmSession.close_all()
+        if self.simulator is not None:
+            self.simulator.close()
+
+    def create_runner(self, command_model="SEQ", dwell=0.0, window_size=4, actions=ACTIONS):
+        self.simulator = RobotArmSimulator(move_duration=0.002, buffer_size=window_size)
+        session = RobotArmSession.get('127.0.0.1', self.simulator.port)
+        session.connect()
+        program = CompiledProgram.compile(actions, self.robot, command_model)
+        return ProgramLoopRunner(ProgramStreamer(session, window_size=window_size), program, dwell, command_model)
+
+    def test_seq_dwell_sent_with_last_move(self):
+        runner = self.create_runner("SEQ", dwell=0.5)
+        moves = list(runner.iter_moves(loop_times=3))
+        self.assertEqual(len(moves), 9)
+        dwell_command = command_builder.set_time_delay(500)
+        self.assertEqual([payload.endswith(dwell_command) for payload, _ in moves],
+                         [False, False, True] * 2 + [False] * 3)  # 最后一次循环之后不停留
+        self.assertAlmostEqual(moves[2][1], runner.program.durations[2] + 0.5)
+        self.assertAlmostEqual(sum(duration for _, duration in moves[3:6]), runner.expected_cycle_time)
+
+    def test_long_dwell_split_into_delay_commands(self):
+        runner = self.create_runner("SEQ", dwell=45)
+        payload, _ = list(runner.iter_moves(loop_times=2))[2]
+        self.assertTrue(payload.endswith(command_builder.set_time_delay(30000) + command_builder.set_time_delay(15000)))
+
+    def test_cycles_pipelined_and_timed(self):
+        runner = self.create_runner("SEQ", window_size=4)
+        cycles = []
+        self.assertTrue(runner.run(loop_times=10, on_cycle=lambda count, cycle_time: cycles.append(count)))
+        self.assertEqual(self.simulator.moves_completed, 30)
+        self.assertEqual(self.simulator.overflows, 0)
+        # 窗口跨过循环边界, 下一次循环的动作在当前循环结束前已经下发
+        self.assertEqual(runner.streamer.stats()["max_in_flight"], 4)
+        self.assertEqual(cycles, list(range(1, 11)))
+        stats = runner.stats()
+        self.assertEqual(stats["cycles_completed"], 10)
+        self.assertGreater(stats["cycle_time_min"], 0)
+        self.assertLessEqual(stats["cycle_time_min"], stats["cycle_time_mean"])
+        self.assertLessEqual(stats["cycle_time_mean"], stats["cycle_time_max"])
+        self.assertGreaterEqual(stats["jitter"], 0)
+
+    def test_int_dwell_on_host(self):
+        runner = self.create_runner("INT", dwell=0.05, window_size=1)
+        start_time = time.perf_counter()
+        self.assertTrue(runner.run(loop_times=3))
+        self.assertGreaterEqual(time.perf_counter() - start_time, 2 * 0.05)
+        self.assertNotIn("set_time_delay", [command["command"] for command in self.simulator.received_commands])
+        self.assertEqual(runner.stats()["cycles_completed"], 3)
+        self.assertTrue(all(cycle_time >= 0.05 for cycle_time in list(runner.cycle_times)[1:]))  # 第 2、3 次循环包含停留
+
+    def test_endless_loop_until_stopped(self):
+        runner = self.create_runner("SEQ", window_size=2, actions=ACTIONS[:1])
+        self.assertFalse(runner.run(is_running=lambda: runner.cycles_completed < 20))
+        self.assertGreaterEqual(runner.stats()["cycles_completed"], 20)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,99 @@
+import sys
+sys.path.append("..")
+import unittest
+
+import numpy as np
+
+from common import settings
+from common.blinx_robot_module import Mirobot
+from common.program_optimizer import ProgramOptimizer
+from componets.action_table_model import ActionTableModel
+
+
+def make_rows(joint_one_degrees, speed=30):
+    rows = ActionTableModel.make_rows(len(joint_one_degrees))
+    rows['joints'][:, 0] = joint_one_degrees
+    rows['speed'] = speed
+    rows['tool'] = ActionTableModel.TOOL_OPTIONS.index("吸盘")
+    return rows
+
+
+class TestProgramOptimizer(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.robot = Mirobot(settings.ROBOT_MODEL_CONFIG_FILE_PATH, param_type='MDH')
+
+    def setUp(self):
+        self.optimizer = ProgramOptimizer(self.robot, position_tolerance=1.0, orientation_tolerance=1.0, move_overhead=0.2)
+
+    def test_collinear_jog_merged(self):
+        # 录制时第 1 关节每次点动 1°, 其中一次重复添加
+        rows = make_rows([0, 1, 2, 3, 3, 4, 5, 6, 7, 8, 9, 10])
+        rows['switch'][-1] = ActionTableModel.SWITCH_OPTIONS.index("开")
+        notes = [""] * 11 + ["抓取"]
+        optimized_rows, optimized_notes, report = self.optimizer.optimize(rows, notes)
+        np.testing.assert_array_equal(optimized_rows['joints'][:, 0], [0, 10])
+        self.assertEqual(optimized_notes, ["", "抓取"])
+        self.assertEqual(report['duplicates_removed'], 1)
+        self.assertEqual(report['simplified_removed'], 9)
+        # 关节运动的总行程不变, 节省的是 10 个动作的额外耗时
+        self.assertAlmostEqual(report['time_saved'], 10 * 0.2)
+
+    def test_key_rows_kept(self):
+        rows = make_rows(np.arange(10))
+        rows['delay'][2] = 1
+        rows['switch'][4] = ActionTableModel.SWITCH_OPTIONS.index("关")
+        rows['speed'][7:] = 60  # 第 6 行之后速度改变
+        notes = [""] * 10
+        notes[5] = "放置"
+        optimized_rows, _, _ = self.optimizer.optimize(rows, notes)
+        np.testing.assert_array_equal(optimized_rows['joints'][:, 0], [0, 2, 4, 5, 6, 9])
+
+    def test_linear_move_and_start_kept(self):
+        rows = make_rows(np.arange(10))
+        rows['motion'][7] = ActionTableModel.MOTION_OPTIONS.index("直线")  # 起点为第 6 行
+        optimized_rows, _, _ = self.optimizer.optimize(rows, [""] * 10)
+        np.testing.assert_array_equal(optimized_rows['joints'][:, 0], [0, 6, 7, 9])
+
+    def test_blend_rows_kept(self):
+        rows = make_rows(np.arange(10))
+        rows['blend'][3] = 5.0
+        optimized_rows, _, _ = self.optimizer.optimize(rows, [""] * 10)
+        np.testing.assert_array_equal(optimized_rows['joints'][:, 0], [0, 3, 9])
+        self.assertEqual(optimized_rows['blend'].tolist(), [0.0, 5.0, 0.0])
+
+    def test_wrist_rotation_kept(self):
+        # 只转动第 6 关节时末端位置不变, 由姿态容差保留
+        rows = make_rows([0, 0, 0, 0])
+        rows['joints'][:, 5] = [0, 30, 0, 0]
+        optimized_rows, _, _ = self.optimizer.optimize(rows, [""] * 4)
+        np.testing.assert_array_equal(optimized_rows['joints'][:, 5], [0, 30, 0])
+
+    def test_removed_rows_within_tolerance(self):
+        rng = np.random.default_rng(1)
+        rows = make_rows(np.zeros(2000))
+        rows['joints'] = np.cumsum(rng.choice([0.0, 0.2, -0.2], (2000, 6)), axis=0)
+        optimized_rows, _, report = self.optimizer.optimize(rows, [""] * 2000)
+        self.assertLess(report['rows_after'], 2000)
+        self.assertGreater(report['time_saved'], 0)
+
+        # 找到保留的动作在原程序中的位置, 逐段检查被删除的动作
+        kept = [0]
+        for joints in optimized_rows['joints'][1:]:
+            kept.append(kept[-1] + 1 + int(np.flatnonzero(np.all(rows['joints'][kept[-1] + 1:] == joints, axis=1))[0]))
+        for start, stop in zip(kept[:-1], kept[1:]):
+            q_start, q_stop = rows['joints'][start], rows['joints'][stop]
+            for row in range(start + 1, stop):
+                direction = q_stop - q_start
+                t = np.clip((rows['joints'][row] - q_start) @ direction / max(direction @ direction, 1e-12), 0, 1)
+                poses = self.robot.fkine_batch(np.radians([rows['joints'][row], q_start + t * direction]))
+                self.assertLessEqual(np.linalg.norm(poses[0, :3] - poses[1, :3]) * 1000, 1.0 + 1e-9)
+
+    def test_empty_program(self):
+        optimized_rows, optimized_notes, report = self.optimizer.optimize(ActionTableModel.make_rows(0), [])
+        self.assertEqual(len(optimized_rows), 0)
+        self.assertEqual(report['time_saved'], 0.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,99 @@
+import sys
+sys.path.append("..")
+import time
+import unittest
+
+import numpy as np
+
+import common.command_builder as command_builder
+from common import settings
+from common.blinx_robot_module import Mirobot
+from common.program_streamer import ProgramStreamer
+from common.socket_client import RobotArmSession
+from tests.robot_arm_simulator import RobotArmSimulator
+
+
+def program(move_count):
+    for i in range(move_count):
+        yield command_builder.set_joint_angle_all_time(50, [i % 90, 0, 0, 0, 0, 0]) + command_builder.set_time_delay(100)
+
+
+class TestProgramStreamer(unittest.TestCase):
+    def tearDown(self):
+        RobotArmSession.close_all()
+        self.simulator.close()
+
+    def create_streamer(self, move_duration=0.002, buffer_size=4, **kwargs):
+        self.simulator = RobotArmSimulator(move_duration=move_duration, buffer_size=buffer_size)
+        session = RobotArmSession.get('127.0.0.1', self.simulator.port)
+        session.connect()
+        return ProgramStreamer(session, **kwargs)
+
+    def test_program_longer_than_controller_buffer(self):
+        streamer = self.create_streamer(window_size=4)
+        progress = []
+        self.assertTrue(streamer.run(program(200), on_progress=progress.append))
+
+        self.assertEqual(self.simulator.moves_completed, 200)
+        self.assertEqual(self.simulator.overflows, 0)
+        self.assertLessEqual(self.simulator.max_buffered, 4)
+        stats = streamer.stats()
+        self.assertEqual(stats["moves_sent"], 200)
+        self.assertEqual(stats["moves_completed"], 200)
+        self.assertEqual(stats["max_in_flight"], 4)
+        self.assertEqual(stats["ack_timeouts"], 0)
+        self.assertEqual(progress[-1], 200)
+        self.assertEqual(progress, sorted(progress))
+
+    def test_stop_while_streaming(self):
+        streamer = self.create_streamer(window_size=2)
+        self.assertFalse(streamer.run(program(1000), is_running=lambda: streamer.stats()["moves_completed"] < 10))
+        self.assertLess(streamer.stats()["moves_sent"], 20)
+
+    def test_ack_timeout_counts_move_as_done(self):
+        streamer = self.create_streamer(move_duration=None, window_size=2, ack_timeout=0.05)
+        self.assertTrue(streamer.run(program(3)))
+        self.assertEqual(streamer.stats()["ack_timeouts"], 3)
+
+    def test_move_timeout_from_expected_duration(self):
+        """超时时间按预计耗时计算, 从动作开始执行时计时"""
+        streamer = self.create_streamer(move_duration=None, window_size=2, timeout_factor=2.0, timeout_margin=0.02)
+        self.assertEqual(streamer.move_timeout(None), streamer.ack_timeout)
+        start_time = time.perf_counter()
+        self.assertTrue(streamer.run((payload, 0.02) for payload in program(3)))
+        self.assertEqual(streamer.stats()["ack_timeouts"], 3)
+        self.assertGreaterEqual(time.perf_counter() - start_time, 3 * 0.06)
+        self.assertLess(time.perf_counter() - start_time, 1.0)
+
+    def test_move_futures_resolved_in_order(self):
+        streamer = self.create_streamer(window_size=4)
+        session = streamer.session
+        session.subscribe(streamer.ACK_COMMAND, streamer._on_move_status)
+        futures = [streamer.send_move(payload, 0.01) for payload in program(3)]
+        ack_times = [future.result(timeout=1) for future in futures]
+        self.assertEqual(ack_times, sorted(ack_times))
+        self.assertEqual(streamer.stats()["moves_completed"], 3)
+
+    def test_int_mode_chains_moves_without_gaps(self):
+        streamer = self.create_streamer(window_size=1)
+        self.assertTrue(streamer.run(program(50)))
+        self.assertLess(streamer.stats()["refill_latency"]["p50_ms"], 20)
+
+
+class TestJointMoveTime(unittest.TestCase):
+    def setUp(self):
+        self.robot = Mirobot(settings.ROBOT_MODEL_CONFIG_FILE_PATH, param_type='MDH')
+
+    def test_max_speed_from_config(self):
+        np.testing.assert_allclose(self.robot.joint_max_speeds, [45, 45, 45, 45, 27, 45])
+
+    def test_slowest_joint_decides_move_time(self):
+        start = [0, 0, 0, 0, 0, 0]
+        self.assertAlmostEqual(self.robot.joint_move_time(start, [90, 0, 0, 0, 0, 0], 100), 2.0)
+        self.assertAlmostEqual(self.robot.joint_move_time(start, [45, 0, 0, 0, -27, 0], 100), 1.0)
+        self.assertAlmostEqual(self.robot.joint_move_time(start, [45, 0, 0, 0, 0, 0], 50), 2.0)
+        self.assertEqual(self.robot.joint_move_time(start, start, 100), 0.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
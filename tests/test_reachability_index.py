@@ -0,0 +1,89 @@
+import sys
+sys.path.append("..")
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+from common import settings
+from common.blinx_robot_module import Mirobot
+from common.reachability_index import ReachabilityIndex
+
+
+class TestReachabilityIndex(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.temp_dir = Path(tempfile.mkdtemp())
+        cls.config_file = cls.temp_dir / "robot_mdh_parameters.yaml"
+        shutil.copy(settings.ROBOT_MODEL_CONFIG_FILE_PATH, cls.config_file)
+        cls.robot = Mirobot(cls.config_file, param_type='MDH')
+        cls.index_file = cls.temp_dir / "reachability_index.npy"
+        cls.index = ReachabilityIndex(cls.robot, cls.config_file, cls.index_file)  # 与界面使用相同的采样参数
+        cls.qlim = np.array([link.qlim for link in cls.robot.links])
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.temp_dir)
+
+    def test_fkine_positions_are_reachable(self):
+        joints = np.random.default_rng(1).uniform(self.qlim[:, 0], self.qlim[:, 1], size=(20000, 6))
+        positions = self.robot.fkine_batch(joints)[:, :3]
+        self.assertTrue(self.index.contains(positions).all())
+        self.assertTrue(self.index.is_reachable(positions[0]))
+
+    def test_near_joint_limits_reachable(self):
+        # 关节在限位附近时末端落在工作空间边界, 逆解可以求解, 不能被索引拒绝
+        rng = np.random.default_rng(2)
+        joints = rng.uniform(self.qlim[:, 0], self.qlim[:, 1], size=(200000, 6))
+        near_limit = rng.random(joints.shape) < 0.5
+        margin = rng.uniform(0, np.radians(3), joints.shape)
+        limits = np.where(rng.random(joints.shape) < 0.5, self.qlim[:, 0] + margin, self.qlim[:, 1] - margin)
+        joints = np.where(near_limit, limits, joints)
+        positions = self.robot._fkine_batch_axes(joints)[3].T
+        self.assertTrue(self.index.contains(positions).all())
+
+        q = np.radians([-5.7, -70, -60, -29.4, -179.8, -28.7])
+        self.assertIsNotNone(self.robot.ikine_analytic(self.robot._fkine_matrix(q), q)[0])
+        self.assertTrue(self.index.is_reachable(self.robot._fkine_matrix(q)[:3, 3]))
+
+    def test_reject_far_targets(self):
+        index = self.index
+        self.assertFalse(index.is_reachable((1.0, 1.0, 1.0)))
+        self.assertFalse(index.is_reachable((0.0, 0.0, -0.5)))
+        self.assertFalse(index.contains([[0.9, 0.0, 0.15]])[0])
+
+    def test_clamp_step_to_boundary(self):
+        index = self.index
+        start = self.robot.fkine_batch(np.radians([0, 0, 0, 0, -40, 0]))[0, :3]
+        target = start + [1.0, 0.0, 0.0]
+        clamped = index.clamp_step(start, target)
+        self.assertTrue(index.is_reachable(clamped))
+        self.assertGreater(clamped[0], start[0])
+        self.assertLess(clamped[0], target[0])
+        np.testing.assert_allclose(clamped[1:], start[1:])
+        np.testing.assert_allclose(index.clamp_step(start, start + 0.001), start + 0.001)
+
+    def test_rebuild_when_config_changes(self):
+        temp_dir = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, temp_dir)
+        config_file = temp_dir / "robot_mdh_parameters.yaml"
+        shutil.copy(settings.ROBOT_MODEL_CONFIG_FILE_PATH, config_file)
+        index_file = temp_dir / "reachability_index.npy"
+
+        def create_index():
+            return ReachabilityIndex(self.robot, config_file, index_file, sample_count=100000)
+
+        create_index()
+        self.assertIsInstance(create_index().grid, np.memmap)
+        build_time = index_file.stat().st_mtime_ns
+
+        with open(config_file, 'a', encoding='utf-8') as f:
+            f.write("\n# 修改配置文件\n")
+        create_index()
+        self.assertNotEqual(index_file.stat().st_mtime_ns, build_time)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,237 @@
+import sys
+sys.path.append("..")
+import threading
+import time
+import unittest
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+import simplejson as json
+
+from common.socket_client import RobotArmSession, CommandQueue, EmergencyStopChannel, LatencyHistogram
+from tests.robot_arm_simulator import RobotArmSimulator
+
+
+def command(command_type, data=None):
+    return json.dumps({"command": command_type, "data": data}).replace(' ', '') + '\r\n'
+
+
+class TestRobotArmSession(unittest.TestCase):
+    def setUp(self):
+        self.simulator = RobotArmSimulator()
+        self.session = RobotArmSession.get('127.0.0.1', self.simulator.port)
+        self.session.reconnect_interval = 0.05
+
+    def tearDown(self):
+        RobotArmSession.close_all()
+        self.simulator.close()
+
+    def wait_until(self, condition, timeout=3):
+        deadline = time.time() + timeout
+        while not condition() and time.time() < deadline:
+            time.sleep(0.01)
+        return condition()
+
+    def test_one_connection_for_many_commands(self):
+        for i in range(50):
+            self.session.send(command("set_joint_angle", [1, 50, i])).result(timeout=1)
+        self.assertTrue(self.wait_until(lambda: len(self.simulator.received_commands) == 50))
+        self.assertEqual(self.simulator.accept_count, 1)
+        self.assertIs(RobotArmSession.get('127.0.0.1', self.simulator.port), self.session)
+
+        stats = self.session.stats()
+        self.assertEqual(stats["connects"], 1)
+        self.assertEqual(stats["commands_sent"], 50)
+        self.assertEqual(stats["commands_per_connect"], 50)
+
+    def test_route_responses_by_command_type(self):
+        mode_future = self.session.send(command("get_robot_mode"), expect="get_robot_mode")
+        delay_future = self.session.send(command("set_time_delay", [20]), expect="set_time_delay")
+        self.assertEqual(delay_future.result(timeout=1)["data"], [20])
+        self.assertEqual(mode_future.result(timeout=1)["command"], "get_robot_mode")
+
+    def test_subscribe_pushed_data(self):
+        received = []
+        self.session.subscribe("get_joint_angle_all", received.append)
+        self.session.connect()
+        self.assertTrue(self.wait_until(lambda: self.simulator.connections))
+        self.simulator.push({"command": "get_joint_angle_all", "data": [0, 0, 0, 0, 0, 0]})
+        self.simulator.push({"command": "move_in_place", "data": True})
+        self.assertTrue(self.wait_until(lambda: received))
+        self.assertEqual(received, [{"command": "get_joint_angle_all", "data": [0, 0, 0, 0, 0, 0]}])
+        # 没有订阅的 move_in_place 不做 JSON 解析
+        self.assertTrue(self.wait_until(lambda: self.session.stats()["frames_skipped"] >= 1))
+        self.assertGreaterEqual(self.session.stats()["framer"]["frames"], 2)
+
+    def test_transparent_reconnect(self):
+        self.session.request(command("get_robot_mode"), expect="get_robot_mode", timeout=1)
+        self.simulator.drop_connections()
+        self.assertTrue(self.wait_until(lambda: self.simulator.accept_count == 2))
+
+        response = self.session.request(command("get_robot_mode"), expect="get_robot_mode", timeout=1)
+        self.assertEqual(response["command"], "get_robot_mode")
+        self.assertEqual(self.session.stats()["reconnects"], 1)
+
+    def test_timed_out_request_not_answered_later(self):
+        # 控制器没有返回 get_robot_mode 响应, 请求超时后不再占用后续同类型的响应
+        with self.assertRaises(FutureTimeoutError):
+            self.session.request(command("set_time_delay", [1]), expect="get_robot_mode", timeout=0.2)
+        self.assertEqual(self.session.stats()["pending"], 0)
+        response = self.session.request(command("get_robot_mode"), expect="get_robot_mode", timeout=1)
+        self.assertEqual(response["command"], "get_robot_mode")
+
+        # 调用方自行取消的 Future 同样跳过
+        cancelled = self.session.send(command("set_time_delay", [2]), expect="get_robot_mode")
+        self.assertTrue(self.wait_until(lambda: self.session.stats()["pending"] == 1))
+        cancelled.cancel()
+        response = self.session.request(command("get_robot_mode"), expect="get_robot_mode", timeout=1)
+        self.assertEqual(response["command"], "get_robot_mode")
+
+    def test_close_fails_pending_futures(self):
+        future = self.session.send(command("set_joint_initialize", [0]), expect="never_answered")
+        self.session.close()
+        self.assertIsInstance(future.exception(timeout=1), ConnectionError)
+        self.assertIsNot(RobotArmSession.get('127.0.0.1', self.simulator.port), self.session)
+
+    def test_concurrent_senders(self):
+        """多个线程同时 send() 时 I/O 线程正常合并发送, 每个线程的命令按顺序到达"""
+        self.session.connect()
+        self.addCleanup(sys.setswitchinterval, sys.getswitchinterval())
+        sys.setswitchinterval(1e-6)  # 频繁切换线程, 复现 I/O 线程合并命令时其他线程追加命令
+
+        def send_burst(joint_number):
+            futures = [self.session.send(command("set_joint_angle", [joint_number, 50, i])) for i in range(3000)]
+            for future in futures:
+                future.result(timeout=10)
+
+        threads = [threading.Thread(target=send_burst, args=(joint_number,)) for joint_number in range(1, 5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertTrue(self.wait_until(lambda: len(self.simulator.received_commands) == 12000, timeout=10))
+        for joint_number in range(1, 5):
+            self.assertEqual([c["data"][2] for c in self.simulator.received_commands if c["data"][0] == joint_number],
+                             list(range(3000)))
+        self.assertTrue(self.session._io_thread.is_alive())
+
+    def test_io_thread_failure_closes_session(self):
+        future = self.session.send(command("get_robot_mode"), expect="never_answered")
+        self.assertTrue(self.wait_until(lambda: self.session.stats()["pending"] == 1))
+
+        def broken_read(client_socket):
+            raise RuntimeError("解析异常")
+
+        self.session.framer.read_from = broken_read
+        self.simulator.push({"command": "get_joint_angle_all", "data": [0] * 6})
+        self.assertIsInstance(future.exception(timeout=1), ConnectionError)
+        self.assertTrue(self.wait_until(lambda: not self.session._io_thread.is_alive()))
+        self.assertIsInstance(self.session.send(command("get_robot_mode")).exception(timeout=1), ConnectionError)
+
+        # 下一次获取会话时重新连接
+        session = RobotArmSession.get('127.0.0.1', self.simulator.port)
+        self.assertIsNot(session, self.session)
+        self.assertEqual(session.request(command("get_robot_mode"), expect="get_robot_mode", timeout=1)["command"],
+                         "get_robot_mode")
+
+    def test_command_queue_wakes_io_thread(self):
+        """命令队列写入后立即发送, 不等待轮询周期"""
+        command_queue = CommandQueue()
+        self.session.attach_command_queue(command_queue)
+        for i in range(20):
+            command_queue.put(command("set_joint_angle", [1, 50, i]).encode())
+            self.assertTrue(self.wait_until(lambda: len(self.simulator.received_commands) == i + 1))
+        self.assertTrue(command_queue.empty())
+
+        dispatch = self.session.stats()["latency"]["dispatch"]
+        self.assertEqual(dispatch["count"], 20)
+        self.assertLess(dispatch["p50_ms"], 20)
+
+    def test_coalesce_pending_commands(self):
+        """积压的命令合并发送, 单批不超过 max_batch_bytes"""
+        payloads = [command("set_joint_angle", [1, 50, i]).encode() for i in range(100, 150)]
+        self.session.max_batch_bytes = sum(map(len, payloads[:10]))
+        self.session.connect()
+        command_queue = CommandQueue()
+        for payload in payloads:
+            command_queue.put(payload)
+        self.session.attach_command_queue(command_queue)
+
+        self.assertTrue(self.wait_until(lambda: len(self.simulator.received_commands) == 50))
+        self.assertEqual([c["data"][2] for c in self.simulator.received_commands], list(range(100, 150)))
+        stats = self.session.stats()
+        self.assertEqual(stats["commands_sent"], 50)
+        self.assertEqual(stats["batches_sent"], 5)
+        self.assertEqual(stats["average_batch_commands"], 10)
+        self.assertEqual(stats["average_batch_bytes"], self.session.max_batch_bytes)
+
+
+class TestEmergencyStopChannel(unittest.TestCase):
+    def setUp(self):
+        self.simulator = RobotArmSimulator()
+        self.channel = EmergencyStopChannel(reconnect_interval=0.05)
+
+    def tearDown(self):
+        self.channel.close()
+        RobotArmSession.close_all()
+        self.simulator.close()
+
+    def wait_until(self, condition, timeout=3):
+        deadline = time.time() + timeout
+        while not condition() and time.time() < deadline:
+            time.sleep(0.01)
+        return condition()
+
+    def stop_commands(self):
+        return [c for c in self.simulator.received_commands if c["command"] == "set_joint_emergency_stop"]
+
+    def test_stop_within_latency_budget(self):
+        self.assertTrue(self.channel.open('127.0.0.1', self.simulator.port))
+        for _ in range(20):
+            self.channel.stop()
+        self.assertTrue(self.wait_until(lambda: self.channel.stats()["latency"]["ack"]["count"] == 20))
+        self.assertEqual(len(self.stop_commands()), 20)
+        stats = self.channel.stats()
+        self.assertLess(stats["latency"]["send"]["max_ms"], stats["latency_budget_ms"])
+        self.assertLess(stats["latency"]["ack"]["p99_ms"], 50)
+
+    def test_stop_bypasses_command_queue(self):
+        """命令队列积压时急停命令不排在队列之后"""
+        session = RobotArmSession.get('127.0.0.1', self.simulator.port)
+        session.connect()
+        self.channel.open('127.0.0.1', self.simulator.port)
+        command_queue = CommandQueue()
+        for i in range(5000):
+            command_queue.put(command("set_joint_angle", [1, 50, i]).encode())
+        session.attach_command_queue(command_queue)
+        self.channel.stop()
+
+        self.assertTrue(self.wait_until(lambda: self.stop_commands()))
+        self.assertLess(len(self.simulator.received_commands), 5000)
+
+    def test_reconnect_after_drop(self):
+        self.channel.open('127.0.0.1', self.simulator.port)
+        self.simulator.drop_connections()
+        self.assertTrue(self.wait_until(lambda: self.channel.stats()["connects"] == 2 and self.channel.is_connected))
+        self.channel.stop()
+        self.assertTrue(self.wait_until(lambda: self.stop_commands()))
+
+    def test_stop_without_connection(self):
+        with self.assertRaises(ConnectionError):
+            self.channel.stop()
+
+
+class TestLatencyHistogram(unittest.TestCase):
+    def test_buckets_and_percentiles(self):
+        histogram = LatencyHistogram()
+        for latency_ms in (0.05, 0.3, 0.3, 4, 150):
+            histogram.record(latency_ms / 1000)
+        summary = histogram.summary()
+        self.assertEqual(summary["count"], 5)
+        self.assertEqual(summary["buckets"], {"<=0.1ms": 1, "<=0.5ms": 2, "<=5ms": 1, "<=200ms": 1})
+        self.assertAlmostEqual(summary["p50_ms"], 0.3)
+        self.assertAlmostEqual(summary["max_ms"], 150)
+        self.assertIn("p99", histogram.format("测试"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,155 @@
+import sys
+sys.path.append("..")
+import time
+import tracemalloc
+import unittest
+
+import numpy as np
+
+import common.command_builder as command_builder
+from common import settings
+from common.blinx_robot_module import Mirobot
+from common.program_loop import ProgramLoopRunner
+from common.setpoint_streamer import SetpointStreamer, encode_setpoints, interpolate_setpoints
+from common.socket_client import RobotArmSession
+from common.teach_program import CompiledProgram
+from tests.robot_arm_simulator import RobotArmSimulator
+
+
+TOOL_ON = command_builder.set_end_tool(1, 1)
+
+
+class TestSetpointPipeline(unittest.TestCase):
+    def test_interpolated_evenly_to_waypoint(self):
+        setpoints = list(interpolate_setpoints([([10, 0, 0, 0, 0, 20], 50, TOOL_ON, 0.1)], 0.01, [0] * 6))
+        self.assertEqual(len(setpoints), 10)
+        joints = np.array([setpoint[0] for setpoint in setpoints])
+        np.testing.assert_allclose(joints[:, 0], np.arange(1, 11))
+        np.testing.assert_allclose(joints[:, 5], np.arange(2, 21, 2))
+        # 附带命令只随最后一个设定点发送
+        self.assertEqual([extra for _, _, extra, _ in setpoints], [b''] * 9 + [TOOL_ON])
+        self.assertEqual([reached for *_, reached in setpoints], [False] * 9 + [True])
+
+    def test_duration_rounded_up_to_whole_periods(self):
+        setpoints = list(interpolate_setpoints([([1, 0, 0, 0, 0, 0], 50, b'', 0.025), ([1, 1, 0, 0, 0, 0], 50, b'', 0.0)],
+                                               0.01, [0] * 6))
+        self.assertEqual(len(setpoints), 3 + 1)  # 0.025 s 为 3 个周期, 没有耗时的动作占 1 个周期
+        np.testing.assert_array_equal(setpoints[2][0], [1, 0, 0, 0, 0, 0])
+
+    def test_hold_and_duplicates_not_sent(self):
+        waypoints = [([5, 0, 0, 0, 0, 0], 50, b'', 0.02), (None, 0, b'', 0.03), ([5, 0, 0, 0, 0, 0], 50, b'', 0.02)]
+        encoded = list(encode_setpoints(interpolate_setpoints(waypoints, 0.01, [0] * 6)))
+        self.assertEqual(len(encoded), 2 + 3 + 2)
+        self.assertEqual([payload is not None for payload, _ in encoded], [True, True] + [False] * 5)
+        self.assertEqual([reached for _, reached in encoded], [False, True, False, False, False, False, True])
+
+    def test_memory_flat_for_long_path(self):
+        rng = np.random.default_rng(0)
+
+        def waypoints(count):
+            for _ in range(count):
+                yield rng.uniform(-90, 90, 6), 50, b'', 0.5
+
+        tracemalloc.start()
+        try:
+            for payload, _ in encode_setpoints(interpolate_setpoints(waypoints(200), 0.005, [0] * 6)):
+                pass
+            _, short_peak = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            for payload, _ in encode_setpoints(interpolate_setpoints(waypoints(2000), 0.005, [0] * 6)):
+                pass
+            _, long_peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        self.assertLess(long_peak, short_peak * 2)
+
+
+class TestSetpointStreamer(unittest.TestCase):
+    def setUp(self):
+        self.simulator = RobotArmSimulator()
+        self.session = RobotArmSession.get('127.0.0.1', self.simulator.port)
+        self.session.connect()
+
+    def tearDown(self):
+        RobotArmSession.close_all()
+        self.simulator.close()
+
+    def received_setpoints(self):
+        return [command for command in self.simulator.received_commands if command["command"] == "set_joint_angle_all_time"]
+
+    def test_fixed_rate(self):
+        streamer = SetpointStreamer(self.session, rate=100)
+        waypoints = [([10, 0, 0, 0, 0, 0], 50, b'', 0.1), ([10, 10, 0, 0, 0, 0], 50, TOOL_ON, 0.1)]
+        start_time = time.perf_counter()
+        self.assertTrue(streamer.run(waypoints, [0] * 6))
+        elapsed = time.perf_counter() - start_time
+        # 按绝对时刻发送, 总耗时不随周期数累积误差
+        self.assertGreaterEqual(elapsed, 0.2)
+        self.assertLess(elapsed, 0.2 + 0.1)
+        self.assertEqual(streamer.stats()["ticks"], 20)
+        self.assertEqual(streamer.moves_completed, 2)
+        time.sleep(0.05)
+        setpoints = self.received_setpoints()
+        self.assertEqual(len(setpoints), 20)
+        self.assertEqual(setpoints[-1]["data"], [50, 10, 10, 0, 0, 0, 0])
+        self.assertEqual(sum(command["command"] == "set_end_tool" for command in self.simulator.received_commands), 1)
+        times = np.array(self.simulator.received_times["set_joint_angle_all_time"])
+        self.assertAlmostEqual(float(np.median(np.diff(times))), 0.01, delta=0.005)
+
+    def test_stall_resynchronized(self):
+        def waypoints():
+            yield [10, 0, 0, 0, 0, 0], 50, b'', 0.1
+            time.sleep(0.2)  # 生成路点时线程被阻塞
+            yield [20, 0, 0, 0, 0, 0], 50, b'', 0.1
+
+        streamer = SetpointStreamer(self.session, rate=100, max_lag=0.05)
+        start_time = time.perf_counter()
+        self.assertTrue(streamer.run(waypoints(), [0] * 6))
+        elapsed = time.perf_counter() - start_time
+        self.assertGreaterEqual(streamer.deadline_misses, 1)
+        self.assertGreaterEqual(streamer.resyncs, 1)
+        # 阻塞之后不集中补发, 第二段仍按原来的速度执行
+        self.assertGreaterEqual(elapsed, 0.2 + 0.2 - 0.02)
+        time.sleep(0.05)
+        times = np.array(self.simulator.received_times["set_joint_angle_all_time"][10:])
+        self.assertGreaterEqual(times[-1] - times[0], 0.08)
+
+    def test_stopped(self):
+        streamer = SetpointStreamer(self.session, rate=100)
+        start_time = time.perf_counter()
+        self.assertFalse(streamer.run([([90, 0, 0, 0, 0, 0], 50, b'', 10.0)], [0] * 6,
+                                      is_running=lambda: time.perf_counter() - start_time < 0.1))
+        self.assertLess(time.perf_counter() - start_time, 0.5)
+
+    def test_invalid_rate(self):
+        with self.assertRaises(ValueError):
+            SetpointStreamer(self.session, rate=0)
+
+
+class TestSetpointLoop(unittest.TestCase):
+    def setUp(self):
+        self.simulator = RobotArmSimulator()
+        self.session = RobotArmSession.get('127.0.0.1', self.simulator.port)
+        self.session.connect()
+
+    def tearDown(self):
+        RobotArmSession.close_all()
+        self.simulator.close()
+
+    def test_int_loop_streamed(self):
+        robot = Mirobot(settings.ROBOT_MODEL_CONFIG_FILE_PATH, param_type='MDH')
+        actions = [([0, 0, 0, 0, 0, 0], 100, -1, 0.0), ([10, 0, 0, 0, 0, 0], 100, 1, 0.0)]
+        program = CompiledProgram.compile(actions, robot, "INT")
+        runner = ProgramLoopRunner(SetpointStreamer(self.session, rate=100), program, dwell=0.05, command_model="INT")
+        cycles = []
+        self.assertTrue(runner.run(loop_times=3, start_degrees=[0] * 6,
+                                   on_cycle=lambda count, cycle_time: cycles.append(cycle_time)))
+        self.assertEqual(runner.streamer.moves_completed, 6)
+        self.assertEqual(len(cycles), 3)
+        self.assertTrue(all(cycle_time >= runner.expected_cycle_time - 0.01 for cycle_time in cycles[1:]))
+        time.sleep(0.05)
+        self.assertEqual(sum(command["command"] == "set_end_tool" for command in self.simulator.received_commands), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,105 @@
+import sys
+sys.path.append("..")
+import unittest
+
+import numpy as np
+
+import common.command_builder as command_builder
+from common import settings
+from common.blinx_robot_module import Mirobot
+from common.program_loop import ProgramLoopRunner
+from common.teach_program import CompiledProgram
+
+
+ACTIONS = [
+    ([0, 0, 0, 0, 0, 0], 100, -1, 0.0),
+    ([90, 0, 0, 0, 0, 0], 50, 1, 0.5),
+    ([90, 0, 0, 0, -27, 0], 100, 0, 0.0),
+]
+
+
+class TestCompiledProgram(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.robot = Mirobot(settings.ROBOT_MODEL_CONFIG_FILE_PATH, param_type='MDH')
+
+    def test_payloads_pre_encoded(self):
+        program = CompiledProgram.compile(ACTIONS, self.robot, "SEQ")
+        self.assertEqual(len(program), 3)
+        self.assertEqual(program.payloads[0], command_builder.set_joint_angle_all_time(100, ACTIONS[0][0]))
+        self.assertEqual(program.payloads[1],
+                         command_builder.set_joint_angle_all_time(50, ACTIONS[1][0])
+                         + command_builder.set_end_tool(1, 1) + command_builder.set_time_delay(500))
+        self.assertEqual(program.step_payloads[1],
+                         command_builder.set_joint_angle_all_time(50, ACTIONS[1][0]) + command_builder.set_end_tool(1, 1))
+        self.assertEqual(program.payloads[2],
+                         command_builder.set_joint_angle_all_time(100, ACTIONS[2][0]) + command_builder.set_end_tool(1, 0))
+
+    def test_int_mode_skips_delay(self):
+        program = CompiledProgram.compile(ACTIONS + [([0] * 6, 100, -1, 60.0)], self.robot, "INT")
+        self.assertNotIn(b'set_time_delay', b''.join(program.payloads))
+        # INT 模式按时间最优时间律估算: 匀速耗时 + 一次加减速
+        self.assertAlmostEqual(program.durations[1], 90 / 22.5 + 22.5 / 180)
+        self.assertAlmostEqual(program.first_duration([0] * 6), 0.0)
+        self.assertAlmostEqual(program.first_duration([45, 0, 0, 0, 0, 0]), 45 / 45 + 45 / 180)
+
+    def test_durations_match_joint_move_time(self):
+        program = CompiledProgram.compile(ACTIONS, self.robot, "SEQ")
+        # 第 0 个动作按循环从最后一个动作出发估算
+        np.testing.assert_allclose(program.durations, [2.0, 4.0 + 0.5, 1.0])
+        for row, (joints, speed, _, delay) in enumerate(ACTIONS):
+            expected = self.robot.joint_move_time(ACTIONS[row - 1][0], joints, speed) + delay
+            self.assertAlmostEqual(program.durations[row], expected)
+
+    def test_plan_is_read_only(self):
+        program = CompiledProgram.compile(ACTIONS, self.robot, "SEQ")
+        with self.assertRaises(ValueError):
+            program.actions['speed'][0] = 10
+        with self.assertRaises(ValueError):
+            program.durations[0] = 0.0
+
+    def test_delay_out_of_range(self):
+        with self.assertRaisesRegex(ValueError, "第 2 个动作"):
+            CompiledProgram.compile([ACTIONS[0], ([0] * 6, 100, -1, 31.0)], self.robot, "SEQ")
+
+    def test_iter_moves_loops_without_reencoding(self):
+        program = CompiledProgram.compile(ACTIONS, self.robot, "SEQ")
+        moves = list(ProgramLoopRunner(None, program).iter_moves(loop_times=1000, start_degrees=[0] * 6))
+        self.assertEqual(len(moves), 3000)
+        # 循环只复用编译好的命令对象
+        self.assertTrue(all(payload is program.payloads[i % 3] for i, (payload, _) in enumerate(moves)))
+        self.assertAlmostEqual(moves[0][1], 0.0)  # 当前位置就在第一个动作
+        self.assertAlmostEqual(moves[3][1], 2.0)  # 之后的循环从最后一个动作出发
+        self.assertAlmostEqual(moves[1][1], 4.5)
+
+    def test_dry_run_timeline(self):
+        program = CompiledProgram.compile(ACTIONS, self.robot, "SEQ")
+        result = program.dry_run(loop_times=10, start_degrees=[0] * 6)
+        np.testing.assert_allclose(result['finish_times'], [2.0, 6.5, 7.5])
+        np.testing.assert_allclose(result['start_times'], [0.0, 2.0, 6.5])
+        self.assertAlmostEqual(result['cycle_time'], 7.5)
+        self.assertAlmostEqual(result['first_cycle_time'], 5.5)  # 当前位置就在第一个动作
+        self.assertAlmostEqual(result['total_time'], 5.5 + 7.5 * 9)
+        moves = list(ProgramLoopRunner(None, program).iter_moves(10, [0] * 6))
+        self.assertAlmostEqual(sum(duration for _, duration in moves), result['total_time'])
+
+        poses = self.robot.fkine_batch(np.radians([action[0] for action in ACTIONS]))
+        self.assertAlmostEqual(result['tool_travel'][1], np.linalg.norm(poses[1, :3] - poses[0, :3]) * 1000)
+        self.assertEqual(len(result['joint_limit_rows']), 0)
+
+    def test_dry_run_joint_limits_and_int_mode(self):
+        program = CompiledProgram.compile(ACTIONS + [([150, 0, 0, 0, 0, 0], 100, -1, 1.0)], self.robot, "INT")
+        result = program.dry_run()
+        np.testing.assert_array_equal(result['joint_limit_rows'], [3])
+        first = 150 / 45 + 45 / 180
+        np.testing.assert_allclose(result['finish_times'][:3], [first, first + 4.125, first + 4.125 + 1.15])  # 不含延时
+
+    def test_empty_program(self):
+        program = CompiledProgram.compile([], self.robot, "SEQ")
+        self.assertEqual(len(program), 0)
+        self.assertEqual(list(ProgramLoopRunner(None, program).iter_moves(10)), [])
+        self.assertEqual(program.dry_run(10)['total_time'], 0.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,112 @@
+import sys
+sys.path.append("..")
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+import yaml
+
+from common import settings
+from common.blinx_robot_module import Mirobot, RobotArmConfig
+from common.time_parameterization import TimeOptimalParameterization
+
+
+MAX_SPEEDS = np.array([45, 45, 45, 45, 27, 45], dtype=np.float64)
+MAX_ACCELERATIONS = np.full(6, 180.0)
+PERIOD = 0.005
+
+
+def make_curve(count=2000):
+    s = np.linspace(0, 1, count)
+    return np.stack([60 * np.sin(2 * np.pi * s), 40 * s, 30 * np.cos(3 * np.pi * s), 0 * s, 20 * s, -50 * s], axis=1)
+
+
+class TestTimeOptimalParameterization(unittest.TestCase):
+    def setUp(self):
+        self.parameterization = TimeOptimalParameterization(MAX_SPEEDS, MAX_ACCELERATIONS)
+
+    def test_straight_move_is_trapezoid(self):
+        # 能加速到最大速度: 匀速耗时 + 一次加减速; 太短: 三角形速度曲线
+        self.assertAlmostEqual(self.parameterization.move_time([0] * 6, [90, 0, 0, 0, 0, 0]), 90 / 45 + 45 / 180)
+        self.assertAlmostEqual(self.parameterization.move_time([0] * 6, [10, 0, 0, 0, 0, 0]), 2 * np.sqrt(10 / 180))
+        self.assertAlmostEqual(self.parameterization.move_time([0] * 6, [90, 0, 0, 0, 0, 0], 50), 90 / 22.5 + 22.5 / 180)
+        # 最慢的关节决定耗时
+        self.assertAlmostEqual(self.parameterization.move_time([0] * 6, [27, 0, 0, 0, 27, 0]), 27 / 27 + 27 / 180)
+        self.assertEqual(self.parameterization.move_time([5] * 6, [5] * 6), 0.0)
+
+        timing = self.parameterization.parameterize([[0] * 6, [90, 0, 0, 0, 0, 0]])
+        self.assertAlmostEqual(timing["duration"], 90 / 45 + 45 / 180)
+
+    def test_move_durations_vectorized(self):
+        joints = np.random.default_rng(0).uniform(-90, 90, (50, 6))
+        speeds = np.random.default_rng(1).uniform(1, 100, 50)
+        durations = self.parameterization.move_durations(joints, speeds)
+        for row in range(50):
+            self.assertAlmostEqual(durations[row],
+                                   self.parameterization.move_time(joints[row - 1], joints[row], speeds[row]))
+
+    def test_curved_path_within_limits(self):
+        path = make_curve()
+        timing = self.parameterization.parameterize(path)
+        setpoints = TimeOptimalParameterization.sample(timing, PERIOD)
+        self.assertEqual(len(setpoints), int(np.ceil(timing["duration"] / PERIOD - 1e-9)))
+        np.testing.assert_array_equal(setpoints[-1], path[-1])
+
+        joints = np.vstack([path[0], setpoints])
+        velocities = np.diff(joints, axis=0) / PERIOD
+        accelerations = np.diff(np.vstack([np.zeros(6), velocities, np.zeros(6)]), axis=0) / PERIOD
+        self.assertTrue(np.all(np.abs(velocities) <= MAX_SPEEDS * (1 + 1e-6)))
+        self.assertTrue(np.all(np.abs(accelerations) <= MAX_ACCELERATIONS * 1.01))
+        # 时间最优: 某个关节的速度或加速度达到限制
+        self.assertGreater(np.max(np.abs(velocities) / MAX_SPEEDS), 0.99)
+
+    def test_timing_monotonic_and_duplicates_removed(self):
+        path = np.repeat(make_curve(100), 2, axis=0)
+        timing = self.parameterization.parameterize(path)
+        self.assertEqual(len(timing["path"]), 100)
+        self.assertTrue(np.all(np.diff(timing["times"]) > 0))
+        self.assertEqual(timing["velocities"][0], 0.0)
+        self.assertEqual(timing["velocities"][-1], 0.0)
+        self.assertGreater(self.parameterization.parameterize(path, 20)["duration"], timing["duration"])
+
+        self.assertEqual(self.parameterization.parameterize([[1] * 6] * 3)["duration"], 0.0)
+        self.assertEqual(len(TimeOptimalParameterization.sample(self.parameterization.parameterize([[1] * 6]), PERIOD)), 1)
+
+    def test_limits_from_model_config(self):
+        config = RobotArmConfig(settings.ROBOT_MODEL_CONFIG_FILE_PATH)
+        robot = Mirobot(settings.ROBOT_MODEL_CONFIG_FILE_PATH, param_type='MDH')
+        np.testing.assert_array_equal(robot.joint_max_accelerations, config.get_joint_max_accelerations())
+        self.assertTrue(np.all(robot.joint_max_accelerations > 0))
+        np.testing.assert_array_equal(robot.time_parameterization.joint_max_speeds, robot.joint_max_speeds)
+        with self.assertRaises(ValueError):
+            TimeOptimalParameterization(MAX_SPEEDS, np.zeros(6))
+
+    def test_move_time_follows_configured_acceleration(self):
+        """最大加速度是调试估计值, 修改配置后预计耗时按梯形速度曲线变化"""
+        config = RobotArmConfig(settings.ROBOT_MODEL_CONFIG_FILE_PATH).open_yaml_config()
+        move_times = {}
+        with tempfile.TemporaryDirectory() as temp_dir:
+            for max_acceleration in (90, 180, 360, None):
+                for each_joint in config:
+                    if max_acceleration is None:
+                        each_joint.pop('max_acceleration', None)
+                    else:
+                        each_joint['max_acceleration'] = max_acceleration
+                config_file = Path(temp_dir) / f"robot_{max_acceleration}.yaml"
+                config_file.write_text(yaml.safe_dump(config), encoding='utf-8')
+                robot = Mirobot(config_file, param_type='MDH')
+                move_times[max_acceleration] = (robot.time_parameterization.move_time([0] * 6, [90, 0, 0, 0, 0, 0]),
+                                                robot.time_parameterization.move_time([0] * 6, [4, 0, 0, 0, 0, 0]))
+
+        # 能加速到最大速度: 90 / 45 + 45 / a; 太短: 2 * sqrt(4 / a)
+        for max_acceleration in (90, 180, 360):
+            self.assertAlmostEqual(move_times[max_acceleration][0], 90 / 45 + 45 / max_acceleration)
+            self.assertAlmostEqual(move_times[max_acceleration][1], 2 * np.sqrt(4 / max_acceleration))
+        self.assertAlmostEqual(move_times[90][0] - move_times[180][0], 0.25)
+        # 配置文件中未填写时使用默认的 180 °/s²
+        self.assertEqual(move_times[None], move_times[180])
+
+
+if __name__ == '__main__':
+    unittest.main()
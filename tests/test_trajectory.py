@@ -0,0 +1,135 @@
+import sys
+sys.path.append("..")
+import time
+import unittest
+
+import numpy as np
+
+import common.command_builder as command_builder
+from common import settings
+from common.blinx_robot_module import Mirobot
+from common.program_loop import ProgramLoopRunner
+from common.setpoint_streamer import SetpointStreamer
+from common.socket_client import RobotArmSession
+from common.teach_program import CompiledProgram
+from common.trajectory import BlendedTrajectory
+from tests.robot_arm_simulator import RobotArmSimulator
+
+
+PERIOD = 0.01
+
+
+def make_joints(count=20):
+    return np.cumsum(np.random.default_rng(0).uniform(-8, 8, (count, 6)), axis=0)
+
+
+class TestBlendedTrajectory(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.robot = Mirobot(settings.ROBOT_MODEL_CONFIG_FILE_PATH, param_type='MDH')
+
+    def compile(self, joints, blend, tool_status=-1, delay=0.0):
+        actions = [(row.tolist(), 50, tool_status, delay, blend) for row in joints]
+        return CompiledProgram.compile(actions, self.robot, "INT")
+
+    def setpoints(self, trajectory, program, blend_times):
+        waypoints = [(action['joints'], 50, b'', duration, blend_time)
+                     for action, duration, blend_time in zip(program.actions, program.durations, blend_times)]
+        waypoints[0] = waypoints[0][:4] + (0.0,)
+        setpoints = list(trajectory.iter_setpoints(waypoints, PERIOD, program.actions['joints'][-1]))
+        joints = np.vstack([program.actions['joints'][-1]] + [setpoint[0] for setpoint in setpoints])
+        return setpoints, joints
+
+    def test_zero_radius_stops_at_every_waypoint(self):
+        trajectory = BlendedTrajectory(self.robot)
+        program = self.compile(make_joints(), 0)
+        plan = trajectory.plan(program, PERIOD)
+        self.assertEqual(plan["blended_count"], 0)
+        self.assertEqual(plan["cycle_time"], plan["stop_cycle_time"])
+        setpoints, joints = self.setpoints(trajectory, program, plan["blend_times"])
+        reached = [i + 1 for i, setpoint in enumerate(setpoints) if setpoint[3]]
+        np.testing.assert_allclose(joints[reached], program.actions['joints'])
+        self.assertAlmostEqual(len(setpoints) * PERIOD, plan["stop_cycle_time"], delta=PERIOD / 2)
+
+    def test_blending_shortens_cycle_within_limits(self):
+        for profile in BlendedTrajectory.PROFILES:
+            trajectory = BlendedTrajectory(self.robot, profile)
+            program = self.compile(make_joints(), 50)
+            plan = trajectory.plan(program, PERIOD)
+            self.assertGreater(plan["blended_count"], 0)
+            self.assertLess(plan["cycle_time"], plan["stop_cycle_time"] * 0.9)
+
+            setpoints, joints = self.setpoints(trajectory, program, plan["blend_times"])
+            velocities = np.diff(joints, axis=0) / PERIOD
+            accelerations = np.diff(velocities, axis=0) / PERIOD
+            # 速度、加速度不超过限制, 路径连续
+            self.assertTrue(np.all(np.abs(velocities) <= self.robot.joint_max_speeds * 0.5 + 1e-6))
+            self.assertTrue(np.all(np.abs(accelerations) <= trajectory.joint_accelerations + 1e-6))
+            np.testing.assert_allclose(joints[-1], program.actions['joints'][-1])
+
+    def test_deviation_within_radius(self):
+        trajectory = BlendedTrajectory(self.robot, samples=33)
+        for radius in (2.0, 10.0):
+            program = self.compile(make_joints(), radius)
+            plan = trajectory.plan(program, PERIOD)
+            blended = np.flatnonzero(plan["blend_times"] > 0)
+            joints = program.actions['joints']
+            times, _ = trajectory.segment_times(np.abs(joints - np.roll(joints, 1, axis=0)),
+                                                np.asarray(program.durations), PERIOD)
+            velocities = (joints - np.roll(joints, 1, axis=0)) / times[:, np.newaxis]
+            positions = self.robot._fkine_batch_axes(np.radians(joints))[3]
+            deviation = trajectory._blend_deviation(joints[blended], velocities[blended],
+                                                    np.roll(velocities, -1, axis=0)[blended],
+                                                    plan["blend_times"][blended], positions[:, blended])
+            self.assertTrue(np.all(deviation <= radius * 1.01))
+
+    def test_tool_and_delay_always_stop(self):
+        trajectory = BlendedTrajectory(self.robot)
+        for tool_status, delay in ((1, 0.0), (-1, 0.5)):
+            plan = trajectory.plan(self.compile(make_joints(), 50, tool_status, delay), PERIOD)
+            self.assertEqual(plan["blended_count"], 0)
+
+        # 有附带命令的路点即使给了过渡时间也停稳
+        tool_on = command_builder.set_end_tool(1, 1)
+        waypoints = [([10, 0, 0, 0, 0, 0], 50, tool_on, 0.2, 0.05), ([20, 0, 0, 0, 0, 0], 50, b'', 0.2, 0.0)]
+        setpoints = list(trajectory.iter_setpoints(waypoints, PERIOD, [0] * 6))
+        reached = [setpoint for setpoint in setpoints if setpoint[3]]
+        np.testing.assert_array_equal(reached[0][0], [10, 0, 0, 0, 0, 0])
+        self.assertEqual(reached[0][2], tool_on)
+
+    def test_invalid_profile(self):
+        with self.assertRaises(ValueError):
+            BlendedTrajectory(self.robot, "cubic")
+
+
+class TestBlendedLoop(unittest.TestCase):
+    def setUp(self):
+        self.simulator = RobotArmSimulator()
+        self.session = RobotArmSession.get('127.0.0.1', self.simulator.port)
+        self.session.connect()
+
+    def tearDown(self):
+        RobotArmSession.close_all()
+        self.simulator.close()
+
+    def test_int_loop_blended(self):
+        robot = Mirobot(settings.ROBOT_MODEL_CONFIG_FILE_PATH, param_type='MDH')
+        corners = ([0, 0], [20, 0], [20, 20], [0, 20])
+        actions = [([j1, j2, 0, 0, 0, 0], 100, -1, 0.0, 50) for j1, j2 in corners]
+        program = CompiledProgram.compile(actions, robot, "INT")
+        trajectory = BlendedTrajectory(robot)
+        plan = trajectory.plan(program, PERIOD)
+        self.assertEqual(plan["blended_count"], 4)
+        streamer = SetpointStreamer(self.session, rate=1 / PERIOD, trajectory=trajectory)
+        runner = ProgramLoopRunner(streamer, program, command_model="INT", blend_times=plan["blend_times"])
+        start_time = time.perf_counter()
+        self.assertTrue(runner.run(loop_times=2, start_degrees=[0] * 6))
+        self.assertEqual(streamer.moves_completed, 8)
+        self.assertLess(time.perf_counter() - start_time, 2 * plan["stop_cycle_time"])
+        time.sleep(0.05)
+        setpoints = [command for command in self.simulator.received_commands if command["command"] == "set_joint_angle_all_time"]
+        self.assertEqual(setpoints[-1]["data"], [100, 0, 20, 0, 0, 0, 0])
+
+
+if __name__ == '__main__':
+    unittest.main()